@@ -4,13 +4,14 @@ import threading
 from collections.abc import Callable
 from dataclasses import asdict
 from queue import Queue
+from time import perf_counter
 from traceback import format_exception
 from typing import Any
 
 from blueapi.core import BlueskyContext, MsgGenerator
 from bluesky.callbacks.zmq import Publisher
 from bluesky.run_engine import RunEngine
-from flask import Flask, request
+from flask import Flask, Response, request
 from flask_restful import Api, Resource
 from pydantic.dataclasses import dataclass
 
@@ -28,12 +29,21 @@ from mx_bluesky.hyperion.external_interaction.callbacks.aperture_change_callback
 from mx_bluesky.hyperion.external_interaction.callbacks.common.callback_util import (
     CallbacksFactory,
 )
+from mx_bluesky.hyperion.external_interaction.callbacks.document_bus import (
+    SERIALISERS,
+    create_publisher_subscription,
+)
+from mx_bluesky.hyperion.external_interaction.callbacks.document_journal import (
+    DocumentJournalRecorder,
+    get_document_journal_dir,
+)
 from mx_bluesky.hyperion.external_interaction.callbacks.log_uid_tag_callback import (
     LogUidTaggingCallback,
 )
 from mx_bluesky.hyperion.external_interaction.callbacks.logging_callback import (
     VerbosePlanExecutionLoggingCallback,
 )
+from mx_bluesky.hyperion.job_queue import Job, JobQueue, JobState
 from mx_bluesky.hyperion.log import (
     LOGGER,
     do_default_logging_setup,
@@ -42,10 +52,13 @@ from mx_bluesky.hyperion.log import (
 from mx_bluesky.hyperion.parameters.cli import parse_cli_args
 from mx_bluesky.hyperion.parameters.components import HyperionParameters
 from mx_bluesky.hyperion.parameters.constants import CONST, Actions, Status
+from mx_bluesky.hyperion.status import StatusBroadcaster
 from mx_bluesky.hyperion.tracing import TRACER
-from mx_bluesky.hyperion.utils.context import setup_context
+from mx_bluesky.hyperion.utils.context import DeviceCompositeCache, setup_context
+from mx_bluesky.hyperion.utils.startup import StartupReport, run_concurrent_startup
 
 VERBOSE_EVENT_LOGGING: bool | None = None
+MAX_STATUS_LONG_POLL_S = 30.0
 
 
 @dataclass
@@ -83,9 +96,14 @@ class BlueskyRunner:
         context: BlueskyContext,
         skip_startup_connection=False,
         use_external_callbacks: bool = False,
+        concurrent_startup: bool = False,
+        zmq_serialiser: str = "pickle",
+        zmq_event_batch_size: int = 1,
     ) -> None:
         self.command_queue: Queue[Command] = Queue()
-        self.current_status: StatusAndMessage = StatusAndMessage(Status.IDLE)
+        self.composite_cache = DeviceCompositeCache()
+        self.status_broadcaster = StatusBroadcaster()
+        self.current_status = StatusAndMessage(Status.IDLE)
         self.last_run_aborted: bool = False
         self.aperture_change_callback = ApertureChangeCallback()
         self.logging_uid_tag_callback = LogUidTaggingCallback()
@@ -94,23 +112,61 @@ class BlueskyRunner:
         self.RE = RE
         self.context = context
         self.subscribed_per_plan_callbacks: list[int] = []
+        self.startup_report: StartupReport | None = None
+        self.job_queue = JobQueue()
+        self._job_start_lock = threading.Lock()
+        self._previous_job_end: float | None = None
         RE.subscribe(self.aperture_change_callback)
         RE.subscribe(self.logging_uid_tag_callback)
 
         self.use_external_callbacks = use_external_callbacks
         if self.use_external_callbacks:
-            LOGGER.info("Connecting to external callback ZMQ proxy...")
-            self.publisher = Publisher(f"localhost:{CONST.CALLBACK_0MQ_PROXY_PORTS[0]}")
-            RE.subscribe(self.publisher)
+            LOGGER.info(
+                f"Connecting to external callback ZMQ proxy, serialising documents "
+                f"with {zmq_serialiser}..."
+            )
+            self.publisher = Publisher(
+                f"localhost:{CONST.CALLBACK_0MQ_PROXY_PORTS[0]}",
+                serializer=SERIALISERS[zmq_serialiser],
+            )
+            RE.subscribe(
+                create_publisher_subscription(self.publisher, zmq_event_batch_size)
+            )
+
+        if journal_dir := get_document_journal_dir():
+            LOGGER.info(f"Recording document journals to {journal_dir}")
+            RE.subscribe(DocumentJournalRecorder(journal_dir))
 
         if VERBOSE_EVENT_LOGGING:
             RE.subscribe(VerbosePlanExecutionLoggingCallback())
 
         self.skip_startup_connection = skip_startup_connection
-        if not self.skip_startup_connection:
+        if not self.skip_startup_connection and concurrent_startup:
+            LOGGER.info("Connecting dodal devices and setting up plans concurrently...")
+            self.startup_report = run_concurrent_startup(
+                context,
+                self.composite_cache,
+                {name: entry["setup"] for name, entry in PLAN_REGISTRY.items()},
+            )
+        elif not self.skip_startup_connection:
             LOGGER.info("Initialising dodal devices...")
             for plan_name in PLAN_REGISTRY:
-                PLAN_REGISTRY[plan_name]["setup"](context)
+                self.composite_cache.get(
+                    context, plan_name, PLAN_REGISTRY[plan_name]["setup"]
+                )
+
+    @property
+    def current_status(self) -> StatusAndMessage:
+        return self._current_status
+
+    @current_status.setter
+    def current_status(self, status: StatusAndMessage) -> None:
+        """Setting the status also publishes a new status snapshot to clients."""
+        self._current_status = status
+        snapshot = asdict(status)
+        if cache_lookup := self.composite_cache.last_lookup:
+            snapshot["composite_cache"] = asdict(cache_lookup)
+        self.status_broadcaster.publish(snapshot)
 
     def start(
         self,
@@ -121,25 +177,102 @@ class BlueskyRunner:
     ) -> StatusAndMessage:
         LOGGER.info(f"Started with parameters: {parameters.json(indent=2)}")
 
-        devices: Any = PLAN_REGISTRY[plan_name]["setup"](self.context)
+        devices: Any = self.composite_cache.get(
+            self.context, plan_name, PLAN_REGISTRY[plan_name]["setup"]
+        )
 
-        if (
-            self.current_status.status == Status.BUSY.value
-            or self.current_status.status == Status.ABORTING.value
-        ):
-            return StatusAndMessage(Status.FAILED, "Bluesky already running")
-        else:
+        with self._job_start_lock:
+            if (
+                self.current_status.status == Status.BUSY.value
+                or self.current_status.status == Status.ABORTING.value
+            ):
+                return StatusAndMessage(Status.FAILED, "Bluesky already running")
+            elif len(self.job_queue):
+                return StatusAndMessage(
+                    Status.FAILED,
+                    "Jobs are queued, submit to the queue to run after them",
+                )
+            else:
+                self.current_status = StatusAndMessage(Status.BUSY)
+                self.command_queue.put(
+                    Command(
+                        action=Actions.START,
+                        devices=devices,
+                        experiment=experiment,
+                        parameters=parameters,
+                        callbacks=callbacks,
+                    )
+                )
+                return StatusAndMessage(Status.SUCCESS)
+
+    def submit(
+        self,
+        experiment: Callable,
+        parameters: HyperionParameters,
+        plan_name: str,
+        callbacks: CallbacksFactory | None,
+    ) -> Job:
+        """Adds a plan to the job queue. The devices for the plan are set up now, so
+        that the job can be started as soon as any jobs ahead of it have finished."""
+        LOGGER.info(f"Queued {plan_name} with parameters: {parameters.json(indent=2)}")
+        devices: Any = self.composite_cache.get(
+            self.context, plan_name, PLAN_REGISTRY[plan_name]["setup"]
+        )
+        job = self.job_queue.submit(
+            Job(plan_name, experiment, parameters, devices, callbacks)
+        )
+        self._start_next_job_if_idle()
+        return job
+
+    def _start_next_job_if_idle(self) -> None:
+        with self._job_start_lock:
+            if self.current_status.status in (
+                Status.BUSY.value,
+                Status.ABORTING.value,
+            ):
+                return
+            job = self.job_queue.pop_next()
+            if job is None:
+                return
+            LOGGER.info(f"Starting queued job {job.job_id} ({job.plan_name})")
             self.current_status = StatusAndMessage(Status.BUSY)
             self.command_queue.put(
                 Command(
                     action=Actions.START,
-                    devices=devices,
-                    experiment=experiment,
-                    parameters=parameters,
-                    callbacks=callbacks,
+                    devices=job.devices,
+                    experiment=job.experiment,
+                    parameters=job.parameters,
+                    callbacks=job.callbacks,
                 )
             )
-            return StatusAndMessage(Status.SUCCESS)
+
+    def resume_queue(self) -> StatusAndMessage:
+        """Carries on starting queued jobs after the queue was paused by a failure."""
+        if not self.job_queue.resume():
+            return StatusAndMessage(Status.FAILED, "Queue not paused")
+        LOGGER.info("Queue resumed")
+        self._start_next_job_if_idle()
+        return StatusAndMessage(Status.SUCCESS)
+
+    def _on_run_finished(self, succeeded: bool) -> None:
+        """Starts the next queued job if the plan succeeded. Otherwise the queue is
+        paused, so that jobs which may depend on the failed one wait until it is
+        resumed."""
+        with self._job_start_lock:
+            if (job := self.job_queue.running) is not None:
+                self.job_queue.finish(
+                    job, JobState.FINISHED if succeeded else JobState.FAILED
+                )
+            if not succeeded and len(self.job_queue):
+                self.job_queue.pause()
+                LOGGER.warning(
+                    f"Plan did not finish successfully, pausing the queue with "
+                    f"{len(self.job_queue)} jobs until it is resumed"
+                )
+        if succeeded:
+            if len(self.job_queue):
+                self._previous_job_end = perf_counter()
+            self._start_next_job_if_idle()
 
     def stopping_thread(self):
         try:
@@ -174,6 +307,7 @@ class BlueskyRunner:
             elif command.action == Actions.START:
                 if command.experiment is None:
                     raise ValueError("No experiment provided for START")
+                succeeded = True
                 try:
                     if (
                         not self.use_external_callbacks
@@ -186,6 +320,11 @@ class BlueskyRunner:
                         self.subscribed_per_plan_callbacks += [
                             self.RE.subscribe(cb) for cb in cbs
                         ]
+                    if self._previous_job_end is not None:
+                        self.job_queue.record_gap(
+                            perf_counter() - self._previous_job_end
+                        )
+                        self._previous_job_end = None
                     with TRACER.start_span("do_run"):
                         self.RE(command.experiment(command.devices, command.parameters))
 
@@ -200,6 +339,7 @@ class BlueskyRunner:
                     self.current_status = ErrorStatusAndMessage(exception)
                 except Exception as exception:
                     LOGGER.error("Exception on running plan", exc_info=True)
+                    succeeded = False
 
                     if self.last_run_aborted:
                         # Aborting will cause an exception here that we want to swallow
@@ -211,6 +351,7 @@ class BlueskyRunner:
                         self.RE.unsubscribe(cb)
                         for cb in self.subscribed_per_plan_callbacks
                     ]
+                self._on_run_finished(succeeded)
 
 
 def compose_start_args(context: BlueskyContext, plan_name: str, action: Actions):
@@ -265,6 +406,61 @@ class RunExperiment(Resource):
         return asdict(status_and_message)  # type: ignore
 
 
+class QueueJob(Resource):
+    def __init__(self, runner: BlueskyRunner, context: BlueskyContext) -> None:
+        super().__init__()
+        self.runner = runner
+        self.context = context
+
+    def put(self, target: str, action: str):
+        """Submits a job for the plan named by `target`, or cancels or reorders the
+        queued job whose id is `target`."""
+        status_and_message = StatusAndMessage(Status.FAILED, f"{action} not understood")
+        try:
+            if action == Actions.SUBMIT.value:
+                plan, params, plan_name, callback_type = compose_start_args(
+                    self.context, target, Actions.SUBMIT
+                )
+                job = self.runner.submit(plan, params, plan_name, callback_type)
+                return asdict(StatusAndMessage(Status.SUCCESS)) | {"job_id": job.job_id}
+            elif action == Actions.CANCEL.value:
+                status_and_message = self._result(self.runner.job_queue.cancel(target))
+            elif action == Actions.REORDER.value:
+                position = int(json.loads(request.data)["position"])
+                status_and_message = self._result(
+                    self.runner.job_queue.reorder(target, position)
+                )
+        except Exception as e:
+            status_and_message = ErrorStatusAndMessage(e)
+            LOGGER.error(format_exception(e))
+        return asdict(status_and_message)
+
+    @staticmethod
+    def _result(found: bool) -> StatusAndMessage:
+        if found:
+            return StatusAndMessage(Status.SUCCESS)
+        return StatusAndMessage(Status.FAILED, "No queued job with that id")
+
+
+class QueueStatus(Resource):
+    def __init__(self, runner: BlueskyRunner) -> None:
+        super().__init__()
+        self.runner = runner
+
+    def put(self, action: str | None = None):
+        status_and_message = StatusAndMessage(Status.FAILED, f"{action} not understood")
+        if action == Actions.RESUME.value:
+            status_and_message = self.runner.resume_queue()
+        return asdict(status_and_message)
+
+    def get(self, **kwargs):
+        return {
+            "jobs": self.runner.job_queue.list_jobs(),
+            "paused": self.runner.job_queue.paused,
+            "metrics": self.runner.job_queue.metrics,
+        }
+
+
 class StopOrStatus(Resource):
     def __init__(self, runner: BlueskyRunner) -> None:
         super().__init__()
@@ -277,14 +473,36 @@ class StopOrStatus(Resource):
         return asdict(status_and_message)
 
     def get(self, **kwargs):
+        """Returns the latest status snapshot. If a `since` version is given, waits up
+        to `timeout` seconds for a snapshot newer than it before returning."""
         action = kwargs.get("action")
-        status_and_message = StatusAndMessage(Status.FAILED, f"{action} not understood")
-        if action == Actions.STATUS.value:
-            LOGGER.debug(
-                f"Runner recieved status request - state of the runner object is: {self.runner.__dict__} - state of the RE is: {self.runner.RE.__dict__}"
+        if action != Actions.STATUS.value:
+            status_and_message = StatusAndMessage(
+                Status.FAILED, f"{action} not understood"
             )
-            status_and_message = self.runner.current_status
-        return asdict(status_and_message)
+            return asdict(status_and_message)
+        broadcaster = self.runner.status_broadcaster
+        since = request.args.get("since", type=int)
+        if since is None:
+            _, snapshot = broadcaster.latest
+        else:
+            timeout = request.args.get("timeout", MAX_STATUS_LONG_POLL_S, type=float)
+            _, snapshot = broadcaster.wait_for_change(
+                since, min(timeout, MAX_STATUS_LONG_POLL_S)
+            )
+        return Response(snapshot, mimetype="application/json")
+
+
+class StatusStream(Resource):
+    def __init__(self, runner: BlueskyRunner) -> None:
+        super().__init__()
+        self.runner: BlueskyRunner = runner
+
+    def get(self):
+        """Streams every change of status as server-sent events."""
+        return Response(
+            self.runner.status_broadcaster.stream(), mimetype="text/event-stream"
+        )
 
 
 class FlushLogs(Resource):
@@ -305,15 +523,21 @@ def create_app(
     RE: RunEngine = RunEngine({}),
     skip_startup_connection: bool = False,
     use_external_callbacks: bool = False,
+    concurrent_startup: bool = False,
+    zmq_serialiser: str = "pickle",
+    zmq_event_batch_size: int = 1,
 ) -> tuple[Flask, BlueskyRunner]:
     context = setup_context(
-        wait_for_connection=not skip_startup_connection,
+        wait_for_connection=not (skip_startup_connection or concurrent_startup),
     )
     runner = BlueskyRunner(
         RE,
         context=context,
         use_external_callbacks=use_external_callbacks,
         skip_startup_connection=skip_startup_connection,
+        concurrent_startup=concurrent_startup,
+        zmq_serialiser=zmq_serialiser,
+        zmq_event_batch_size=zmq_event_batch_size,
     )
     app = Flask(__name__)
     if test_config:
@@ -328,6 +552,22 @@ def create_app(
         FlushLogs,
         "/flush_debug_log",
     )
+    api.add_resource(
+        StatusStream,
+        "/status/stream",
+        resource_class_args=[runner],
+    )
+    api.add_resource(
+        QueueStatus,
+        "/queue",
+        "/queue/<string:action>",
+        resource_class_args=[runner],
+    )
+    api.add_resource(
+        QueueJob,
+        "/queue/<string:target>/<string:action>",
+        resource_class_args=[runner, context],
+    )
     api.add_resource(
         StopOrStatus,
         "/<string:action>",
@@ -345,6 +585,9 @@ def create_targets():
     app, runner = create_app(
         skip_startup_connection=args.skip_startup_connection,
         use_external_callbacks=args.use_external_callbacks,
+        concurrent_startup=args.concurrent_startup,
+        zmq_serialiser=args.zmq_serialiser,
+        zmq_event_batch_size=args.zmq_event_batch_size,
     )
     return app, runner, hyperion_port, args.dev_mode
 
@@ -354,7 +597,7 @@ def main():
     atexit.register(runner.shutdown)
     flask_thread = threading.Thread(
         target=lambda: app.run(
-            host="0.0.0.0", port=port, debug=True, use_reloader=False
+            host="0.0.0.0", port=port, debug=dev_mode, use_reloader=False
         ),
         daemon=True,
     )
@@ -43,7 +43,6 @@ from dodal.devices.zocalo.zocalo_results import (
 )
 from dodal.plans.check_topup import check_topup_and_wait_if_necessary
 from ophyd_async.panda import HDFPanda
-from scanspec.core import AxesPoints, Axis
 
 from mx_bluesky.hyperion.device_setup_plans.manipulate_sample import move_x_y_z
 from mx_bluesky.hyperion.device_setup_plans.read_hardware_for_setup import (
@@ -68,6 +67,7 @@ from mx_bluesky.hyperion.exceptions import WarningException
 from mx_bluesky.hyperion.log import LOGGER
 from mx_bluesky.hyperion.parameters.constants import CONST
 from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+from mx_bluesky.hyperion.parameters.scan_geometry import ScanDescriptor
 from mx_bluesky.hyperion.tracing import TRACER
 from mx_bluesky.hyperion.utils.context import device_composite_from_context
 
@@ -281,7 +281,7 @@ def run_gridscan(
         feature_controlled.fgs_motors,
         fgs_composite.eiger,
         fgs_composite.synchrotron,
-        [parameters.scan_points_first_grid, parameters.scan_points_second_grid],
+        parameters.scan_descriptors,
         parameters.scan_indices,
         do_during_run=read_during_collection,
     )
@@ -292,7 +292,7 @@ def kickoff_and_complete_gridscan(
     gridscan: FastGridScanCommon,
     eiger: EigerDetector,
     synchrotron: Synchrotron,
-    scan_points: list[AxesPoints[Axis]],
+    scan_descriptors: list[ScanDescriptor],
     scan_start_indices: list[int],
     do_during_run: Callable[[], MsgGenerator] | None = None,
 ):
@@ -301,7 +301,7 @@ def kickoff_and_complete_gridscan(
     @bpp.run_decorator(
         md={
             "subplan_name": CONST.PLAN.DO_FGS,
-            "scan_points": scan_points,
+            "scan_descriptors": [d.to_dict() for d in scan_descriptors],
             "scan_start_indices": scan_start_indices,
         }
     )
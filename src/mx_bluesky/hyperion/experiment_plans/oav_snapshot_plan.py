@@ -1,4 +1,6 @@
+import dataclasses
 from datetime import datetime
+from math import ceil
 from typing import Protocol
 
 from blueapi.core import MsgGenerator
@@ -10,12 +12,15 @@ from dodal.devices.oav.oav_parameters import OAVParameters
 from dodal.devices.smargon import Smargon
 
 from mx_bluesky.hyperion.device_setup_plans.setup_oav import setup_general_oav_params
+from mx_bluesky.hyperion.log import LOGGER
 from mx_bluesky.hyperion.parameters.components import WithSnapshot
 from mx_bluesky.hyperion.parameters.constants import DocDescriptorNames
 
 OAV_SNAPSHOT_SETUP_GROUP = "oav_snapshot_setup"
 OAV_SNAPSHOT_SETUP_SHOT = "oav_snapshot_setup_shot"
 OAV_SNAPSHOT_GROUP = "oav_snapshot_group"
+OAV_SNAPSHOT_FLY_GROUP = "oav_snapshot_fly"
+OAV_FLY_SNAPSHOT_POLL_INTERVAL_S = 0.01
 
 
 class OavSnapshotComposite(Protocol):
@@ -75,13 +80,121 @@ def _take_oav_snapshot(composite: OavSnapshotComposite, omega: float):
     yield from bps.abs_set(
         composite.smargon.omega, omega, group=OAV_SNAPSHOT_SETUP_SHOT
     )
-    time_now = datetime.now()
-    filename = f"{time_now.strftime('%H%M%S')}_oav_snapshot_{omega:.0f}"
     yield from bps.abs_set(
-        composite.oav.snapshot.filename, filename, group=OAV_SNAPSHOT_SETUP_SHOT
+        composite.oav.snapshot.filename,
+        _snapshot_filename(omega),
+        group=OAV_SNAPSHOT_SETUP_SHOT,
     )
     yield from bps.wait(group=OAV_SNAPSHOT_SETUP_SHOT)
     yield from bps.trigger(composite.oav.snapshot, wait=True)
     yield from bps.create(DocDescriptorNames.OAV_ROTATION_SNAPSHOT_TRIGGERED)
     yield from bps.read(composite.oav.snapshot)
     yield from bps.save()
+
+
+def _snapshot_filename(omega: float) -> str:
+    return f"{datetime.now().strftime('%H%M%S')}_oav_snapshot_{omega:.0f}"
+
+
+def _fly_snapshot_event(composite: OavSnapshotComposite):
+    """Takes a snapshot and emits an event with it and where omega was as soon as it
+    had been taken, as omega carries on moving throughout"""
+    yield from bps.trigger(composite.oav.snapshot, wait=True)
+    yield from bps.create(DocDescriptorNames.OAV_ROTATION_SNAPSHOT_TRIGGERED)
+    yield from bps.read(composite.smargon.omega)
+    yield from bps.read(composite.oav.snapshot)
+    yield from bps.save()
+
+
+@dataclasses.dataclass
+class FlySnapshotPath:
+    """A single move of omega which passes through all the snapshot angles in order"""
+
+    direction: int
+    omegas_deg: list[float]
+    end_deg: float
+    needs_run_up: bool
+
+
+def plan_fly_snapshot_path(
+    current_omega_deg: float, snapshot_omegas_deg: list[float], end_omega_deg: float
+) -> FlySnapshotPath:
+    """Picks the direction to pass through the snapshot angles which moves omega the
+    least on the way from where it is to where it needs to end up. Omega only has to
+    stop before the snapshots if it is already past the first of them."""
+
+    def _path(direction: int) -> tuple[float, bool, FlySnapshotPath]:
+        omegas = sorted(snapshot_omegas_deg, key=lambda omega: direction * omega)
+        first, last = omegas[0], omegas[-1]
+        needs_run_up = direction * (current_omega_deg - first) > 0
+        # Carry on to the end if it's further on, rather than stopping twice
+        end = end_omega_deg if direction * (end_omega_deg - last) > 0 else last
+        travel = (
+            abs(current_omega_deg - first)
+            + abs(last - first)
+            + abs(end_omega_deg - last)
+        )
+        return (
+            travel,
+            needs_run_up,
+            FlySnapshotPath(direction, omegas, end, needs_run_up),
+        )
+
+    return min((_path(1), _path(-1)), key=lambda p: p[:2])[2]
+
+
+def oav_fly_snapshot_plan(
+    composite: OavSnapshotComposite,
+    parameters: WithSnapshot,
+    oav_parameters: OAVParameters,
+    end_omega_deg: float,
+    max_omega_velocity_deg_s: float,
+) -> MsgGenerator:
+    """Takes the snapshots while omega moves towards `end_omega_deg` without stopping
+    at each angle. Each snapshot is triggered as soon as omega is seen to have passed
+    its angle, and the event for it records where omega actually was. Expects omega to
+    have been set to `max_omega_velocity_deg_s` by `setup_oav_snapshot_plan`."""
+    if not parameters.take_snapshots:
+        return
+    yield from bps.wait(group=OAV_SNAPSHOT_SETUP_GROUP)
+    yield from _setup_oav(composite, parameters, oav_parameters)
+    omega = composite.smargon.omega
+    current_omega = yield from bps.rd(omega)
+    path = plan_fly_snapshot_path(
+        current_omega, parameters.snapshot_omegas_deg or [], end_omega_deg
+    )
+    LOGGER.info(f"Taking snapshots while moving omega: {path}")
+    if path.needs_run_up:
+        yield from bps.abs_set(omega, path.omegas_deg[0], wait=True)
+        current_omega = path.omegas_deg[0]
+
+    expected_time_s = abs(path.end_deg - current_omega) / max_omega_velocity_deg_s
+    max_polls = ceil(2 * expected_time_s / OAV_FLY_SNAPSHOT_POLL_INTERVAL_S) + 1
+    yield from bps.abs_set(
+        composite.oav.snapshot.filename,
+        _snapshot_filename(path.omegas_deg[0]),
+        wait=True,
+    )
+    yield from bps.abs_set(omega, path.end_deg, group=OAV_SNAPSHOT_FLY_GROUP)
+    polls = 0
+    for i, snapshot_omega in enumerate(path.omegas_deg):
+        while polls < max_polls:
+            position = yield from bps.rd(omega)
+            if path.direction * (position - snapshot_omega) >= 0:
+                break
+            yield from bps.sleep(OAV_FLY_SNAPSHOT_POLL_INTERVAL_S)
+            polls += 1
+        else:
+            LOGGER.warning(
+                f"Omega did not pass {snapshot_omega} in {2 * expected_time_s}s,"
+                " waiting for it to stop before taking the snapshot"
+            )
+            yield from bps.wait(group=OAV_SNAPSHOT_FLY_GROUP)
+        yield from _fly_snapshot_event(composite)
+        if i + 1 < len(path.omegas_deg):
+            yield from bps.abs_set(
+                composite.oav.snapshot.filename,
+                _snapshot_filename(path.omegas_deg[i + 1]),
+                wait=True,
+            )
+    yield from bps.wait(group=OAV_SNAPSHOT_FLY_GROUP)
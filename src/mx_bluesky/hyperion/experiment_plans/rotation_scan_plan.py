@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import dataclasses
+import json
+from collections.abc import Callable, Generator
+from functools import partial
+from math import ceil
+from time import monotonic
+from typing import Any, TypeVar
 
 import bluesky.plan_stubs as bps
 import bluesky.preprocessors as bpp
 from blueapi.core import BlueskyContext, MsgGenerator
-from dodal.devices.aperturescatterguard import ApertureScatterguard
+from bluesky.utils import Msg
+from dodal.devices.aperturescatterguard import AperturePosition, ApertureScatterguard
 from dodal.devices.attenuator import Attenuator
-from dodal.devices.backlight import Backlight
+from dodal.devices.backlight import Backlight, BacklightPosition
 from dodal.devices.dcm import DCM
 from dodal.devices.detector.detector_motion import DetectorMotion
 from dodal.devices.eiger import EigerDetector
@@ -41,7 +48,9 @@ from mx_bluesky.hyperion.device_setup_plans.setup_zebra import (
     setup_zebra_for_rotation,
 )
 from mx_bluesky.hyperion.experiment_plans.oav_snapshot_plan import (
+    OAV_SNAPSHOT_SETUP_GROUP,
     OavSnapshotComposite,
+    oav_fly_snapshot_plan,
     oav_snapshot_plan,
     setup_oav_snapshot_plan,
 )
@@ -50,6 +59,7 @@ from mx_bluesky.hyperion.parameters.constants import CONST
 from mx_bluesky.hyperion.parameters.rotation import (
     MultiRotationScan,
     RotationScan,
+    RotationScanPerSweep,
 )
 from mx_bluesky.hyperion.utils.context import device_composite_from_context
 
@@ -84,6 +94,12 @@ DEFAULT_DIRECTION = RotationDirection.NEGATIVE
 DEFAULT_MAX_VELOCITY = 120
 # Use a slightly larger time to acceleration than EPICS as it's better to be cautious
 ACCELERATION_MARGIN = 1.5
+OMEGA_POLL_INTERVAL_S = 0.05
+# The exact search over orders of sweeps takes time exponential in their number, so
+# beyond this many a greedy search is used instead
+MAX_EXACT_REORDER_SWEEPS = 10
+
+SweepT = TypeVar("SweepT", bound=RotationScanPerSweep)
 
 
 @dataclasses.dataclass
@@ -181,20 +197,371 @@ def calculate_motion_profile(
     )
 
 
+def _reversed_direction(direction: RotationDirection) -> RotationDirection:
+    return (
+        RotationDirection.NEGATIVE
+        if direction == RotationDirection.POSITIVE
+        else RotationDirection.POSITIVE
+    )
+
+
+def _reversed_sweep(scan: SweepT) -> SweepT:
+    """The same sweep covering the same range of omega in the opposite direction"""
+    return scan.copy(
+        update={
+            "omega_start_deg": scan.omega_start_deg
+            + scan.rotation_direction.multiplier * scan.scan_width_deg,
+            "rotation_direction": _reversed_direction(scan.rotation_direction),
+        }
+    )
+
+
+@dataclasses.dataclass
+class PlannedSweep:
+    requested_index: int
+    reversed: bool
+    motion_profile: RotationMotionProfile
+    phi_deg: float | None
+    chi_deg: float | None
+
+    @property
+    def end_motion_deg(self) -> float:
+        return (
+            self.motion_profile.start_motion_deg
+            + self.motion_profile.distance_to_move_deg
+        )
+
+
+@dataclasses.dataclass
+class SweepOrderPlan:
+    """The order and direction in which to collect the sweeps of a multi rotation scan,
+    with the predicted time spent moving between sweeps compared to collecting them as
+    requested. Moves between sweeps are assumed to run omega, phi and chi at full
+    speed in parallel, so the time for each is that of the slowest axis."""
+
+    sweeps: list[PlannedSweep]
+    requested_sweeps: list[PlannedSweep]
+    velocities_deg_s: tuple[float, float, float]
+
+    def _transition_times_s(self, sweeps: list[PlannedSweep]) -> list[float]:
+        return [
+            _transition_time_s(a, b, self.velocities_deg_s)
+            for a, b in zip(sweeps, sweeps[1:], strict=False)
+        ]
+
+    @property
+    def predicted_time_saving_s(self) -> float:
+        return sum(self._transition_times_s(self.requested_sweeps)) - sum(
+            self._transition_times_s(self.sweeps)
+        )
+
+    def apply(self, parameters: MultiRotationScan) -> MultiRotationScan:
+        rotation_scans = []
+        for sweep in self.sweeps:
+            scan = parameters.rotation_scans[sweep.requested_index]
+            rotation_scans.append(_reversed_sweep(scan) if sweep.reversed else scan)
+        # Rebuilt rather than copied so that the image offsets of each sweep follow
+        # the new order
+        return MultiRotationScan(
+            **(
+                parameters.dict()
+                | {"rotation_scans": [scan.dict() for scan in rotation_scans]}
+            )
+        )
+
+    def summary(self) -> dict[str, Any]:
+        def _travel(sweeps: list[PlannedSweep]) -> dict[str, float]:
+            return {
+                axis: sum(
+                    abs(distance)
+                    for distance in (
+                        _transition_distances_deg(a, b)[i]
+                        for a, b in zip(sweeps, sweeps[1:], strict=False)
+                    )
+                )
+                for i, axis in enumerate(["omega", "phi", "chi"])
+            }
+
+        return {
+            "order": [s.requested_index for s in self.sweeps],
+            "reversed": [s.reversed for s in self.sweeps],
+            "requested_travel_deg": _travel(self.requested_sweeps),
+            "planned_travel_deg": _travel(self.sweeps),
+            "requested_transition_time_s": sum(
+                self._transition_times_s(self.requested_sweeps)
+            ),
+            "planned_transition_time_s": sum(self._transition_times_s(self.sweeps)),
+            "predicted_time_saving_s": self.predicted_time_saving_s,
+        }
+
+
+def _transition_distances_deg(
+    a: PlannedSweep, b: PlannedSweep
+) -> tuple[float, float, float]:
+    def _distance(start: float | None, end: float | None) -> float:
+        # An angle that isn't given isn't moved
+        return 0 if start is None or end is None else end - start
+
+    return (
+        b.motion_profile.start_motion_deg - a.end_motion_deg,
+        _distance(a.phi_deg, b.phi_deg),
+        _distance(a.chi_deg, b.chi_deg),
+    )
+
+
+def _transition_time_s(
+    a: PlannedSweep, b: PlannedSweep, velocities_deg_s: tuple[float, float, float]
+) -> float:
+    return max(
+        abs(distance) / velocity
+        for distance, velocity in zip(
+            _transition_distances_deg(a, b), velocities_deg_s, strict=True
+        )
+    )
+
+
+def plan_sweep_order(
+    parameters: MultiRotationScan,
+    motor_time_to_speed_s: float,
+    omega_velocity_deg_s: float,
+    phi_velocity_deg_s: float = DEFAULT_MAX_VELOCITY,
+    chi_velocity_deg_s: float = DEFAULT_MAX_VELOCITY,
+) -> SweepOrderPlan:
+    """Finds the order and direction of the sweeps which minimises the time spent
+    moving omega, phi and chi between them, as far as the parameters allow sweeps to
+    be reordered or reversed. Reversing a sweep also moves its run-up to the other
+    side, and every sweep keeps the run-up given by `calculate_motion_profile`.
+
+    Reordering finds the best order of up to MAX_EXACT_REORDER_SWEEPS sweeps. Beyond
+    that a greedy order is used, or the requested order if that is quicker.
+
+    This only uses the parameters and motor speeds, so can be run offline to check
+    what a collection will do."""
+    velocities = (omega_velocity_deg_s, phi_velocity_deg_s, chi_velocity_deg_s)
+    requested_scans = list(parameters.single_rotation_scans)
+
+    def _planned(index: int, reverse: bool) -> PlannedSweep:
+        scan = requested_scans[index]
+        if reverse:
+            scan = _reversed_sweep(scan)
+        return PlannedSweep(
+            index,
+            reverse,
+            calculate_motion_profile(scan, motor_time_to_speed_s, omega_velocity_deg_s),
+            scan.phi_start_deg,
+            scan.chi_start_deg,
+        )
+
+    requested = [_planned(i, False) for i in range(len(requested_scans))]
+    candidates = [
+        [
+            requested[i],
+            *([_planned(i, True)] if parameters.allow_sweep_reversal else []),
+        ]
+        for i in range(len(requested_scans))
+    ]
+    if parameters.allow_sweep_reordering and len(candidates) <= (
+        MAX_EXACT_REORDER_SWEEPS
+    ):
+        sweeps = _shortest_tour(candidates, velocities)
+    elif parameters.allow_sweep_reordering:
+        sweeps = min(
+            _greedy_tour(candidates, velocities),
+            _shortest_path_in_order(candidates, velocities),
+            key=lambda tour: _tour_time_s(tour, velocities),
+        )
+    else:
+        sweeps = _shortest_path_in_order(candidates, velocities)
+    return SweepOrderPlan(sweeps, requested, velocities)
+
+
+def _shortest_path_in_order(
+    candidates: list[list[PlannedSweep]], velocities: tuple[float, float, float]
+) -> list[PlannedSweep]:
+    """Picks a direction for each sweep, keeping the requested order"""
+    paths: list[tuple[float, list[PlannedSweep]]] = [(0, [c]) for c in candidates[0]]
+    for options in candidates[1:]:
+        # Keep only the quickest way to get to each direction of this sweep
+        paths = [
+            min(
+                (
+                    (
+                        time + _transition_time_s(path[-1], option, velocities),
+                        [*path, option],
+                    )
+                    for time, path in paths
+                ),
+                key=lambda p: p[0],
+            )
+            for option in options
+        ]
+    return min(paths, key=lambda p: p[0])[1]
+
+
+def _tour_time_s(
+    sweeps: list[PlannedSweep], velocities: tuple[float, float, float]
+) -> float:
+    return sum(
+        _transition_time_s(a, b, velocities)
+        for a, b in zip(sweeps, sweeps[1:], strict=False)
+    )
+
+
+def _greedy_tour(
+    candidates: list[list[PlannedSweep]], velocities: tuple[float, float, float]
+) -> list[PlannedSweep]:
+    """Picks the order and direction of the sweeps by always moving to the nearest
+    sweep not yet collected, trying each sweep to start from"""
+    tours = []
+    for first in (option for options in candidates for option in options):
+        tour = [first]
+        remaining = set(range(len(candidates))) - {first.requested_index}
+        while remaining:
+            tour.append(
+                min(
+                    (option for i in remaining for option in candidates[i]),
+                    key=lambda option: _transition_time_s(tour[-1], option, velocities),
+                )
+            )
+            remaining.remove(tour[-1].requested_index)
+        tours.append(tour)
+    return min(tours, key=lambda tour: _tour_time_s(tour, velocities))
+
+
+def _shortest_tour(
+    candidates: list[list[PlannedSweep]], velocities: tuple[float, float, float]
+) -> list[PlannedSweep]:
+    """Picks the order and direction of the sweeps, visiting each sweep once, using
+    dynamic programming over the subsets of sweeps already collected."""
+    n = len(candidates)
+    # (sweeps done, last sweep, last option) -> (time, previous state)
+    best: dict[tuple[int, int, int], tuple[float, tuple[int, int, int] | None]] = {
+        (1 << i, i, o): (0, None) for i in range(n) for o in range(len(candidates[i]))
+    }
+    for done in range(1, 1 << n):
+        for last in range(n):
+            for last_option in range(len(candidates[last])):
+                state = (done, last, last_option)
+                if state not in best:
+                    continue
+                time = best[state][0]
+                for nxt in range(n):
+                    if done & (1 << nxt):
+                        continue
+                    for option, sweep in enumerate(candidates[nxt]):
+                        new_time = time + _transition_time_s(
+                            candidates[last][last_option], sweep, velocities
+                        )
+                        new_state = (done | (1 << nxt), nxt, option)
+                        if new_state not in best or new_time < best[new_state][0]:
+                            best[new_state] = (new_time, state)
+    all_done = (1 << n) - 1
+    state: tuple[int, int, int] | None = min(
+        (s for s in best if s[0] == all_done), key=lambda s: best[s][0]
+    )
+    tour = []
+    while state is not None:
+        tour.append(candidates[state[1]][state[2]])
+        state = best[state][1]
+    return tour[::-1]
+
+
+def plan_sweep_order_from_devices(
+    composite: RotationScanComposite, parameters: MultiRotationScan
+) -> Generator[Msg, Any, SweepOrderPlan]:
+    smargon = composite.smargon
+    motor_time_to_speed = yield from bps.rd(smargon.omega.acceleration_time)
+    velocities = []
+    for motor in (smargon.omega, smargon.phi, smargon.chi):
+        velocity = yield from bps.rd(motor.max_velocity)
+        velocities.append(
+            velocity if velocity and velocity > 0 else DEFAULT_MAX_VELOCITY
+        )
+    sweep_plan = plan_sweep_order(parameters, motor_time_to_speed, *velocities)
+    LOGGER.info(f"Planned sweep order: {json.dumps(sweep_plan.summary())}")
+    return sweep_plan
+
+
+class SweepTimer:
+    """Records when each sweep of a multi rotation scan starts and stops rotating, to
+    report the dead time between them."""
+
+    def __init__(self) -> None:
+        self._plan_start_s = monotonic()
+        self._rotation_starts_s: list[float] = []
+        self._rotation_ends_s: list[float] = []
+
+    def rotation_started(self):
+        self._rotation_starts_s.append(monotonic())
+
+    def rotation_finished(self):
+        self._rotation_ends_s.append(monotonic())
+
+    @property
+    def dead_times_s(self) -> list[float]:
+        """The time before each sweep started rotating, from the start of the plan for
+        the first sweep and from the end of the previous rotation for the others."""
+        previous_ends_s = [self._plan_start_s, *self._rotation_ends_s]
+        return [
+            start - previous_end
+            for start, previous_end in zip(
+                self._rotation_starts_s, previous_ends_s, strict=False
+            )
+        ]
+
+    def report(self, mode: str) -> str:
+        dead_times_s = [round(t, 3) for t in self.dead_times_s]
+        return (
+            f"Multi rotation scan ({mode}) dead time per sweep: {dead_times_s}s, "
+            f"total between sweeps: {sum(dead_times_s[1:]):.3f}s"
+        )
+
+
+def _wait_for_exposure_to_end(
+    composite: RotationScanComposite, motion_values: RotationMotionProfile
+):
+    """Waits until omega has passed the end of the exposure, after which the zebra has
+    sent all its triggers and closed the shutter, but omega may still be decelerating.
+    If omega doesn't get there in time, waits for the rotation to finish instead."""
+    multiplier = motion_values.direction.multiplier
+    end_of_exposure_deg = motion_values.start_scan_deg + multiplier * (
+        motion_values.scan_width_deg + motion_values.shutter_opening_deg
+    )
+    expected_time_s = (
+        abs(motion_values.distance_to_move_deg) / motion_values.speed_for_rotation_deg_s
+    )
+    for _ in range(ceil(2 * expected_time_s / OMEGA_POLL_INTERVAL_S) + 1):
+        omega_deg = yield from bps.rd(composite.smargon.omega)
+        if (omega_deg - end_of_exposure_deg) * multiplier >= 0:
+            return
+        yield from bps.sleep(OMEGA_POLL_INTERVAL_S)
+    LOGGER.warning(
+        f"Omega did not pass {end_of_exposure_deg} in {2 * expected_time_s}s, waiting"
+        " for the rotation to finish before preparing the next sweep"
+    )
+    yield from bps.wait(CONST.WAIT.ROTATION_SWEEP)
+
+
 def rotation_scan_plan(
     composite: RotationScanComposite,
     params: RotationScan,
     motion_values: RotationMotionProfile,
+    zebra_already_set_up: bool = False,
+    prepare_next_sweep: Callable[[], MsgGenerator] | None = None,
+    sweep_timer: SweepTimer | None = None,
 ):
     """A stub plan to collect diffraction images from a sample continuously rotating
     about a fixed axis - for now this axis is limited to omega.
-    Needs additional setup of the sample environment and a wrapper to clean up."""
+    Needs additional setup of the sample environment and a wrapper to clean up.
+
+    If `prepare_next_sweep` is given it is run as soon as the exposure has finished,
+    while omega is still decelerating, rather than after the rotation."""
 
     @bpp.set_run_key_decorator(CONST.PLAN.ROTATION_MAIN)
     @bpp.run_decorator(
         md={
             "subplan_name": CONST.PLAN.ROTATION_MAIN,
-            "scan_points": [params.scan_points],
+            "scan_descriptors": [params.scan_descriptor.to_dict()],
         }
     )
     def _rotation_scan_plan(
@@ -215,16 +582,8 @@ def rotation_scan_plan(
             wait=True,
         )
 
-        yield from setup_zebra_for_rotation(
-            composite.zebra,
-            start_angle=motion_values.start_scan_deg,
-            scan_width=motion_values.scan_width_deg,
-            direction=motion_values.direction,
-            shutter_opening_deg=motion_values.shutter_opening_deg,
-            shutter_opening_s=motion_values.shutter_time_s,
-            group="setup_zebra",
-            wait=True,
-        )
+        if not zebra_already_set_up:
+            yield from _setup_zebra(composite, motion_values, wait=True)
 
         yield from setup_sample_environment(
             composite.aperture_scatterguard,
@@ -265,19 +624,56 @@ def rotation_scan_plan(
         )  # See #https://github.com/DiamondLightSource/hyperion/issues/932
 
         LOGGER.info("Executing rotation scan")
-        yield from bps.rel_set(axis, motion_values.distance_to_move_deg, wait=True)
-
-        yield from read_hardware_during_collection(
-            composite.aperture_scatterguard,
-            composite.attenuator,
-            composite.flux,
-            composite.dcm,
-            composite.eiger,
-        )
+        if sweep_timer:
+            sweep_timer.rotation_started()
+        if prepare_next_sweep is None:
+            yield from bps.rel_set(axis, motion_values.distance_to_move_deg, wait=True)
+            if sweep_timer:
+                sweep_timer.rotation_finished()
+            yield from _read_hardware_during_collection(composite)
+        else:
+            yield from bps.rel_set(
+                axis,
+                motion_values.distance_to_move_deg,
+                group=CONST.WAIT.ROTATION_SWEEP,
+            )
+            yield from _wait_for_exposure_to_end(composite, motion_values)
+            # Read before preparing the next sweep, which may move the aperture
+            yield from _read_hardware_during_collection(composite)
+            LOGGER.info("Preparing next sweep while omega decelerates")
+            yield from prepare_next_sweep()
+            yield from bps.wait(CONST.WAIT.ROTATION_SWEEP)
+            if sweep_timer:
+                sweep_timer.rotation_finished()
 
     yield from _rotation_scan_plan(motion_values, composite)
 
 
+def _read_hardware_during_collection(composite: RotationScanComposite):
+    yield from read_hardware_during_collection(
+        composite.aperture_scatterguard,
+        composite.attenuator,
+        composite.flux,
+        composite.dcm,
+        composite.eiger,
+    )
+
+
+def _setup_zebra(
+    composite: RotationScanComposite, motion_values: RotationMotionProfile, wait: bool
+):
+    yield from setup_zebra_for_rotation(
+        composite.zebra,
+        start_angle=motion_values.start_scan_deg,
+        scan_width=motion_values.scan_width_deg,
+        direction=motion_values.direction,
+        shutter_opening_deg=motion_values.shutter_opening_deg,
+        shutter_opening_s=motion_values.shutter_time_s,
+        group="setup_zebra",
+        wait=wait,
+    )
+
+
 def _cleanup_plan(composite: RotationScanComposite, **kwargs):
     LOGGER.info("Cleaning up after rotation scan")
     max_vel = yield from bps.rd(composite.smargon.omega.max_velocity)
@@ -287,18 +683,11 @@ def _cleanup_plan(composite: RotationScanComposite, **kwargs):
     yield from bpp.finalize_wrapper(disarm_zebra(composite.zebra), bps.wait("cleanup"))
 
 
-def _move_and_rotation(
-    composite: RotationScanComposite,
-    params: RotationScan,
-    oav_params: OAVParameters,
-):
-    motor_time_to_speed = yield from bps.rd(composite.smargon.omega.acceleration_time)
-    max_vel = yield from bps.rd(composite.smargon.omega.max_velocity)
-    motion_values = calculate_motion_profile(params, motor_time_to_speed, max_vel)
+def _div_by_1000_if_not_none(num: float | None):
+    return num / 1000 if num else num
 
-    def _div_by_1000_if_not_none(num: float | None):
-        return num / 1000 if num else num
 
+def _move_gonio_to_start(composite: RotationScanComposite, params: RotationScan):
     LOGGER.info("moving to position (if specified)")
     yield from move_x_y_z(
         composite.smargon,
@@ -313,19 +702,123 @@ def _move_and_rotation(
         params.chi_start_deg,
         group=CONST.WAIT.MOVE_GONIO_TO_START,
     )
+
+
+def _take_snapshots(
+    composite: RotationScanComposite,
+    params: RotationScan,
+    motion_values: RotationMotionProfile,
+    oav_params: OAVParameters,
+):
     if params.take_snapshots:
         yield from bps.wait(CONST.WAIT.MOVE_GONIO_TO_START)
         yield from setup_oav_snapshot_plan(
             composite, params, motion_values.max_velocity_deg_s
         )
-        yield from oav_snapshot_plan(composite, params, oav_params)
+        if params.fly_snapshots:
+            yield from oav_fly_snapshot_plan(
+                composite,
+                params,
+                oav_params,
+                motion_values.start_motion_deg,
+                motion_values.max_velocity_deg_s,
+            )
+        else:
+            yield from oav_snapshot_plan(composite, params, oav_params)
+
+
+def _move_and_rotation(
+    composite: RotationScanComposite,
+    params: RotationScan,
+    oav_params: OAVParameters,
+    sweep_timer: SweepTimer | None = None,
+):
+    motor_time_to_speed = yield from bps.rd(composite.smargon.omega.acceleration_time)
+    max_vel = yield from bps.rd(composite.smargon.omega.max_velocity)
+    motion_values = calculate_motion_profile(params, motor_time_to_speed, max_vel)
+
+    yield from _move_gonio_to_start(composite, params)
+    yield from _take_snapshots(composite, params, motion_values, oav_params)
     yield from rotation_scan_plan(
-        composite,
-        params,
-        motion_values,
+        composite, params, motion_values, sweep_timer=sweep_timer
     )
 
 
+def _prepare_sweep(
+    composite: RotationScanComposite,
+    params: RotationScan,
+    motion_values: RotationMotionProfile,
+):
+    """Starts everything for a sweep which doesn't need omega, without waiting for it
+    to finish. The zebra may still be armed from the previous sweep, so it is disarmed
+    before it is set up again; it has already sent all that sweep's triggers."""
+    yield from _move_gonio_to_start(composite, params)
+    yield from disarm_zebra(composite.zebra)
+    yield from _setup_zebra(composite, motion_values, wait=False)
+    if params.take_snapshots:
+        yield from bps.abs_set(
+            composite.backlight, BacklightPosition.IN, group=OAV_SNAPSHOT_SETUP_GROUP
+        )
+        yield from bps.abs_set(
+            composite.aperture_scatterguard,
+            AperturePosition.ROBOT_LOAD,
+            group=OAV_SNAPSHOT_SETUP_GROUP,
+        )
+
+
+def _single_sweep_md(params: RotationScan) -> dict:
+    return {
+        "subplan_name": CONST.PLAN.ROTATION_OUTER,
+        CONST.TRIGGER.ZOCALO: CONST.PLAN.ROTATION_MAIN,
+        "hyperion_parameters": params.json(),
+    }
+
+
+def _pipelined_rotation_sweeps(
+    composite: RotationScanComposite,
+    parameters: MultiRotationScan,
+    oav_params: OAVParameters,
+    sweep_timer: SweepTimer,
+):
+    """Runs every sweep of a multi rotation scan, preparing each sweep while omega is
+    decelerating at the end of the previous one. The motion profiles for all sweeps
+    are calculated up front."""
+    motor_time_to_speed = yield from bps.rd(composite.smargon.omega.acceleration_time)
+    max_vel = yield from bps.rd(composite.smargon.omega.max_velocity)
+    sweeps = [
+        (params, calculate_motion_profile(params, motor_time_to_speed, max_vel))
+        for params in parameters.single_rotation_scans
+    ]
+
+    yield from _prepare_sweep(composite, *sweeps[0])
+    for (params, motion_values), next_sweep in zip(
+        sweeps, [*sweeps[1:], None], strict=True
+    ):
+
+        @bpp.set_run_key_decorator("rotation_scan")
+        @bpp.run_decorator(md=_single_sweep_md(params))
+        def rotation_scan_core(
+            params: RotationScan,
+            motion_values: RotationMotionProfile,
+            next_sweep: tuple[RotationScan, RotationMotionProfile] | None,
+        ):
+            yield from _take_snapshots(composite, params, motion_values, oav_params)
+            yield from rotation_scan_plan(
+                composite,
+                params,
+                motion_values,
+                zebra_already_set_up=True,
+                prepare_next_sweep=(
+                    partial(_prepare_sweep, composite, *next_sweep)
+                    if next_sweep
+                    else None
+                ),
+                sweep_timer=sweep_timer,
+            )
+
+        yield from rotation_scan_core(params, motion_values, next_sweep)
+
+
 def rotation_scan(
     composite: RotationScanComposite,
     parameters: RotationScan,
@@ -378,6 +871,9 @@ def multi_rotation_scan(
 ) -> MsgGenerator:
     if not oav_params:
         oav_params = OAVParameters(context="xrayCentring")
+    if parameters.allow_sweep_reordering or parameters.allow_sweep_reversal:
+        sweep_plan = yield from plan_sweep_order_from_devices(composite, parameters)
+        parameters = sweep_plan.apply(parameters)
     eiger: EigerDetector = composite.eiger
     eiger.set_detector_parameters(parameters.detector_params)
     LOGGER.info("setting up sample environment...")
@@ -403,22 +899,29 @@ def multi_rotation_scan(
     @bpp.stage_decorator([eiger])
     @bpp.finalize_decorator(lambda: _cleanup_plan(composite))
     def _multi_rotation_scan():
+        sweep_timer = SweepTimer()
+        if parameters.pipeline_sweeps:
+            yield from _pipelined_rotation_sweeps(
+                composite, parameters, oav_params, sweep_timer
+            )
+            LOGGER.info(sweep_timer.report("pipelined"))
+            return
+
         for single_scan in parameters.single_rotation_scans:
 
             @bpp.set_run_key_decorator("rotation_scan")
             @bpp.run_decorator(  # attach experiment metadata to the start document
-                md={
-                    "subplan_name": CONST.PLAN.ROTATION_OUTER,
-                    CONST.TRIGGER.ZOCALO: CONST.PLAN.ROTATION_MAIN,
-                    "hyperion_parameters": single_scan.json(),
-                }
+                md=_single_sweep_md(single_scan)
             )
             def rotation_scan_core(
                 params: RotationScan,
             ):
-                yield from _move_and_rotation(composite, params, oav_params)
+                yield from _move_and_rotation(
+                    composite, params, oav_params, sweep_timer
+                )
 
             yield from rotation_scan_core(single_scan)
+        LOGGER.info(sweep_timer.report("serial"))
 
     LOGGER.info("setting up and staging eiger...")
     yield from _multi_rotation_scan()
@@ -1,12 +1,19 @@
 import logging
+import signal
 from collections.abc import Callable, Sequence
 from threading import Thread
 from time import sleep
 
-from bluesky.callbacks.zmq import Proxy, RemoteDispatcher
+from bluesky.callbacks.zmq import Proxy
 from dodal.log import LOGGER as dodal_logger
 from dodal.log import set_up_all_logging_handlers
 
+from mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler import (
+    HANDLER_PROFILER,
+)
+from mx_bluesky.hyperion.external_interaction.callbacks.document_bus import (
+    DocumentBusDispatcher,
+)
 from mx_bluesky.hyperion.external_interaction.callbacks.log_uid_tag_callback import (
     LogUidTaggingCallback,
 )
@@ -19,6 +26,9 @@ from mx_bluesky.hyperion.external_interaction.callbacks.rotation.ispyb_callback
 from mx_bluesky.hyperion.external_interaction.callbacks.rotation.nexus_callback import (
     RotationNexusFileCallback,
 )
+from mx_bluesky.hyperion.external_interaction.callbacks.threaded_dispatcher import (
+    ThreadedCallbackDispatcher,
+)
 from mx_bluesky.hyperion.external_interaction.callbacks.xray_centre.ispyb_callback import (
     GridscanISPyBCallback,
 )
@@ -28,13 +38,16 @@ from mx_bluesky.hyperion.external_interaction.callbacks.xray_centre.nexus_callba
 from mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback import (
     ZocaloCallback,
 )
+from mx_bluesky.hyperion.external_interaction.zocalo.submission_service import (
+    ZOCALO_SUBMISSION_SERVICE,
+)
 from mx_bluesky.hyperion.log import (
     ISPYB_LOGGER,
     NEXUS_LOGGER,
     _get_logging_dir,
     tag_filter,
 )
-from mx_bluesky.hyperion.parameters.cli import parse_callback_dev_mode_arg
+from mx_bluesky.hyperion.parameters.cli import parse_callback_cli_args
 from mx_bluesky.hyperion.parameters.constants import CONST
 
 LIVENESS_POLL_SECONDS = 1
@@ -53,6 +66,21 @@ def setup_callbacks():
     ]
 
 
+def stops_handled_after_nexus(callbacks: Sequence[Callable]) -> dict:
+    """The ISPyB callbacks trigger Zocalo on the stop document of a collection, which
+    must not happen until the NeXus callbacks have finished writing its files"""
+    nexus_callbacks = [
+        cb
+        for cb in callbacks
+        if isinstance(cb, GridscanNexusFileCallback | RotationNexusFileCallback)
+    ]
+    return {
+        cb: nexus_callbacks
+        for cb in callbacks
+        if isinstance(cb, GridscanISPyBCallback | RotationISPyBCallback)
+    }
+
+
 def setup_logging(dev_mode: bool):
     for logger, filename in [
         (ISPYB_LOGGER, "hyperion_ispyb_callback.log"),
@@ -75,16 +103,30 @@ def setup_logging(dev_mode: bool):
     log_debug("nexgen logger added to nexus logger")
 
 
-def setup_threads():
+def setup_profiler_dump():
+    """Logs the callback handler profile when the process is sent SIGUSR1, e.g. by
+    `kill -USR1 <pid>`"""
+    signal.signal(signal.SIGUSR1, lambda *_: HANDLER_PROFILER.log_dump())
+    log_debug(f"Callback handler profiling enabled={HANDLER_PROFILER.enabled}")
+
+
+def setup_threads(threaded_dispatch: bool = False):
     proxy = Proxy(*CONST.CALLBACK_0MQ_PROXY_PORTS)
-    dispatcher = RemoteDispatcher(f"localhost:{CONST.CALLBACK_0MQ_PROXY_PORTS[1]}")
+    dispatcher = DocumentBusDispatcher(f"localhost:{CONST.CALLBACK_0MQ_PROXY_PORTS[1]}")
     log_debug("Created proxy and dispatcher objects")
 
     def start_proxy():
         proxy.start()
 
     def start_dispatcher(callbacks: list[Callable]):
-        [dispatcher.subscribe(cb) for cb in callbacks]
+        if threaded_dispatch:
+            threaded_dispatcher = ThreadedCallbackDispatcher(
+                callbacks, stop_after=stops_handled_after_nexus(callbacks)
+            )
+            threaded_dispatcher.start()
+            dispatcher.subscribe(threaded_dispatcher)
+        else:
+            [dispatcher.subscribe(cb) for cb in callbacks]
         dispatcher.start()
 
     return proxy, dispatcher, start_proxy, start_dispatcher
@@ -116,13 +158,19 @@ def wait_for_threads_forever(threads: Sequence[Thread]):
 class HyperionCallbackRunner:
     """Runs Nexus, ISPyB and Zocalo callbacks in their own process."""
 
-    def __init__(self, dev_mode) -> None:
+    def __init__(self, dev_mode, threaded_dispatch: bool = False) -> None:
         setup_logging(dev_mode)
         log_info("Hyperion callback process started.")
 
         self.callbacks = setup_callbacks()
-        self.proxy, self.dispatcher, start_proxy, start_dispatcher = setup_threads()
-        log_info("Created 0MQ proxy and local RemoteDispatcher.")
+        setup_profiler_dump()
+        self.proxy, self.dispatcher, start_proxy, start_dispatcher = setup_threads(
+            threaded_dispatch
+        )
+        log_info(
+            "Created 0MQ proxy and local RemoteDispatcher, with "
+            f"{'a thread for each callback' if threaded_dispatch else 'one thread'}."
+        )
 
         self.proxy_thread = Thread(target=start_proxy, daemon=True)
         self.dispatcher_thread = Thread(
@@ -135,12 +183,14 @@ class HyperionCallbackRunner:
         self.dispatcher_thread.start()
         log_info("Proxy and dispatcher thread launched.")
         wait_for_threads_forever([self.proxy_thread, self.dispatcher_thread])
+        ZOCALO_SUBMISSION_SERVICE.close()
 
 
 def main(dev_mode=False) -> None:
-    dev_mode = dev_mode or parse_callback_dev_mode_arg()
+    args = parse_callback_cli_args()
+    dev_mode = dev_mode or args.dev_mode
     print(f"In dev mode: {dev_mode}")
-    runner = HyperionCallbackRunner(dev_mode)
+    runner = HyperionCallbackRunner(dev_mode, args.threaded_dispatch)
     runner.start()
 
 
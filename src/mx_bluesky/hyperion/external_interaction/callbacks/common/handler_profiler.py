@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from logging import Logger
+from typing import Any
+
+from mx_bluesky.hyperion.log import ISPYB_LOGGER, NEXUS_LOGGER
+
+# Upper bounds of the histogram buckets, the last bucket holds everything slower
+BUCKET_BOUNDS_S = (0.0001, 0.0003, 0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1, 3, 10)
+DEFAULT_SLOW_HANDLER_S = 1.0
+DEFAULT_SUMMARY_INTERVAL_S = 300.0
+
+
+def get_callback_profiling_enabled() -> bool:
+    return os.environ.get("HYPERION_CALLBACK_PROFILING", "1").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+
+
+def get_slow_handler_s() -> float:
+    return float(os.environ.get("HYPERION_SLOW_CALLBACK_S", DEFAULT_SLOW_HANDLER_S))
+
+
+@dataclasses.dataclass
+class Histogram:
+    counts: list[int] = dataclasses.field(
+        default_factory=lambda: [0] * (len(BUCKET_BOUNDS_S) + 1)
+    )
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.count if self.count else 0.0
+
+    def record(self, duration_s: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS_S, duration_s)] += 1
+        self.total_s += duration_s
+        self.max_s = max(self.max_s, duration_s)
+
+    def quantile_s(self, q: float) -> float:
+        """The upper bound of the bucket holding the qth quantile, or the slowest
+        duration if that is in the last bucket"""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_S, self.counts, strict=False):
+            seen += count
+            if seen >= target and seen:
+                return min(bound, self.max_s)
+        return self.max_s
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "buckets_s": [*BUCKET_BOUNDS_S, "inf"],
+            "counts": list(self.counts),
+            "count": self.count,
+            "mean_s": self.mean_s,
+            "max_s": self.max_s,
+        }
+
+
+@dataclasses.dataclass
+class HandlerProfile:
+    # How long the handler took
+    handling: Histogram = dataclasses.field(default_factory=Histogram)
+    # From the document being created until the handler started on it
+    lag: Histogram = dataclasses.field(default_factory=Histogram)
+    slow: int = 0
+
+
+class HandlerProfiler:
+    """Timings of the handlers of callbacks, kept for each callback and type of
+    document, shared across the process.
+
+    Handlers slower than `slow_handler_s` are warned about as they happen, and a summary
+    of every handler is logged at most every `summary_interval_s` when a handler is
+    recorded. `dump` gives the histograms for an on-demand report. Recording takes a
+    couple of microseconds, so it can be left on."""
+
+    def __init__(
+        self,
+        slow_handler_s: float = DEFAULT_SLOW_HANDLER_S,
+        summary_interval_s: float = DEFAULT_SUMMARY_INTERVAL_S,
+        enabled: bool = True,
+    ) -> None:
+        self.slow_handler_s = slow_handler_s
+        self.summary_interval_s = summary_interval_s
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._profiles: dict[tuple[str, str], HandlerProfile] = {}
+        self._last_summary = time.monotonic()
+
+    def record(
+        self,
+        callback: str,
+        document: str,
+        handling_s: float,
+        created: float | None,
+        started: float,
+        log: Logger = ISPYB_LOGGER,
+    ) -> None:
+        """Records a handler of `callback` which took `handling_s` over a `document`
+        created at `created` and started at `started`, both as from time.time"""
+        summary = None
+        with self._lock:
+            profile = self._profiles.get((callback, document))
+            if profile is None:
+                profile = self._profiles[(callback, document)] = HandlerProfile()
+            profile.handling.record(handling_s)
+            if created is not None:
+                profile.lag.record(max(0.0, started - created))
+            slow = handling_s > self.slow_handler_s
+            if slow:
+                profile.slow += 1
+            now = time.monotonic()
+            if now - self._last_summary >= self.summary_interval_s:
+                self._last_summary = now
+                summary = self._summary()
+        if slow:
+            log.warning(
+                f"{callback} took {handling_s:.3f}s to handle a {document} document"
+            )
+        if summary:
+            for logger in (ISPYB_LOGGER, NEXUS_LOGGER):
+                logger.info(f"Callback handler times: {summary}")
+
+    def summary(self) -> str:
+        with self._lock:
+            return self._summary()
+
+    def _summary(self) -> str:
+        """Must be called holding the lock"""
+        return "; ".join(
+            f"{callback}.{document} n={p.handling.count} "
+            f"mean={p.handling.mean_s * 1000:.1f}ms "
+            f"p95<={p.handling.quantile_s(0.95) * 1000:.1f}ms "
+            f"max={p.handling.max_s * 1000:.1f}ms "
+            f"lag_mean={p.lag.mean_s * 1000:.1f}ms slow={p.slow}"
+            for (callback, document), p in sorted(self._profiles.items())
+        )
+
+    def dump(self) -> dict[str, dict[str, Any]]:
+        """The histograms of every handler, keyed by callback then document type"""
+        with self._lock:
+            dumped: dict[str, dict[str, Any]] = {}
+            for (callback, document), p in sorted(self._profiles.items()):
+                dumped.setdefault(callback, {})[document] = {
+                    "handling": p.handling.to_dict(),
+                    "lag": p.lag.to_dict(),
+                    "slow": p.slow,
+                }
+            return dumped
+
+    def log_dump(self, log: Logger = ISPYB_LOGGER) -> None:
+        log.info(f"Callback handler profile: {json.dumps(self.dump())}")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._profiles = {}
+            self._last_summary = time.monotonic()
+
+
+HANDLER_PROFILER = HandlerProfiler(
+    slow_handler_s=get_slow_handler_s(), enabled=get_callback_profiling_enabled()
+)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import TYPE_CHECKING, TypeVar
+
+from mx_bluesky.hyperion.log import LOGGER
+from mx_bluesky.hyperion.parameters.components import HyperionParameters
+
+if TYPE_CHECKING:
+    from event_model.documents import RunStart
+
+MAX_CACHED_PARAMETERS = 16
+
+P = TypeVar("P", bound=HyperionParameters)
+
+
+class ParsedParameterCache:
+    """Parameters parsed from the `hyperion_parameters` of start documents, so that
+    when several callbacks receive the same start document the parameters are only
+    validated once and the callbacks share the resulting object.
+
+    Entries are keyed by the uid of the run and a digest of the parameters, as well as
+    the type they were parsed into. Callbacks must treat the parameters they are given
+    as read-only."""
+
+    def __init__(self, max_size: int = MAX_CACHED_PARAMETERS) -> None:
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._parameters: OrderedDict[tuple, HyperionParameters] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, parameter_type: type[P], doc: RunStart, *, allow_extras: bool = False
+    ) -> P:
+        json_params = doc.get("hyperion_parameters")
+        assert json_params is not None
+        key = (
+            doc.get("uid"),
+            blake2b(json_params.encode(), digest_size=16).digest(),
+            parameter_type,
+            allow_extras,
+        )
+        # Parsing under the lock means that callbacks which receive the same document
+        # at the same time wait for a single parse rather than all doing their own
+        with self._lock:
+            params = self._parameters.get(key)
+            if params is not None:
+                self.hits += 1
+                self._parameters.move_to_end(key)
+                return params  # type: ignore
+            params = parameter_type.from_json(json_params, allow_extras=allow_extras)
+            self.misses += 1
+            self._parameters[key] = params
+            if len(self._parameters) > self._max_size:
+                self._parameters.popitem(last=False)
+        LOGGER.debug(f"Parsed {parameter_type.__name__} for run {doc.get('uid')}")
+        return params
+
+    def clear(self) -> None:
+        with self._lock:
+            self._parameters.clear()
+
+
+PARSED_PARAMETERS = ParsedParameterCache()
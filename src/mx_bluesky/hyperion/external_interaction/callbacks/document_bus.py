@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import pickle
+import threading
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+import msgpack
+import msgpack_numpy
+from bluesky.callbacks.zmq import RemoteDispatcher
+from bluesky.run_engine import DocumentNames
+from event_model import pack_event_page, unpack_event_page
+
+from mx_bluesky.hyperion.log import LOGGER
+
+# Documents serialised by msgpack are tagged with a leading byte, which pickle (from
+# protocol 2) never starts with, so the dispatcher can read whatever it is sent
+MSGPACK_TAG = b"M"
+MSGPACK_ZLIB_TAG = b"Z"
+# Smaller documents, such as most events, aren't worth compressing
+COMPRESS_ABOVE_BYTES = 1024
+ZLIB_LEVEL = 1
+DEFAULT_MAX_EVENT_DELAY_S = 0.05
+
+
+def _pack(doc: Any) -> bytes:
+    return msgpack.packb(doc, default=msgpack_numpy.encode)
+
+
+def serialise_msgpack(doc: Any) -> bytes:
+    try:
+        return MSGPACK_TAG + _pack(doc)
+    except TypeError:
+        return pickle.dumps(doc)
+
+
+def serialise_msgpack_zlib(doc: Any) -> bytes:
+    try:
+        packed = _pack(doc)
+    except TypeError:
+        return pickle.dumps(doc)
+    if len(packed) > COMPRESS_ABOVE_BYTES:
+        return MSGPACK_ZLIB_TAG + zlib.compress(packed, ZLIB_LEVEL)
+    return MSGPACK_TAG + packed
+
+
+def deserialise_document(message: bytes) -> Any:
+    """Reads a document serialised by any of the SERIALISERS"""
+    tag = message[:1]
+    if tag == MSGPACK_TAG:
+        packed = message[1:]
+    elif tag == MSGPACK_ZLIB_TAG:
+        packed = zlib.decompress(message[1:])
+    else:
+        return pickle.loads(message)
+    return msgpack.unpackb(
+        packed, object_hook=msgpack_numpy.decode, strict_map_key=False
+    )
+
+
+# pickle is what bluesky uses by default. msgpack gives smaller documents, and
+# msgpack-zlib smaller still for large documents such as start documents carrying
+# the parameters and scan points, at the cost of compressing them. Documents msgpack
+# can't represent are sent pickled.
+SERIALISERS: dict[str, Callable[[Any], bytes]] = {
+    "pickle": pickle.dumps,
+    "msgpack": serialise_msgpack,
+    "msgpack-zlib": serialise_msgpack_zlib,
+}
+
+
+class EventBatchingPublisher:
+    """Passes documents on to `publish`, e.g. a Publisher, with the events of each
+    descriptor batched into event pages of up to `max_events`, so that fewer messages
+    are sent over the bus.
+
+    No event is held for more than `max_delay_s`, and the events batched so far are
+    sent before any other document, so the order of the documents is kept. The
+    DocumentBusDispatcher passes the events in a page on to the callbacks one at a
+    time, with the time they were created."""
+
+    def __init__(
+        self,
+        publish: Callable[[str, dict[str, Any]], Any],
+        max_events: int,
+        max_delay_s: float = DEFAULT_MAX_EVENT_DELAY_S,
+    ) -> None:
+        self.publish = publish
+        self.max_events = max_events
+        self.max_delay_s = max_delay_s
+        self._lock = threading.Lock()
+        self._events: list[dict[str, Any]] = []
+        self._timer: threading.Timer | None = None
+
+    def __call__(self, name: str, doc: dict[str, Any]) -> None:
+        with self._lock:
+            if name != "event":
+                self._send_events()
+                self.publish(name, doc)
+                return
+            if self._events and self._events[0]["descriptor"] != doc["descriptor"]:
+                self._send_events()
+            self._events.append(doc)
+            if len(self._events) >= self.max_events:
+                self._send_events()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay_s, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._send_events()
+
+    def _send_events(self) -> None:
+        """Must be called holding the lock"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._events:
+            return
+        events, self._events = self._events, []
+        if len(events) == 1:
+            self.publish("event", events[0])
+        else:
+            self.publish("event_page", pack_event_page(*events))  # type: ignore
+
+
+class DocumentBusDispatcher(RemoteDispatcher):
+    """A RemoteDispatcher which reads documents however the publisher serialised them,
+    and passes the events of event pages on to the callbacks one at a time, as the
+    callbacks don't handle event pages themselves"""
+
+    def __init__(self, address, **kwargs) -> None:
+        super().__init__(address, deserializer=deserialise_document, **kwargs)
+
+    def process(self, name, doc):
+        if name != DocumentNames.event_page:
+            return super().process(name, doc)
+        for event in unpack_event_page(doc):
+            super().process(DocumentNames.event, event)
+
+
+def create_publisher_subscription(
+    publisher: Callable[[str, dict[str, Any]], Any], event_batch_size: int
+) -> Callable[[str, dict[str, Any]], Any]:
+    """What to subscribe to the RunEngine to publish its documents, batching events
+    if `event_batch_size` is more than one"""
+    if event_batch_size > 1:
+        LOGGER.info(f"Batching up to {event_batch_size} events into each event page")
+        return EventBatchingPublisher(publisher, event_batch_size)
+    return publisher
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import json
+import os
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+
+import numpy as np
+
+from mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler import (
+    Histogram,
+)
+from mx_bluesky.hyperion.log import LOGGER
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".jsonl.gz"
+
+Callback = Callable[[str, dict[str, Any]], Any]
+JournalEntry = tuple[float, str, dict[str, Any]]
+
+
+def get_document_journal_dir() -> Path | None:
+    journal_dir = os.environ.get("HYPERION_DOCUMENT_JOURNAL_DIR")
+    return Path(journal_dir) if journal_dir else None
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} can't be written to a document journal")
+
+
+def _decode(obj: dict[str, Any]) -> Any:
+    if "__ndarray__" in obj:
+        return np.array(obj["__ndarray__"], dtype=obj["dtype"])
+    return obj
+
+
+class DocumentJournalRecorder:
+    """Records the documents of each run which activates the external callbacks, such
+    as those of flyscan_xray_centre, rotation_scan and multi_rotation_scan, to its own
+    journal in `directory`. The runs nested within it are recorded in the same journal.
+
+    A journal is a gzipped file of JSON lines. The first is a header, then each document
+    is a line of `[seconds since the start of the run, name, document]`, with numpy
+    arrays tagged so they are read back as arrays. A journal which can't be written is
+    abandoned and logged rather than raised, so recording never fails a plan."""
+
+    def __init__(self, directory: Path | str, compresslevel: int = 1) -> None:
+        self.directory = Path(directory)
+        self.compresslevel = compresslevel
+        self.journals: list[Path] = []
+        self._journal: IO[str] | None = None
+        self._run_uid: str | None = None
+        self._started = 0.0
+
+    def __call__(self, name: str, doc: dict[str, Any]) -> None:
+        if self._journal is None:
+            if name != "start" or not doc.get("activate_callbacks"):
+                return
+            try:
+                self._open(doc)
+            except Exception:
+                LOGGER.exception(f"Failed to open journal in {self.directory}")
+                return
+        try:
+            self._write([round(time.monotonic() - self._started, 6), name, doc])
+        except Exception:
+            LOGGER.exception(f"Failed to record {name} document, abandoning journal")
+            self._close()
+            return
+        if name == "stop" and doc.get("run_start") == self._run_uid:
+            self._close()
+
+    def _open(self, doc: dict[str, Any]) -> None:
+        plan_name = doc.get("subplan_name") or doc.get("plan_name") or "run"
+        path = self.directory / (
+            f"{datetime.now():%Y%m%d-%H%M%S}-{plan_name}-{doc['uid'][:8]}"
+            f"{JOURNAL_SUFFIX}"
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._journal = gzip.open(path, "wt", compresslevel=self.compresslevel)
+        self._run_uid = doc["uid"]
+        self._started = time.monotonic()
+        self.journals.append(path)
+        self._write({"journal_version": JOURNAL_VERSION, "recorded": time.time()})
+        LOGGER.info(f"Recording documents of {plan_name} to {path}")
+
+    def _write(self, line: Any) -> None:
+        assert self._journal
+        self._journal.write(
+            json.dumps(line, default=_encode, separators=(",", ":")) + "\n"
+        )
+
+    def _close(self) -> None:
+        if self._journal:
+            self._journal.close()
+        self._journal = None
+        self._run_uid = None
+
+
+def read_journal(path: Path | str) -> list[JournalEntry]:
+    with gzip.open(path, "rt") as journal:
+        header = json.loads(next(journal))
+        if header.get("journal_version") != JOURNAL_VERSION:
+            raise ValueError(
+                f"{path} is a version {header.get('journal_version')} journal, "
+                f"expected version {JOURNAL_VERSION}"
+            )
+        return [
+            (offset_s, name, doc)
+            for offset_s, name, doc in (
+                json.loads(line, object_hook=_decode) for line in journal
+            )
+        ]
+
+
+def redirect_storage_directory(
+    doc: dict[str, Any], directory: Path | str
+) -> dict[str, Any]:
+    """A copy of a start document with where its parameters have files, such as the
+    NeXus files, written to moved into `directory`"""
+    if not (json_params := doc.get("hyperion_parameters")):
+        return doc
+    params = json.loads(json_params)
+    params["storage_directory"] = str(directory)
+    if "snapshot_directory" in params:
+        params["snapshot_directory"] = str(Path(directory, "snapshots"))
+    return {**doc, "hyperion_parameters": json.dumps(params)}
+
+
+@dataclasses.dataclass
+class ReplayReport:
+    documents: int = 0
+    elapsed_s: float = 0.0
+    # From when each document was due until every callback had handled it, by name
+    latency: dict[str, Histogram] = dataclasses.field(default_factory=dict)
+
+    @property
+    def throughput_per_s(self) -> float:
+        return self.documents / self.elapsed_s if self.elapsed_s else 0.0
+
+    def record(self, name: str, latency_s: float) -> None:
+        self.documents += 1
+        self.latency.setdefault(name, Histogram()).record(latency_s)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "documents": self.documents,
+            "elapsed_s": self.elapsed_s,
+            "throughput_per_s": self.throughput_per_s,
+            "latency": {name: h.to_dict() for name, h in self.latency.items()},
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.documents} documents in {self.elapsed_s:.3f}s, "
+            f"{self.throughput_per_s:.1f} documents/s"
+        ]
+        lines += [
+            f"{name:>10} n={h.count} mean={h.mean_s * 1000:.2f}ms "
+            f"p95<={h.quantile_s(0.95) * 1000:.2f}ms max={h.max_s * 1000:.2f}ms"
+            for name, h in sorted(self.latency.items())
+        ]
+        return "\n".join(lines)
+
+
+def replay_journal(
+    journal: Path | str,
+    callbacks: Sequence[Callback],
+    speed: float | None = None,
+    storage_directory: Path | str | None = None,
+) -> ReplayReport:
+    """Passes the documents of a journal to each of the callbacks in turn, as the
+    dispatcher of the external callbacks would, e.g. those from `setup_callbacks()`.
+
+    With a `speed` of 1 the documents are replayed as quickly as they were recorded, 2
+    twice as quickly and so on; without one they are replayed as quickly as the
+    callbacks handle them. The journal is read up front so decoding it isn't timed. If
+    `storage_directory` is given the files the callbacks write are put there instead of
+    where they were during the recording."""
+    entries = read_journal(journal)
+    report = ReplayReport()
+    begin = time.monotonic()
+    for offset_s, name, doc in entries:
+        if speed:
+            due = begin + offset_s / speed
+            time.sleep(max(0.0, due - time.monotonic()))
+        else:
+            due = time.monotonic()
+        if storage_directory is not None and name == "start":
+            doc = redirect_storage_directory(doc, storage_directory)
+        for callback in callbacks:
+            callback(name, doc)
+        report.record(name, time.monotonic() - due)
+    report.elapsed_s = time.monotonic() - begin
+    return report
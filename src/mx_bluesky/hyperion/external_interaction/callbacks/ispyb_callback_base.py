@@ -12,6 +12,9 @@ from dodal.devices.synchrotron import SynchrotronMode
 from mx_bluesky.hyperion.external_interaction.callbacks.plan_reactive_callback import (
     PlanReactiveCallback,
 )
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    CONNECTION_ERRORS,
+)
 from mx_bluesky.hyperion.external_interaction.ispyb.data_model import (
     DataCollectionInfo,
     DataCollectionPositionInfo,
@@ -21,7 +24,13 @@ from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_store import (
     IspybIds,
     StoreInIspyb,
 )
-from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import get_ispyb_config
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
+    get_ispyb_batch_updates,
+    get_ispyb_config,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.write_behind import (
+    IspybWriteBehindQueue,
+)
 from mx_bluesky.hyperion.log import ISPYB_LOGGER, set_dcgid_tag
 from mx_bluesky.hyperion.parameters.components import DiffractionExperimentWithSample
 from mx_bluesky.hyperion.parameters.constants import CONST
@@ -61,6 +70,11 @@ class BaseISPyBCallback(PlanReactiveCallback):
             )
         self.uid_to_finalize_on: str | None = None
         self.ispyb_ids: IspybIds = IspybIds()
+        self.writes = IspybWriteBehindQueue()
+        # The IDs returned by the updates written behind. Only the writes use this
+        # until `flush_writes` hands it back to the callback thread as `ispyb_ids`
+        self._written_ispyb_ids: IspybIds | None = None
+        self.batch_updates = get_ispyb_batch_updates()
         self.log = ISPYB_LOGGER
 
     def activity_gated_start(self, doc: RunStart):
@@ -92,10 +106,46 @@ class BaseISPyBCallback(PlanReactiveCallback):
                 scan_data_infos = self._handle_ispyb_transmission_flux_read(doc)
             case _:
                 return self._tag_doc(doc)
-        self.ispyb_ids = self.ispyb.update_deposition(self.ispyb_ids, scan_data_infos)
-        ISPYB_LOGGER.info(f"Recieved ISPYB IDs: {self.ispyb_ids}")
+        self._update_deposition(scan_data_infos)
         return self._tag_doc(doc)
 
+    def _update_deposition(self, scan_data_infos: Sequence[ScanDataInfo]) -> None:
+        """Queues the update to be written behind, unless it creates a data collection
+        whose ID is needed, in which case the queue is flushed and the update made
+        straight away."""
+        if not all(info.data_collection_id for info in scan_data_infos):
+            self.flush_writes()
+            self.ispyb_ids = self.ispyb.update_deposition(
+                self.ispyb_ids, scan_data_infos
+            )
+            ISPYB_LOGGER.info(f"Recieved ISPYB IDs: {self.ispyb_ids}")
+            return
+        ispyb = self.ispyb
+        ispyb_ids = self.ispyb_ids
+
+        def update_deposition():
+            # The data collection IDs don't change, only the grid IDs are added to
+            self._written_ispyb_ids = ispyb.update_deposition(
+                self._written_ispyb_ids or ispyb_ids, scan_data_infos
+            )
+
+        self.writes.submit(
+            f"update data collections {[i.data_collection_id for i in scan_data_infos]}",
+            update_deposition,
+        )
+
+    def flush_writes(self) -> None:
+        """Waits for the queued ISPyB writes to finish, this must be done before
+        passing on a document which relies on them having been made."""
+        if self.batch_updates and (ispyb := getattr(self, "ispyb", None)):
+            self.writes.submit("write pending changes", ispyb.write_pending)
+        self.writes.flush()
+        for failed in self.writes.take_failed():
+            ISPYB_LOGGER.warning(f"ISPyB write was not made: {failed}")
+        if self._written_ispyb_ids:
+            self.ispyb_ids = self._written_ispyb_ids
+            self._written_ispyb_ids = None
+
     def _handle_ispyb_hardware_read(self, doc) -> Sequence[ScanDataInfo]:
         assert self.params, "Event handled before activity_gated_start received params"
         ISPYB_LOGGER.info("ISPyB handler received event from read hardware")
@@ -177,22 +227,38 @@ class BaseISPyBCallback(PlanReactiveCallback):
         )
         reason = doc.get("reason") or ""
         set_dcgid_tag(None)
-        try:
-            self.ispyb.end_deposition(self.ispyb_ids, exit_status, reason)
-        except Exception as e:
-            ISPYB_LOGGER.warning(
-                f"Failed to finalise ISPyB deposition on stop document: {format_doc_for_log(doc)} with exception: {e}"
-            )
+        ispyb = self.ispyb
+
+        def end_deposition():
+            try:
+                ispyb.end_deposition(self.ispyb_ids, exit_status, reason)
+            except CONNECTION_ERRORS:
+                raise
+            except Exception as e:
+                ISPYB_LOGGER.warning(
+                    f"Failed to finalise ISPyB deposition on stop document: {format_doc_for_log(doc)} with exception: {e}"
+                )
+
+        self.writes.submit(
+            f"end deposition {self.ispyb_ids.data_collection_ids}", end_deposition
+        )
+        self.flush_writes()
+        ISPYB_LOGGER.info(f"ISPyB write behind queue: {self.writes.stats}")
         return self._tag_doc(doc)
 
     def _append_to_comment(self, id: int, comment: str) -> None:
         assert isinstance(self.ispyb, StoreInIspyb)
-        try:
-            self.ispyb.append_to_comment(id, comment)
-        except TypeError:
-            ISPYB_LOGGER.warning(
-                "ISPyB deposition not initialised, can't update comment."
-            )
+        ispyb = self.ispyb
+
+        def append_to_comment():
+            try:
+                ispyb.append_to_comment(id, comment)
+            except TypeError:
+                ISPYB_LOGGER.warning(
+                    "ISPyB deposition not initialised, can't update comment."
+                )
+
+        self.writes.submit(f"append to comment of {id}", append_to_comment)
 
     def append_to_comment(self, comment: str):
         for id in self.ispyb_ids.data_collection_ids:
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import time
 from collections.abc import Callable
 from logging import Logger
 from typing import TYPE_CHECKING, Any
 
 from bluesky.callbacks import CallbackBase
 
+from mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler import (
+    HANDLER_PROFILER,
+)
+
 if TYPE_CHECKING:
     from event_model.documents import Event, EventDescriptor, RunStart, RunStop
 
@@ -48,11 +53,36 @@ class PlanReactiveCallback(CallbackBase):
         if not running_gated_function:
             return doc
         try:
-            return self.emit(name, func(doc))
+            if not HANDLER_PROFILER.enabled:
+                return self.emit(name, func(doc))
+            return self._run_profiled(name, func, doc)
         except Exception as e:
             self.log.exception(e)
             raise
 
+    def _run_profiled(self, name: str, func, doc):
+        started = time.time()
+        start = time.perf_counter()
+        result = func(doc)
+        handled = time.perf_counter()
+        created = doc.get("time") if isinstance(doc, dict) else None
+        HANDLER_PROFILER.record(
+            type(self).__name__, name, handled - start, created, started, self.log
+        )
+        if self.emit_cb is None:
+            return self.emit(name, result)
+        # Time what is emitted to, such as Zocalo, separately from this handler
+        emitted = self.emit(name, result)
+        HANDLER_PROFILER.record(
+            type(self.emit_cb).__name__,
+            name,
+            time.perf_counter() - handled,
+            created,
+            started + handled - start,
+            self.log,
+        )
+        return emitted
+
     def start(self, doc: RunStart) -> RunStart | None:
         callbacks_to_activate = doc.get("activate_callbacks")
         if callbacks_to_activate and not self.active:
@@ -13,7 +13,15 @@ from mx_bluesky.hyperion.external_interaction.callbacks.plan_reactive_callback i
 )
 from mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store import (
     ExpeyeInteraction,
-    RobotActionID,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.expeye_queue import (
+    ExpeyeRobotActionQueue,
+    RobotAction,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
+    get_expeye_spool_path,
+    get_ispyb_config,
+    prewarm_ispyb_lookups,
 )
 from mx_bluesky.hyperion.log import ISPYB_LOGGER
 from mx_bluesky.hyperion.parameters.constants import CONST
@@ -28,8 +36,10 @@ class RobotLoadISPyBCallback(PlanReactiveCallback):
         super().__init__(log=ISPYB_LOGGER)
         self.run_uid: str | None = None
         self.descriptors: dict[str, EventDescriptor] = {}
-        self.action_id: RobotActionID | None = None
+        self.action: RobotAction | None = None
         self.expeye = ExpeyeInteraction()
+        # So that the document stream isn't held up waiting for ExpEye
+        self.expeye_queue = ExpeyeRobotActionQueue(self.expeye, get_expeye_spool_path())
 
     def activity_gated_start(self, doc: RunStart):
         ISPYB_LOGGER.debug("ISPyB robot load callback received start document.")
@@ -40,8 +50,10 @@ class RobotLoadISPyBCallback(PlanReactiveCallback):
             assert isinstance(
                 visit := get_visit_string_from_path(metadata["visit_path"]), str
             )
+            # The deposition for the collection after the load will need these
+            prewarm_ispyb_lookups(get_ispyb_config(), visit)
             proposal, session = get_proposal_and_session_from_visit_string(visit)
-            self.action_id = self.expeye.start_load(
+            self.action = self.expeye_queue.start_load(
                 proposal,
                 session,
                 metadata["sample_id"],
@@ -61,14 +73,14 @@ class RobotLoadISPyBCallback(PlanReactiveCallback):
             and event_descriptor.get("name") == CONST.DESCRIPTORS.ROBOT_LOAD
         ):
             assert (
-                self.action_id is not None
+                self.action is not None
             ), "ISPyB Robot load callback event called unexpectedly"
             barcode = doc["data"]["robot-barcode"]
             oav_snapshot = doc["data"]["oav_snapshot_last_saved_path"]
             webcam_snapshot = doc["data"]["webcam-last_saved_path"]
             # I03 uses webcam/oav snapshots in place of before/after snapshots
-            self.expeye.update_barcode_and_snapshots(
-                self.action_id, barcode, webcam_snapshot, oav_snapshot
+            self.expeye_queue.update_barcode_and_snapshots(
+                self.action, barcode, webcam_snapshot, oav_snapshot
             )
 
         return super().activity_gated_event(doc)
@@ -77,12 +89,12 @@ class RobotLoadISPyBCallback(PlanReactiveCallback):
         ISPYB_LOGGER.debug("ISPyB robot load callback received stop document.")
         if doc.get("run_start") == self.run_uid:
             assert (
-                self.action_id is not None
+                self.action is not None
             ), "ISPyB Robot load callback stop called unexpectedly"
             exit_status = (
                 doc.get("exit_status") or "Exit status not available in stop document!"
             )
             reason = doc.get("reason") or "OK"
-            self.expeye.end_load(self.action_id, exit_status, reason)
-            self.action_id = None
+            self.expeye_queue.end_load(self.action, exit_status, reason)
+            self.action = None
         return super().activity_gated_stop(doc)
@@ -7,6 +7,9 @@ from mx_bluesky.hyperion.external_interaction.callbacks.common.ispyb_mapping imp
     populate_data_collection_group,
     populate_remaining_data_collection_info,
 )
+from mx_bluesky.hyperion.external_interaction.callbacks.common.parameter_cache import (
+    PARSED_PARAMETERS,
+)
 from mx_bluesky.hyperion.external_interaction.callbacks.ispyb_callback_base import (
     BaseISPyBCallback,
 )
@@ -54,13 +57,15 @@ class RotationISPyBCallback(BaseISPyBCallback):
         super().__init__(emit=emit)
         self.last_sample_id: int | None = None
         self.ispyb_ids: IspybIds = IspybIds()
+        self._snapshot_omegas_deg: list[float] = []
 
     def activity_gated_start(self, doc: RunStart):
         if doc.get("subplan_name") == CONST.PLAN.ROTATION_OUTER:
             ISPYB_LOGGER.info(
                 "ISPyB callback received start document with experiment parameters."
             )
-            self.params = RotationScan.from_json(doc.get("hyperion_parameters"))
+            self.params = PARSED_PARAMETERS.get(RotationScan, doc)
+            self._snapshot_omegas_deg = []
             dcgid = (
                 self.ispyb_ids.data_collection_group_id
                 if (self.params.sample_id == self.last_sample_id)
@@ -78,7 +83,9 @@ class RotationISPyBCallback(BaseISPyBCallback):
                     f"Collection is {self.params.ispyb_experiment_type} - storing sampleID to bundle images"
                 )
                 self.last_sample_id = self.params.sample_id
-            self.ispyb = StoreInIspyb(self.ispyb_config)
+            self.ispyb = StoreInIspyb(
+                self.ispyb_config, batch_updates=self.batch_updates
+            )
             ISPYB_LOGGER.info("Beginning ispyb deposition")
             data_collection_group_info = populate_data_collection_group(self.params)
             data_collection_info = populate_data_collection_info_for_rotation(
@@ -133,6 +140,9 @@ class RotationISPyBCallback(BaseISPyBCallback):
         ), "handle_ispyb_hardware_read triggered before activity_gated_start"
         motor_positions_um = [position * 1000 for position in motor_positions_mm]
         comment = f"Sample position (µm): ({motor_positions_um[0]:.0f}, {motor_positions_um[1]:.0f}, {motor_positions_um[2]:.0f}) {self.params.comment} "
+        if self._snapshot_omegas_deg:
+            snapshot_omegas = ", ".join(f"{o:.1f}" for o in self._snapshot_omegas_deg)
+            comment += f"Snapshots at omega (°): {snapshot_omegas} "
         scan_data_infos[0].data_collection_info.comments = comment
         return scan_data_infos
 
@@ -143,9 +153,7 @@ class RotationISPyBCallback(BaseISPyBCallback):
         descriptor_name = self.descriptors[doc["descriptor"]].get("name")
         if descriptor_name == CONST.DESCRIPTORS.OAV_ROTATION_SNAPSHOT_TRIGGERED:
             scan_data_infos = self._handle_oav_rotation_snapshot_triggered(doc)
-            self.ispyb_ids = self.ispyb.update_deposition(
-                self.ispyb_ids, scan_data_infos
-            )
+            self._update_deposition(scan_data_infos)
 
         return doc
 
@@ -154,6 +162,8 @@ class RotationISPyBCallback(BaseISPyBCallback):
         assert self.params, "ISPyB handler didn't receive parameters!"
         data = doc["data"]
         self._oav_snapshot_event_idx += 1
+        if (omega := data.get("smargon-omega")) is not None:
+            self._snapshot_omegas_deg.append(omega)
         data_collection_info = DataCollectionInfo(
             **{
                 f"xtal_snapshot{self._oav_snapshot_event_idx}": data.get(
@@ -168,6 +178,7 @@ class RotationISPyBCallback(BaseISPyBCallback):
         return [scan_data_info]
 
     def activity_gated_stop(self, doc: RunStop) -> RunStop:
+        self.flush_writes()
         if doc.get("run_start") == self.uid_to_finalize_on:
             self.uid_to_finalize_on = None
             return super().activity_gated_stop(doc)
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from mx_bluesky.hyperion.external_interaction.callbacks.common.parameter_cache import (
+    PARSED_PARAMETERS,
+)
 from mx_bluesky.hyperion.external_interaction.callbacks.plan_reactive_callback import (
     PlanReactiveCallback,
 )
@@ -10,6 +13,9 @@ from mx_bluesky.hyperion.external_interaction.nexus.nexus_utils import (
     vds_type_based_on_bit_depth,
 )
 from mx_bluesky.hyperion.external_interaction.nexus.write_nexus import NexusWriter
+from mx_bluesky.hyperion.external_interaction.nexus.writing_service import (
+    NEXUS_WRITING_SERVICE,
+)
 from mx_bluesky.hyperion.log import NEXUS_LOGGER
 from mx_bluesky.hyperion.parameters.constants import CONST
 from mx_bluesky.hyperion.parameters.rotation import RotationScan
@@ -17,7 +23,7 @@ from mx_bluesky.hyperion.parameters.rotation import RotationScan
 from ..logging_callback import format_doc_for_log
 
 if TYPE_CHECKING:
-    from event_model.documents import Event, EventDescriptor, RunStart
+    from event_model.documents import Event, EventDescriptor, RunStart, RunStop
 
 
 class RotationNexusFileCallback(PlanReactiveCallback):
@@ -41,6 +47,7 @@ class RotationNexusFileCallback(PlanReactiveCallback):
         # used when multiple collections are made in one detector arming event:
         self.full_num_of_images: int | None = None
         self.meta_data_run_number: int | None = None
+        self.nexus_writing = NEXUS_WRITING_SERVICE
 
     def activity_gated_descriptor(self, doc: EventDescriptor):
         self.descriptors[doc["uid"]] = doc
@@ -68,8 +75,21 @@ class RotationNexusFileCallback(PlanReactiveCallback):
                 data["attenuator-actual_transmission"],
             )
             vds_data_type = vds_type_based_on_bit_depth(doc["data"]["eiger_bit_depth"])
-            self.writer.create_nexus_file(vds_data_type)
-            NEXUS_LOGGER.info(f"Nexus file created at {self.writer.data_filename}")
+            assert self.run_uid
+            self.nexus_writing.submit(self.run_uid, self.writer, vds_data_type)
+            NEXUS_LOGGER.info(
+                f"Nexus file being written for {self.writer.data_filename}"
+            )
+        return doc
+
+    def activity_gated_stop(self, doc: RunStop) -> RunStop | None:
+        # The files are waited for on the stop of the main run, before Zocalo is
+        # triggered by it as the ISPyB callbacks handle stops after this. Zocalo isn't
+        # triggered for files which failed, see ZocaloCallback
+        if self.run_uid:
+            self.nexus_writing.wait_for_run(self.run_uid)
+            if doc.get("run_start") == self.run_uid:
+                self.nexus_writing.discard_skeletons(self.run_uid)
         return doc
 
     def activity_gated_start(self, doc: RunStart):
@@ -82,7 +102,7 @@ class RotationNexusFileCallback(PlanReactiveCallback):
             NEXUS_LOGGER.info(
                 f"Nexus writer received start document with experiment parameters {json_params}"
             )
-            parameters = RotationScan.from_json(json_params)
+            parameters = PARSED_PARAMETERS.get(RotationScan, doc)
             NEXUS_LOGGER.info("Setting up nexus file...")
             det_size = (
                 parameters.detector_params.detector_size_constants.det_size_pixels
@@ -91,7 +111,7 @@ class RotationNexusFileCallback(PlanReactiveCallback):
             self.writer = NexusWriter(
                 parameters,
                 shape,
-                parameters.scan_points,
+                parameters.scan_descriptor,
                 omega_start_deg=parameters.omega_start_deg,
                 chi_start_deg=parameters.chi_start_deg or 0,
                 phi_start_deg=parameters.phi_start_deg or 0,
@@ -100,3 +120,5 @@ class RotationNexusFileCallback(PlanReactiveCallback):
                 meta_data_run_number=self.meta_data_run_number,
                 rotation_direction=parameters.rotation_direction,
             )
+            assert self.run_uid
+            self.nexus_writing.submit_skeletons(self.run_uid, self.writer)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+from queue import Queue
+from typing import Any
+
+from mx_bluesky.hyperion.log import ISPYB_LOGGER, NEXUS_LOGGER
+
+# Beyond this the dispatcher waits for the callback to catch up, rather than holding
+# an ever growing backlog of documents
+DEFAULT_MAX_QUEUED_DOCUMENTS = 10000
+
+Callback = Callable[[str, dict[str, Any]], Any]
+
+
+@dataclasses.dataclass
+class CallbackLagStats:
+    handled: int = 0
+    max_depth: int = 0
+    # From the dispatcher receiving a document until the callback had handled it
+    total_lag_s: float = 0.0
+    max_lag_s: float = 0.0
+    # Spent in the callback itself
+    total_handling_s: float = 0.0
+    max_handling_s: float = 0.0
+
+    @property
+    def mean_lag_s(self) -> float:
+        return self.total_lag_s / self.handled if self.handled else 0.0
+
+    @property
+    def mean_handling_s(self) -> float:
+        return self.total_handling_s / self.handled if self.handled else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.handled} documents, lag mean {self.mean_lag_s * 1000:.1f}ms max "
+            f"{self.max_lag_s * 1000:.1f}ms, handling mean "
+            f"{self.mean_handling_s * 1000:.1f}ms max {self.max_handling_s * 1000:.1f}ms, "
+            f"max queued {self.max_depth}"
+        )
+
+
+@dataclasses.dataclass
+class _QueuedDocument:
+    name: str
+    doc: dict[str, Any]
+    received: float
+    # Set once this worker has finished with a stop document, and waited for before
+    # handling it, for the callbacks which must handle it first
+    handled: threading.Event | None = None
+    handled_first: Sequence[threading.Event] = ()
+
+
+class CallbackWorker:
+    """Passes documents to one callback on its own thread, in the order they were
+    submitted.
+
+    If the callback raises, the exception is logged and kept in `error`, and the rest
+    of the documents of that run are dropped, as a callback which has failed part way
+    through a run can't be relied on to handle the rest of it. The error is cleared and
+    the callback given documents again from the start of the next outermost run."""
+
+    def __init__(
+        self,
+        callback: Callback,
+        max_queued: int = DEFAULT_MAX_QUEUED_DOCUMENTS,
+    ) -> None:
+        self.callback = callback
+        self.name = type(callback).__name__
+        self.stats = CallbackLagStats()
+        self.error: Exception | None = None
+        # Only used by the worker thread
+        self._open_runs: set[str] = set()
+        self._queue: Queue[_QueuedDocument | None] = Queue(max_queued)
+        self._thread = threading.Thread(
+            target=self._run, name=f"callback-{self.name}", daemon=True
+        )
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def submit(
+        self,
+        name: str,
+        doc: dict[str, Any],
+        received: float,
+        handled: threading.Event | None = None,
+        handled_first: Sequence[threading.Event] = (),
+    ) -> None:
+        """Queues the document for the callback. It isn't passed on until every event
+        in `handled_first` is set, and `handled` is set once the callback has finished
+        with it, whether or not it succeeded"""
+        self._queue.put(_QueuedDocument(name, doc, received, handled, handled_first))
+        self.stats.max_depth = max(self.stats.max_depth, self._queue.qsize())
+
+    def wait_until_idle(self) -> None:
+        """Waits until the callback has handled every document submitted so far"""
+        self._queue.join()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            for first in item.handled_first:
+                first.wait()
+            if item.name == "start":
+                if not self._open_runs:
+                    self.error = None
+                self._open_runs.add(item.doc["uid"])
+            elif item.name == "stop":
+                self._open_runs.discard(item.doc["run_start"])
+            if self.error is None:
+                self._handle(item.name, item.doc, item.received)
+            if item.handled:
+                item.handled.set()
+            self._queue.task_done()
+        self._queue.task_done()
+
+    def _handle(self, name: str, doc: dict[str, Any], received: float) -> None:
+        start = time.monotonic()
+        try:
+            self.callback(name, doc)
+        except Exception as e:
+            ISPYB_LOGGER.exception(
+                f"{self.name} failed handling {name} document, the rest of the run "
+                "won't be passed to it"
+            )
+            self.error = e
+            return
+        end = time.monotonic()
+        self.stats.handled += 1
+        self.stats.total_handling_s += end - start
+        self.stats.max_handling_s = max(self.stats.max_handling_s, end - start)
+        self.stats.total_lag_s += end - received
+        self.stats.max_lag_s = max(self.stats.max_lag_s, end - received)
+
+
+class ThreadedCallbackDispatcher:
+    """Fans the documents received by a dispatcher out to a CallbackWorker for each
+    callback, so that a slow callback, such as one writing NeXus files, doesn't hold up
+    the others. Subscribe this to the dispatcher in place of the callbacks.
+
+    Each callback is given its own shallow copy of each document, as the ISPyB
+    callbacks tag documents with the DCIDs before passing them on to Zocalo. Callbacks
+    which depend on each other within a run should be chained through `emit`, which
+    runs them on the same worker.
+
+    Runs are a barrier: the start of an outermost run isn't passed on until every
+    callback has finished with the previous run, so callbacks never see two runs
+    interleaved and the lag of each callback is logged once it has caught up. Stop
+    documents are also passed to a callback only once the callbacks it is given in
+    `stop_after` have handled them, for callbacks which act on the stop of a run
+    when another has finished with it, e.g. triggering Zocalo once the NeXus files
+    have been written. If a callback raises, the exception is logged and only that
+    callback misses the rest of the run, see CallbackWorker. Nothing is raised to the
+    dispatcher, so the other callbacks and later runs carry on as they would without
+    the workers."""
+
+    def __init__(
+        self,
+        callbacks: Sequence[Callback],
+        max_queued: int = DEFAULT_MAX_QUEUED_DOCUMENTS,
+        stop_after: Mapping[Callback, Sequence[Callback]] | None = None,
+    ) -> None:
+        self.workers = [CallbackWorker(cb, max_queued) for cb in callbacks]
+        worker_for = {id(worker.callback): worker for worker in self.workers}
+        self._stop_after = {
+            worker_for[id(callback)]: [worker_for[id(first)] for first in firsts]
+            for callback, firsts in (stop_after or {}).items()
+        }
+        assert all(
+            worker not in firsts for worker, firsts in self._stop_after.items()
+        ), "A callback can't handle stop documents after itself"
+        self._open_runs: set[str] = set()
+
+    def start(self) -> None:
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self) -> None:
+        for worker in self.workers:
+            worker.stop()
+
+    @property
+    def stats(self) -> dict[str, CallbackLagStats]:
+        return {worker.name: worker.stats for worker in self.workers}
+
+    def wait_until_idle(self) -> None:
+        for worker in self.workers:
+            worker.wait_until_idle()
+
+    def __call__(self, name: str, doc: dict[str, Any]) -> None:
+        received = time.monotonic()
+        if name == "start" and not self._open_runs:
+            self.wait_until_idle()
+            self._log_lag()
+        if name == "start":
+            self._open_runs.add(doc["uid"])
+        elif name == "stop":
+            self._open_runs.discard(doc["run_start"])
+        if name != "stop":
+            for worker in self.workers:
+                worker.submit(name, dict(doc), received)
+            return
+        handled = {worker: threading.Event() for worker in self.workers}
+        for worker in self.workers:
+            worker.submit(
+                name,
+                dict(doc),
+                received,
+                handled[worker],
+                [handled[first] for first in self._stop_after.get(worker, [])],
+            )
+
+    def _log_lag(self) -> None:
+        for worker in self.workers:
+            if worker.stats.handled:
+                message = f"{worker.name} lag: {worker.stats}"
+                ISPYB_LOGGER.debug(message)
+                NEXUS_LOGGER.debug(message)
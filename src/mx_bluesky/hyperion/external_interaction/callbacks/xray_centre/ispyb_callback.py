@@ -13,6 +13,9 @@ from mx_bluesky.hyperion.external_interaction.callbacks.common.ispyb_mapping imp
     populate_data_collection_group,
     populate_remaining_data_collection_info,
 )
+from mx_bluesky.hyperion.external_interaction.callbacks.common.parameter_cache import (
+    PARSED_PARAMETERS,
+)
 from mx_bluesky.hyperion.external_interaction.callbacks.ispyb_callback_base import (
     BaseISPyBCallback,
 )
@@ -93,10 +96,10 @@ class GridscanISPyBCallback(BaseISPyBCallback):
                 "ISPyB callback received start document with experiment parameters and "
                 f"uid: {self.uid_to_finalize_on}"
             )
-            self.params = GridCommon.from_json(
-                doc.get("hyperion_parameters"), allow_extras=True
+            self.params = PARSED_PARAMETERS.get(GridCommon, doc, allow_extras=True)
+            self.ispyb = StoreInIspyb(
+                self.ispyb_config, batch_updates=self.batch_updates
             )
-            self.ispyb = StoreInIspyb(self.ispyb_config)
             data_collection_group_info = populate_data_collection_group(self.params)
 
             scan_data_infos = [
@@ -134,9 +137,7 @@ class GridscanISPyBCallback(BaseISPyBCallback):
             self._handle_zocalo_read_event(doc)
         elif descriptor_name == CONST.DESCRIPTORS.OAV_GRID_SNAPSHOT_TRIGGERED:
             scan_data_infos = self._handle_oav_grid_snapshot_triggered(doc)
-            self.ispyb_ids = self.ispyb.update_deposition(
-                self.ispyb_ids, scan_data_infos
-            )
+            self._update_deposition(scan_data_infos)
 
         return doc
 
@@ -170,9 +171,7 @@ class GridscanISPyBCallback(BaseISPyBCallback):
         assert (
             self.ispyb_ids.data_collection_ids
         ), "No data collection to add results to"
-        self.ispyb.append_to_comment(
-            self.ispyb_ids.data_collection_ids[0], crystal_summary
-        )
+        self._append_to_comment(self.ispyb_ids.data_collection_ids[0], crystal_summary)
 
     def _handle_oav_grid_snapshot_triggered(self, doc) -> Sequence[ScanDataInfo]:
         assert self.ispyb_ids.data_collection_ids, "No current data collection"
@@ -258,6 +257,7 @@ class GridscanISPyBCallback(BaseISPyBCallback):
         return scan_data_infos
 
     def activity_gated_stop(self, doc: RunStop) -> RunStop:
+        self.flush_writes()
         if doc.get("run_start") == self._start_of_fgs_uid:
             self._processing_start_time = time()
         if doc.get("run_start") == self.uid_to_finalize_on:
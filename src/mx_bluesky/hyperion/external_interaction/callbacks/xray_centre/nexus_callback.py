@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from mx_bluesky.hyperion.external_interaction.callbacks.common.parameter_cache import (
+    PARSED_PARAMETERS,
+)
 from mx_bluesky.hyperion.external_interaction.callbacks.plan_reactive_callback import (
     PlanReactiveCallback,
 )
@@ -10,21 +13,25 @@ from mx_bluesky.hyperion.external_interaction.nexus.nexus_utils import (
     vds_type_based_on_bit_depth,
 )
 from mx_bluesky.hyperion.external_interaction.nexus.write_nexus import NexusWriter
+from mx_bluesky.hyperion.external_interaction.nexus.writing_service import (
+    NEXUS_WRITING_SERVICE,
+)
 from mx_bluesky.hyperion.log import NEXUS_LOGGER
 from mx_bluesky.hyperion.parameters.constants import CONST
 from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
 
 if TYPE_CHECKING:
-    from event_model.documents import Event, EventDescriptor, RunStart
+    from event_model.documents import Event, EventDescriptor, RunStart, RunStop
 
 
 class GridscanNexusFileCallback(PlanReactiveCallback):
     """Callback class to handle the creation of Nexus files based on experiment \
     parameters. Initialises on recieving a 'start' document for the \
     'run_gridscan_move_and_tidy' sub plan, which must also contain the run parameters, \
-    as metadata under the 'hyperion_internal_parameters' key. Actually writes the \
-    nexus files on updates the timestamps on recieving the 'ispyb_reading_hardware' event \
-    document, and finalises the files on getting a 'stop' document for the whole run.
+    as metadata under the 'hyperion_internal_parameters' key. Writes the skeletons \
+    of the nexus files on the 'start' document, starts completing them on recieving \
+    the 'ispyb_reading_hardware' event document, and waits for them to be written \
+    on the next 'stop' document.
 
     To use, subscribe the Bluesky RunEngine to an instance of this class.
     E.g.:
@@ -41,6 +48,7 @@ class GridscanNexusFileCallback(PlanReactiveCallback):
         self.nexus_writer_1: NexusWriter | None = None
         self.nexus_writer_2: NexusWriter | None = None
         self.descriptors: dict[str, EventDescriptor] = {}
+        self.nexus_writing = NEXUS_WRITING_SERVICE
         self.log = NEXUS_LOGGER
 
     def activity_gated_start(self, doc: RunStart):
@@ -49,25 +57,27 @@ class GridscanNexusFileCallback(PlanReactiveCallback):
             NEXUS_LOGGER.info(
                 f"Nexus writer received start document with experiment parameters {json_params}"
             )
-            parameters = ThreeDGridScan.from_json(json_params)
+            parameters = PARSED_PARAMETERS.get(ThreeDGridScan, doc)
             d_size = parameters.detector_params.detector_size_constants.det_size_pixels
             grid_n_img_1 = parameters.scan_indices[1]
             grid_n_img_2 = parameters.num_images - grid_n_img_1
             data_shape_1 = (grid_n_img_1, d_size.width, d_size.height)
             data_shape_2 = (grid_n_img_2, d_size.width, d_size.height)
             run_number_2 = parameters.detector_params.run_number + 1
-            self.nexus_writer_1 = NexusWriter(
-                parameters, data_shape_1, parameters.scan_points_first_grid
-            )
+            descriptor_1, descriptor_2 = parameters.scan_descriptors
+            self.nexus_writer_1 = NexusWriter(parameters, data_shape_1, descriptor_1)
             self.nexus_writer_2 = NexusWriter(
                 parameters,
                 data_shape_2,
-                parameters.scan_points_second_grid,
+                descriptor_2,
                 run_number=run_number_2,
                 vds_start_index=parameters.scan_indices[1],
                 omega_start_deg=90,
             )
             self.run_start_uid = doc.get("uid")
+            assert self.run_start_uid
+            for nexus_writer in [self.nexus_writer_1, self.nexus_writer_2]:
+                self.nexus_writing.submit_skeletons(self.run_start_uid, nexus_writer)
 
     def activity_gated_descriptor(self, doc: EventDescriptor):
         self.descriptors[doc["uid"]] = doc
@@ -89,7 +99,22 @@ class GridscanNexusFileCallback(PlanReactiveCallback):
                 vds_data_type = vds_type_based_on_bit_depth(
                     doc["data"]["eiger_bit_depth"]
                 )
-                nexus_writer.create_nexus_file(vds_data_type)
-                NEXUS_LOGGER.info(f"Nexus file created at {nexus_writer.data_filename}")
+                assert self.run_start_uid
+                self.nexus_writing.submit(
+                    self.run_start_uid, nexus_writer, vds_data_type
+                )
+                NEXUS_LOGGER.info(
+                    f"Nexus file being written for {nexus_writer.data_filename}"
+                )
 
         return super().activity_gated_event(doc)
+
+    def activity_gated_stop(self, doc: RunStop) -> RunStop | None:
+        # The files are waited for on the stop of the gridscan, before Zocalo is
+        # triggered by it as the ISPyB callbacks handle stops after this. Zocalo isn't
+        # triggered for files which failed, see ZocaloCallback
+        if self.run_start_uid:
+            self.nexus_writing.wait_for_run(self.run_start_uid)
+            if doc.get("run_start") == self.run_start_uid:
+                self.nexus_writing.discard_skeletons(self.run_start_uid)
+        return super().activity_gated_stop(doc)
@@ -3,12 +3,19 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from bluesky.callbacks import CallbackBase
-from dodal.devices.zocalo import ZocaloStartInfo, ZocaloTrigger
+from dodal.devices.zocalo import ZocaloStartInfo
 
 from mx_bluesky.hyperion.external_interaction.exceptions import ISPyBDepositionNotMade
+from mx_bluesky.hyperion.external_interaction.nexus.writing_service import (
+    NEXUS_WRITING_SERVICE,
+    NexusWritingService,
+)
+from mx_bluesky.hyperion.external_interaction.zocalo.submission_service import (
+    QueuedZocaloTrigger,
+)
 from mx_bluesky.hyperion.log import ISPYB_LOGGER
 from mx_bluesky.hyperion.parameters.constants import CONST
-from mx_bluesky.hyperion.utils.utils import number_of_frames_from_scan_spec
+from mx_bluesky.hyperion.parameters.scan_geometry import frames_per_scan
 
 if TYPE_CHECKING:
     from event_model.documents import Event, EventDescriptor, RunStart, RunStop
@@ -20,6 +27,13 @@ class ZocaloCallback(CallbackBase):
     sub-plan, and sends a run_end signal on receiving a stop document for the same plan.
 
     The metadata of the sub-plan this starts on must include a zocalo_environment.
+    The signals are queued on the ZOCALO_SUBMISSION_SERVICE, which sends them over a
+    connection kept open between runs, so handling the documents doesn't wait for the
+    broker.
+
+    The run_end signals aren't sent if the NeXus files of the run which set the
+    trigger weren't written, see NexusWritingService.failed_files. The NeXus callbacks
+    must have handled the stop document first.
 
     Shouldn't be subscribed directly to the RunEngine, instead should be passed to the
     `emit` argument of an ISPyB callback which appends DCIDs to the relevant start doc.
@@ -27,38 +41,41 @@ class ZocaloCallback(CallbackBase):
 
     def _reset_state(self):
         self.run_uid: str | None = None
+        # The run whose start set the trigger, which the NeXus files are written for
+        self.trigger_run_uid: str | None = None
         self.triggering_plan: str | None = None
-        self.zocalo_interactor: ZocaloTrigger | None = None
+        self.zocalo_interactor: QueuedZocaloTrigger | None = None
         self.zocalo_info: list[ZocaloStartInfo] = []
         self.descriptors: dict[str, EventDescriptor] = {}
 
     def __init__(
         self,
+        nexus_writing: NexusWritingService = NEXUS_WRITING_SERVICE,
     ):
         super().__init__()
+        self.nexus_writing = nexus_writing
         self._reset_state()
 
     def start(self, doc: RunStart):
         ISPYB_LOGGER.info("Zocalo handler received start document.")
         if triggering_plan := doc.get(CONST.TRIGGER.ZOCALO):
             self.triggering_plan = triggering_plan
+            self.trigger_run_uid = doc.get("uid")
             assert isinstance(zocalo_environment := doc.get("zocalo_environment"), str)
             ISPYB_LOGGER.info(f"Zocalo environment set to {zocalo_environment}.")
-            self.zocalo_interactor = ZocaloTrigger(zocalo_environment)
+            self.zocalo_interactor = QueuedZocaloTrigger(zocalo_environment)
 
         if self.triggering_plan and doc.get("subplan_name") == self.triggering_plan:
             self.run_uid = doc.get("uid")
-            assert isinstance(scan_points := doc.get("scan_points"), list)
+            scan_frames = frames_per_scan(doc)  # type: ignore
             if (
                 isinstance(ispyb_ids := doc.get("ispyb_dcids"), tuple)
                 and len(ispyb_ids) > 0
             ):
-                ids_and_shape = list(zip(ispyb_ids, scan_points, strict=False))
+                ids_and_frames = list(zip(ispyb_ids, scan_frames, strict=False))
                 start_frame = 0
                 self.zocalo_info = []
-                for idx, id_and_shape in enumerate(ids_and_shape):
-                    id, shape = id_and_shape
-                    num_frames = number_of_frames_from_scan_spec(shape)
+                for idx, (id, num_frames) in enumerate(ids_and_frames):
                     self.zocalo_info.append(
                         ZocaloStartInfo(id, None, start_frame, num_frames, idx)
                     )
@@ -87,6 +104,15 @@ class ZocaloCallback(CallbackBase):
                 f"Zocalo handler received stop document, for run {doc.get('run_start')}."
             )
             assert self.zocalo_interactor is not None
-            for info in self.zocalo_info:
-                self.zocalo_interactor.run_end(info.ispyb_dcid)
+            if self.trigger_run_uid and (
+                failed := self.nexus_writing.failed_files(self.trigger_run_uid)
+            ):
+                dcids = [info.ispyb_dcid for info in self.zocalo_info]
+                ISPYB_LOGGER.error(
+                    f"Not ending Zocalo runs for {dcids} as NeXus files weren't "
+                    f"written: {failed}"
+                )
+            else:
+                for info in self.zocalo_info:
+                    self.zocalo_interactor.run_end(info.ispyb_dcid)
             self._reset_state()
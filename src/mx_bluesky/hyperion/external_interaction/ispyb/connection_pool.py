@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import ispyb
+from ispyb.connector.mysqlsp.main import ISPyBMySQLSPConnector as Connector
+
+from mx_bluesky.hyperion.log import ISPYB_LOGGER
+
+DEFAULT_POOL_SIZE = 4
+# Connections which have been idle for longer than this are checked before use
+HEALTH_CHECK_AFTER_IDLE_S = 30.0
+# ispyb raises its own ConnectionError, which isn't the builtin one
+CONNECTION_ERRORS = (ConnectionError, ispyb.ConnectionError)
+
+
+def get_ispyb_pool_size() -> int:
+    return int(os.environ.get("ISPYB_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+
+@dataclasses.dataclass
+class _PooledConnection:
+    # What ispyb.open returned, which is closed when the connection is discarded
+    opened: Any
+    # What entering it gave, which is used to talk to the database
+    conn: Connector
+    last_used: float
+
+
+def _is_healthy(connection: _PooledConnection) -> bool:
+    mysql_conn = getattr(connection.conn, "conn", None)
+    if mysql_conn is None:
+        return False
+    try:
+        mysql_conn.ping(reconnect=True, attempts=1, delay=0)
+    except Exception as e:
+        ISPYB_LOGGER.info(f"Discarding ISPyB connection which failed health check: {e}")
+        return False
+    return True
+
+
+class IspybConnectionPool:
+    """Open ISPyB connections for one config file, which are handed out to one user at
+    a time and kept open afterwards rather than being closed.
+
+    At most `max_size` connections are open at once, further users wait for one to be
+    returned. A connection which has been idle for a while is pinged before it is
+    handed out, and a connection which raises one of the `CONNECTION_ERRORS` while in
+    use is closed rather than being returned to the pool."""
+
+    def __init__(self, config_path: str, max_size: int = DEFAULT_POOL_SIZE) -> None:
+        assert max_size > 0, "ISPyB connection pool must allow at least one connection"
+        self.config_path = config_path
+        self.max_size = max_size
+        self._available = threading.Condition()
+        self._idle: list[_PooledConnection] = []
+        self._open = 0
+        self._closed = False
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[Connector]:
+        pooled = self._acquire()
+        try:
+            yield pooled.conn
+        except CONNECTION_ERRORS:
+            self._discard(pooled)
+            raise
+        except BaseException:
+            self._release(pooled)
+            raise
+        else:
+            self._release(pooled)
+
+    def _acquire(self) -> _PooledConnection:
+        with self._available:
+            while True:
+                while self._idle:
+                    pooled = self._idle.pop()
+                    if (
+                        time.monotonic() - pooled.last_used < HEALTH_CHECK_AFTER_IDLE_S
+                        or _is_healthy(pooled)
+                    ):
+                        self.reused += 1
+                        return pooled
+                    self._close(pooled)
+                if self._open < self.max_size:
+                    # Reserve the slot, but connect without holding the lock
+                    self._open += 1
+                    break
+                self._available.wait()
+        try:
+            pooled = self._connect()
+        except BaseException:
+            with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+        return pooled
+
+    def _connect(self) -> _PooledConnection:
+        ISPYB_LOGGER.debug(f"Opening ISPyB connection using {self.config_path}")
+        opened = ispyb.open(self.config_path)
+        conn = opened.__enter__()
+        assert conn is not None, "Failed to connect to ISPyB"
+        with self._available:
+            self.opened += 1
+        return _PooledConnection(opened, conn, time.monotonic())
+
+    def _release(self, pooled: _PooledConnection) -> None:
+        pooled.last_used = time.monotonic()
+        with self._available:
+            if self._closed:
+                self._close(pooled)
+            else:
+                self._idle.append(pooled)
+            self._available.notify()
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        with self._available:
+            self._close(pooled)
+            self._available.notify()
+
+    def _close(self, pooled: _PooledConnection) -> None:
+        """Must be called holding the lock"""
+        self._open -= 1
+        self.discarded += 1
+        try:
+            pooled.opened.__exit__(None, None, None)
+        except Exception as e:
+            ISPYB_LOGGER.warning(f"Failed to close ISPyB connection: {e}")
+
+    def close(self) -> None:
+        """Closes the idle connections, connections in use are closed when returned"""
+        with self._available:
+            self._closed = True
+            while self._idle:
+                self._close(self._idle.pop())
+
+
+class IspybConnectionPools:
+    """The connection pool for each ISPyB config file, shared across the process so
+    that every `StoreInIspyb` reuses the same connections."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pools: dict[str, IspybConnectionPool] = {}
+
+    def get(self, config_path: str) -> IspybConnectionPool:
+        with self._lock:
+            pool = self._pools.get(config_path)
+            if pool is None:
+                pool = IspybConnectionPool(config_path, get_ispyb_pool_size())
+                self._pools[config_path] = pool
+            return pool
+
+    def clear(self) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.close()
+
+
+ISPYB_CONNECTION_POOLS = IspybConnectionPools()
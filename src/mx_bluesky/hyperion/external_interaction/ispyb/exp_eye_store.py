@@ -1,7 +1,11 @@
 import configparser
+import threading
+from functools import cache
 
-from requests import patch, post
+from requests import Session
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
+from urllib3.util.retry import Retry
 
 from mx_bluesky.hyperion.external_interaction.exceptions import ISPyBDepositionNotMade
 from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
@@ -11,6 +15,15 @@ from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
 
 RobotActionID = int
 
+# Only the callback's worker thread and occasional synchronous callers use the session
+EXPEYE_POOL_SIZE = 2
+EXPEYE_TIMEOUT_S = 10.0
+# Retries of connecting only, so a request is never sent twice
+EXPEYE_CONNECT_RETRIES = 2
+
+_session: Session | None = None
+_session_lock = threading.Lock()
+
 
 class BearerAuth(AuthBase):
     def __init__(self, token):
@@ -21,14 +34,42 @@ class BearerAuth(AuthBase):
         return r
 
 
-def _get_base_url_and_token() -> tuple[str, str]:
+@cache
+def _read_base_url_and_token(config_path: str) -> tuple[str, str]:
     config = configparser.ConfigParser()
-    conf = get_ispyb_config()
-    config.read(conf)
+    config.read(config_path)
     expeye_config = config["expeye"]
     return expeye_config["url"], expeye_config["token"]
 
 
+def _get_base_url_and_token() -> tuple[str, str]:
+    return _read_base_url_and_token(get_ispyb_config())
+
+
+def get_expeye_session() -> Session:
+    """The HTTP session shared by every ExpeyeInteraction, which keeps connections to
+    ExpEye alive between requests rather than connecting for each one."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=EXPEYE_POOL_SIZE,
+                max_retries=Retry(
+                    total=EXPEYE_CONNECT_RETRIES,
+                    connect=EXPEYE_CONNECT_RETRIES,
+                    read=0,
+                    status=0,
+                    other=0,
+                    backoff_factor=0.1,
+                ),
+            )
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
 class ExpeyeInteraction:
     CREATE_ROBOT_ACTION = "/proposals/{proposal}/sessions/{visit_number}/robot-actions"
     UPDATE_ROBOT_ACTION = "/robot-actions/{action_id}"
@@ -37,9 +78,10 @@ class ExpeyeInteraction:
         url, token = _get_base_url_and_token()
         self.base_url = url + "/core"
         self.auth = BearerAuth(token)
+        self.session = get_expeye_session()
 
     def _send_and_get_response(self, url, data, send_func) -> dict:
-        response = send_func(url, auth=self.auth, json=data)
+        response = send_func(url, auth=self.auth, json=data, timeout=EXPEYE_TIMEOUT_S)
         if not response.ok:
             raise ISPyBDepositionNotMade(f"Could not write {data} to {url}: {response}")
         return response.json()
@@ -51,6 +93,7 @@ class ExpeyeInteraction:
         sample_id: int,
         dewar_location: int,
         container_location: int,
+        timestamp: str | None = None,
     ) -> RobotActionID:
         """Create a robot load entry in ispyb.
 
@@ -62,6 +105,7 @@ class ExpeyeInteraction:
             sample_id (int): The id of the sample in the database
             dewar_location (int): Which puck in the dewar the sample is in
             container_location (int): Which pin in that puck has the sample
+            timestamp (str | None): When the load started, if not now
 
         Returns:
             RobotActionID: The id of the robot load action that is created
@@ -71,13 +115,13 @@ class ExpeyeInteraction:
         )
 
         data = {
-            "startTimestamp": get_current_time_string(),
+            "startTimestamp": timestamp or get_current_time_string(),
             "sampleId": sample_id,
             "actionType": "LOAD",
             "containerLocation": container_location,
             "dewarLocation": dewar_location,
         }
-        response = self._send_and_get_response(url, data, post)
+        response = self._send_and_get_response(url, data, self.session.post)
         return response["robotActionId"]
 
     def update_barcode_and_snapshots(
@@ -102,9 +146,15 @@ class ExpeyeInteraction:
             "xtalSnapshotBefore": snapshot_before_path,
             "xtalSnapshotAfter": snapshot_after_path,
         }
-        self._send_and_get_response(url, data, patch)
+        self._send_and_get_response(url, data, self.session.patch)
 
-    def end_load(self, action_id: RobotActionID, status: str, reason: str):
+    def end_load(
+        self,
+        action_id: RobotActionID,
+        status: str,
+        reason: str,
+        timestamp: str | None = None,
+    ):
         """Finish an existing robot action, providing final information about how it went
 
         Args:
@@ -112,14 +162,15 @@ class ExpeyeInteraction:
             status (str): The status of the action at the end, "success" for success,
                           otherwise error
             reason (str): If the status is in error than the reason for that error
+            timestamp (str | None): When the load finished, if not now
         """
         url = self.base_url + self.UPDATE_ROBOT_ACTION.format(action_id=action_id)
 
         run_status = "SUCCESS" if status == "success" else "ERROR"
 
         data = {
-            "endTimestamp": get_current_time_string(),
+            "endTimestamp": timestamp or get_current_time_string(),
             "status": run_status,
             "message": reason,
         }
-        self._send_and_get_response(url, data, patch)
+        self._send_and_get_response(url, data, self.session.patch)
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+import uuid
+from pathlib import Path
+from typing import Any
+
+from requests.exceptions import ConnectionError, Timeout
+
+from mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store import (
+    ExpeyeInteraction,
+    RobotActionID,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
+    get_current_time_string,
+)
+from mx_bluesky.hyperion.external_interaction.ordered_worker import (
+    OrderedRetryingWorker,
+    OrderedWorkerStats,
+)
+from mx_bluesky.hyperion.log import ISPYB_LOGGER
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_S = 0.5
+# ExpEye couldn't be reached, as opposed to rejecting the request
+TRANSIENT_ERRORS = (ConnectionError, Timeout)
+
+
+def _can_resend(call: str, error: Exception) -> bool:
+    """Whether a request which failed with the error can be sent again. Creating a robot
+    action may have taken effect if ExpEye was reached but didn't respond in time, so
+    that is only sent again if it couldn't connect"""
+    if call == "start_load":
+        return isinstance(error, ConnectionError)
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+# Every queue in the process shares the spool lock, as they usually share the file
+_spool_lock = threading.Lock()
+
+
+@dataclasses.dataclass
+class RobotAction:
+    """A robot action submitted to the queue, whose ID is only known once it has been
+    created in ExpEye"""
+
+    key: str = dataclasses.field(default_factory=lambda: uuid.uuid4().hex)
+    action_id: RobotActionID | None = None
+    # Once one request for the action has been spooled the rest are too, so that they
+    # are still sent in order
+    spooled: bool = False
+
+
+@dataclasses.dataclass
+class _Request:
+    action: RobotAction
+    # The ExpeyeInteraction method which sends the request
+    call: str
+    args: list[Any]
+    # When a load started or ended, which is sent with spooled requests
+    timestamp: str | None
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "key": self.action.key,
+            "action_id": self.action.action_id,
+            "call": self.call,
+            "args": self.args,
+            "timestamp": self.timestamp,
+        }
+
+
+@dataclasses.dataclass
+class ExpeyeQueueStats(OrderedWorkerStats):
+    spooled: int = 0
+    replayed: int = 0
+    dropped: int = 0
+
+
+class ExpeyeRobotActionQueue(OrderedRetryingWorker[_Request]):
+    """Sends robot actions to ExpEye on a worker thread so that the callback submitting
+    them doesn't wait for ExpEye.
+
+    Requests are sent one at a time in the order they were submitted. A request which
+    can't reach ExpEye is retried, waiting `backoff_s` and doubling the wait after each
+    attempt. After `max_attempts` it is appended to the spool file at `spool_path`,
+    along with every later request for the same action. Whenever the worker thread
+    starts it first sends what has been spooled, in order and with the times the loads
+    started and ended. A request which ExpEye rejects is logged and dropped, as is the
+    creation of a robot action which timed out waiting for ExpEye to respond, so that it
+    isn't created twice.
+    """
+
+    stats: ExpeyeQueueStats
+
+    def __init__(
+        self,
+        expeye: ExpeyeInteraction,
+        spool_path: Path,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_s: float = DEFAULT_BACKOFF_S,
+    ) -> None:
+        super().__init__(
+            "expeye-robot-actions",
+            ISPYB_LOGGER,
+            ExpeyeQueueStats(),
+            max_attempts,
+            backoff_s,
+        )
+        self.expeye = expeye
+        self.spool_path = spool_path
+        # Only used by the worker thread
+        self._spooled_actions: dict[str, RobotAction] = {}
+
+    def start_load(
+        self,
+        proposal_reference: str,
+        visit_number: int,
+        sample_id: int,
+        dewar_location: int,
+        container_location: int,
+    ) -> RobotAction:
+        """Queues the creation of a robot load entry, see
+        ExpeyeInteraction.start_load"""
+        action = RobotAction()
+        self._submit(
+            _Request(
+                action,
+                "start_load",
+                [
+                    proposal_reference,
+                    visit_number,
+                    sample_id,
+                    dewar_location,
+                    container_location,
+                ],
+                get_current_time_string(),
+            )
+        )
+        return action
+
+    def update_barcode_and_snapshots(
+        self,
+        action: RobotAction,
+        barcode: str,
+        snapshot_before_path: str,
+        snapshot_after_path: str,
+    ):
+        self._submit(
+            _Request(
+                action,
+                "update_barcode_and_snapshots",
+                [barcode, snapshot_before_path, snapshot_after_path],
+                None,
+            )
+        )
+
+    def end_load(self, action: RobotAction, status: str, reason: str):
+        self._submit(
+            _Request(action, "end_load", [status, reason], get_current_time_string())
+        )
+
+    def _on_worker_start(self) -> None:
+        self._replay_spool()
+
+    def _process(self, item: _Request) -> bool:
+        if item.action.spooled:
+            self._spool(item)
+            return False
+        if item.call != "start_load" and item.action.action_id is None:
+            ISPYB_LOGGER.warning(
+                f"Dropping ExpEye {item.call} as the robot action wasn't created"
+            )
+            with self._changed:
+                self.stats.dropped += 1
+            return False
+        return super()._process(item)
+
+    def _describe(self, item: _Request) -> str:
+        return f"ExpEye {item.call}"
+
+    def _is_retryable(self, item: _Request, error: Exception) -> bool:
+        return _can_resend(item.call, error)
+
+    def _on_failure(self, item: _Request, error: Exception, attempts: int) -> None:
+        if _can_resend(item.call, error):
+            ISPYB_LOGGER.warning(
+                f"Couldn't reach ExpEye after {attempts} attempts: {error}"
+            )
+            self._spool(item)
+        else:
+            super()._on_failure(item, error, attempts)
+            with self._changed:
+                self.stats.dropped += 1
+
+    def _attempt(self, item: _Request) -> None:
+        # Loads are recorded as starting and ending when they were submitted, not when
+        # the worker got to them
+        if item.call == "start_load":
+            item.action.action_id = self.expeye.start_load(
+                *item.args, timestamp=item.timestamp
+            )
+        elif item.call == "end_load":
+            self.expeye.end_load(
+                item.action.action_id, *item.args, timestamp=item.timestamp
+            )
+        else:
+            getattr(self.expeye, item.call)(item.action.action_id, *item.args)
+
+    def _spool(self, request: _Request) -> None:
+        request.action.spooled = True
+        self._spooled_actions[request.action.key] = request.action
+        with _spool_lock:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spool_path, "a") as spool:
+                spool.write(json.dumps(request.to_record()) + "\n")
+        with self._changed:
+            self.stats.spooled += 1
+        ISPYB_LOGGER.warning(f"Spooled ExpEye {request.call} to {self.spool_path}")
+
+    def _replay_spool(self) -> None:
+        with _spool_lock:
+            if not self.spool_path.exists():
+                return
+            records = [
+                json.loads(line)
+                for line in self.spool_path.read_text().splitlines()
+                if line
+            ]
+            ISPYB_LOGGER.info(
+                f"Sending {len(records)} spooled ExpEye requests from {self.spool_path}"
+            )
+            action_ids: dict[str, RobotActionID] = {}
+            for i, record in enumerate(records):
+                try:
+                    self._replay(record, action_ids)
+                except Exception as e:
+                    if not _can_resend(record["call"], e):
+                        ISPYB_LOGGER.exception(
+                            f"Dropping spooled ExpEye {record['call']}: {e}"
+                        )
+                        with self._changed:
+                            self.stats.dropped += 1
+                        continue
+                    ISPYB_LOGGER.warning(
+                        f"Couldn't reach ExpEye to send spooled requests: {e}"
+                    )
+                    remaining = [
+                        {**r, "action_id": r["action_id"] or action_ids.get(r["key"])}
+                        for r in records[i:]
+                    ]
+                    self.spool_path.write_text(
+                        "".join(json.dumps(r) + "\n" for r in remaining)
+                    )
+                    self._resume_actions(action_ids, {r["key"] for r in remaining})
+                    return
+                else:
+                    with self._changed:
+                        self.stats.replayed += 1
+            self.spool_path.unlink()
+            self._resume_actions(action_ids, set())
+
+    def _replay(self, record: dict[str, Any], action_ids: dict[str, RobotActionID]):
+        if record["call"] == "start_load":
+            action_ids[record["key"]] = self.expeye.start_load(
+                *record["args"], timestamp=record["timestamp"]
+            )
+            return
+        action_id = record["action_id"] or action_ids.get(record["key"])
+        if action_id is None:
+            raise ValueError("The robot action wasn't created")
+        if record["call"] == "end_load":
+            self.expeye.end_load(
+                action_id, *record["args"], timestamp=record["timestamp"]
+            )
+        else:
+            getattr(self.expeye, record["call"])(action_id, *record["args"])
+
+    def _resume_actions(
+        self, action_ids: dict[str, RobotActionID], still_spooled: set[str]
+    ) -> None:
+        """Lets actions of this queue whose spooled requests have all been sent carry on
+        sending their requests straight away"""
+        for key, action in list(self._spooled_actions.items()):
+            if action.action_id is None:
+                action.action_id = action_ids.get(key)
+            if key not in still_spooled:
+                action.spooled = False
+                del self._spooled_actions[key]
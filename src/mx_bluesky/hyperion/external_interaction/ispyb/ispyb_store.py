@@ -1,20 +1,23 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
-from dataclasses import asdict
-from typing import TYPE_CHECKING
+from collections.abc import Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
 
-import ispyb
-import ispyb.sqlalchemy
 from ispyb.connector.mysqlsp.main import ISPyBMySQLSPConnector as Connector
 from ispyb.sp.mxacquisition import MXAcquisition
 from ispyb.strictordereddict import StrictOrderedDict
 from pydantic import BaseModel
 
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    ISPYB_CONNECTION_POOLS,
+)
 from mx_bluesky.hyperion.external_interaction.ispyb.data_model import (
     DataCollectionGridInfo,
     DataCollectionGroupInfo,
     DataCollectionInfo,
+    DataCollectionPositionInfo,
     ScanDataInfo,
 )
 from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
@@ -37,16 +40,86 @@ class IspybIds(BaseModel):
     grid_ids: tuple[int, ...] = ()
 
 
+@dataclass
+class _PendingChanges:
+    """Changes to a data collection which haven't been written to ISPyB yet"""
+
+    data_collection_group_id: int | None = None
+    data_collection_info: dict[str, Any] = field(default_factory=dict)
+    position_info: DataCollectionPositionInfo | None = None
+    grid_info: DataCollectionGridInfo | None = None
+    end_time: str | None = None
+    run_status: str | None = None
+    # As (delimiter, comment), in the order they were appended
+    comment_appends: list[tuple[str, str]] = field(default_factory=list)
+
+    def merge(self, scan_data_info: ScanDataInfo) -> None:
+        changed = {
+            k: v
+            for k, v in asdict(scan_data_info.data_collection_info).items()
+            if v is not None
+        }
+        if "comments" in changed:
+            # Setting the comment replaces anything appended to it before
+            self.comment_appends = []
+        self.data_collection_info |= changed
+        if scan_data_info.data_collection_position_info:
+            self.position_info = scan_data_info.data_collection_position_info
+        if scan_data_info.data_collection_grid_info:
+            self.grid_info = scan_data_info.data_collection_grid_info
+
+    def has_data_collection_changes(self) -> bool:
+        return bool(self.end_time) or any(
+            k != "parent_id" for k in self.data_collection_info
+        )
+
+
+@contextmanager
+def _transaction(conn: Connector) -> Iterator[None]:
+    mysql_conn = conn.conn
+    mysql_conn.start_transaction()
+    try:
+        yield
+    except BaseException:
+        mysql_conn.rollback()
+        raise
+    mysql_conn.commit()
+
+
 class StoreInIspyb:
-    def __init__(self, ispyb_config: str) -> None:
+    """Writes data collections to ISPyB.
+
+    If `batch_updates` is set, changes to data collections that already exist are held
+    until `write_pending` is called. All of the changes to each data collection are
+    then merged and written in as few stored procedure calls as possible, in a single
+    transaction. Updates which create a data collection are always written straight
+    away, after the pending changes, as the new ID is needed. The grid IDs of batched
+    updates aren't known until they are written, so aren't added to the IspybIds
+    returned by `update_deposition`."""
+
+    def __init__(self, ispyb_config: str, batch_updates: bool = False) -> None:
         self.ISPYB_CONFIG_PATH: str = ispyb_config
         self._data_collection_group_id: int | None
+        self.batch_updates = batch_updates
+        self._pending: dict[int, _PendingChanges] = {}
+
+    def _connection(self) -> AbstractContextManager[Connector]:
+        return ISPYB_CONNECTION_POOLS.get(self.ISPYB_CONFIG_PATH).connection()
+
+    def _pending_changes(
+        self, data_collection_id: int, data_collection_group_id: int | None = None
+    ) -> _PendingChanges:
+        changes = self._pending.setdefault(data_collection_id, _PendingChanges())
+        if data_collection_group_id:
+            changes.data_collection_group_id = data_collection_group_id
+        return changes
 
     def begin_deposition(
         self,
         data_collection_group_info: DataCollectionGroupInfo,
         scan_data_infos: Sequence[ScanDataInfo],
     ) -> IspybIds:
+        self.write_pending()
         ispyb_ids = IspybIds()
         if scan_data_infos[0].data_collection_info:
             ispyb_ids.data_collection_group_id = scan_data_infos[
@@ -68,6 +141,15 @@ class StoreInIspyb:
         assert (
             ispyb_ids.data_collection_ids
         ), "Attempted to store scan data without a collection"
+        if self.batch_updates:
+            if all(info.data_collection_id for info in scan_data_infos):
+                for info in scan_data_infos:
+                    assert info.data_collection_id
+                    self._pending_changes(
+                        info.data_collection_id, ispyb_ids.data_collection_group_id
+                    ).merge(info)
+                return ispyb_ids
+            self.write_pending()
         return self._begin_or_update_deposition(ispyb_ids, None, scan_data_infos)
 
     def _begin_or_update_deposition(
@@ -76,8 +158,7 @@ class StoreInIspyb:
         data_collection_group_info: DataCollectionGroupInfo | None,
         scan_data_infos,
     ) -> IspybIds:
-        with ispyb.open(self.ISPYB_CONFIG_PATH) as conn:
-            assert conn is not None, "Failed to connect to ISPyB"
+        with self._connection() as conn:
             if data_collection_group_info:
                 ispyb_ids.data_collection_group_id = (
                     self._store_data_collection_group_table(
@@ -132,6 +213,17 @@ class StoreInIspyb:
             else:
                 run_status = "DataCollection Successful"
             current_time = get_current_time_string()
+            if self.batch_updates:
+                changes = self._pending_changes(
+                    id_, ispyb_ids.data_collection_group_id
+                )
+                changes.end_time = current_time
+                changes.run_status = run_status
+                if reason:
+                    changes.comment_appends.append(
+                        (" ", f"{run_status} reason: {reason}")
+                    )
+                continue
             self._update_scan_with_end_time_and_status(
                 current_time,
                 run_status,
@@ -143,13 +235,77 @@ class StoreInIspyb:
     def append_to_comment(
         self, data_collection_id: int, comment: str, delimiter: str = " "
     ) -> None:
-        with ispyb.open(self.ISPYB_CONFIG_PATH) as conn:
-            assert conn is not None, "Failed to connect to ISPyB!"
+        if self.batch_updates:
+            self._pending_changes(data_collection_id).comment_appends.append(
+                (delimiter, comment)
+            )
+            return
+        with self._connection() as conn:
             mx_acquisition: MXAcquisition = conn.mx_acquisition
             mx_acquisition.update_data_collection_append_comments(
                 data_collection_id, comment, delimiter
             )
 
+    def write_pending(self) -> None:
+        """Writes the changes held by `batch_updates`, which are kept if writing them
+        fails so that it can be retried."""
+        if not self._pending:
+            return
+        with self._connection() as conn:
+            with _transaction(conn):
+                calls = sum(
+                    self._write_pending_changes(conn, data_collection_id, changes)
+                    for data_collection_id, changes in self._pending.items()
+                )
+        ISPYB_LOGGER.info(
+            f"Wrote pending changes to data collections {list(self._pending)} in "
+            f"{calls} stored procedure calls"
+        )
+        self._pending = {}
+
+    def _write_pending_changes(
+        self, conn: Connector, data_collection_id: int, changes: _PendingChanges
+    ) -> int:
+        """Returns the number of stored procedure calls made. `changes` is left as it
+        is, so that it can be written again if the transaction is rolled back."""
+        calls = 0
+        data_collection_info = changes.data_collection_info
+        comment_appends = changes.comment_appends
+        if comment_appends and "comments" in data_collection_info:
+            data_collection_info = data_collection_info | {
+                "comments": data_collection_info["comments"]
+                + "".join(delimiter + comment for delimiter, comment in comment_appends)
+            }
+            comment_appends = []
+        if changes.has_data_collection_changes():
+            params = self._fill_common_data_collection_params(
+                conn,
+                data_collection_id,
+                DataCollectionInfo(**data_collection_info),
+            )
+            if changes.data_collection_group_id:
+                params["parentid"] = changes.data_collection_group_id
+            if changes.end_time:
+                params["endtime"] = changes.end_time
+                params["run_status"] = changes.run_status
+            self._upsert_data_collection(conn, params)
+            calls += 1
+        if changes.position_info:
+            self._store_position_table(conn, changes.position_info, data_collection_id)
+            calls += 1
+        if changes.grid_info:
+            self._store_grid_info_table(conn, data_collection_id, changes.grid_info)
+            calls += 1
+        if comment_appends:
+            (first_delimiter, first_comment), *rest = comment_appends
+            conn.mx_acquisition.update_data_collection_append_comments(
+                data_collection_id,
+                first_comment + "".join(d + c for d, c in rest),
+                first_delimiter,
+            )
+            calls += 1
+        return calls
+
     def _update_scan_with_end_time_and_status(
         self,
         end_time: str,
@@ -161,8 +317,7 @@ class StoreInIspyb:
         if reason is not None and reason != "":
             self.append_to_comment(data_collection_id, f"{run_status} reason: {reason}")
 
-        with ispyb.open(self.ISPYB_CONFIG_PATH) as conn:
-            assert conn is not None, "Failed to connect to ISPyB!"
+        with self._connection() as conn:
 
             mx_acquisition: MXAcquisition = conn.mx_acquisition
 
@@ -2,11 +2,20 @@ from __future__ import annotations
 
 import datetime
 import os
+import threading
+from pathlib import Path
 
 from ispyb import NoResult
 from ispyb.connector.mysqlsp.main import ISPyBMySQLSPConnector as Connector
 from ispyb.sp.core import Core
 
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    ISPYB_CONNECTION_POOLS,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.lookup_cache import (
+    ISPYB_LOOKUP_CACHE,
+)
+from mx_bluesky.hyperion.log import ISPYB_LOGGER
 from mx_bluesky.hyperion.parameters.constants import CONST
 
 VISIT_PATH_REGEX = r".+/([a-zA-Z]{2}\d{4,5}-\d{1,3})(/?$)"
@@ -16,12 +25,44 @@ def get_ispyb_config():
     return os.environ.get("ISPYB_CONFIG_PATH", CONST.SIM.ISPYB_CONFIG)
 
 
+def get_ispyb_batch_updates() -> bool:
+    return os.environ.get("ISPYB_BATCH_UPDATES", "").lower() in ("1", "true", "yes")
+
+
+def get_expeye_spool_path() -> Path:
+    """Where robot actions which couldn't be sent to ExpEye are kept until they can be,
+    alongside the logs unless EXPEYE_SPOOL_PATH is set"""
+    if spool_path := os.environ.get("EXPEYE_SPOOL_PATH"):
+        return Path(spool_path)
+    log_dir = Path(os.environ.get("HYPERION_LOG_DIR") or "./tmp/dev/")
+    return log_dir / "expeye_spool.jsonl"
+
+
 def get_session_id_from_visit(conn: Connector, visit: str):
-    try:
-        core: Core = conn.core
-        return core.retrieve_visit_id(visit)
-    except NoResult as e:
-        raise NoResult(f"No session ID found in ispyb for visit {visit}") from e
+    def look_up():
+        try:
+            core: Core = conn.core
+            return core.retrieve_visit_id(visit)
+        except NoResult as e:
+            raise NoResult(f"No session ID found in ispyb for visit {visit}") from e
+
+    return ISPYB_LOOKUP_CACHE.get("session_id", visit, look_up)
+
+
+def prewarm_ispyb_lookups(config_path: str, visit: str) -> threading.Thread:
+    """Looks up the session ID of the visit in the background, so that it is cached
+    by the time the deposition for the visit begins."""
+
+    def prewarm():
+        try:
+            with ISPYB_CONNECTION_POOLS.get(config_path).connection() as conn:
+                get_session_id_from_visit(conn, visit)
+        except Exception as e:
+            ISPYB_LOGGER.warning(f"Failed to prewarm ISPyB lookups for {visit}: {e}")
+
+    thread = threading.Thread(target=prewarm, name="ispyb-prewarm", daemon=True)
+    thread.start()
+    return thread
 
 
 def get_current_time_string():
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from mx_bluesky.hyperion.log import ISPYB_LOGGER
+
+# Long enough to cover a shift, after which the lookups are made again in case the
+# database has been corrected
+DEFAULT_LOOKUP_TTL_S = 8 * 60 * 60
+MAX_CACHED_LOOKUPS = 1024
+
+T = TypeVar("T")
+
+
+class IspybLookupCache:
+    """Results of ISPyB lookups which don't change while Hyperion is running, such as
+    the session ID of a visit, shared across the process.
+
+    Each result is kept for `ttl_s` after it was looked up. Lookups which fail, for
+    instance because the visit doesn't exist, aren't cached. The hits and misses are
+    counted for each kind of lookup.
+
+    Lookups are made outside the lock, so a slow lookup only holds up those waiting
+    for the same result. Those wait for the lookup already being made, such as one
+    being prewarmed, rather than making it again."""
+
+    def __init__(
+        self, ttl_s: float = DEFAULT_LOOKUP_TTL_S, max_size: int = MAX_CACHED_LOOKUPS
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._results: dict[tuple[str, Hashable], tuple[float, Any]] = {}
+        self._looking_up: dict[tuple[str, Hashable], Future] = {}
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def get(self, kind: str, key: Hashable, look_up: Callable[[], T]) -> T:
+        with self._lock:
+            cached = self._results.get((kind, key))
+            if cached is not None and time.monotonic() < cached[0]:
+                self.hits[kind] += 1
+                return cached[1]
+            if (looking_up := self._looking_up.get((kind, key))) is not None:
+                self.hits[kind] += 1
+            else:
+                self.misses[kind] += 1
+                self._looking_up[(kind, key)] = Future()
+        if looking_up is not None:
+            return looking_up.result()
+        return self._look_up(kind, key, look_up)
+
+    def _look_up(self, kind: str, key: Hashable, look_up: Callable[[], T]) -> T:
+        try:
+            result = look_up()
+        except BaseException as e:
+            with self._lock:
+                looking_up = self._looking_up.pop((kind, key))
+            looking_up.set_exception(e)
+            raise
+        with self._lock:
+            looking_up = self._looking_up.pop((kind, key))
+            self._store(kind, key, result)
+        looking_up.set_result(result)
+        ISPYB_LOGGER.debug(f"Looked up ISPyB {kind} for {key}: {result}")
+        return result
+
+    def _store(self, kind: str, key: Hashable, result: Any) -> None:
+        """Must be called holding the lock"""
+        self._results.pop((kind, key), None)
+        self._results[(kind, key)] = (time.monotonic() + self.ttl_s, result)
+        if len(self._results) > self.max_size:
+            # Dicts are in insertion order, so this is the oldest lookup
+            del self._results[next(iter(self._results))]
+
+    def invalidate(self, kind: str, key: Hashable) -> None:
+        with self._lock:
+            self._results.pop((kind, key), None)
+
+    def hit_rate(self, kind: str) -> float:
+        with self._lock:
+            total = self.hits[kind] + self.misses[kind]
+            return self.hits[kind] / total if total else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results = {}
+            self.hits.clear()
+            self.misses.clear()
+
+
+ISPYB_LOOKUP_CACHE = IspybLookupCache()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Callable
+
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    CONNECTION_ERRORS,
+)
+from mx_bluesky.hyperion.external_interaction.ordered_worker import (
+    OrderedRetryingWorker,
+    OrderedWorkerStats,
+)
+from mx_bluesky.hyperion.log import ISPYB_LOGGER
+
+DEFAULT_MAX_DEPTH = 100
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF_S = 0.5
+
+
+@dataclasses.dataclass
+class _PendingWrite:
+    description: str
+    write: Callable[[], object]
+
+
+class IspybWriteBehindQueue(OrderedRetryingWorker[_PendingWrite]):
+    """Runs ISPyB writes on a worker thread so that the thread submitting them doesn't
+    wait for the database.
+
+    Writes are made one at a time in the order they were submitted, so writes to the
+    same data collection are never reordered. At most `max_depth` writes are held,
+    beyond that `submit` waits for the worker to catch up. A write which loses its
+    connection is retried, waiting `backoff_s` and doubling the wait after each
+    attempt; a write which fails for any other reason, or runs out of attempts, is
+    logged and dropped. The worker thread only runs while there are writes to make.
+    """
+
+    def __init__(
+        self,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_s: float = DEFAULT_BACKOFF_S,
+    ) -> None:
+        super().__init__(
+            "ispyb-write-behind",
+            ISPYB_LOGGER,
+            OrderedWorkerStats(),
+            max_attempts,
+            backoff_s,
+            max_depth,
+        )
+        self._failed: list[str] = []
+
+    def submit(self, description: str, write: Callable[[], object]) -> None:
+        self._submit(_PendingWrite(description, write))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        if not super().flush(timeout):
+            ISPYB_LOGGER.warning(
+                f"Timed out after {timeout}s waiting for {self.depth} ISPyB writes to "
+                "finish"
+            )
+            return False
+        return True
+
+    def take_failed(self) -> list[str]:
+        """Returns the descriptions of the writes which failed since this was last
+        called"""
+        with self._changed:
+            failed, self._failed = self._failed, []
+        return failed
+
+    def _describe(self, item: _PendingWrite) -> str:
+        return f"ISPyB write '{item.description}'"
+
+    def _attempt(self, item: _PendingWrite) -> None:
+        item.write()
+
+    def _is_retryable(self, item: _PendingWrite, error: Exception) -> bool:
+        return isinstance(error, CONNECTION_ERRORS)
+
+    def _finished(self, item: _PendingWrite, succeeded: bool) -> None:
+        if not succeeded:
+            self._failed.append(item.description)
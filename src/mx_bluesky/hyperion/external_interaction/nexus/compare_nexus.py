@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+
+def _values_differ(first, second) -> bool:
+    if isinstance(first, np.ndarray) or isinstance(second, np.ndarray):
+        first, second = np.asarray(first), np.asarray(second)
+        return first.shape != second.shape or not np.array_equal(first, second)
+    return first != second
+
+
+def _selection(space: h5py.h5s.SpaceID) -> tuple:
+    if (
+        space.get_select_type() == h5py.h5s.SEL_HYPERSLABS
+        and space.is_regular_hyperslab()
+    ):
+        return space.shape, space.get_regular_hyperslab()
+    return space.shape, space.get_select_type()
+
+
+def _virtual_sources(dataset: h5py.Dataset) -> list[tuple]:
+    return [
+        (
+            _selection(source.vspace),
+            source.file_name,
+            source.dset_name,
+            _selection(source.src_space),
+        )
+        for source in dataset.virtual_sources()
+    ]
+
+
+def _compare_attrs(path: str, first, second) -> list[str]:
+    differences = []
+    for name in sorted(set(first.attrs) | set(second.attrs)):
+        if name not in first.attrs or name not in second.attrs:
+            differences.append(f"{path}: attribute {name} only in one file")
+        elif _values_differ(first.attrs[name], second.attrs[name]):
+            differences.append(f"{path}: attribute {name} differs")
+    return differences
+
+
+def _compare_datasets(
+    path: str, first: h5py.Dataset, second: h5py.Dataset
+) -> list[str]:
+    if (first.shape, first.dtype) != (second.shape, second.dtype):
+        return [f"{path}: shape or type differs"]
+    if first.is_virtual or second.is_virtual:
+        # The images the sources refer to needn't exist, so the mappings are compared
+        if not (first.is_virtual and second.is_virtual) or _virtual_sources(
+            first
+        ) != _virtual_sources(second):
+            return [f"{path}: virtual sources differ"]
+        return []
+    if _values_differ(first[()], second[()]):
+        return [f"{path}: values differ"]
+    return []
+
+
+def _link_target(link: h5py.SoftLink | h5py.ExternalLink) -> tuple[str, str]:
+    return getattr(link, "filename", ""), link.path
+
+
+def _compare_groups(path: str, first: h5py.Group, second: h5py.Group) -> list[str]:
+    differences = _compare_attrs(path or "/", first, second)
+    for name in sorted(set(first) | set(second)):
+        child = f"{path}/{name}"
+        first_link = first.get(name, getlink=True)
+        second_link = second.get(name, getlink=True)
+        if first_link is None or second_link is None:
+            differences.append(f"{child}: only in one file")
+            continue
+        if isinstance(first_link, h5py.SoftLink | h5py.ExternalLink) and isinstance(
+            second_link, type(first_link)
+        ):
+            # Links which are the same, e.g. to the image files, needn't be followed
+            if _link_target(first_link) == _link_target(second_link):
+                continue
+        differences.extend(_compare_objects(child, first[name], second[name]))
+    return differences
+
+
+def _compare_objects(path: str, first, second) -> list[str]:
+    if isinstance(first, h5py.Group) and isinstance(second, h5py.Group):
+        return _compare_groups(path, first, second)
+    if isinstance(first, h5py.Dataset) and isinstance(second, h5py.Dataset):
+        return _compare_attrs(path, first, second) + _compare_datasets(
+            path, first, second
+        )
+    return [f"{path}: is a group in one file and a dataset in the other"]
+
+
+def compare_nexus_files(first: Path, second: Path) -> list[str]:
+    """Compares the NeXus structure of two files, as read through HDF5 and so following
+    external links between them, and returns how they differ. Virtual datasets are
+    compared by their mappings rather than the images, which needn't exist yet."""
+    with h5py.File(first, "r") as first_file, h5py.File(second, "r") as second_file:
+        return _compare_groups("", first_file, second_file)
@@ -8,9 +8,10 @@ from dodal.devices.detector import DetectorParams
 from dodal.devices.zebra import RotationDirection
 from nexgen.nxs_utils import Attenuator, Axis, Beam, Detector, EigerDetector, Goniometer
 from nexgen.nxs_utils.axes import TransformationType
-from numpy.typing import DTypeLike
+from numpy.typing import ArrayLike, DTypeLike
 
 from mx_bluesky.hyperion.log import NEXUS_LOGGER
+from mx_bluesky.hyperion.parameters.scan_geometry import ScanDescriptor
 from mx_bluesky.hyperion.utils.utils import convert_eV_to_angstrom
 
 
@@ -29,6 +30,41 @@ def vds_type_based_on_bit_depth(detector_bit_depth: int) -> DTypeLike:
         return np.uint16
 
 
+def unique_in_order(values: ArrayLike) -> np.ndarray:
+    """The distinct values, in the order they first appear"""
+    values = np.asarray(values)
+    _, first_indices = np.unique(values, return_index=True)
+    return values[np.sort(first_indices)]
+
+
+class CompactGoniometer(Goniometer):
+    """A nexgen Goniometer which finds the distinct positions of each scan axis from
+    the lines of `scan_descriptor`, if given, rather than from the position at every
+    frame. nexgen searches a list of the positions for each frame, which takes time
+    quadratic in the number of frames and dominates writing large scans. Without a
+    descriptor the positions are found with a sort instead."""
+
+    def __init__(
+        self,
+        axes: list[Axis],
+        scan: dict[str, ArrayLike] | None = None,
+        scan_descriptor: ScanDescriptor | None = None,
+    ):
+        self.scan_descriptor = scan_descriptor
+        super().__init__(axes, scan)
+
+    def _get_unique_scan_point_values(self, ax: str) -> np.ndarray:  # type: ignore
+        if descriptor := self.scan_descriptor:
+            if ax in descriptor.static:
+                return np.array([descriptor.static[ax]])
+            for line in (descriptor.fast, descriptor.slow):
+                if line and line.axis == ax:
+                    # Every line is swept forwards first, even in a snaked grid
+                    return unique_in_order(line.midpoints)
+        assert self.scan is not None
+        return unique_in_order(self.scan[ax])
+
+
 def create_goniometer_axes(
     omega_start: float,
     scan_points: dict | None,
@@ -36,6 +72,7 @@ def create_goniometer_axes(
     chi: float = 0.0,
     phi: float = 0.0,
     rotation_direction: RotationDirection = RotationDirection.NEGATIVE,
+    scan_descriptor: ScanDescriptor | None = None,
 ):
     """Returns a Nexgen 'Goniometer' object with the dependency chain of I03's Smargon
     goniometer. If scan points is provided these values will be used in preference to
@@ -50,6 +87,9 @@ def create_goniometer_axes(
         x_y_z_increments:    optionally, specify the increments between each image for
                              the x, y, and z axes. Will be ignored if scan_points
                              is provided.
+        scan_descriptor:     optionally, the description the scan points were
+                             generated from, so that the goniometer needn't search
+                             the points of every frame.
     """
     gonio_axes = [
         Axis(
@@ -88,7 +128,7 @@ def create_goniometer_axes(
         ),
         Axis("phi", "chi", TransformationType.ROTATION, (-1, -0.0025, -0.0056), phi),
     ]
-    return Goniometer(gonio_axes, scan_points)
+    return CompactGoniometer(gonio_axes, scan_points, scan_descriptor)
 
 
 def get_start_and_predicted_end_time(time_expected: float) -> tuple[str, str]:
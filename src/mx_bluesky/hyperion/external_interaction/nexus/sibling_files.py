@@ -0,0 +1,56 @@
+"""The .nxs and _master.h5 files of a collection hold the same NeXus structure. They
+can be written by nexgen separately, or the master file derived from the .nxs file
+once it has been written, which avoids building the structure and VDS twice."""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import shutil
+from enum import Enum
+from pathlib import Path
+
+import h5py
+
+from mx_bluesky.hyperion.log import NEXUS_LOGGER
+
+# From linux/fs.h, shares the blocks of one file with another on btrfs, XFS etc.
+FICLONE = 0x40049409
+
+
+class NexusSiblingMode(Enum):
+    # Write both files with nexgen
+    WRITE = "write"
+    # Write the .nxs file and copy it, by reflink where the filesystem supports it
+    COPY = "copy"
+    # Write the .nxs file and a master file whose contents are external links to it,
+    # so the .nxs file must be kept beside it
+    LINK = "link"
+
+
+def get_nexus_sibling_mode() -> NexusSiblingMode:
+    return NexusSiblingMode(os.environ.get("HYPERION_NEXUS_SIBLING_MODE", "write"))
+
+
+def clone_file(source: Path, destination: Path) -> bool:
+    """Copies `source` to `destination`, by a reflink if the filesystem supports it.
+
+    Returns whether the copy is a reflink."""
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError as e:
+            NEXUS_LOGGER.debug(f"Can't reflink {source}, copying it instead: {e}")
+    shutil.copyfile(source, destination)
+    return False
+
+
+def write_link_stub(target: Path, destination: Path) -> None:
+    """Writes a NeXus file at `destination` with the attributes of `target` and an
+    external link to each of its top level groups. The link is relative, so the files
+    must be kept in the same directory."""
+    with h5py.File(target, "r") as source, h5py.File(destination, "x") as stub:
+        stub.attrs.update(source.attrs)
+        for name in source:
+            stub[name] = h5py.ExternalLink(target.name, f"/{name}")
@@ -6,21 +6,36 @@ gridscan.
 from __future__ import annotations
 
 import math
+from itertools import chain
 from pathlib import Path
 
+import h5py
 from dodal.devices.zebra import RotationDirection
 from dodal.utils import get_beamline_name
 from nexgen.nxs_utils import Attenuator, Beam, Detector, Goniometer, Source
+from nexgen.nxs_write.nxclass_writers import (
+    write_NXattenuator,
+    write_NXbeam,
+    write_NXdatetime,
+)
 from nexgen.nxs_write.nxmx_writer import NXmxFileWriter
 from numpy.typing import DTypeLike
 from scanspec.core import AxesPoints
 
 from mx_bluesky.hyperion.external_interaction.nexus.nexus_utils import (
+    create_beam_and_attenuator_parameters,
     create_detector_parameters,
     create_goniometer_axes,
     get_start_and_predicted_end_time,
 )
+from mx_bluesky.hyperion.external_interaction.nexus.sibling_files import (
+    NexusSiblingMode,
+    clone_file,
+    get_nexus_sibling_mode,
+    write_link_stub,
+)
 from mx_bluesky.hyperion.parameters.components import DiffractionExperimentWithSample
+from mx_bluesky.hyperion.parameters.scan_geometry import ScanDescriptor
 
 
 class NexusWriter:
@@ -28,7 +43,7 @@ class NexusWriter:
         self,
         parameters: DiffractionExperimentWithSample,
         data_shape: tuple[int, int, int],
-        scan_points: AxesPoints,
+        scan_points: AxesPoints | ScanDescriptor,
         *,
         run_number: int | None = None,
         omega_start_deg: float = 0,
@@ -40,9 +55,15 @@ class NexusWriter:
         full_num_of_images: int | None = None,
         meta_data_run_number: int | None = None,
         rotation_direction: RotationDirection = RotationDirection.NEGATIVE,
+        sibling_mode: NexusSiblingMode | None = None,
     ) -> None:
         self.beam: Beam | None = None
         self.attenuator: Attenuator | None = None
+        # A descriptor of the scan lets the goniometer be set up from its lines
+        self.scan_descriptor: ScanDescriptor | None = None
+        if isinstance(scan_points, ScanDescriptor):
+            self.scan_descriptor = scan_points
+            scan_points = scan_points.points()
         self.scan_points: dict = scan_points
         self.data_shape: tuple[int, int, int] = data_shape
         self.run_number: int = (
@@ -70,6 +91,26 @@ class NexusWriter:
             chi=chi_start_deg,
             phi=phi_start_deg,
             rotation_direction=rotation_direction,
+            scan_descriptor=self.scan_descriptor,
+        )
+        self.sibling_mode: NexusSiblingMode = sibling_mode or get_nexus_sibling_mode()
+        self._skeletons: set[Path] = set()
+
+    @property
+    def files(self) -> list[Path]:
+        return [self.nexus_file, self.master_file]
+
+    @property
+    def file_groups(self) -> list[list[Path]]:
+        """The files, grouped so that each group can be written independently of the
+        others, in order within the group as later files are derived from earlier ones"""
+        if self.sibling_mode == NexusSiblingMode.WRITE:
+            return [[filename] for filename in self.files]
+        return [self.files]
+
+    def predict_collection_times(self) -> tuple[str, str]:
+        return get_start_and_predicted_end_time(
+            self.detector.exp_time * self.full_num_of_images
         )
 
     def create_nexus_file(self, bit_depth: DTypeLike):
@@ -77,33 +118,156 @@ class NexusWriter:
         Creates a nexus file based on the parameters supplied when this object was
         initialised.
         """
-        start_time, est_end_time = get_start_and_predicted_end_time(
-            self.detector.exp_time * self.full_num_of_images
+        start_time, est_end_time = self.predict_collection_times()
+        for filename in chain.from_iterable(self.file_groups):
+            self.write_file(filename, bit_depth, start_time, est_end_time)
+
+    @property
+    def nexgen_files(self) -> list[Path]:
+        """The files written by nexgen rather than derived from another"""
+        return [group[0] for group in self.file_groups]
+
+    def write_skeleton(self, filename: Path):
+        """Writes everything which doesn't depend on the hardware readings, i.e. other
+        than the beam, attenuator, collection times and the VDS of the images, whose
+        type depends on the bit depth, to the temporary file that `write_file` will
+        complete. This can be done as soon as the run starts."""
+        assert filename in self.nexgen_files
+        temporary_file = self._temporary_file(filename)
+        temporary_file.unlink(missing_ok=True)
+        beam, attenuator = create_beam_and_attenuator_parameters(12.7, 0, 1)
+        try:
+            self._write_with_nexgen(
+                temporary_file,
+                None,
+                *self.predict_collection_times(),
+                beam,
+                attenuator,
+            )
+        except Exception:
+            temporary_file.unlink(missing_ok=True)
+            raise
+        self._skeletons.add(filename)
+
+    def discard_skeletons(self):
+        """Removes any skeletons which weren't completed"""
+        for filename in self._skeletons:
+            self._temporary_file(filename).unlink(missing_ok=True)
+        self._skeletons.clear()
+
+    def write_file(
+        self,
+        filename: Path,
+        bit_depth: DTypeLike,
+        start_time: str,
+        est_end_time: str,
+    ):
+        """Writes one of the files to a temporary file beside it, which is renamed to
+        `filename` once complete so that a partly written file is never seen. If the
+        skeleton of the file has been written it is completed, and unless in WRITE
+        mode the master file is derived from the .nxs file, which must have been
+        written first."""
+        temporary_file = self._temporary_file(filename)
+        try:
+            if filename in self._skeletons:
+                self._complete_skeleton(
+                    temporary_file, bit_depth, start_time, est_end_time
+                )
+            else:
+                temporary_file.unlink(missing_ok=True)
+                if (
+                    filename == self.master_file
+                    and self.sibling_mode != NexusSiblingMode.WRITE
+                ):
+                    self._derive_master_file(temporary_file)
+                else:
+                    assert self.beam is not None
+                    assert self.attenuator is not None
+                    self._write_with_nexgen(
+                        temporary_file,
+                        bit_depth,
+                        start_time,
+                        est_end_time,
+                        self.beam,
+                        self.attenuator,
+                    )
+            temporary_file.replace(filename)
+        finally:
+            self._skeletons.discard(filename)
+            temporary_file.unlink(missing_ok=True)
+
+    def _temporary_file(self, filename: Path) -> Path:
+        return filename.with_name(f".{filename.name}.tmp")
+
+    def _nxmx_writer(
+        self, filename: Path, beam: Beam, attenuator: Attenuator
+    ) -> NXmxFileWriter:
+        return NXmxFileWriter(
+            filename,
+            self.goniometer,
+            self.detector,
+            self.source,
+            beam,
+            attenuator,
+            self.full_num_of_images,
         )
 
+    def _write_with_nexgen(
+        self,
+        filename: Path,
+        bit_depth: DTypeLike | None,
+        start_time: str,
+        est_end_time: str,
+        beam: Beam,
+        attenuator: Attenuator,
+    ):
+        """Writes the file with nexgen, without the VDS if `bit_depth` is None"""
+        NXmx_Writer = self._nxmx_writer(filename, beam, attenuator)
+        NXmx_Writer.write(
+            image_filename=f"{self.data_filename}",
+            start_time=start_time,
+            est_end_time=est_end_time,
+        )
+        if bit_depth is not None:
+            self._write_vds(NXmx_Writer, bit_depth)
+
+    def _write_vds(self, NXmx_Writer: NXmxFileWriter, bit_depth: DTypeLike):
+        NXmx_Writer.write_vds(
+            vds_offset=self.start_index,
+            vds_shape=self.data_shape,
+            vds_dtype=bit_depth,
+        )
+
+    def _complete_skeleton(
+        self,
+        filename: Path,
+        bit_depth: DTypeLike,
+        start_time: str,
+        est_end_time: str,
+    ):
+        """Replaces what was left out of the skeleton with what nexgen would have
+        written"""
         assert self.beam is not None
         assert self.attenuator is not None
+        self._write_vds(
+            self._nxmx_writer(filename, self.beam, self.attenuator), bit_depth
+        )
+        with h5py.File(filename, "r+") as nxs:
+            instrument, sample = nxs["entry/instrument"], nxs["entry/sample"]
+            del instrument["attenuator"], instrument["beam"], sample["beam"]
+            write_NXattenuator(instrument, self.attenuator)
+            write_NXbeam(instrument, self.beam)
+            # nexgen hard links the sample beam to the instrument beam
+            sample["beam"] = instrument["beam"]
+            del nxs["entry/start_time"], nxs["entry/end_time_estimated"]
+            write_NXdatetime(nxs, start_time, "start_time")
+            write_NXdatetime(nxs, est_end_time, "end_time_estimated")
 
-        vds_shape = self.data_shape
-
-        for filename in [self.nexus_file, self.master_file]:
-            NXmx_Writer = NXmxFileWriter(
-                filename,
-                self.goniometer,
-                self.detector,
-                self.source,
-                self.beam,
-                self.attenuator,
-                self.full_num_of_images,
-            )
-            NXmx_Writer.write(
-                image_filename=f"{self.data_filename}",
-                start_time=start_time,
-                est_end_time=est_end_time,
-            )
-            NXmx_Writer.write_vds(
-                vds_offset=self.start_index, vds_shape=vds_shape, vds_dtype=bit_depth
-            )
+    def _derive_master_file(self, filename: Path):
+        if self.sibling_mode == NexusSiblingMode.LINK:
+            write_link_stub(self.nexus_file, filename)
+        else:
+            clone_file(self.nexus_file, filename)
 
     def get_image_datafiles(self, max_images_per_file=1000):
         return [
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+from numpy.typing import DTypeLike
+
+from mx_bluesky.hyperion.external_interaction.nexus.write_nexus import NexusWriter
+from mx_bluesky.hyperion.log import NEXUS_LOGGER
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RUN_TIMEOUT_S = 60.0
+
+
+@dataclasses.dataclass
+class NexusFileTiming:
+    filename: str
+    # Time waiting for a worker, and for any file it's derived from or its skeleton,
+    # then writing it. The skeleton is written earlier, off the critical path.
+    queued_s: float = 0
+    write_s: float = 0
+    skeleton_s: float = 0
+    error: str = ""
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.error
+
+
+@dataclasses.dataclass
+class NexusRunReport:
+    """The files written for a run, and the time from the first being submitted until
+    the last was written"""
+
+    run_uid: str
+    files: list[NexusFileTiming] = dataclasses.field(default_factory=list)
+    total_time_s: float = 0
+
+    @property
+    def failed(self) -> list[str]:
+        return [f.filename for f in self.files if not f.succeeded]
+
+    def as_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self) | {"failed": self.failed}
+
+
+@dataclasses.dataclass
+class _RunWrites:
+    submitted: float
+    last_written: float = 0
+    files: list[tuple[NexusFileTiming, Future]] = dataclasses.field(
+        default_factory=list
+    )
+
+
+class NexusWritingService:
+    """Writes the NeXus files of runs on a pool of at most `max_workers` threads, so
+    that the callbacks don't wait for them while handling documents and all the files
+    of a run are written at the same time, other than files derived from others
+    which are written after them.
+
+    Each file is written beside its final name and renamed once complete. The
+    callbacks submit the skeletons of the files when a run starts, then the files
+    once the hardware has been read, which completes the skeletons. They wait for the
+    files in `wait_for_run` on a stop document, so that anything triggered by the
+    stop, such as Zocalo, sees the files. Anything triggered by the stop should check
+    `failed_files` first, as the files which failed or weren't written in time won't
+    be there."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="nexus")
+        self._lock = threading.Lock()
+        self._runs: dict[str, _RunWrites] = {}
+        self._skeletons: dict[str, list[tuple[NexusWriter, Path, Future]]] = {}
+        self._failed_runs: dict[str, list[str]] = {}
+
+    def submit_skeletons(self, run_uid: str, writer: NexusWriter) -> None:
+        """Starts writing the skeletons of the files of `writer` which nexgen writes"""
+        with self._lock:
+            skeletons = self._skeletons.setdefault(run_uid, [])
+            for filename in writer.nexgen_files:
+                future = self._executor.submit(self._write_skeleton, writer, filename)
+                skeletons.append((writer, filename, future))
+
+    def _write_skeleton(self, writer: NexusWriter, filename: Path) -> float:
+        start = time.perf_counter()
+        try:
+            writer.write_skeleton(filename)
+        except Exception:
+            NEXUS_LOGGER.exception(
+                f"Failed to write skeleton of {filename}, it will be written in full"
+            )
+            return 0
+        return time.perf_counter() - start
+
+    def discard_skeletons(self, run_uid: str) -> None:
+        """Removes the skeletons of the run which weren't completed, e.g. as the run
+        failed before the hardware was read"""
+        with self._lock:
+            skeletons = self._skeletons.pop(run_uid, [])
+        wait([future for _, _, future in skeletons])
+        for writer in {id(writer): writer for writer, _, _ in skeletons}.values():
+            writer.discard_skeletons()
+
+    def submit(self, run_uid: str, writer: NexusWriter, bit_depth: DTypeLike) -> None:
+        """Starts writing all the files of `writer`, with the beam and attenuator it
+        has now"""
+        collection_times = writer.predict_collection_times()
+        with self._lock:
+            run = self._runs.setdefault(run_uid, _RunWrites(time.perf_counter()))
+            skeletons = {
+                filename: future
+                for skeleton_writer, filename, future in self._skeletons.get(
+                    run_uid, []
+                )
+                if skeleton_writer is writer
+            }
+            for filenames in writer.file_groups:
+                timings = [NexusFileTiming(str(filename)) for filename in filenames]
+                future = self._executor.submit(
+                    self._write,
+                    run,
+                    timings,
+                    time.perf_counter(),
+                    writer,
+                    filenames,
+                    [skeletons.get(filename) for filename in filenames],
+                    bit_depth,
+                    *collection_times,
+                )
+                run.files.extend((timing, future) for timing in timings)
+
+    def _write(
+        self,
+        run: _RunWrites,
+        timings: list[NexusFileTiming],
+        submitted: float,
+        writer: NexusWriter,
+        filenames: list[Path],
+        skeletons: list[Future | None],
+        *args,
+    ) -> None:
+        for timing, filename, skeleton in zip(
+            timings, filenames, skeletons, strict=True
+        ):
+            if skeleton:
+                timing.skeleton_s = skeleton.result()
+            start = time.perf_counter()
+            timing.queued_s = start - submitted
+            try:
+                writer.write_file(filename, *args)
+            except Exception as e:
+                NEXUS_LOGGER.exception(f"Failed to write NeXus file {filename}")
+                timing.error = repr(e)
+            end = time.perf_counter()
+            timing.write_s = end - start
+            with self._lock:
+                run.last_written = max(run.last_written, end)
+
+    def wait_for_run(
+        self, run_uid: str, timeout_s: float = DEFAULT_RUN_TIMEOUT_S
+    ) -> NexusRunReport | None:
+        """Waits for the files submitted for `run_uid` to be written and reports how
+        long they took, or returns None if none were submitted. A file not written
+        within `timeout_s` is reported as failed, though it may still be written."""
+        with self._lock:
+            run = self._runs.pop(run_uid, None)
+        if run is None:
+            return None
+        _, not_done = wait([future for _, future in run.files], timeout_s)
+        with self._lock:
+            last_written = time.perf_counter() if not_done else run.last_written
+        report = NexusRunReport(run_uid, total_time_s=last_written - run.submitted)
+        for timing, future in run.files:
+            timing = dataclasses.replace(timing)
+            if future in not_done:
+                timing.error = f"Not written within {timeout_s}s"
+            report.files.append(timing)
+        NEXUS_LOGGER.info(f"NeXus writing report: {json.dumps(report.as_dict())}")
+        if report.failed:
+            NEXUS_LOGGER.error(f"NeXus files were not written: {report.failed}")
+            with self._lock:
+                self._failed_runs[run_uid] = report.failed
+        return report
+
+    def failed_files(self, run_uid: str) -> list[str]:
+        """The files of `run_uid` which `wait_for_run` found had failed or weren't
+        written in time, which are forgotten once returned"""
+        with self._lock:
+            return self._failed_runs.pop(run_uid, [])
+
+
+NEXUS_WRITING_SERVICE = NexusWritingService()
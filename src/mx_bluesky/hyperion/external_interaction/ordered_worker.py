@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass
+class OrderedWorkerStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+    max_depth: int = 0
+    # Time spent processing the items which completed, and from their submission
+    # until they completed
+    total_work_s: float = 0.0
+    max_work_s: float = 0.0
+    total_latency_s: float = 0.0
+    max_latency_s: float = 0.0
+
+    @property
+    def mean_work_s(self) -> float:
+        return self.total_work_s / self.completed if self.completed else 0.0
+
+    @property
+    def mean_latency_s(self) -> float:
+        return self.total_latency_s / self.completed if self.completed else 0.0
+
+    def as_dict(self) -> dict:
+        return dataclasses.asdict(self) | {
+            "mean_work_s": self.mean_work_s,
+            "mean_latency_s": self.mean_latency_s,
+        }
+
+
+class OrderedRetryingWorker(ABC, Generic[T]):
+    """Processes items on a worker thread, so that the thread submitting them doesn't
+    wait for them, one at a time in the order they were submitted. The worker thread
+    only runs while there are items to process.
+
+    Subclasses make one attempt at an item in `_attempt`. An attempt which raises an
+    error that `_is_retryable` accepts is made again, waiting `backoff_s` and doubling
+    the wait after each attempt. After `max_attempts`, or any other error,
+    `_on_failure` is called with the last error and the item is counted as failed.
+    If `max_depth` is given at most that many items are held, beyond that `_submit`
+    waits for the worker to catch up."""
+
+    def __init__(
+        self,
+        name: str,
+        log: logging.Logger,
+        stats: OrderedWorkerStats,
+        max_attempts: int,
+        backoff_s: float,
+        max_depth: int | None = None,
+    ) -> None:
+        assert max_depth is None or max_depth > 0, f"{name} must hold at least one item"
+        self.name = name
+        self.log = log
+        self.stats = stats
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.max_depth = max_depth
+        self._changed = threading.Condition()
+        # The item being processed stays at the front until it has finished, with the
+        # time it was submitted
+        self._pending: deque[tuple[T, float]] = deque()
+        self._worker: threading.Thread | None = None
+
+    @property
+    def depth(self) -> int:
+        """The number of items which haven't finished yet, including the one being
+        processed"""
+        with self._changed:
+            return len(self._pending)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until every item submitted so far has finished.
+
+        Returns whether they all had before the timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: not self._pending, timeout)
+
+    def _submit(self, item: T) -> None:
+        with self._changed:
+            if (max_depth := self.max_depth) is not None:
+                self._changed.wait_for(lambda: len(self._pending) < max_depth)
+            self._pending.append((item, time.monotonic()))
+            self.stats.submitted += 1
+            self.stats.max_depth = max(self.stats.max_depth, len(self._pending))
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        try:
+            self._on_worker_start()
+        except Exception as e:
+            self.log.exception(f"{self.name} failed to start: {e}")
+        while True:
+            with self._changed:
+                if not self._pending:
+                    self._worker = None
+                    return
+                item, submitted = self._pending[0]
+            start = time.monotonic()
+            try:
+                succeeded = self._process(item)
+            except Exception as e:
+                self.log.exception(f"{self._describe(item)} failed: {e}")
+                succeeded = False
+            end = time.monotonic()
+            with self._changed:
+                self._pending.popleft()
+                self._record(succeeded, end - start, end - submitted)
+                self._finished(item, succeeded)
+                self._changed.notify_all()
+
+    def _process(self, item: T) -> bool:
+        """Attempts the item, retrying it as needed, and returns whether it
+        completed"""
+        wait_s = self.backoff_s
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self._attempt(item)
+                return True
+            except Exception as e:
+                if attempt == self.max_attempts or not self._is_retryable(item, e):
+                    self._on_failure(item, e, attempt)
+                    return False
+                self.log.warning(
+                    f"{self._describe(item)} failed, retrying in {wait_s}s: {e}"
+                )
+                with self._changed:
+                    self.stats.retries += 1
+                time.sleep(wait_s)
+                wait_s *= 2
+        return False
+
+    def _record(self, succeeded: bool, work_s: float, latency_s: float) -> None:
+        """Must be called holding the lock"""
+        if not succeeded:
+            self.stats.failed += 1
+            return
+        self.stats.completed += 1
+        self.stats.total_work_s += work_s
+        self.stats.max_work_s = max(self.stats.max_work_s, work_s)
+        self.stats.total_latency_s += latency_s
+        self.stats.max_latency_s = max(self.stats.max_latency_s, latency_s)
+
+    def _describe(self, item: T) -> str:
+        """How the item is referred to in the logs"""
+        return str(item)
+
+    @abstractmethod
+    def _attempt(self, item: T) -> None:
+        """Makes one attempt at the item, raising if it failed"""
+
+    def _is_retryable(self, item: T, error: Exception) -> bool:
+        return True
+
+    def _on_failure(self, item: T, error: Exception, attempts: int) -> None:
+        """Called on the worker thread, while handling the error, when the item won't be
+        attempted again"""
+        self.log.exception(
+            f"Giving up on {self._describe(item)} after {attempts} attempts: {error}"
+        )
+
+    def _on_worker_start(self) -> None:
+        """Called on the worker thread each time it starts, before any items"""
+
+    def _finished(self, item: T, succeeded: bool) -> None:
+        """Called on the worker thread holding the lock once the item has finished and
+        been counted in the stats, before anything waiting in `flush` is woken"""
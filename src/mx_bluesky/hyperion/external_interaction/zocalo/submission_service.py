@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import dataclasses
+import getpass
+import json
+import os
+import socket
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import zocalo.configuration
+from dodal.devices.zocalo import ZocaloTrigger
+from workflows.transport import lookup
+from workflows.transport.common_transport import CommonTransport
+
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
+    get_current_time_string,
+)
+from mx_bluesky.hyperion.external_interaction.ordered_worker import (
+    OrderedRetryingWorker,
+    OrderedWorkerStats,
+)
+from mx_bluesky.hyperion.log import ISPYB_LOGGER
+
+ZOCALO_DESTINATION = "processing_recipe"
+ZOCALO_RECIPES = ["mimas"]
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_S = 0.5
+DEFAULT_CLOSE_TIMEOUT_S = 30.0
+
+
+def get_zocalo_dead_letter_path() -> Path:
+    """Where messages which couldn't be delivered to Zocalo are kept, alongside the logs
+    unless ZOCALO_DEAD_LETTER_PATH is set"""
+    if dead_letter_path := os.environ.get("ZOCALO_DEAD_LETTER_PATH"):
+        return Path(dead_letter_path)
+    return (
+        Path(os.environ.get("HYPERION_LOG_DIR") or "./tmp/dev/")
+        / "zocalo_dead_letters.jsonl"
+    )
+
+
+def connect_to_zocalo(environment: str) -> CommonTransport:
+    zc = zocalo.configuration.from_file()
+    zc.activate_environment(environment)
+    transport = lookup("PikaTransport")()
+    transport.connect()
+    return transport
+
+
+def _zocalo_headers() -> dict[str, str]:
+    return {
+        "zocalo.go.user": os.environ.get("ZOCALO_GO_USER", getpass.getuser()),
+        "zocalo.go.host": os.environ.get("ZOCALO_GO_HOSTNAME", socket.gethostname()),
+    }
+
+
+@dataclasses.dataclass
+class ZocaloSubmission:
+    """A message submitted to Zocalo, which is done once the broker has confirmed it
+    or it has been dead-lettered"""
+
+    environment: str
+    parameters: dict[str, Any]
+    delivered: bool = False
+    error: str = ""
+    done: threading.Event = dataclasses.field(default_factory=threading.Event)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for the message to be done and returns whether it was delivered"""
+        return self.done.wait(timeout) and self.delivered
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "environment": self.environment,
+            "destination": ZOCALO_DESTINATION,
+            "message": {"recipes": ZOCALO_RECIPES, "parameters": self.parameters},
+            "error": self.error,
+            "time": get_current_time_string(),
+        }
+
+
+@dataclasses.dataclass
+class ZocaloSubmissionStats(OrderedWorkerStats):
+    connections: int = 0
+    dead_lettered: int = 0
+
+
+class ZocaloSubmissionService(OrderedRetryingWorker[ZocaloSubmission]):
+    """Sends messages to Zocalo on a worker thread, so that the callbacks submitting
+    them don't wait for the broker, over a connection to each Zocalo environment which
+    is kept open between messages.
+
+    Messages are sent one at a time in the order they were submitted, each in its own
+    transaction so that it's only counted as delivered once the broker has confirmed
+    it. A message which fails is retried on a new connection, waiting `backoff_s` and
+    doubling the wait after each attempt. After `max_attempts` it is appended to the
+    dead letter file at `dead_letter_path`, or `get_zocalo_dead_letter_path()` if not
+    given. The worker thread only runs while there are messages to send.
+    """
+
+    stats: ZocaloSubmissionStats
+
+    def __init__(
+        self,
+        connect: Callable[[str], CommonTransport] = connect_to_zocalo,
+        dead_letter_path: Path | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_s: float = DEFAULT_BACKOFF_S,
+    ) -> None:
+        super().__init__(
+            "zocalo-submission",
+            ISPYB_LOGGER,
+            ZocaloSubmissionStats(),
+            max_attempts,
+            backoff_s,
+        )
+        self.connect = connect
+        self.dead_letter_path = dead_letter_path
+        # Only used by the worker thread, and by close once it has finished
+        self._transports: dict[str, CommonTransport] = {}
+
+    def submit(self, environment: str, parameters: dict[str, Any]) -> ZocaloSubmission:
+        submission = ZocaloSubmission(environment, parameters)
+        self._submit(submission)
+        return submission
+
+    def close(self, timeout: float | None = DEFAULT_CLOSE_TIMEOUT_S):
+        """Flushes the messages then disconnects from Zocalo"""
+        if not self.flush(timeout):
+            ISPYB_LOGGER.error(
+                f"{self.depth} Zocalo messages not sent within {timeout}s"
+            )
+            return
+        for environment in list(self._transports):
+            self._disconnect(environment)
+        ISPYB_LOGGER.info(
+            f"Zocalo submission stats: {json.dumps(self.stats.as_dict())}"
+        )
+
+    def _describe(self, item: ZocaloSubmission) -> str:
+        return f"Zocalo message for {item.parameters}"
+
+    def _attempt(self, item: ZocaloSubmission) -> None:
+        try:
+            self._send(item)
+        except Exception:
+            self._disconnect(item.environment)
+            raise
+
+    def _on_failure(
+        self, item: ZocaloSubmission, error: Exception, attempts: int
+    ) -> None:
+        super()._on_failure(item, error, attempts)
+        item.error = repr(error)
+        self._dead_letter(item)
+
+    def _finished(self, item: ZocaloSubmission, succeeded: bool) -> None:
+        item.delivered = succeeded
+        item.done.set()
+
+    def _send(self, submission: ZocaloSubmission) -> None:
+        transport = self._transports.get(submission.environment)
+        if transport is None or not transport.is_connected():
+            transport = self.connect(submission.environment)
+            self._transports[submission.environment] = transport
+            with self._changed:
+                self.stats.connections += 1
+        transaction = transport.transaction_begin()
+        transport.send(
+            ZOCALO_DESTINATION,
+            {"recipes": ZOCALO_RECIPES, "parameters": submission.parameters},
+            headers=_zocalo_headers(),
+            transaction=transaction,
+        )
+        transport.transaction_commit(transaction)
+
+    def _disconnect(self, environment: str) -> None:
+        if transport := self._transports.pop(environment, None):
+            try:
+                transport.disconnect()
+            except Exception as e:
+                ISPYB_LOGGER.warning(f"Failed to disconnect from Zocalo: {e}")
+
+    def _dead_letter(self, submission: ZocaloSubmission) -> None:
+        dead_letter_path = self.dead_letter_path or get_zocalo_dead_letter_path()
+        dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(dead_letter_path, "a") as dead_letters:
+            dead_letters.write(json.dumps(submission.to_record()) + "\n")
+        with self._changed:
+            self.stats.dead_lettered += 1
+        ISPYB_LOGGER.error(
+            f"Zocalo message for {submission.parameters} written to {dead_letter_path}"
+        )
+
+
+ZOCALO_SUBMISSION_SERVICE = ZocaloSubmissionService()
+
+
+class QueuedZocaloTrigger(ZocaloTrigger):
+    """A ZocaloTrigger which submits its messages to a ZocaloSubmissionService rather
+    than connecting to Zocalo and waiting for each message to be sent"""
+
+    def __init__(
+        self,
+        environment: str = "artemis",
+        service: ZocaloSubmissionService = ZOCALO_SUBMISSION_SERVICE,
+    ):
+        super().__init__(environment)
+        self.service = service
+
+    def _send_to_zocalo(self, parameters: dict):
+        self.service.submit(self.zocalo_environment, parameters)
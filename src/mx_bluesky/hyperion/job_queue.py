@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+from collections import deque
+from collections.abc import Callable
+from enum import StrEnum
+from statistics import mean
+from time import time
+from typing import Any
+from uuid import uuid4
+
+from mx_bluesky.hyperion.external_interaction.callbacks.common.callback_util import (
+    CallbacksFactory,
+)
+from mx_bluesky.hyperion.parameters.components import HyperionParameters
+
+METRICS_HISTORY_LENGTH = 100
+
+
+class JobState(StrEnum):
+    QUEUED = "Queued"
+    RUNNING = "Running"
+    FINISHED = "Finished"
+    FAILED = "Failed"
+    CANCELLED = "Cancelled"
+
+
+@dataclasses.dataclass
+class Job:
+    """A plan submitted to the queue. The parameters have already been validated and
+    the devices set up by the time a job is queued, so it can be started as soon as
+    the previous job finishes."""
+
+    plan_name: str
+    experiment: Callable
+    parameters: HyperionParameters
+    devices: Any
+    callbacks: CallbacksFactory | None = None
+    job_id: str = dataclasses.field(default_factory=lambda: str(uuid4()))
+    state: JobState = JobState.QUEUED
+    submitted_at: float = dataclasses.field(default_factory=time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def wait_time_s(self) -> float | None:
+        return None if self.started_at is None else self.started_at - self.submitted_at
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "plan_name": self.plan_name,
+            "state": self.state.value,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_time_s": self.wait_time_s,
+        }
+
+
+class JobQueue:
+    """An ordered, thread-safe queue of jobs waiting to be run by the BlueskyRunner,
+    which also records how long jobs waited and the gaps between consecutive plans.
+    While the queue is paused no jobs are taken off it, but they can still be
+    submitted, cancelled and reordered."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queued: list[Job] = []
+        self._paused = False
+        self.running: Job | None = None
+        self._wait_times_s: deque[float] = deque(maxlen=METRICS_HISTORY_LENGTH)
+        self._gaps_s: deque[float] = deque(maxlen=METRICS_HISTORY_LENGTH)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._queued)
+
+    def submit(self, job: Job) -> Job:
+        with self._lock:
+            self._queued.append(job)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Removes a job which has not yet started. Returns False if there is no such
+        queued job."""
+        with self._lock:
+            job = self._find(job_id)
+            if job is None:
+                return False
+            self._queued.remove(job)
+            job.state = JobState.CANCELLED
+            return True
+
+    def reorder(self, job_id: str, position: int) -> bool:
+        """Moves a job which has not yet started to the given position in the queue,
+        where 0 is the next job to run. Returns False if there is no such queued job."""
+        with self._lock:
+            job = self._find(job_id)
+            if job is None:
+                return False
+            self._queued.remove(job)
+            self._queued.insert(max(position, 0), job)
+            return True
+
+    @property
+    def paused(self) -> bool:
+        with self._lock:
+            return self._paused
+
+    def pause(self) -> None:
+        with self._lock:
+            self._paused = True
+
+    def resume(self) -> bool:
+        """Lets jobs be taken off the queue again. Returns False if it wasn't
+        paused."""
+        with self._lock:
+            was_paused, self._paused = self._paused, False
+            return was_paused
+
+    def pop_next(self) -> Job | None:
+        """Takes the next job off the queue and marks it as running, unless the queue
+        is paused."""
+        with self._lock:
+            if self._paused or not self._queued:
+                return None
+            job = self._queued.pop(0)
+            job.state = JobState.RUNNING
+            job.started_at = time()
+            self._wait_times_s.append(job.started_at - job.submitted_at)
+            self.running = job
+            return job
+
+    def finish(self, job: Job, state: JobState) -> None:
+        with self._lock:
+            job.state = state
+            job.finished_at = time()
+            if self.running is job:
+                self.running = None
+
+    def record_gap(self, gap_s: float) -> None:
+        """Record the time between one queued plan finishing and the next starting."""
+        with self._lock:
+            self._gaps_s.append(gap_s)
+
+    def list_jobs(self) -> list[dict[str, Any]]:
+        with self._lock:
+            jobs = [self.running] if self.running else []
+            return [job.summary() for job in jobs + self._queued]
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": len(self._queued),
+                "last_wait_time_s": self._last(self._wait_times_s),
+                "mean_wait_time_s": self._mean(self._wait_times_s),
+                "last_gap_between_plans_s": self._last(self._gaps_s),
+                "max_gap_between_plans_s": max(self._gaps_s, default=None),
+            }
+
+    def _find(self, job_id: str) -> Job | None:
+        return next((job for job in self._queued if job.job_id == job_id), None)
+
+    @staticmethod
+    def _last(values: deque[float]) -> float | None:
+        return values[-1] if values else None
+
+    @staticmethod
+    def _mean(values: deque[float]) -> float | None:
+        return mean(values) if values else None
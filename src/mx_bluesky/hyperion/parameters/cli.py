@@ -9,6 +9,15 @@ class HyperionArgs:
     use_external_callbacks: bool = False
     verbose_event_logging: bool = False
     skip_startup_connection: bool = False
+    concurrent_startup: bool = False
+    zmq_serialiser: str = "pickle"
+    zmq_event_batch_size: int = 1
+
+
+@dataclass
+class CallbackArgs:
+    dev_mode: bool = False
+    threaded_dispatch: bool = False
 
 
 def _add_callback_relevant_args(parser: argparse.ArgumentParser) -> None:
@@ -20,12 +29,23 @@ def _add_callback_relevant_args(parser: argparse.ArgumentParser) -> None:
     )
 
 
-def parse_callback_dev_mode_arg() -> bool:
-    """Returns the bool representing the 'dev_mode' argument."""
+def parse_callback_cli_args() -> CallbackArgs:
+    """Parses the arguments of hyperion-callbacks. Returns a CallbackArgs dataclass
+    with the fields: (dev_mode: bool,
+                      threaded_dispatch: bool)"""
     parser = argparse.ArgumentParser()
     _add_callback_relevant_args(parser)
+    parser.add_argument(
+        "--threaded-dispatch",
+        action="store_true",
+        help="Run each callback on its own thread, so that a slow callback doesn't "
+        "hold up the others",
+    )
     args = parser.parse_args()
-    return args.dev
+    return CallbackArgs(
+        dev_mode=args.dev or False,
+        threaded_dispatch=args.threaded_dispatch or False,
+    )
 
 
 def parse_cli_args() -> HyperionArgs:
@@ -33,7 +53,10 @@ def parse_cli_args() -> HyperionArgs:
     the fields: (verbose_event_logging: bool,
                  dev_mode: bool,
                  skip_startup_connection: bool,
-                 external_callbacks: bool)"""
+                 external_callbacks: bool,
+                 concurrent_startup: bool,
+                 zmq_serialiser: str,
+                 zmq_event_batch_size: int)"""
     parser = argparse.ArgumentParser()
     _add_callback_relevant_args(parser)
     parser.add_argument(
@@ -51,10 +74,32 @@ def parse_cli_args() -> HyperionArgs:
         action="store_true",
         help="Run the external hyperion-callbacks service and publish events over ZMQ",
     )
+    parser.add_argument(
+        "--concurrent-startup",
+        action="store_true",
+        help="Connect devices and set up plans in parallel on startup, and log a "
+        "report of how long each took",
+    )
+    parser.add_argument(
+        "--zmq-serialiser",
+        choices=["pickle", "msgpack", "msgpack-zlib"],
+        default="pickle",
+        help="How to serialise the documents published to the external callbacks",
+    )
+    parser.add_argument(
+        "--zmq-event-batch-size",
+        type=int,
+        default=1,
+        help="Batch up to this many events into each message published to the "
+        "external callbacks",
+    )
     args = parser.parse_args()
     return HyperionArgs(
         verbose_event_logging=args.verbose_event_logging or False,
         dev_mode=args.dev or False,
         skip_startup_connection=args.skip_startup_connection or False,
         use_external_callbacks=args.external_callbacks or False,
+        concurrent_startup=args.concurrent_startup or False,
+        zmq_serialiser=args.zmq_serialiser,
+        zmq_event_batch_size=args.zmq_event_batch_size,
     )
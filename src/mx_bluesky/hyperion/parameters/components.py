@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import datetime
 import json
+import os
 from abc import abstractmethod
 from collections.abc import Sequence
 from enum import StrEnum
@@ -14,7 +15,7 @@ from dodal.devices.detector import (
     TriggerMode,
 )
 from numpy.typing import NDArray
-from pydantic import BaseModel, Extra, Field, root_validator, validator
+from pydantic import BaseModel, Extra, Field, PrivateAttr, root_validator, validator
 from scanspec.core import AxesPoints
 from semver import Version
 
@@ -134,11 +135,17 @@ class HyperionParameters(BaseModel):
     @classmethod
     def from_json(cls, input: str | None, *, allow_extras: bool = False):
         assert input is not None
+        values = json.loads(input)
         if allow_extras:
-            cls.Config.extra = Extra.ignore  # type: ignore
-        params = cls(**json.loads(input))
-        cls.Config.extra = Extra.forbid
-        return params
+            # Drop unknown fields here rather than changing the model config, which
+            # would affect any other thread parsing the same class
+            known_fields = {
+                name
+                for field in cls.__fields__.values()
+                for name in (field.name, field.alias)
+            }
+            values = {k: v for k, v in values.items() if k in known_fields}
+        return cls(**values)
 
 
 class WithSnapshot(BaseModel):
@@ -173,6 +180,7 @@ class DiffractionExperiment(HyperionParameters, WithSnapshot):
     transmission_frac: float = Field(default=0.1)
     ispyb_experiment_type: IspybExperimentType
     storage_directory: str
+    _created_storage_directory: str | None = PrivateAttr(default=None)
 
     @root_validator(pre=True)
     def validate_snapshot_directory(cls, values):
@@ -194,6 +202,13 @@ class DiffractionExperiment(HyperionParameters, WithSnapshot):
     def num_images(self) -> int:
         return 0
 
+    def create_storage_directory(self):
+        """Creates the storage directory, if it hasn't already been created for these
+        parameters."""
+        if self._created_storage_directory != self.storage_directory:
+            os.makedirs(self.storage_directory, exist_ok=True)
+            self._created_storage_directory = self.storage_directory
+
     @property
     @abstractmethod
     def detector_params(self) -> DetectorParams: ...
@@ -41,6 +41,8 @@ class PlanGroupCheckpointConstants:
     # Gridscan
     GRID_READY_FOR_DC = "ready_for_data_collection"
     MOVE_GONIO_TO_START = "move_gonio_to_start"
+    # Rotation
+    ROTATION_SWEEP = "rotation_sweep"
 
 
 @dataclass(frozen=True)
@@ -62,6 +64,13 @@ class HardwareConstants:
     CRYOJET_MARGIN_MM = 0.2
 
 
+@dataclass(frozen=True)
+class StartupConstants:
+    MAX_CONCURRENT_CONNECTIONS = 16
+    DEVICE_CONNECTION_TIMEOUT_S = 10.0
+    MAX_CONCURRENT_PLAN_SETUPS = 6
+
+
 @dataclass(frozen=True)
 class TriggerConstants:
     ZOCALO = "trigger_zocalo_on"
@@ -117,6 +126,7 @@ class HyperionConstants:
     PLAN = PlanNameConstants()
     WAIT = PlanGroupCheckpointConstants()
     SIM = SimConstants()
+    STARTUP = StartupConstants()
     TRIGGER = TriggerConstants()
     CALLBACK_0MQ_PROXY_PORTS = (5577, 5578)
     DESCRIPTORS = DocDescriptorNames()
@@ -138,6 +148,10 @@ class Actions(Enum):
     STOP = "stop"
     SHUTDOWN = "shutdown"
     STATUS = "status"
+    SUBMIT = "submit"
+    CANCEL = "cancel"
+    REORDER = "reorder"
+    RESUME = "resume"
 
 
 class Status(Enum):
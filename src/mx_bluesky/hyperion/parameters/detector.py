@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any
+
+import numpy as np
+from dodal.devices.detector import DetectorParams
+from dodal.devices.detector.det_dist_to_beam_converter import (
+    Axis,
+    DetectorDistanceToBeamXYConverter,
+)
+from dodal.devices.detector.detector import get_run_number
+from numpy.typing import ArrayLike
+from pydantic import root_validator
+
+from mx_bluesky.hyperion.log import LOGGER
+
+
+class CachedDetectorDistanceToBeamXYConverter(DetectorDistanceToBeamXYConverter):
+    """A beam centre converter which keeps the parsed lookup table as an array, so
+    that it can be shared between parameters and interpolate many distances at once."""
+
+    def __init__(self, lookup_file: str):
+        super().__init__(lookup_file)
+        self._table = np.array(self.lookup_table_values)
+
+    def reload_lookup_table(self):
+        super().reload_lookup_table()
+        self._table = np.array(self.lookup_table_values)
+
+    def get_beam_xy_from_det_dist(self, det_dist_mm: float, beam_axis: Axis) -> float:
+        return float(self.get_beam_xy_from_det_dists(det_dist_mm, beam_axis))
+
+    def get_beam_xy_from_det_dists(
+        self, det_dists_mm: ArrayLike, beam_axis: Axis
+    ) -> np.ndarray:
+        return np.interp(det_dists_mm, self._table[0], self._table[beam_axis.value])
+
+
+class BeamXYLookupTables:
+    """Parsed beam centre lookup tables, shared across the process. A table is only
+    read from disk again if the file has been modified since it was last parsed."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._converters: dict[
+            str, tuple[int, CachedDetectorDistanceToBeamXYConverter]
+        ] = {}
+        self.loads = 0
+
+    def get(self, lookup_file: str) -> CachedDetectorDistanceToBeamXYConverter:
+        modified_ns = os.stat(lookup_file).st_mtime_ns
+        with self._lock:
+            cached = self._converters.get(lookup_file)
+            if cached is not None and cached[0] == modified_ns:
+                return cached[1]
+        LOGGER.debug(f"Loading beam centre lookup table from {lookup_file}")
+        converter = CachedDetectorDistanceToBeamXYConverter(lookup_file)
+        with self._lock:
+            self._converters[lookup_file] = (modified_ns, converter)
+            self.loads += 1
+        return converter
+
+    def clear(self) -> None:
+        with self._lock:
+            self._converters.clear()
+
+
+BEAM_XY_LOOKUP_TABLES = BeamXYLookupTables()
+
+
+class HyperionDetectorParams(DetectorParams):
+    """DetectorParams which take their beam centre converter from the shared lookup
+    tables rather than parsing the lookup table file each time they are created."""
+
+    # Replaces the validator of the same name in DetectorParams
+    @root_validator(pre=True)
+    def create_beamxy_and_runnumber(cls, values: dict[str, Any]) -> dict[str, Any]:
+        values["beam_xy_converter"] = BEAM_XY_LOOKUP_TABLES.get(
+            values["det_dist_to_beam_converter_path"]
+        )
+        if values.get("run_number") is None:
+            values["run_number"] = get_run_number(values["directory"], values["prefix"])
+        return values
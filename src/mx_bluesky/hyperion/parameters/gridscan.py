@@ -1,18 +1,13 @@
 from __future__ import annotations
 
-import os
+import dataclasses
 
 from dodal.devices.aperturescatterguard import AperturePositionGDANames
-from dodal.devices.detector import (
-    DetectorDistanceToBeamXYConverter,
-    DetectorParams,
-)
 from dodal.devices.fast_grid_scan import (
     PandAGridScanParams,
     ZebraGridScanParams,
 )
 from pydantic import Field, PrivateAttr
-from scanspec.core import Path as ScanPath
 from scanspec.specs import Line, Static
 
 from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_dataclass import (
@@ -28,6 +23,13 @@ from mx_bluesky.hyperion.parameters.components import (
     XyzStarts,
 )
 from mx_bluesky.hyperion.parameters.constants import CONST, I03Constants
+from mx_bluesky.hyperion.parameters.detector import HyperionDetectorParams
+from mx_bluesky.hyperion.parameters.scan_geometry import (
+    GridScanGeometry,
+    ScanDescriptor,
+)
+
+_GEOMETRY_FIELDS = [field.name for field in dataclasses.fields(GridScanGeometry)]
 
 
 class GridCommon(
@@ -70,8 +72,8 @@ class GridCommon(
         assert (
             self.detector_distance_mm is not None
         ), "Detector distance must be filled before generating DetectorParams"
-        os.makedirs(self.storage_directory, exist_ok=True)
-        return DetectorParams(
+        self.create_storage_directory()
+        return HyperionDetectorParams(
             detector_size_constants=I03Constants.DETECTOR,
             expected_energy_ev=self.demand_energy_ev,
             exposure_time=self.exposure_time_s,
@@ -85,9 +87,6 @@ class GridCommon(
             use_roi_mode=self.use_roi_mode,
             det_dist_to_beam_converter_path=self.det_dist_to_beam_converter_path,
             trigger_mode=self.trigger_mode,
-            beam_xy_converter=DetectorDistanceToBeamXYConverter(
-                self.det_dist_to_beam_converter_path
-            ),
             enable_dev_shm=self.use_gpu,
             **optional_args,
         )
@@ -133,6 +132,7 @@ class ThreeDGridScan(SpecifiedGridScan, SplitScan):
     y_steps: int = Field(gt=0)
     z_steps: int = Field(gt=0)
     _set_stub_offsets: bool = PrivateAttr(default_factory=lambda: False)
+    _geometry: GridScanGeometry | None = PrivateAttr(default=None)
 
     @property
     def FGS_params(self) -> ZebraGridScanParams:
@@ -197,13 +197,21 @@ class ThreeDGridScan(SpecifiedGridScan, SplitScan):
         grid_2_y = Static("sam_y", self.y2_start_um)
         return grid_2_z.zip(grid_2_y) * ~grid_2_x
 
+    @property
+    def geometry(self) -> GridScanGeometry:
+        """The points of the scan, which are kept between accesses and regenerated
+        only if one of the fields describing the grids has changed."""
+        geometry = GridScanGeometry(
+            **{field: getattr(self, field) for field in _GEOMETRY_FIELDS}
+        )
+        if geometry != self._geometry:
+            self._geometry = geometry
+        return self._geometry
+
     @property
     def scan_indices(self):
         """The first index of each gridscan, useful for writing nexus files/VDS"""
-        return [
-            0,
-            len(ScanPath(self.grid_1_spec.calculate()).consume().midpoints["sam_x"]),
-        ]
+        return self.geometry.scan_indices
 
     @property
     def scan_spec(self):
@@ -214,21 +222,29 @@ class ThreeDGridScan(SpecifiedGridScan, SplitScan):
     @property
     def scan_points(self):
         """A list of all the points in the scan_spec."""
-        return ScanPath(self.scan_spec.calculate()).consume().midpoints
+        return self.geometry.points
 
     @property
     def scan_points_first_grid(self):
         """A list of all the points in the first grid scan."""
-        return ScanPath(self.grid_1_spec.calculate()).consume().midpoints
+        return self.geometry.first_grid_points
 
     @property
     def scan_points_second_grid(self):
         """A list of all the points in the second grid scan."""
-        return ScanPath(self.grid_2_spec.calculate()).consume().midpoints
+        return self.geometry.second_grid_points
+
+    @property
+    def scan_descriptors(self) -> list[ScanDescriptor]:
+        """Compact descriptions of the points of each grid, for start documents"""
+        return [
+            self.geometry.first_grid_descriptor,
+            self.geometry.second_grid_descriptor,
+        ]
 
     @property
     def num_images(self) -> int:
-        return len(self.scan_points["sam_x"])
+        return self.geometry.num_images
 
 
 class OddYStepsException(Exception): ...
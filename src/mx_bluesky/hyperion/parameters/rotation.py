@@ -1,15 +1,10 @@
 from __future__ import annotations
 
-import os
 from collections.abc import Iterator
 from itertools import accumulate
 from typing import Annotated
 
 from annotated_types import Len
-from dodal.devices.detector import DetectorParams
-from dodal.devices.detector.det_dist_to_beam_converter import (
-    DetectorDistanceToBeamXYConverter,
-)
 from dodal.devices.zebra import (
     RotationDirection,
 )
@@ -32,6 +27,11 @@ from mx_bluesky.hyperion.parameters.components import (
     WithScan,
 )
 from mx_bluesky.hyperion.parameters.constants import CONST, I03Constants
+from mx_bluesky.hyperion.parameters.detector import HyperionDetectorParams
+from mx_bluesky.hyperion.parameters.scan_geometry import (
+    LineDescriptor,
+    ScanDescriptor,
+)
 
 
 class RotationScanPerSweep(OptionalGonioAngleStarts, OptionalXyzStarts):
@@ -49,6 +49,7 @@ class RotationExperiment(DiffractionExperimentWithSample):
     ispyb_experiment_type: IspybExperimentType = Field(
         default=IspybExperimentType.ROTATION
     )
+    fly_snapshots: bool = Field(default=False)
 
     def _detector_params(self, omega_start_deg: float):
         self.det_dist_to_beam_converter_path: str = (
@@ -59,8 +60,8 @@ class RotationExperiment(DiffractionExperimentWithSample):
         if self.run_number:
             optional_args["run_number"] = self.run_number
         assert self.detector_distance_mm is not None
-        os.makedirs(self.storage_directory, exist_ok=True)
-        return DetectorParams(
+        self.create_storage_directory()
+        return HyperionDetectorParams(
             detector_size_constants=I03Constants.DETECTOR,
             expected_energy_ev=self.demand_energy_ev,
             exposure_time=self.exposure_time_s,
@@ -73,9 +74,6 @@ class RotationExperiment(DiffractionExperimentWithSample):
             num_triggers=1,
             use_roi_mode=False,
             det_dist_to_beam_converter_path=self.det_dist_to_beam_converter_path,
-            beam_xy_converter=DetectorDistanceToBeamXYConverter(
-                self.det_dist_to_beam_converter_path
-            ),
             **optional_args,
         )
 
@@ -113,6 +111,17 @@ class RotationScan(WithScan, RotationScanPerSweep, RotationExperiment):
         scan_path = ScanPath(scan_spec.calculate())
         return scan_path.consume().midpoints
 
+    @property
+    def scan_descriptor(self) -> ScanDescriptor:
+        """A compact description of `scan_points`, for start documents"""
+        num = self.num_images
+        step = (
+            (self.scan_width_deg - self.rotation_increment_deg) / (num - 1)
+            if num > 1
+            else self.rotation_increment_deg
+        )
+        return ScanDescriptor(LineDescriptor("omega", self.omega_start_deg, step, num))
+
     @property
     def num_images(self) -> int:
         return int(self.scan_width_deg / self.rotation_increment_deg)
@@ -120,15 +129,17 @@ class RotationScan(WithScan, RotationScanPerSweep, RotationExperiment):
 
 class MultiRotationScan(RotationExperiment, SplitScan):
     rotation_scans: Annotated[list[RotationScanPerSweep], Len(min_length=1)]
-
-    def _single_rotation_scan(self, scan: RotationScanPerSweep) -> RotationScan:
-        # self has everything from RotationExperiment
-        params = self.dict()
-        del params["rotation_scans"]
-        # provided `scan` has everything from RotationScanPerSweep
-        params.update(scan.dict())
-        # together they have everything for RotationScan
-        return RotationScan(**params)
+    pipeline_sweeps: bool = Field(default=False)
+    allow_sweep_reordering: bool = Field(default=False)
+    allow_sweep_reversal: bool = Field(default=False)
+
+    def _single_rotation_scan(
+        self, experiment_params: dict, scan: RotationScanPerSweep
+    ) -> RotationScan:
+        # experiment_params has everything from RotationExperiment, provided `scan` has
+        # everything from RotationScanPerSweep, together they have everything for
+        # RotationScan
+        return RotationScan(**(experiment_params | scan.dict()))
 
     @root_validator(pre=False)  # type: ignore
     def validate_snapshot_directory(cls, values):
@@ -140,8 +151,11 @@ class MultiRotationScan(RotationExperiment, SplitScan):
 
     @property
     def single_rotation_scans(self) -> Iterator[RotationScan]:
+        experiment_params = self.dict(
+            exclude=set(MultiRotationScan.__fields__) - set(RotationScan.__fields__)
+        )
         for scan in self.rotation_scans:
-            yield self._single_rotation_scan(scan)
+            yield self._single_rotation_scan(experiment_params, scan)
 
     def _num_images_per_scan(self):
         return [
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import dataclasses
+from functools import cached_property
+from typing import Any
+
+import numpy as np
+from scanspec.core import AxesPoints
+
+from mx_bluesky.hyperion.utils.utils import number_of_frames_from_scan_spec
+
+
+def line_midpoints(start: float, step_size: float, num: int) -> np.ndarray:
+    """The midpoints of a scanspec `Line` from `start` with `num` points spaced by
+    `step_size`, calculated in the same way as scanspec so that the values match
+    exactly."""
+    stop = start + step_size * (num - 1)
+    step = (stop - start) / (num - 1) if num > 1 else stop - start
+    return np.linspace(0.5, num - 0.5, num) * step + (start - step / 2)
+
+
+def snake_grid(
+    slow_axis: str,
+    slow_points: np.ndarray,
+    static_axis: str,
+    static_value: float,
+    fast_axis: str,
+    fast_points: np.ndarray,
+) -> AxesPoints:
+    """The points of a grid which steps along the slow axis, sweeping the fast axis
+    forwards on even rows and backwards on odd rows, at a fixed value of the static
+    axis. Equivalent to `Line(slow).zip(Static(static)) * ~Line(fast)` in scanspec."""
+    rows, columns = len(slow_points), len(fast_points)
+    fast = np.tile(fast_points, (rows, 1))
+    fast[1::2] = fast[1::2, ::-1]
+    return {
+        slow_axis: np.repeat(slow_points, columns),
+        static_axis: np.full(rows * columns, static_value),
+        fast_axis: fast.ravel(),
+    }
+
+
+@dataclasses.dataclass(frozen=True)
+class LineDescriptor:
+    """`num` points along `axis`, from `start` spaced by `step`"""
+
+    axis: str
+    start: float
+    step: float
+    num: int
+
+    @property
+    def midpoints(self) -> np.ndarray:
+        return line_midpoints(self.start, self.step, self.num)
+
+
+@dataclasses.dataclass(frozen=True)
+class ScanDescriptor:
+    """A compact description of the points of a scan, which is put in start documents
+    in place of the points themselves. The `fast` line is swept at each point of the
+    `slow` line, if there is one, in reverse on every other row if `snake`, with the
+    `static` axes held at a fixed value.
+
+    The number of frames is known without generating the points, which `points`
+    generates the same as scanspec would if they are needed."""
+
+    fast: LineDescriptor
+    slow: LineDescriptor | None = None
+    static: dict[str, float] = dataclasses.field(default_factory=dict)
+    snake: bool = False
+
+    @property
+    def num_frames(self) -> int:
+        return self.fast.num * (self.slow.num if self.slow else 1)
+
+    def points(self) -> AxesPoints:
+        rows = self.slow.num if self.slow else 1
+        fast = np.tile(self.fast.midpoints, (rows, 1))
+        if self.snake:
+            fast[1::2] = fast[1::2, ::-1]
+        points: AxesPoints = {}
+        if self.slow:
+            points[self.slow.axis] = np.repeat(self.slow.midpoints, self.fast.num)
+        for axis, value in self.static.items():
+            points[axis] = np.full(self.num_frames, value)
+        points[self.fast.axis] = fast.ravel()
+        return points
+
+    def to_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, descriptor: dict[str, Any]) -> ScanDescriptor:
+        slow = descriptor.get("slow")
+        return cls(
+            fast=LineDescriptor(**descriptor["fast"]),
+            slow=LineDescriptor(**slow) if slow else None,
+            static=dict(descriptor.get("static") or {}),
+            snake=descriptor.get("snake", False),
+        )
+
+
+def frames_per_scan(start_doc: dict[str, Any]) -> list[int]:
+    """The number of frames of each scan in a start document, from its
+    `scan_descriptors` or, in documents recorded before those replaced them, by
+    counting its `scan_points`"""
+    if (descriptors := start_doc.get("scan_descriptors")) is not None:
+        return [ScanDescriptor.from_dict(d).num_frames for d in descriptors]
+    assert isinstance(scan_points := start_doc.get("scan_points"), list)
+    return [number_of_frames_from_scan_spec(points) for points in scan_points]
+
+
+def _read_only(points: AxesPoints) -> AxesPoints:
+    for axis_points in points.values():
+        axis_points.flags.writeable = False
+    return points
+
+
+@dataclasses.dataclass(frozen=True)
+class GridScanGeometry:
+    """The points visited by a 3D grid scan, made up of a snaked grid in X and Y
+    followed by one in X and Z. Point arrays are only generated when first needed and
+    are read-only as they are shared between everything that uses the parameters."""
+
+    x_start_um: float
+    y_start_um: float
+    z_start_um: float
+    y2_start_um: float
+    z2_start_um: float
+    x_step_size_um: float
+    y_step_size_um: float
+    z_step_size_um: float
+    x_steps: int
+    y_steps: int
+    z_steps: int
+
+    @property
+    def num_images_first_grid(self) -> int:
+        return self.x_steps * self.y_steps
+
+    @property
+    def num_images(self) -> int:
+        return self.x_steps * (self.y_steps + self.z_steps)
+
+    @property
+    def scan_indices(self) -> list[int]:
+        return [0, self.num_images_first_grid]
+
+    @property
+    def _x_line(self) -> LineDescriptor:
+        return LineDescriptor(
+            "sam_x", self.x_start_um, self.x_step_size_um, self.x_steps
+        )
+
+    @property
+    def first_grid_descriptor(self) -> ScanDescriptor:
+        return ScanDescriptor(
+            fast=self._x_line,
+            slow=LineDescriptor(
+                "sam_y", self.y_start_um, self.y_step_size_um, self.y_steps
+            ),
+            static={"sam_z": self.z_start_um},
+            snake=True,
+        )
+
+    @property
+    def second_grid_descriptor(self) -> ScanDescriptor:
+        return ScanDescriptor(
+            fast=self._x_line,
+            slow=LineDescriptor(
+                "sam_z", self.z2_start_um, self.z_step_size_um, self.z_steps
+            ),
+            static={"sam_y": self.y2_start_um},
+            snake=True,
+        )
+
+    @cached_property
+    def _x_points(self) -> np.ndarray:
+        return line_midpoints(self.x_start_um, self.x_step_size_um, self.x_steps)
+
+    @cached_property
+    def first_grid_points(self) -> AxesPoints:
+        y_points = line_midpoints(self.y_start_um, self.y_step_size_um, self.y_steps)
+        return _read_only(
+            snake_grid(
+                "sam_y", y_points, "sam_z", self.z_start_um, "sam_x", self._x_points
+            )
+        )
+
+    @cached_property
+    def second_grid_points(self) -> AxesPoints:
+        z_points = line_midpoints(self.z2_start_um, self.z_step_size_um, self.z_steps)
+        return _read_only(
+            snake_grid(
+                "sam_z", z_points, "sam_y", self.y2_start_um, "sam_x", self._x_points
+            )
+        )
+
+    @cached_property
+    def points(self) -> AxesPoints:
+        return _read_only(
+            {
+                axis: np.concatenate(
+                    [self.first_grid_points[axis], self.second_grid_points[axis]]
+                )
+                for axis in self.first_grid_points
+            }
+        )
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+STATUS_STREAM_KEEPALIVE_S = 15.0
+
+
+class StatusBroadcaster:
+    """Holds the most recent status of the runner as pre-serialised JSON, so that it can
+    be served to clients without locking or formatting anything on each request.
+
+    The snapshot is only rebuilt when the status changes. Every snapshot carries an
+    increasing version number, which clients can use to long-poll for, or stream, the
+    next change rather than repeatedly polling."""
+
+    def __init__(self) -> None:
+        self._changed = threading.Condition()
+        # Replaced as a whole on each change so that readers never need the lock
+        self._latest: tuple[int, bytes] = (0, b"{}")
+
+    @property
+    def latest(self) -> tuple[int, bytes]:
+        return self._latest
+
+    def publish(self, status: dict[str, Any]) -> None:
+        with self._changed:
+            version = self._latest[0] + 1
+            self._latest = (
+                version,
+                json.dumps({**status, "version": version}).encode(),
+            )
+            self._changed.notify_all()
+
+    def wait_for_change(
+        self, since_version: int, timeout_s: float
+    ) -> tuple[int, bytes]:
+        """Returns the first snapshot newer than `since_version`, or the current one if
+        nothing changes within the timeout."""
+        if self._latest[0] > since_version:
+            return self._latest
+        with self._changed:
+            self._changed.wait_for(lambda: self._latest[0] > since_version, timeout_s)
+            return self._latest
+
+    def stream(self, keepalive_s: float = STATUS_STREAM_KEEPALIVE_S) -> Iterator[bytes]:
+        """Yields the current status and then every subsequent change as server-sent
+        events, with a comment line as a keepalive if nothing changes for a while."""
+        version, snapshot = self._latest
+        yield b"data: " + snapshot + b"\n\n"
+        while True:
+            new_version, snapshot = self.wait_for_change(version, keepalive_s)
+            if new_version == version:
+                yield b": keepalive\n\n"
+            else:
+                version = new_version
+                yield b"data: " + snapshot + b"\n\n"
@@ -1,4 +1,7 @@
 import dataclasses
+import threading
+from collections.abc import Callable
+from time import perf_counter
 from typing import Any, ClassVar, Protocol, TypeVar, get_type_hints
 
 from blueapi.core import BlueskyContext
@@ -70,6 +73,88 @@ def device_composite_from_context(context: BlueskyContext, dc: type[DT]) -> DT:
     return dc(**devices)
 
 
+@dataclasses.dataclass
+class CompositeCacheLookup:
+    """The outcome of the most recent request for a device composite."""
+
+    plan_name: str
+    hit: bool
+    time_s: float
+
+
+class DeviceCompositeCache:
+    """Holds the device composites built by each plan's setup function, so that they
+    are only constructed from the context once rather than on every plan start.
+
+    A cached composite is discarded if the context it was built from is replaced, or if
+    any of the devices it holds is no longer the device registered in the context under
+    that name (e.g. because the device has been reconnected and re-registered).
+
+    Composites for different plans may be requested from several threads at once.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._context: BlueskyContext | None = None
+        self._composites: dict[str, Any] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.last_lookup: CompositeCacheLookup | None = None
+
+    def get(
+        self,
+        context: BlueskyContext,
+        plan_name: str,
+        setup: Callable[[BlueskyContext], DT],
+    ) -> DT:
+        start_time = perf_counter()
+        with self._lock:
+            if context is not self._context:
+                self._composites.clear()
+                self._context = context
+            composite = self._composites.get(plan_name)
+
+        hit = composite is not None and self._devices_still_in_context(
+            context, composite
+        )
+        if not hit:
+            composite = setup(context)
+
+        lookup = CompositeCacheLookup(
+            plan_name=plan_name,
+            hit=hit,
+            time_s=perf_counter() - start_time,
+        )
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if context is self._context:
+                    self._composites[plan_name] = composite
+            self.last_lookup = lookup
+        LOGGER.debug(f"Device composite cache lookup: {lookup}")
+        return composite  # type: ignore
+
+    def invalidate(self, plan_name: str | None = None) -> None:
+        """Discard the cached composite for the given plan, or all cached composites
+        if no plan is given."""
+        with self._lock:
+            if plan_name is None:
+                self._composites.clear()
+            else:
+                self._composites.pop(plan_name, None)
+
+    @staticmethod
+    def _devices_still_in_context(context: BlueskyContext, composite: Any) -> bool:
+        if not dataclasses.is_dataclass(composite):
+            return True
+        return all(
+            context.find_device(field.name) is getattr(composite, field.name)
+            for field in dataclasses.fields(composite)
+        )
+
+
 def setup_context(wait_for_connection: bool = True) -> BlueskyContext:
     context = BlueskyContext()
     context.with_plan_module(hyperion_plans)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any
+
+from blueapi.core import BlueskyContext
+from bluesky.run_engine import call_in_bluesky_event_loop
+from ophyd_async.core import Device as OphydAsyncDevice
+
+from mx_bluesky.hyperion.log import LOGGER
+from mx_bluesky.hyperion.parameters.constants import CONST
+from mx_bluesky.hyperion.utils.context import DeviceCompositeCache
+
+
+@dataclasses.dataclass
+class DeviceConnectionTiming:
+    name: str
+    time_s: float
+    connected: bool
+    error: str = ""
+
+
+@dataclasses.dataclass
+class PlanSetupTiming:
+    plan_name: str
+    time_s: float
+
+
+@dataclasses.dataclass
+class StartupReport:
+    """Timings for a concurrent startup. Devices are all connected before any plan's
+    composite is set up, so the critical path is the slowest device connection
+    followed by the slowest plan setup."""
+
+    device_connections: list[DeviceConnectionTiming] = dataclasses.field(
+        default_factory=list
+    )
+    plan_setups: list[PlanSetupTiming] = dataclasses.field(default_factory=list)
+    total_time_s: float = 0
+
+    @property
+    def failed_devices(self) -> list[str]:
+        return [c.name for c in self.device_connections if not c.connected]
+
+    @property
+    def critical_path(self) -> list[str]:
+        path = []
+        if self.device_connections:
+            path.append(max(self.device_connections, key=lambda c: c.time_s).name)
+        if self.plan_setups:
+            path.append(max(self.plan_setups, key=lambda p: p.time_s).plan_name)
+        return path
+
+    @property
+    def critical_path_time_s(self) -> float:
+        return max((c.time_s for c in self.device_connections), default=0) + max(
+            (p.time_s for p in self.plan_setups), default=0
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self) | {
+            "failed_devices": self.failed_devices,
+            "critical_path": self.critical_path,
+            "critical_path_time_s": self.critical_path_time_s,
+        }
+
+
+def _connect_device(device: Any, timeout_s: float):
+    if isinstance(device, OphydAsyncDevice):
+        call_in_bluesky_event_loop(device.connect(timeout=timeout_s))
+    else:
+        device.wait_for_connection(timeout=timeout_s)
+
+
+def _timed_connect(name: str, device: Any, timeout_s: float) -> DeviceConnectionTiming:
+    start_time = perf_counter()
+    try:
+        _connect_device(device, timeout_s)
+    except Exception as e:
+        LOGGER.error(f"Failed to connect {name} within {timeout_s}s: {e!r}")
+        return DeviceConnectionTiming(name, perf_counter() - start_time, False, repr(e))
+    return DeviceConnectionTiming(name, perf_counter() - start_time, True)
+
+
+def connect_devices_concurrently(
+    devices: Mapping[str, Any],
+    max_workers: int = CONST.STARTUP.MAX_CONCURRENT_CONNECTIONS,
+    timeout_s: float = CONST.STARTUP.DEVICE_CONNECTION_TIMEOUT_S,
+) -> list[DeviceConnectionTiming]:
+    """Connects all the given devices, at most `max_workers` at a time. A device that
+    fails to connect within `timeout_s` is recorded as failed rather than stopping the
+    other connections."""
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="connect") as executor:
+        return list(
+            executor.map(lambda item: _timed_connect(*item, timeout_s), devices.items())
+        )
+
+
+def setup_composites_concurrently(
+    context: BlueskyContext,
+    cache: DeviceCompositeCache,
+    setups: Mapping[str, Callable[[BlueskyContext], Any]],
+    max_workers: int = CONST.STARTUP.MAX_CONCURRENT_PLAN_SETUPS,
+) -> list[PlanSetupTiming]:
+    """Builds the composite for each plan into the cache in parallel."""
+
+    def _timed_setup(plan_name: str) -> PlanSetupTiming:
+        start_time = perf_counter()
+        cache.get(context, plan_name, setups[plan_name])
+        return PlanSetupTiming(plan_name, perf_counter() - start_time)
+
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="setup") as executor:
+        return list(executor.map(_timed_setup, setups))
+
+
+def run_concurrent_startup(
+    context: BlueskyContext,
+    cache: DeviceCompositeCache,
+    setups: Mapping[str, Callable[[BlueskyContext], Any]],
+) -> StartupReport:
+    """Connects every device in the context and then sets up every plan's composite,
+    both in parallel, and logs a structured report of how long each step took."""
+    start_time = perf_counter()
+    report = StartupReport()
+    report.device_connections = connect_devices_concurrently(context.devices)
+    report.plan_setups = setup_composites_concurrently(context, cache, setups)
+    report.total_time_s = perf_counter() - start_time
+    LOGGER.info(f"Startup report: {json.dumps(report.as_dict())}")
+    if report.failed_devices:
+        LOGGER.warning(f"Devices failed to connect: {report.failed_devices}")
+    return report
@@ -80,6 +80,7 @@ from mx_bluesky.hyperion.parameters.gridscan import (
     ThreeDGridScan,
 )
 from mx_bluesky.hyperion.parameters.rotation import MultiRotationScan, RotationScan
+from mx_bluesky.hyperion.parameters.scan_geometry import LineDescriptor, ScanDescriptor
 
 i03.DAQ_CONFIGURATION_PATH = "tests/test_data/test_daq_configuration"
 
@@ -105,6 +106,18 @@ def create_dummy_scan_spec(x_steps, y_steps, z_steps):
     return [spec.consume().midpoints for spec in specs]
 
 
+def create_dummy_scan_descriptors(x_steps, y_steps, z_steps):
+    x_line = LineDescriptor("sam_x", 0, 1, x_steps)
+    return [
+        ScanDescriptor(
+            x_line, LineDescriptor("sam_y", 10, 0.5, y_steps), {"sam_z": 30}, True
+        ),
+        ScanDescriptor(
+            x_line, LineDescriptor("sam_z", 30, 0.7, z_steps), {"sam_y": 10}, True
+        ),
+    ]
+
+
 def _reset_loggers(loggers):
     """Clear all handlers and tear down the logging hierarchy, leave logger references intact."""
     clear_log_handlers(loggers)
@@ -236,7 +236,7 @@ def test_full_plan_tidies_at_end_when_plan_fails(
 
 
 @patch(
-    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger"
+    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger"
 )
 @pytest.mark.s03
 def test_GIVEN_scan_invalid_WHEN_plan_run_THEN_ispyb_entry_made_but_no_zocalo_entry(
@@ -16,7 +16,7 @@ from mx_bluesky.hyperion.external_interaction.callbacks.xray_centre.ispyb_callba
 )
 from mx_bluesky.hyperion.parameters.constants import CONST
 from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
-from tests.conftest import create_dummy_scan_spec
+from tests.conftest import create_dummy_scan_descriptors
 
 """
 If fake-zocalo system tests are failing, check that the RMQ instance is set up right:
@@ -47,7 +47,9 @@ async def zocalo_device():
     md={
         "subplan_name": CONST.PLAN.DO_FGS,
         "zocalo_environment": "dev_artemis",
-        "scan_points": create_dummy_scan_spec(10, 20, 30),
+        "scan_descriptors": [
+            d.to_dict() for d in create_dummy_scan_descriptors(10, 20, 30)
+        ],
     }
 )
 def fake_fgs_plan():
@@ -4,6 +4,12 @@ from unittest.mock import patch
 import pytest
 from event_model import Event, EventDescriptor
 
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    ISPYB_CONNECTION_POOLS,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.lookup_cache import (
+    ISPYB_LOOKUP_CACHE,
+)
 from mx_bluesky.hyperion.parameters.constants import CONST
 
 BANNED_PATHS = [Path("/dls"), Path("/dls_sw")]
@@ -26,6 +32,30 @@ def patch_open_to_prevent_dls_reads_in_tests():
         yield []
 
 
+@pytest.fixture(autouse=True)
+def clear_ispyb_connection_pools():
+    """Tests patch ispyb.open, so connections mustn't be kept between tests"""
+    ISPYB_CONNECTION_POOLS.clear()
+    yield
+    ISPYB_CONNECTION_POOLS.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_ispyb_lookup_cache():
+    """Tests use different mock databases, so lookups mustn't be kept between tests"""
+    ISPYB_LOOKUP_CACHE.clear()
+    yield
+    ISPYB_LOOKUP_CACHE.clear()
+
+
+@pytest.fixture(autouse=True)
+def expeye_spool_path(tmp_path, monkeypatch):
+    """Keeps robot actions that couldn't be sent to ExpEye out of the dev log directory"""
+    spool_path = tmp_path / "expeye_spool.jsonl"
+    monkeypatch.setenv("EXPEYE_SPOOL_PATH", str(spool_path))
+    return spool_path
+
+
 class OavGridSnapshotTestEvents:
     test_descriptor_document_oav_snapshot: EventDescriptor = {
         "uid": "b5ba4aec-de49-4970-81a4-b4a847391d34",
@@ -142,7 +142,7 @@ def modified_store_grid_scan_mock(*args, dcids=(0, 0), dcgid=0, **kwargs):
 def mock_subscriptions(test_fgs_params):
     with (
         patch(
-            "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+            "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
             modified_interactor_mock,
         ),
         patch(
@@ -67,7 +67,7 @@ from mx_bluesky.hyperion.parameters.constants import CONST
 from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
 from tests.conftest import (
     RunEngineSimulator,
-    create_dummy_scan_spec,
+    create_dummy_scan_descriptors,
 )
 
 from ....system_tests.hyperion.external_interaction.conftest import (
@@ -435,7 +435,7 @@ class TestFlyscanXrayCentrePlan:
         autospec=True,
     )
     @patch(
-        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
         modified_interactor_mock,
     )
     def test_individual_plans_triggered_once_and_only_once_in_composite_run(
@@ -588,10 +588,7 @@ class TestFlyscanXrayCentrePlan:
                     fgs,
                     fake_fgs_composite.eiger,
                     fake_fgs_composite.synchrotron,
-                    [
-                        test_fgs_params.scan_points_first_grid,
-                        test_fgs_params.scan_points_second_grid,
-                    ],
+                    test_fgs_params.scan_descriptors,
                     test_fgs_params.scan_indices,
                 )
             )
@@ -603,10 +600,7 @@ class TestFlyscanXrayCentrePlan:
                 fgs,
                 fake_fgs_composite.eiger,
                 fake_fgs_composite.synchrotron,
-                [
-                    test_fgs_params.scan_points_first_grid,
-                    test_fgs_params.scan_points_second_grid,
-                ],
+                test_fgs_params.scan_descriptors,
                 test_fgs_params.scan_indices,
             )
         )
@@ -903,7 +897,7 @@ class TestFlyscanXrayCentrePlan:
                 autospec=True,
             ),
             patch(
-                "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+                "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
                 lambda _: modified_interactor_mock(mock_parent.run_end),
             ),
         ):
@@ -1069,7 +1063,7 @@ class TestFlyscanXrayCentrePlan:
         autospec=True,
     )
     @patch(
-        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
         autospec=True,
     )
     def test_kickoff_and_complete_gridscan_triggers_zocalo(
@@ -1108,7 +1102,9 @@ class TestFlyscanXrayCentrePlan:
                 fake_fgs_composite.zebra_fast_grid_scan,
                 fake_fgs_composite.eiger,
                 fake_fgs_composite.synchrotron,
-                scan_points=create_dummy_scan_spec(x_steps, y_steps, z_steps),
+                scan_descriptors=create_dummy_scan_descriptors(
+                    x_steps, y_steps, z_steps
+                ),
                 scan_start_indices=[0, x_steps * y_steps],
             )
         )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import shutil
 from collections.abc import Callable, Sequence
@@ -15,10 +16,12 @@ from bluesky.run_engine import RunEngine
 from bluesky.simulators import RunEngineSimulator, assert_message_and_return_remaining
 from dodal.devices.oav.oav_parameters import OAVParameters
 from dodal.devices.synchrotron import SynchrotronMode
-from ophyd_async.core import set_mock_value
+from dodal.devices.zebra import ArmDemand
+from ophyd_async.core import AsyncStatus, set_mock_value
 
 from mx_bluesky.hyperion.experiment_plans.rotation_scan_plan import (
     RotationScanComposite,
+    SweepTimer,
     calculate_motion_profile,
     multi_rotation_scan,
 )
@@ -82,8 +85,9 @@ async def test_multi_rotation_plan_runs_multiple_plans_in_one_arm(
 
     msgs_within_arming = list(
         takewhile(
-            lambda msg: msg.command != "unstage"
-            and (not msg.obj or msg.obj.name != "eiger"),
+            lambda msg: (
+                msg.command != "unstage" and (not msg.obj or msg.obj.name != "eiger")
+            ),
             msgs,
         )
     )
@@ -93,9 +97,11 @@ async def test_multi_rotation_plan_runs_multiple_plans_in_one_arm(
             try:
                 remaining = assert_message_and_return_remaining(
                     remaining,
-                    lambda msg: msg.command == "set"
-                    and msg.obj.name == name
-                    and msg.args == (value,),
+                    lambda msg: (
+                        msg.command == "set"
+                        and msg.obj.name == name
+                        and msg.args == (value,)
+                    ),
                 )
             except Exception as e:
                 raise Exception(f"Failed to find {name} being set to {value}") from e
@@ -126,12 +132,14 @@ async def test_multi_rotation_plan_runs_multiple_plans_in_one_arm(
         # the final rel_set of omega to trigger the scan
         assert_message_and_return_remaining(
             msgs_within_arming,
-            lambda msg: msg.command == "set"
-            and msg.obj.name == "smargon-omega"
-            and msg.args
-            == (
-                (scan.scan_width_deg + motion_values.shutter_opening_deg)
-                * motion_values.direction.multiplier,
+            lambda msg: (
+                msg.command == "set"
+                and msg.obj.name == "smargon-omega"
+                and msg.args
+                == (
+                    (scan.scan_width_deg + motion_values.shutter_opening_deg)
+                    * motion_values.direction.multiplier,
+                )
             ),
         )
 
@@ -299,7 +307,7 @@ def test_full_multi_rotation_plan_nexus_files_written_correctly(
         f"{tmpdir}/{meta_filename}",
     )
     for i, scan in enumerate(multi_params.single_rotation_scans):
-        with h5py.File(f"{tmpdir}/{prefix}_{i+1}.nxs", "r") as written_nexus_file:
+        with h5py.File(f"{tmpdir}/{prefix}_{i + 1}.nxs", "r") as written_nexus_file:
             # check links go to the right file:
             detector_specific = written_nexus_file[
                 "entry/instrument/detector/detectorSpecific"
@@ -446,3 +454,217 @@ def test_full_multi_rotation_plan_ispyb_interaction_end_to_end(
         fourth_upsert_data = upsert_calls[3].args[0]
         assert fourth_upsert_data[9]  # timestamp
         assert fourth_upsert_data[10] == "DataCollection Successful"
+
+
+def _track_omega_position(sim: RunEngineSimulator, omega_name: str):
+    position = {"value": 0.0}
+
+    def _set(msg):
+        position["value"] = msg.args[0]
+
+    sim.add_handler("set", _set, omega_name)
+    sim.add_handler(
+        "read",
+        lambda msg: {omega_name: {"value": position["value"]}},
+        omega_name,
+    )
+
+
+def test_pipelined_multi_rotation_prepares_next_sweep_while_omega_decelerates(
+    fake_create_rotation_devices: RotationScanComposite,
+    test_multi_rotation_params: MultiRotationScan,
+    sim_run_engine_for_rotation: RunEngineSimulator,
+    oav_parameters_for_rotation: OAVParameters,
+):
+    test_multi_rotation_params.pipeline_sweeps = True
+    _track_omega_position(sim_run_engine_for_rotation, "smargon-omega")
+    msgs = sim_run_engine_for_rotation.simulate_plan(
+        multi_rotation_scan(
+            fake_create_rotation_devices,
+            test_multi_rotation_params,
+            oav_parameters_for_rotation,
+        )
+    )
+
+    scans = list(test_multi_rotation_params.single_rotation_scans)
+    for next_scan in scans[1:]:
+        msgs = assert_message_and_return_remaining(
+            msgs,
+            lambda msg: msg.command == "set" and msg.obj.name == "zebra-pc-arm",
+        )
+        msgs = assert_message_and_return_remaining(
+            msgs,
+            lambda msg: (
+                msg.command == "set"
+                and msg.obj.name == "smargon-omega"
+                and msg.kwargs.get("group") == CONST.WAIT.ROTATION_SWEEP
+            ),
+        )
+        # The next sweep's position and zebra are set up before the rotation finishes
+        for name, value in [
+            ("smargon-x", next_scan.x_start_um / 1000),  # type: ignore
+            ("smargon-chi", next_scan.chi_start_deg),
+            ("zebra-pc-gate_start", next_scan.omega_start_deg),
+        ]:
+            msgs = assert_message_and_return_remaining(
+                msgs,
+                lambda msg, name=name, value=value: (
+                    msg.command == "set"
+                    and msg.obj.name == name
+                    and msg.args == (value,)
+                ),
+            )
+        msgs = assert_message_and_return_remaining(
+            msgs,
+            lambda msg: (
+                msg.command == "wait"
+                and msg.kwargs["group"] == CONST.WAIT.ROTATION_SWEEP
+            ),
+        )
+        # The zebra is only armed once omega has moved to the start of the next sweep
+        msgs = assert_message_and_return_remaining(
+            msgs,
+            lambda msg: (
+                msg.command == "set"
+                and msg.obj.name == "smargon-omega"
+                and msg.kwargs.get("group") == "move_to_rotation_start"
+            ),
+        )
+
+
+def test_pipelined_multi_rotation_disarms_zebra_before_setting_up_next_sweep(
+    fake_create_rotation_devices: RotationScanComposite,
+    test_multi_rotation_params: MultiRotationScan,
+    sim_run_engine_for_rotation: RunEngineSimulator,
+    oav_parameters_for_rotation: OAVParameters,
+):
+    test_multi_rotation_params.pipeline_sweeps = True
+    _track_omega_position(sim_run_engine_for_rotation, "smargon-omega")
+    msgs = sim_run_engine_for_rotation.simulate_plan(
+        multi_rotation_scan(
+            fake_create_rotation_devices,
+            test_multi_rotation_params,
+            oav_parameters_for_rotation,
+        )
+    )
+
+    def _is_zebra_setup(msg):
+        return msg.command == "set" and msg.obj.name in {
+            "zebra-pc-dir",
+            "zebra-pc-gate_start",
+            "zebra-pc-gate_width",
+        }
+
+    for _ in list(test_multi_rotation_params.single_rotation_scans)[1:]:
+        msgs = assert_message_and_return_remaining(
+            msgs,
+            lambda msg: (
+                msg.command == "set"
+                and msg.obj.name == "smargon-omega"
+                and msg.kwargs.get("group") == CONST.WAIT.ROTATION_SWEEP
+            ),
+        )
+        disarm = assert_message_and_return_remaining(
+            msgs,
+            lambda msg: (
+                msg.command == "set"
+                and msg.obj.name == "zebra-pc-arm"
+                and msg.args == (ArmDemand.DISARM,)
+            ),
+        )
+        assert not any(_is_zebra_setup(msg) for msg in msgs[: len(msgs) - len(disarm)])
+        # The disarm has finished before the zebra is set up for the next sweep
+        msgs = assert_message_and_return_remaining(
+            disarm,
+            lambda msg: (
+                msg.command == "wait"
+                and msg.kwargs["group"] == disarm[0].kwargs["group"]
+            ),
+        )
+        msgs = assert_message_and_return_remaining(msgs, _is_zebra_setup)
+        assert msgs[0].obj.name == "zebra-pc-dir"
+
+
+def test_pipelined_multi_rotation_docs_match_serial(
+    RE: RunEngine,
+    test_multi_rotation_params: MultiRotationScan,
+    fake_create_rotation_devices: RotationScanComposite,
+    oav_parameters_for_rotation: OAVParameters,
+):
+    def _doc_summary(params: MultiRotationScan):
+        callback_sim = DocumentCapturer()
+        _run_multi_rotation_plan(
+            RE,
+            params,
+            fake_create_rotation_devices,
+            [callback_sim],
+            oav_parameters_for_rotation,
+        )
+        return [
+            (name, doc.get("subplan_name"), sorted(doc.get("data", {})))
+            for name, doc in callback_sim.docs_received
+        ]
+
+    serial_docs = _doc_summary(test_multi_rotation_params)
+    test_multi_rotation_params.pipeline_sweeps = True
+    assert _doc_summary(test_multi_rotation_params) == serial_docs
+
+
+def _slow_motor(motor, before_s: float = 0, after_s: float = 0):
+    original_set = motor.set
+
+    @AsyncStatus.wrap
+    async def _set(value, *args, **kwargs):
+        await asyncio.sleep(before_s)
+        await original_set(value, *args, **kwargs)
+        await asyncio.sleep(after_s)
+
+    return patch.object(motor, "set", _set)
+
+
+def test_pipelined_multi_rotation_has_less_dead_time_than_serial(
+    RE: RunEngine,
+    test_multi_rotation_params: MultiRotationScan,
+    fake_create_rotation_devices: RotationScanComposite,
+    oav_parameters_for_rotation: OAVParameters,
+):
+    smargon = fake_create_rotation_devices.smargon
+    timers: list[SweepTimer] = []
+
+    def _sweep_timer():
+        timers.append(SweepTimer())
+        return timers[-1]
+
+    with (
+        # Omega reaches the end of the exposure straight away, then decelerates
+        _slow_motor(smargon.omega, after_s=0.4),
+        # Moving x, y and z to the start takes longer than moving omega to the start
+        _slow_motor(smargon.x, before_s=1.0),
+        _slow_motor(smargon.y, before_s=1.0),
+        _slow_motor(smargon.z, before_s=1.0),
+        patch(
+            "mx_bluesky.hyperion.experiment_plans.rotation_scan_plan.SweepTimer",
+            side_effect=_sweep_timer,
+        ),
+    ):
+        _run_multi_rotation_plan(
+            RE,
+            test_multi_rotation_params,
+            fake_create_rotation_devices,
+            [],
+            oav_parameters_for_rotation,
+        )
+        test_multi_rotation_params.pipeline_sweeps = True
+        _run_multi_rotation_plan(
+            RE,
+            test_multi_rotation_params,
+            fake_create_rotation_devices,
+            [],
+            oav_parameters_for_rotation,
+        )
+
+    serial, pipelined = (timer.dead_times_s for timer in timers)
+    number_of_sweeps = len(test_multi_rotation_params.rotation_scans)
+    assert len(serial) == len(pipelined) == number_of_sweeps
+    # Part of moving x, y and z to the next sweep's start is hidden by omega decelerating
+    assert sum(pipelined[1:]) < sum(serial[1:]) - 0.2 * (number_of_sweeps - 1)
@@ -1,25 +1,37 @@
+import asyncio
 import dataclasses
+import time
 from datetime import datetime
+from math import ceil
 from unittest.mock import patch
 
+import bluesky.plan_stubs as bps
+import bluesky.preprocessors as bpp
 import pytest
-from bluesky.simulators import assert_message_and_return_remaining
+from bluesky.run_engine import RunEngine
+from bluesky.simulators import RunEngineSimulator, assert_message_and_return_remaining
 from dodal.devices.aperturescatterguard import ApertureScatterguard
 from dodal.devices.backlight import Backlight
 from dodal.devices.oav.oav_detector import OAV
 from dodal.devices.oav.oav_parameters import OAVParameters
 from dodal.devices.oav.utils import ColorMode
 from dodal.devices.smargon import Smargon
+from ophyd_async.core import AsyncStatus, set_mock_value
 
 from mx_bluesky.hyperion.experiment_plans.oav_snapshot_plan import (
+    OAV_FLY_SNAPSHOT_POLL_INTERVAL_S,
+    OAV_SNAPSHOT_FLY_GROUP,
     OAV_SNAPSHOT_SETUP_SHOT,
+    FlySnapshotPath,
     OavSnapshotComposite,
+    oav_fly_snapshot_plan,
     oav_snapshot_plan,
+    plan_fly_snapshot_path,
 )
 from mx_bluesky.hyperion.parameters.components import WithSnapshot
 from mx_bluesky.hyperion.parameters.constants import DocDescriptorNames
 
-from ....conftest import raw_params_from_file
+from ....conftest import DocumentCapturer, raw_params_from_file
 
 
 @pytest.fixture
@@ -65,39 +77,49 @@ def test_oav_snapshot_plan_issues_rotations_and_generates_events(
 
     msgs = assert_message_and_return_remaining(
         msgs,
-        lambda msg: msg.command == "set"
-        and msg.obj.name == "oav_cam_color_mode"
-        and msg.args[0] == ColorMode.RGB1,
+        lambda msg: (
+            msg.command == "set"
+            and msg.obj.name == "oav_cam_color_mode"
+            and msg.args[0] == ColorMode.RGB1
+        ),
     )
     msgs = assert_message_and_return_remaining(
         msgs,
-        lambda msg: msg.command == "set"
-        and msg.obj.name == "oav_cam_acquire_period"
-        and msg.args[0] == 0.05,
+        lambda msg: (
+            msg.command == "set"
+            and msg.obj.name == "oav_cam_acquire_period"
+            and msg.args[0] == 0.05
+        ),
     )
     msgs = assert_message_and_return_remaining(
         msgs,
-        lambda msg: msg.command == "set"
-        and msg.obj.name == "oav_cam_acquire_time"
-        and msg.args[0] == 0.075,
+        lambda msg: (
+            msg.command == "set"
+            and msg.obj.name == "oav_cam_acquire_time"
+            and msg.args[0] == 0.075
+        ),
     )
     msgs = assert_message_and_return_remaining(
         msgs,
-        lambda msg: msg.command == "set"
-        and msg.obj.name == "oav_cam_gain"
-        and msg.args[0] == 1,
+        lambda msg: (
+            msg.command == "set" and msg.obj.name == "oav_cam_gain" and msg.args[0] == 1
+        ),
     )
     msgs = assert_message_and_return_remaining(
         msgs,
-        lambda msg: msg.command == "set"
-        and msg.obj.name == "oav_zoom_controller"
-        and msg.args[0] == "5.0x",
+        lambda msg: (
+            msg.command == "set"
+            and msg.obj.name == "oav_zoom_controller"
+            and msg.args[0] == "5.0x"
+        ),
     )
     msgs = assert_message_and_return_remaining(
         msgs,
-        lambda msg: msg.command == "set"
-        and msg.obj.name == "oav_snapshot_directory"
-        and msg.args[0] == "/tmp/my_snapshots",
+        lambda msg: (
+            msg.command == "set"
+            and msg.obj.name == "oav_snapshot_directory"
+            and msg.args[0] == "/tmp/my_snapshots"
+        ),
     )
     for expected in [
         {"omega": 0, "filename": "100623_oav_snapshot_0"},
@@ -107,22 +129,28 @@ def test_oav_snapshot_plan_issues_rotations_and_generates_events(
     ]:
         msgs = assert_message_and_return_remaining(
             msgs,
-            lambda msg: msg.command == "set"
-            and msg.obj.name == "smargon-omega"
-            and msg.args[0] == expected["omega"]
-            and msg.kwargs["group"] == OAV_SNAPSHOT_SETUP_SHOT,
+            lambda msg: (
+                msg.command == "set"
+                and msg.obj.name == "smargon-omega"
+                and msg.args[0] == expected["omega"]
+                and msg.kwargs["group"] == OAV_SNAPSHOT_SETUP_SHOT
+            ),
         )
         msgs = assert_message_and_return_remaining(
             msgs,
-            lambda msg: msg.command == "set"
-            and msg.obj.name == "oav_snapshot_filename"
-            and msg.args[0] == expected["filename"],
+            lambda msg: (
+                msg.command == "set"
+                and msg.obj.name == "oav_snapshot_filename"
+                and msg.args[0] == expected["filename"]
+            ),
         )
         msgs = assert_message_and_return_remaining(
             msgs,
-            lambda msg: msg.command == "trigger"
-            and msg.obj.name == "oav_snapshot"
-            and msg.kwargs["group"] is None,
+            lambda msg: (
+                msg.command == "trigger"
+                and msg.obj.name == "oav_snapshot"
+                and msg.kwargs["group"] is None
+            ),
         )
         msgs = assert_message_and_return_remaining(
             msgs,
@@ -130,13 +158,178 @@ def test_oav_snapshot_plan_issues_rotations_and_generates_events(
         )
         msgs = assert_message_and_return_remaining(
             msgs,
-            lambda msg: msg.command == "create"
-            and msg.kwargs["name"]
-            == DocDescriptorNames.OAV_ROTATION_SNAPSHOT_TRIGGERED,
+            lambda msg: (
+                msg.command == "create"
+                and msg.kwargs["name"]
+                == DocDescriptorNames.OAV_ROTATION_SNAPSHOT_TRIGGERED
+            ),
         )
         msgs = assert_message_and_return_remaining(
             msgs, lambda msg: msg.command == "read" and msg.obj.name == "oav_snapshot"
         )
+        assert msgs[1].command == "save"
+        msgs = msgs[1:]
+
+
+@pytest.mark.parametrize(
+    "current, end, expected",
+    [
+        # Already at the first angle, so carries on through the rest to the end
+        (0, 300, FlySnapshotPath(1, [0, 90, 180, 270], 300, False)),
+        # Passes through the angles on the way down to the end
+        (300, -10, FlySnapshotPath(-1, [270, 180, 90, 0], -10, False)),
+        # Has to go back to the start of the angles, then finishes at the last one
+        (100, 0, FlySnapshotPath(-1, [270, 180, 90, 0], 0, True)),
+        (100, 260, FlySnapshotPath(1, [0, 90, 180, 270], 270, True)),
+    ],
+)
+def test_fly_snapshot_path_moves_omega_the_least(
+    current: float, end: float, expected: FlySnapshotPath
+):
+    assert plan_fly_snapshot_path(current, [90, 0, 270, 180], end) == expected
+
+
+@patch("mx_bluesky.hyperion.experiment_plans.oav_snapshot_plan.datetime", spec=datetime)
+def test_oav_fly_snapshot_plan_triggers_as_omega_passes_each_angle(
+    mock_datetime, oav_snapshot_params, oav_snapshot_composite
+):
+    mock_datetime.now.return_value = datetime.fromisoformat("2024-06-07T10:06:23")
+    sim = RunEngineSimulator()
+    # Where omega is read to be before moving, when polled, and in each event
+    positions = iter([0, 0, 2, 45, 95, 96, 120, 181, 182, 275, 276])
+    sim.add_handler(
+        "read",
+        lambda msg: {"smargon-omega": {"value": next(positions)}},
+        "smargon-omega",
+    )
+    msgs = sim.simulate_plan(
+        oav_fly_snapshot_plan(
+            oav_snapshot_composite,
+            oav_snapshot_params,
+            OAVParameters(oav_config_json="tests/test_data/test_OAVCentring.json"),
+            300,
+            100,
+        )
+    )
+
+    omega_moves = [
+        msg for msg in msgs if msg.command == "set" and msg.obj.name == "smargon-omega"
+    ]
+    assert [(msg.args[0], msg.kwargs["group"]) for msg in omega_moves] == [
+        (300, OAV_SNAPSHOT_FLY_GROUP)
+    ]
+    msgs = assert_message_and_return_remaining(msgs, lambda msg: msg is omega_moves[0])
+    for expected_omega in [0, 90, 180, 270]:
         msgs = assert_message_and_return_remaining(
-            msgs, lambda msg: msg.command == "save"
+            msgs,
+            lambda msg: msg.command == "trigger" and msg.obj.name == "oav_snapshot",
+        )
+        # Omega is read once the snapshot has been taken
+        assert msgs[1].command == "wait"
+        assert (
+            msgs[2].command == "create"
+            and msgs[2].kwargs["name"]
+            == DocDescriptorNames.OAV_ROTATION_SNAPSHOT_TRIGGERED
+        )
+        assert msgs[3].command == "read" and msgs[3].obj.name == "smargon-omega"
+        if expected_omega != 270:
+            msgs = assert_message_and_return_remaining(
+                msgs,
+                lambda msg, omega=expected_omega + 90: (
+                    msg.command == "set"
+                    and msg.obj.name == "oav_snapshot_filename"
+                    and msg.args[0] == f"100623_oav_snapshot_{omega}"
+                ),
+            )
+    assert_message_and_return_remaining(
+        msgs,
+        lambda msg: (
+            msg.command == "wait" and msg.kwargs["group"] == OAV_SNAPSHOT_FLY_GROUP
+        ),
+    )
+
+
+OMEGA_VELOCITY_DEG_S = 720
+OMEGA_SETTLE_TIME_S = 0.2
+OMEGA_UPDATE_INTERVAL_S = 0.005
+
+
+def _moving_omega(smargon: Smargon, position: dict[str, float]):
+    """Patches omega to move at a fixed speed then settle, rather than jumping to the
+    position it's set to"""
+
+    @AsyncStatus.wrap
+    async def _set(value: float, *args, **kwargs):
+        start = position["value"]
+        steps = max(
+            1,
+            ceil(abs(value - start) / OMEGA_VELOCITY_DEG_S / OMEGA_UPDATE_INTERVAL_S),
+        )
+        for step in range(1, steps + 1):
+            await asyncio.sleep(OMEGA_UPDATE_INTERVAL_S)
+            position["value"] = start + (value - start) * step / steps
+            set_mock_value(smargon.omega.user_readback, position["value"])
+        await asyncio.sleep(OMEGA_SETTLE_TIME_S)
+
+    return patch.object(smargon.omega, "set", _set)
+
+
+def test_fly_snapshots_tagged_with_omega_and_quicker_than_stopping_at_each_angle(
+    RE: RunEngine, oav_snapshot_params, oav_snapshot_composite
+):
+    end_omega = 300
+    oav_parameters = OAVParameters(
+        oav_config_json="tests/test_data/test_OAVCentring.json"
+    )
+    position = {"value": 0.0}
+    omega_at_trigger: list[float] = []
+    oav_snapshot_composite.oav.snapshot.trigger.side_effect = lambda: (
+        omega_at_trigger.append(position["value"])
+        or oav_snapshot_composite.oav.snapshot.trigger.return_value
+    )
+
+    def _time_plan(snapshot_plan) -> tuple[float, list[dict]]:
+        position["value"] = 0.0
+        set_mock_value(oav_snapshot_composite.smargon.omega.user_readback, 0.0)
+        capturer = DocumentCapturer()
+        RE.subscribe(capturer)
+        start = time.monotonic()
+        RE(bpp.run_wrapper(snapshot_plan))
+        elapsed = time.monotonic() - start
+        events = [doc for name, doc in capturer.docs_received if name == "event"]
+        return elapsed, events
+
+    def _stop_at_each_angle():
+        yield from oav_snapshot_plan(
+            oav_snapshot_composite, oav_snapshot_params, oav_parameters
         )
+        yield from bps.abs_set(
+            oav_snapshot_composite.smargon.omega, end_omega, wait=True
+        )
+
+    with _moving_omega(oav_snapshot_composite.smargon, position):
+        stopping_time_s, _ = _time_plan(_stop_at_each_angle())
+        omega_at_trigger.clear()
+        fly_time_s, fly_events = _time_plan(
+            oav_fly_snapshot_plan(
+                oav_snapshot_composite,
+                oav_snapshot_params,
+                oav_parameters,
+                end_omega,
+                OMEGA_VELOCITY_DEG_S,
+            )
+        )
+
+    tagged_omegas = [event["data"]["smargon-omega"] for event in fly_events]
+    assert len(tagged_omegas) == 4
+    # Omega carries on moving between polling it and triggering the OAV
+    max_lag_deg = OMEGA_VELOCITY_DEG_S * (
+        OAV_FLY_SNAPSHOT_POLL_INTERVAL_S + 4 * OMEGA_UPDATE_INTERVAL_S
+    )
+    for requested, tagged, actual in zip(
+        [0, 90, 180, 270], tagged_omegas, omega_at_trigger, strict=True
+    ):
+        assert requested <= tagged <= requested + max_lag_deg
+        assert tagged == pytest.approx(actual, abs=4 * OMEGA_UPDATE_INTERVAL_S * 720)
+    # Stopping at each of the 4 angles settles 5 times rather than once
+    assert fly_time_s < stopping_time_s - 3 * OMEGA_SETTLE_TIME_S
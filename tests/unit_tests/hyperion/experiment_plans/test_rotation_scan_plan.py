@@ -16,8 +16,10 @@ from dodal.devices.zebra import Zebra
 from ophyd_async.core import get_mock_put
 
 from mx_bluesky.hyperion.experiment_plans.oav_snapshot_plan import (
+    OAV_SNAPSHOT_FLY_GROUP,
     OAV_SNAPSHOT_GROUP,
     OAV_SNAPSHOT_SETUP_GROUP,
+    OAV_SNAPSHOT_SETUP_SHOT,
 )
 from mx_bluesky.hyperion.experiment_plans.rotation_scan_plan import (
     RotationMotionProfile,
@@ -402,6 +404,52 @@ def test_rotation_scan_moves_gonio_to_start_before_snapshots(
     )
 
 
+def test_rotation_scan_takes_fly_snapshots_on_the_way_to_the_start(
+    fake_create_rotation_devices: RotationScanComposite,
+    sim_run_engine: RunEngineSimulator,
+    test_rotation_params: RotationScan,
+    oav_parameters_for_rotation: OAVParameters,
+):
+    _add_sim_handlers_for_normal_operation(fake_create_rotation_devices, sim_run_engine)
+    sim_run_engine.add_read_handler_for(
+        fake_create_rotation_devices.smargon.omega.max_velocity, 120
+    )
+    test_rotation_params.fly_snapshots = True
+    msgs = sim_run_engine.simulate_plan(
+        rotation_scan(
+            fake_create_rotation_devices,
+            test_rotation_params,
+            oav_parameters_for_rotation,
+        )
+    )
+    omega_moves = [
+        msg for msg in msgs if msg.command == "set" and msg.obj.name == "smargon-omega"
+    ]
+    assert not [
+        msg for msg in omega_moves if msg.kwargs.get("group") == OAV_SNAPSHOT_SETUP_SHOT
+    ]
+    msgs = assert_message_and_return_remaining(
+        msgs,
+        lambda msg: msg.command == "set"
+        and msg.obj.name == "smargon-omega"
+        and msg.kwargs.get("group") == OAV_SNAPSHOT_FLY_GROUP,
+    )
+    msgs = assert_message_and_return_remaining(
+        msgs, lambda msg: msg.command == "trigger" and msg.obj.name == "oav_snapshot"
+    )
+    msgs = assert_message_and_return_remaining(
+        msgs,
+        lambda msg: msg.command == "wait"
+        and msg.kwargs["group"] == OAV_SNAPSHOT_FLY_GROUP,
+    )
+    msgs = assert_message_and_return_remaining(
+        msgs,
+        lambda msg: msg.command == "set"
+        and msg.obj.name == "smargon-omega"
+        and msg.kwargs.get("group") == "move_to_rotation_start",
+    )
+
+
 def test_rotation_scan_moves_aperture_in_backlight_out_after_snapshots_before_rotation(
     fake_create_rotation_devices: RotationScanComposite,
     sim_run_engine: RunEngineSimulator,
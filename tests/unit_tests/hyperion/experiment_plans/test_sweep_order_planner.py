@@ -0,0 +1,238 @@
+import time
+from itertools import permutations, product
+from unittest.mock import patch
+
+import pytest
+from bluesky.simulators import RunEngineSimulator
+from dodal.devices.oav.oav_parameters import OAVParameters
+from dodal.devices.zebra import RotationDirection
+
+from mx_bluesky.hyperion.experiment_plans.rotation_scan_plan import (
+    MAX_EXACT_REORDER_SWEEPS,
+    RotationScanComposite,
+    SweepOrderPlan,
+    _transition_time_s,
+    multi_rotation_scan,
+    plan_sweep_order,
+)
+from mx_bluesky.hyperion.parameters.rotation import MultiRotationScan
+
+from ....conftest import raw_params_from_file
+
+TIME_TO_SPEED_S = 0.1
+OMEGA_VELOCITY = 100
+PHI_VELOCITY = 50
+CHI_VELOCITY = 10
+
+
+def _params(sweeps: list[dict], **flags) -> MultiRotationScan:
+    raw_params = raw_params_from_file(
+        "tests/test_data/parameter_json_files/good_test_multi_rotation_scan_parameters.json"
+    )
+    base_sweep = raw_params["rotation_scans"][0]
+    raw_params["rotation_scans"] = [base_sweep | sweep for sweep in sweeps]
+    return MultiRotationScan(**(raw_params | flags))
+
+
+def _plan(params: MultiRotationScan) -> SweepOrderPlan:
+    return plan_sweep_order(
+        params, TIME_TO_SPEED_S, OMEGA_VELOCITY, PHI_VELOCITY, CHI_VELOCITY
+    )
+
+
+def _total_time(plan: SweepOrderPlan, sweeps) -> float:
+    return sum(
+        _transition_time_s(a, b, plan.velocities_deg_s)
+        for a, b in zip(sweeps, sweeps[1:], strict=False)
+    )
+
+
+SAME_DIRECTION_SWEEPS = [
+    {"omega_start_deg": 0, "scan_width_deg": 180, "rotation_direction": "Positive"},
+    {"omega_start_deg": 0, "scan_width_deg": 180, "rotation_direction": "Positive"},
+    {"omega_start_deg": 0, "scan_width_deg": 180, "rotation_direction": "Positive"},
+]
+
+
+def test_sweeps_left_as_requested_without_flags():
+    plan = _plan(_params(SAME_DIRECTION_SWEEPS))
+    assert plan.sweeps == plan.requested_sweeps
+    assert plan.predicted_time_saving_s == 0
+
+
+def test_reversal_alternates_direction_of_repeated_sweeps():
+    params = _params(SAME_DIRECTION_SWEEPS, allow_sweep_reversal=True)
+    plan = _plan(params)
+
+    assert [s.requested_index for s in plan.sweeps] == [0, 1, 2]
+    assert [s.reversed for s in plan.sweeps] in (
+        [False, True, False],
+        [True, False, True],
+    )
+    assert plan.predicted_time_saving_s > 0
+
+    applied = plan.apply(params)
+    directions = [scan.rotation_direction for scan in applied.rotation_scans]
+    assert directions[0] != directions[1] != directions[2]
+    for scan in applied.single_rotation_scans:
+        start, end = sorted(
+            [
+                scan.omega_start_deg,
+                scan.omega_start_deg
+                + scan.rotation_direction.multiplier * scan.scan_width_deg,
+            ]
+        )
+        assert (start, end) == (0, 180)
+
+
+def _reversed(sweep: dict) -> dict:
+    direction = RotationDirection(sweep["rotation_direction"])
+    return sweep | {
+        "omega_start_deg": sweep["omega_start_deg"]
+        + direction.multiplier * sweep["scan_width_deg"],
+        "rotation_direction": (
+            RotationDirection.NEGATIVE
+            if direction == RotationDirection.POSITIVE
+            else RotationDirection.POSITIVE
+        ).value,
+    }
+
+
+UNORDERED_SWEEPS = [
+    {"omega_start_deg": 0, "chi_start_deg": 0, "scan_width_deg": 90},
+    {"omega_start_deg": 90, "chi_start_deg": 30, "scan_width_deg": 30},
+    {"omega_start_deg": 200, "chi_start_deg": 5, "scan_width_deg": 60},
+    {"omega_start_deg": -40, "chi_start_deg": 15, "scan_width_deg": 120},
+]
+
+
+@pytest.mark.parametrize("allow_sweep_reversal", [False, True])
+def test_reordering_matches_brute_force_search(allow_sweep_reversal: bool):
+    sweeps = [sweep | {"rotation_direction": "Negative"} for sweep in UNORDERED_SWEEPS]
+    plan = _plan(
+        _params(
+            sweeps,
+            allow_sweep_reordering=True,
+            allow_sweep_reversal=allow_sweep_reversal,
+        )
+    )
+
+    brute_force_times = []
+    for order in permutations(sweeps):
+        for reverse in product(
+            [False, True] if allow_sweep_reversal else [False], repeat=len(order)
+        ):
+            candidate = _plan(
+                _params(
+                    [
+                        _reversed(sweep) if r else sweep
+                        for sweep, r in zip(order, reverse, strict=True)
+                    ]
+                )
+            )
+            brute_force_times.append(_total_time(candidate, candidate.requested_sweeps))
+
+    assert sorted(s.requested_index for s in plan.sweeps) == [0, 1, 2, 3]
+    assert _total_time(plan, plan.sweeps) == pytest.approx(min(brute_force_times))
+    assert plan.predicted_time_saving_s > 0
+
+
+def test_many_sweeps_reordered_greedily_without_exact_search():
+    sweeps = [
+        {
+            "omega_start_deg": (97 * i) % 360,
+            "chi_start_deg": (13 * i) % 40,
+            "scan_width_deg": 20,
+            "rotation_direction": "Negative",
+        }
+        for i in range(MAX_EXACT_REORDER_SWEEPS * 3)
+    ]
+    params = _params(sweeps, allow_sweep_reordering=True, allow_sweep_reversal=True)
+
+    with patch(
+        "mx_bluesky.hyperion.experiment_plans.rotation_scan_plan._shortest_tour"
+    ) as shortest_tour:
+        start = time.monotonic()
+        plan = _plan(params)
+        assert time.monotonic() - start < 5
+
+    shortest_tour.assert_not_called()
+    assert sorted(s.requested_index for s in plan.sweeps) == list(range(len(sweeps)))
+    assert plan.predicted_time_saving_s > 0
+
+
+def test_requested_order_kept_when_greedy_order_is_slower():
+    sweeps = [
+        {"omega_start_deg": 0, "chi_start_deg": 2 * i, "scan_width_deg": 10}
+        for i in range(MAX_EXACT_REORDER_SWEEPS + 1)
+    ]
+    params = _params(sweeps, allow_sweep_reordering=True)
+    requested = _plan(params).requested_sweeps
+
+    with patch(
+        "mx_bluesky.hyperion.experiment_plans.rotation_scan_plan._greedy_tour",
+        return_value=requested[::2] + requested[1::2],
+    ):
+        plan = _plan(params)
+
+    assert plan.sweeps == requested
+    assert plan.predicted_time_saving_s == 0
+
+
+def test_applied_plan_recomputes_image_offsets_and_keeps_sweeps():
+    params = _params(UNORDERED_SWEEPS, allow_sweep_reordering=True)
+    plan = _plan(params)
+    applied = plan.apply(params)
+
+    assert [s.requested_index for s in plan.sweeps] != [0, 1, 2, 3]
+    assert applied.allow_sweep_reordering
+    # Only the image offsets of the sweeps change
+    assert [
+        scan.dict(exclude={"nexus_vds_start_img"}) for scan in applied.rotation_scans
+    ] == [
+        params.rotation_scans[s.requested_index].dict(exclude={"nexus_vds_start_img"})
+        for s in plan.sweeps
+    ]
+    offsets = [scan.nexus_vds_start_img for scan in applied.single_rotation_scans]
+    assert offsets == list(applied.scan_indices[:-1])
+    assert offsets[0] == 0
+
+
+def test_summary_reports_travel_and_saving():
+    summary = _plan(_params(SAME_DIRECTION_SWEEPS, allow_sweep_reversal=True)).summary()
+
+    assert summary["order"] == [0, 1, 2]
+    # Every sweep starts where the last one began, so omega unwinds 180 degrees twice
+    assert summary["requested_travel_deg"]["omega"] > 360
+    assert summary["planned_travel_deg"]["omega"] < 20
+    assert summary["predicted_time_saving_s"] == pytest.approx(
+        summary["requested_transition_time_s"] - summary["planned_transition_time_s"]
+    )
+
+
+def test_multi_rotation_scan_collects_sweeps_in_planned_order(
+    fake_create_rotation_devices: RotationScanComposite,
+    sim_run_engine_for_rotation: RunEngineSimulator,
+    oav_parameters_for_rotation: OAVParameters,
+):
+    params = _params(
+        SAME_DIRECTION_SWEEPS, allow_sweep_reversal=True, allow_sweep_reordering=True
+    )
+    sim_run_engine_for_rotation.add_read_handler_for(
+        fake_create_rotation_devices.smargon.omega.acceleration_time, TIME_TO_SPEED_S
+    )
+    sim_run_engine_for_rotation.add_read_handler_for(
+        fake_create_rotation_devices.smargon.omega.max_velocity, OMEGA_VELOCITY
+    )
+    msgs = sim_run_engine_for_rotation.simulate_plan(
+        multi_rotation_scan(
+            fake_create_rotation_devices, params, oav_parameters_for_rotation
+        )
+    )
+
+    gate_starts = [
+        msg.args[0]
+        for msg in msgs
+        if msg.command == "set" and msg.obj.name == "zebra-pc-gate_start"
+    ]
+    assert gate_starts in ([0, 180, 0], [180, 0, 180])
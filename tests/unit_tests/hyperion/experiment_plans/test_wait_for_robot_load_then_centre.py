@@ -1,6 +1,6 @@
 from functools import partial
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 from bluesky.run_engine import RunEngine
@@ -321,18 +321,19 @@ def test_given_ispyb_callback_attached_when_robot_load_then_centre_plan_called_t
     robot_load_composite.webcam.trigger = MagicMock(return_value=NullStatus())
 
     RE = RunEngine()
-    RE.subscribe(RobotLoadISPyBCallback())
+    RE.subscribe(callback := RobotLoadISPyBCallback())
 
     action_id = 1098
     start_load.return_value = action_id
 
     RE(robot_load_then_centre(robot_load_composite, robot_load_then_centre_params))
+    callback.expeye_queue.flush()
 
-    start_load.assert_called_once_with("cm31105", 4, 12345, 40, 3)
+    start_load.assert_called_once_with("cm31105", 4, 12345, 40, 3, timestamp=ANY)
     update_barcode_and_snapshots.assert_called_once_with(
         action_id, "BARCODE", "test_webcam_snapshot", "test_oav_snapshot"
     )
-    end_load.assert_called_once_with(action_id, "success", "OK")
+    end_load.assert_called_once_with(action_id, "success", "OK", timestamp=ANY)
 
 
 @patch("mx_bluesky.hyperion.experiment_plans.robot_load_then_centre_plan.datetime")
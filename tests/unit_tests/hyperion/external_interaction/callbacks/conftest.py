@@ -5,7 +5,7 @@ from event_model.documents import Event, EventDescriptor, RunStart, RunStop
 
 from mx_bluesky.hyperion.parameters.constants import CONST
 from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
-from tests.conftest import create_dummy_scan_spec
+from tests.conftest import create_dummy_scan_descriptors
 
 from .....conftest import default_raw_params, raw_params_from_file
 from ...conftest import OavGridSnapshotTestEvents
@@ -129,7 +129,9 @@ class TestData(OavGridSnapshotTestEvents):
         "plan_type": "generator",
         "plan_name": CONST.PLAN.GRIDSCAN_AND_MOVE,
         "subplan_name": CONST.PLAN.DO_FGS,
-        "scan_points": create_dummy_scan_spec(10, 20, 30),
+        "scan_descriptors": [
+            d.to_dict() for d in create_dummy_scan_descriptors(10, 20, 30)
+        ],
     }
     test_descriptor_document_oav_rotation_snapshot: EventDescriptor = {
         "uid": "c7d698ce-6d49-4c56-967e-7d081f964573",
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import bluesky.plan_stubs as bps
 import bluesky.preprocessors as bpp
@@ -35,6 +35,14 @@ metadata = {
 }
 
 
+@pytest.fixture(autouse=True)
+def prewarm_ispyb_lookups():
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.callbacks.robot_load.ispyb_callback.prewarm_ispyb_lookups"
+    ) as prewarm:
+        yield prewarm
+
+
 @patch(
     "mx_bluesky.hyperion.external_interaction.callbacks.robot_load.ispyb_callback.ExpeyeInteraction.end_load"
 )
@@ -46,17 +54,38 @@ def test_given_start_doc_with_expected_data_then_data_put_in_ispyb(
     end_load: MagicMock,
 ):
     RE = RunEngine()
-    RE.subscribe(RobotLoadISPyBCallback())
+    RE.subscribe(callback := RobotLoadISPyBCallback())
     start_load.return_value = ACTION_ID
 
+    @bpp.run_decorator(md=metadata)
+    def my_plan():
+        yield from bps.null()
+
+    RE(my_plan())
+    callback.expeye_queue.flush()
+
+    start_load.assert_called_once_with(
+        "cm31105", 4, SAMPLE_ID, SAMPLE_PUCK, SAMPLE_PIN, timestamp=ANY
+    )
+    end_load.assert_called_once_with(ACTION_ID, "success", "OK", timestamp=ANY)
+
+
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.robot_load.ispyb_callback.ExpeyeInteraction"
+)
+def test_given_start_doc_then_ispyb_lookups_for_visit_prewarmed(
+    expeye: MagicMock, prewarm_ispyb_lookups: MagicMock
+):
+    RE = RunEngine()
+    RE.subscribe(RobotLoadISPyBCallback())
+
     @bpp.run_decorator(md=metadata)
     def my_plan():
         yield from bps.null()
 
     RE(my_plan())
 
-    start_load.assert_called_once_with("cm31105", 4, SAMPLE_ID, SAMPLE_PUCK, SAMPLE_PIN)
-    end_load.assert_called_once_with(ACTION_ID, "success", "OK")
+    prewarm_ispyb_lookups.assert_called_once_with(CONST.SIM.ISPYB_CONFIG, "cm31105-4")
 
 
 @patch(
@@ -70,7 +99,7 @@ def test_given_failing_plan_then_exception_detail(
     end_load: MagicMock,
 ):
     RE = RunEngine()
-    RE.subscribe(RobotLoadISPyBCallback())
+    RE.subscribe(callback := RobotLoadISPyBCallback())
     start_load.return_value = ACTION_ID
 
     class _Exception(Exception): ...
@@ -82,9 +111,12 @@ def test_given_failing_plan_then_exception_detail(
 
     with pytest.raises(_Exception):
         RE(my_plan())
+    callback.expeye_queue.flush()
 
-    start_load.assert_called_once_with("cm31105", 4, SAMPLE_ID, SAMPLE_PUCK, SAMPLE_PIN)
-    end_load.assert_called_once_with(ACTION_ID, "fail", "BAD")
+    start_load.assert_called_once_with(
+        "cm31105", 4, SAMPLE_ID, SAMPLE_PUCK, SAMPLE_PIN, timestamp=ANY
+    )
+    end_load.assert_called_once_with(ACTION_ID, "fail", "BAD", timestamp=ANY)
 
 
 @patch(
@@ -116,7 +148,7 @@ def test_given_plan_reads_barcode_then_data_put_in_ispyb(
     webcam: Webcam,
 ):
     RE = RunEngine()
-    RE.subscribe(RobotLoadISPyBCallback())
+    RE.subscribe(callback := RobotLoadISPyBCallback())
     start_load.return_value = ACTION_ID
 
     oav.snapshot.last_saved_path.put("test_oav_snapshot")  # type: ignore
@@ -131,9 +163,12 @@ def test_given_plan_reads_barcode_then_data_put_in_ispyb(
         yield from bps.save()
 
     RE(my_plan())
+    callback.expeye_queue.flush()
 
-    start_load.assert_called_once_with("cm31105", 4, SAMPLE_ID, SAMPLE_PUCK, SAMPLE_PIN)
+    start_load.assert_called_once_with(
+        "cm31105", 4, SAMPLE_ID, SAMPLE_PUCK, SAMPLE_PIN, timestamp=ANY
+    )
     update_barcode_and_snapshots.assert_called_once_with(
         ACTION_ID, "BARCODE", "test_webcam_snapshot", "test_oav_snapshot"
     )
-    end_load.assert_called_once_with(ACTION_ID, "success", "OK")
+    end_load.assert_called_once_with(ACTION_ID, "success", "OK", timestamp=ANY)
@@ -1,3 +1,4 @@
+from copy import deepcopy
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -138,6 +139,7 @@ def test_hardware_read_events(
         TestData.test_descriptor_document_pre_data_collection
     )
     callback.activity_gated_event(TestData.test_event_document_pre_data_collection)
+    callback.flush_writes()
     mx.upsert_data_collection_group.assert_not_called()
     assert_upsert_call_with(
         mx.upsert_data_collection.mock_calls[0],
@@ -182,6 +184,7 @@ def test_flux_read_events(
         TestData.test_descriptor_document_pre_data_collection
     )
     callback.activity_gated_event(TestData.test_event_document_pre_data_collection)
+    callback.flush_writes()
     mx.upsert_data_collection_group.reset_mock()
     mx.upsert_data_collection.reset_mock()
     callback.activity_gated_descriptor(
@@ -190,6 +193,7 @@ def test_flux_read_events(
     callback.activity_gated_event(
         TestData.test_rotation_event_document_during_data_collection
     )
+    callback.flush_writes()
 
     mx.upsert_data_collection_group.assert_not_called()
     assert_upsert_call_with(
@@ -239,6 +243,7 @@ def test_oav_rotation_snapshot_triggered_event(
         callback.activity_gated_event(
             TestData.test_event_document_oav_rotation_snapshot
         )
+        callback.flush_writes()
         mx.upsert_data_collection_group.reset_mock()
         assert_upsert_call_with(
             mx.upsert_data_collection.mock_calls[0],
@@ -253,6 +258,50 @@ def test_oav_rotation_snapshot_triggered_event(
     mx.upsert_data_collection_group.assert_not_called()
 
 
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.common.ispyb_mapping.get_current_time_string",
+    new=MagicMock(return_value=EXPECTED_START_TIME),
+)
+def test_snapshot_omegas_added_to_comment(
+    mock_ispyb_conn, dummy_rotation_params, rotation_start_outer_doc_without_snapshots
+):
+    callback = RotationISPyBCallback()
+    callback.activity_gated_start(rotation_start_outer_doc_without_snapshots)  # pyright: ignore
+    callback.activity_gated_descriptor(
+        TestData.test_descriptor_document_oav_rotation_snapshot
+    )
+    for omega in [0.4, 90.72]:
+        event_doc = deepcopy(TestData.test_event_document_oav_rotation_snapshot)
+        event_doc["data"]["smargon-omega"] = omega  # type: ignore
+        callback.activity_gated_event(event_doc)
+    callback.activity_gated_start(
+        TestData.test_rotation_start_main_document  # pyright: ignore
+    )
+    callback.flush_writes()
+    mx = mx_acquisition_from_conn(mock_ispyb_conn)
+    mx.upsert_data_collection.reset_mock()
+
+    callback.activity_gated_descriptor(
+        TestData.test_descriptor_document_pre_data_collection
+    )
+    callback.activity_gated_event(TestData.test_event_document_pre_data_collection)
+    callback.flush_writes()
+    assert_upsert_call_with(
+        mx.upsert_data_collection.mock_calls[0],
+        mx.get_data_collection_params(),
+        {
+            "parentid": TEST_DATA_COLLECTION_GROUP_ID,
+            "id": TEST_DATA_COLLECTION_IDS[0],
+            "slitgaphorizontal": 0.1234,
+            "slitgapvertical": 0.2345,
+            "synchrotronmode": "User",
+            "undulatorgap1": 1.234,
+            "comments": "Sample position (µm): (158, 24, 3) test "
+            "Snapshots at omega (°): 0.4, 90.7 ",
+        },
+    )
+
+
 @patch(
     "mx_bluesky.hyperion.external_interaction.callbacks.common.ispyb_mapping.get_current_time_string",
     new=MagicMock(return_value=EXPECTED_START_TIME),
@@ -316,6 +365,7 @@ def test_comment_correct_after_hardware_read(
         TestData.test_descriptor_document_pre_data_collection
     )
     callback.activity_gated_event(TestData.test_event_document_pre_data_collection)
+    callback.flush_writes()
     assert_upsert_call_with(
         mx.upsert_data_collection.mock_calls[0],
         mx.get_data_collection_params(),
@@ -0,0 +1,130 @@
+import json
+import pickle
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from bluesky.run_engine import DocumentNames
+from event_model import pack_event_page
+
+from mx_bluesky.hyperion.external_interaction.callbacks.document_bus import (
+    MSGPACK_TAG,
+    MSGPACK_ZLIB_TAG,
+    SERIALISERS,
+    DocumentBusDispatcher,
+    EventBatchingPublisher,
+    deserialise_document,
+)
+
+from .....conftest import raw_params_from_file
+
+
+def _event(seq_num: int, descriptor: str = "descriptor-1") -> dict:
+    return {
+        "uid": f"event-{descriptor}-{seq_num}",
+        "descriptor": descriptor,
+        "seq_num": seq_num,
+        "time": 1.0 + seq_num,
+        "data": {"flux": 1e12 + seq_num},
+        "timestamps": {"flux": 1.0 + seq_num},
+        "filled": {},
+    }
+
+
+@pytest.fixture
+def start_doc() -> dict:
+    return {
+        "uid": "run-1",
+        "time": 1.0,
+        "hyperion_parameters": json.dumps(
+            raw_params_from_file(
+                "tests/test_data/parameter_json_files/good_test_parameters.json"
+            )
+        ),
+        "scan_points": [{"sam_x": np.linspace(0, 1, 40), "sam_y": np.zeros(40)}],
+    }
+
+
+@pytest.mark.parametrize("serialiser", SERIALISERS)
+def test_documents_read_back_the_same_however_serialised(start_doc, serialiser):
+    doc = deserialise_document(SERIALISERS[serialiser](start_doc))
+
+    assert doc["hyperion_parameters"] == start_doc["hyperion_parameters"]
+    np.testing.assert_array_equal(
+        doc["scan_points"][0]["sam_x"], start_doc["scan_points"][0]["sam_x"]
+    )
+
+
+def test_large_documents_compressed_and_small_not(start_doc):
+    serialise = SERIALISERS["msgpack-zlib"]
+
+    compressed = serialise(start_doc)
+
+    assert compressed[:1] == MSGPACK_ZLIB_TAG
+    assert len(compressed) < len(pickle.dumps(start_doc)) / 2
+    assert serialise(_event(1))[:1] == MSGPACK_TAG
+
+
+def test_document_msgpack_cannot_represent_sent_pickled():
+    doc = {"uid": "run-1", "axes": {"sam_x", "sam_y"}}
+
+    serialised = SERIALISERS["msgpack"](doc)
+
+    assert serialised == pickle.dumps(doc)
+    assert deserialise_document(serialised) == doc
+
+
+def test_events_batched_into_pages_sent_before_other_documents():
+    publish = MagicMock()
+    publisher = EventBatchingPublisher(publish, max_events=3, max_delay_s=10)
+
+    publisher("descriptor", {"uid": "descriptor-1"})
+    for seq_num in range(1, 6):
+        publisher("event", _event(seq_num))
+    publisher("stop", {"uid": "stop"})
+
+    names = [c.args[0] for c in publish.call_args_list]
+    assert names == ["descriptor", "event_page", "event_page", "stop"]
+    assert publish.call_args_list[1].args[1]["seq_num"] == [1, 2, 3]
+    assert publish.call_args_list[2].args[1]["seq_num"] == [4, 5]
+
+
+def test_events_of_different_descriptors_not_batched_together():
+    publish = MagicMock()
+    publisher = EventBatchingPublisher(publish, max_events=10, max_delay_s=10)
+
+    publisher("event", _event(1, "descriptor-1"))
+    publisher("event", _event(1, "descriptor-2"))
+    publisher.flush()
+
+    assert [c.args[1]["descriptor"] for c in publish.call_args_list] == [
+        "descriptor-1",
+        "descriptor-2",
+    ]
+
+
+def test_events_not_held_longer_than_max_delay():
+    publish = MagicMock()
+    publisher = EventBatchingPublisher(publish, max_events=10, max_delay_s=0.02)
+
+    publisher("event", _event(1))
+    publisher("event", _event(2))
+    time.sleep(0.1)
+
+    publish.assert_called_once()
+    assert publish.call_args.args[0] == "event_page"
+
+
+@patch("zmq.Context")
+def test_dispatcher_passes_events_of_pages_on_one_at_a_time(_):
+    callback = MagicMock()
+    dispatcher = DocumentBusDispatcher("localhost:5578")
+    dispatcher.subscribe(callback)
+
+    dispatcher.process(DocumentNames.event_page, pack_event_page(_event(1), _event(2)))
+    dispatcher.process(DocumentNames.stop, {"uid": "stop"})
+
+    assert [c.args[0] for c in callback.call_args_list] == ["event", "event", "stop"]
+    assert callback.call_args_list[1].args[1]["data"] == {"flux": 1e12 + 2}
+    assert callback.call_args_list[1].args[1]["time"] == 3.0
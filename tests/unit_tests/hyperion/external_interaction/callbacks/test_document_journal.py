@@ -0,0 +1,142 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import bluesky.plan_stubs as bps
+import bluesky.preprocessors as bpp
+import numpy as np
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.callbacks.document_journal import (
+    DocumentJournalRecorder,
+    read_journal,
+    redirect_storage_directory,
+    replay_journal,
+)
+
+from ..conftest import get_test_plan
+
+
+def _record(recorder: DocumentJournalRecorder, documents, interval_s: float = 0):
+    for name, doc in documents:
+        recorder(name, doc)
+        time.sleep(interval_s)
+    return recorder.journals[-1]
+
+
+def _run(uid: str, events: int = 2) -> list[tuple[str, dict]]:
+    return (
+        [("start", {"uid": uid, "activate_callbacks": ["GridscanISPyBCallback"]})]
+        + [("event", {"uid": f"{uid}-event-{i}"}) for i in range(events)]
+        + [("stop", {"uid": f"{uid}-stop", "run_start": uid})]
+    )
+
+
+def test_run_which_activates_callbacks_recorded_with_nested_runs(RE, tmp_path):
+    recorder = DocumentJournalRecorder(tmp_path)
+    RE.subscribe(recorder)
+    plan, _ = get_test_plan("GridscanISPyBCallback")
+
+    @bpp.run_decorator(md={"activate_callbacks": ["RotationISPyBCallback"]})
+    def outer_plan():
+        yield from bpp.set_run_key_wrapper(plan(), "inner")
+
+    RE(outer_plan())
+
+    assert len(recorder.journals) == 1
+    names = [name for _, name, _ in read_journal(recorder.journals[0])]
+    assert names == ["start", "start", "descriptor", "event", "stop", "stop"]
+
+
+def test_runs_which_do_not_activate_callbacks_not_recorded(RE, tmp_path):
+    recorder = DocumentJournalRecorder(tmp_path)
+    RE.subscribe(recorder)
+
+    RE(bpp.run_wrapper(bps.null()))
+
+    assert recorder.journals == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_each_run_recorded_to_its_own_journal(tmp_path):
+    recorder = DocumentJournalRecorder(tmp_path)
+
+    _record(recorder, _run("run-1") + _run("run-2"))
+
+    assert len(recorder.journals) == 2
+    assert [doc["uid"] for _, _, doc in read_journal(recorder.journals[1])] == [
+        doc["uid"] for _, doc in _run("run-2")
+    ]
+
+
+def test_numpy_values_read_back_as_numpy(tmp_path):
+    documents = _run("run-1", events=1)
+    documents[1][1]["data"] = {
+        "image": np.arange(6, dtype=np.uint16).reshape(2, 3),
+        "energy": np.float64(12.7),
+    }
+
+    journal = _record(DocumentJournalRecorder(tmp_path), documents)
+
+    data = read_journal(journal)[1][2]["data"]
+    assert data["image"].dtype == np.uint16
+    np.testing.assert_array_equal(data["image"], np.arange(6).reshape(2, 3))
+    assert data["energy"] == 12.7
+
+
+def test_journal_which_cannot_be_written_does_not_fail_plan(RE, tmp_path):
+    not_a_directory = tmp_path / "file"
+    not_a_directory.touch()
+    RE.subscribe(DocumentJournalRecorder(not_a_directory))
+
+    RE(get_test_plan("GridscanISPyBCallback")[0]())
+
+
+def test_replay_passes_documents_to_each_callback_in_order(tmp_path):
+    documents = _run("run-1")
+    journal = _record(DocumentJournalRecorder(tmp_path), documents)
+    callbacks = [MagicMock(), MagicMock()]
+
+    report = replay_journal(journal, callbacks)
+
+    for callback in callbacks:
+        assert [c.args for c in callback.call_args_list] == documents
+    assert report.documents == 4
+    assert report.latency["event"].count == 2
+    assert report.throughput_per_s > 0
+    assert json.dumps(report.to_dict())
+
+
+@pytest.mark.parametrize("speed, min_s, max_s", [(None, 0, 0.05), (1, 0.1, 0.2)])
+def test_replay_at_recorded_or_maximum_speed(tmp_path, speed, min_s, max_s):
+    journal = _record(DocumentJournalRecorder(tmp_path), _run("run-1"), 0.05)
+
+    report = replay_journal(journal, [MagicMock()], speed=speed)
+
+    assert min_s <= report.elapsed_s < max_s
+
+
+def test_latency_includes_time_waiting_behind_slow_callback(tmp_path):
+    journal = _record(DocumentJournalRecorder(tmp_path), _run("run-1", events=3))
+    slow = MagicMock(side_effect=lambda name, doc: time.sleep(0.02))
+
+    report = replay_journal(journal, [slow], speed=1)
+
+    assert report.latency["stop"].max_s >= 0.02
+    assert report.elapsed_s >= 0.1
+
+
+def test_files_written_by_replayed_run_redirected(tmp_path):
+    doc = {
+        "uid": "run-1",
+        "hyperion_parameters": json.dumps(
+            {"storage_directory": "/dls/i03/data", "snapshot_directory": "/dls/snaps"}
+        ),
+    }
+
+    redirected = redirect_storage_directory(doc, tmp_path)
+
+    params = json.loads(redirected["hyperion_parameters"])
+    assert params["storage_directory"] == str(tmp_path)
+    assert params["snapshot_directory"] == str(tmp_path / "snapshots")
+    assert "/dls/i03/data" in doc["hyperion_parameters"]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import signal
 from collections.abc import Callable
 from unittest.mock import MagicMock, patch
 
@@ -11,14 +13,20 @@ from mx_bluesky.hyperion.external_interaction.callbacks.__main__ import (
     main,
     setup_callbacks,
     setup_logging,
+    setup_profiler_dump,
     setup_threads,
+    stops_handled_after_nexus,
+)
+from mx_bluesky.hyperion.external_interaction.callbacks.threaded_dispatcher import (
+    ThreadedCallbackDispatcher,
 )
 from mx_bluesky.hyperion.log import ISPYB_LOGGER, NEXUS_LOGGER
+from mx_bluesky.hyperion.parameters.cli import CallbackArgs
 
 
 @patch(
-    "mx_bluesky.hyperion.external_interaction.callbacks.__main__.parse_callback_dev_mode_arg",
-    return_value=("DEBUG", True),
+    "mx_bluesky.hyperion.external_interaction.callbacks.__main__.parse_callback_cli_args",
+    return_value=CallbackArgs(dev_mode=True),
 )
 @patch("mx_bluesky.hyperion.external_interaction.callbacks.__main__.setup_callbacks")
 @patch("mx_bluesky.hyperion.external_interaction.callbacks.__main__.setup_logging")
@@ -27,7 +35,7 @@ def test_main_function(
     setup_threads: MagicMock,
     setup_logging: MagicMock,
     setup_callbacks: MagicMock,
-    parse_callback_dev_mode_arg: MagicMock,
+    parse_callback_cli_args: MagicMock,
 ):
     setup_threads.return_value = (MagicMock(), MagicMock(), MagicMock(), MagicMock())
 
@@ -44,20 +52,38 @@ def test_setup_callbacks():
     assert len(set(cbs)) == current_number_of_callbacks
 
 
+def test_ispyb_callbacks_handle_stops_after_nexus_callbacks():
+    stop_after = stops_handled_after_nexus(setup_callbacks())
+
+    assert {
+        type(callback).__name__: [type(first).__name__ for first in firsts]
+        for callback, firsts in stop_after.items()
+    } == {
+        "GridscanISPyBCallback": [
+            "GridscanNexusFileCallback",
+            "RotationNexusFileCallback",
+        ],
+        "RotationISPyBCallback": [
+            "GridscanNexusFileCallback",
+            "RotationNexusFileCallback",
+        ],
+    }
+
+
 @pytest.mark.skip_log_setup
 @patch(
-    "mx_bluesky.hyperion.external_interaction.callbacks.__main__.parse_callback_dev_mode_arg",
-    return_value=True,
+    "mx_bluesky.hyperion.external_interaction.callbacks.__main__.parse_callback_cli_args",
+    return_value=CallbackArgs(dev_mode=True),
 )
 def test_setup_logging(parse_callback_cli_args):
     assert DODAL_LOGGER.parent != ISPYB_LOGGER
     assert len(ISPYB_LOGGER.handlers) == 0
     assert len(NEXUS_LOGGER.handlers) == 0
-    setup_logging(parse_callback_cli_args())
+    setup_logging(parse_callback_cli_args().dev_mode)
     assert len(ISPYB_LOGGER.handlers) == 4
     assert len(NEXUS_LOGGER.handlers) == 4
     assert DODAL_LOGGER.parent == ISPYB_LOGGER
-    setup_logging(parse_callback_cli_args())
+    setup_logging(parse_callback_cli_args().dev_mode)
     assert len(ISPYB_LOGGER.handlers) == 4
     assert len(NEXUS_LOGGER.handlers) == 4
 
@@ -69,3 +95,39 @@ def test_setup_threads(_):
     assert isinstance(dispatcher, RemoteDispatcher)
     assert isinstance(start_proxy, Callable)
     assert isinstance(start_dispatcher, Callable)
+
+
+@pytest.mark.parametrize("threaded_dispatch", [False, True])
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.__main__.DocumentBusDispatcher"
+)
+@patch("zmq.Context")
+def test_setup_threads_subscribes_callbacks_directly_or_through_workers(
+    _, mock_dispatcher: MagicMock, threaded_dispatch: bool
+):
+    callbacks = [MagicMock(), MagicMock()]
+    _, dispatcher, _, start_dispatcher = setup_threads(threaded_dispatch)
+
+    start_dispatcher(callbacks)
+
+    subscribed = [c.args[0] for c in dispatcher.subscribe.call_args_list]
+    if threaded_dispatch:
+        assert len(subscribed) == 1
+        assert isinstance(subscribed[0], ThreadedCallbackDispatcher)
+        assert [w.callback for w in subscribed[0].workers] == callbacks
+        subscribed[0].stop()
+    else:
+        assert subscribed == callbacks
+    dispatcher.start.assert_called_once()
+
+
+@patch("mx_bluesky.hyperion.external_interaction.callbacks.__main__.HANDLER_PROFILER")
+def test_handler_profile_logged_on_sigusr1(profiler: MagicMock):
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        setup_profiler_dump()
+        os.kill(os.getpid(), signal.SIGUSR1)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+
+    profiler.log_dump.assert_called_once()
@@ -0,0 +1,149 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler import (
+    BUCKET_BOUNDS_S,
+    HandlerProfiler,
+    Histogram,
+)
+
+from ..conftest import MockReactiveCallback, get_test_plan
+
+
+@pytest.fixture
+def profiler():
+    profiler = HandlerProfiler()
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.callbacks.plan_reactive_callback.HANDLER_PROFILER",
+        profiler,
+    ):
+        yield profiler
+
+
+def test_histogram_counts_durations_into_buckets():
+    histogram = Histogram()
+    for duration_s in [0.00005, 0.002, 0.002, 0.002, 20]:
+        histogram.record(duration_s)
+
+    assert histogram.counts[0] == 1
+    assert histogram.counts[BUCKET_BOUNDS_S.index(0.003)] == 3
+    assert histogram.counts[-1] == 1
+    assert histogram.quantile_s(0.5) == 0.003
+    assert histogram.quantile_s(1) == 20
+    assert histogram.max_s == 20
+
+
+def test_handlers_of_each_document_type_timed_for_each_callback(
+    profiler: HandlerProfiler, RE_with_mock_callback
+):
+    RE, callback = RE_with_mock_callback
+    callback.activity_gated_event.side_effect = lambda doc: time.sleep(0.01) or doc
+
+    RE(get_test_plan("MockReactiveCallback")[0]())
+
+    dumped = profiler.dump()["MockReactiveCallback"]
+    assert set(dumped) == {"start", "descriptor", "event", "stop"}
+    assert dumped["event"]["handling"]["count"] == 1
+    assert dumped["event"]["handling"]["max_s"] >= 0.01
+    assert dumped["start"]["handling"]["max_s"] < 0.01
+    # The documents were created just before they were handled
+    assert 0 <= dumped["event"]["lag"]["max_s"] < 1
+
+
+def test_handlers_not_timed_when_callback_inactive(
+    profiler: HandlerProfiler, mocked_test_callback: MockReactiveCallback
+):
+    mocked_test_callback.event({"time": time.time()})  # type: ignore
+
+    assert profiler.dump() == {}
+
+
+def test_handlers_not_timed_when_profiling_disabled(
+    profiler: HandlerProfiler, RE_with_mock_callback
+):
+    profiler.enabled = False
+    RE, callback = RE_with_mock_callback
+
+    RE(get_test_plan("MockReactiveCallback")[0]())
+
+    assert profiler.dump() == {}
+    callback.activity_gated_event.assert_called_once()
+
+
+def test_what_callback_emits_to_timed_separately(profiler: HandlerProfiler, RE):
+    class ZocaloLikeCallback(MagicMock):
+        pass
+
+    downstream = ZocaloLikeCallback(side_effect=lambda name, doc: time.sleep(0.01))
+    callback = MockReactiveCallback(emit=downstream)
+    RE.subscribe(callback)
+
+    RE(get_test_plan("MockReactiveCallback")[0]())
+
+    dumped = profiler.dump()
+    assert dumped["ZocaloLikeCallback"]["event"]["handling"]["max_s"] >= 0.01
+    assert dumped["MockReactiveCallback"]["event"]["handling"]["max_s"] < 0.01
+
+
+def test_slow_handler_warned_about(profiler: HandlerProfiler, RE_with_mock_callback):
+    profiler.slow_handler_s = 0.005
+    RE, callback = RE_with_mock_callback
+    callback.activity_gated_event.side_effect = lambda doc: time.sleep(0.01) or doc
+
+    RE(get_test_plan("MockReactiveCallback")[0]())
+
+    callback.log.warning.assert_called_once()
+    assert "MockReactiveCallback" in callback.log.warning.call_args.args[0]
+    assert profiler.dump()["MockReactiveCallback"]["event"]["slow"] == 1
+
+
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler.NEXUS_LOGGER"
+)
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler.ISPYB_LOGGER"
+)
+def test_summary_logged_once_interval_has_passed(
+    ispyb_logger: MagicMock, nexus_logger: MagicMock
+):
+    profiler = HandlerProfiler(summary_interval_s=60)
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler.time.monotonic",
+        side_effect=[30, 61, 62],
+    ):
+        profiler._last_summary = 0
+        for _ in range(3):
+            profiler.record("GridscanNexusFileCallback", "event", 0.002, None, 0)
+
+    ispyb_logger.info.assert_called_once()
+    nexus_logger.info.assert_called_once()
+    summary = ispyb_logger.info.call_args.args[0]
+    assert "GridscanNexusFileCallback.event n=2 mean=2.0ms" in summary
+
+
+def test_dump_can_be_logged_as_json():
+    profiler = HandlerProfiler()
+    profiler.record("RotationISPyBCallback", "start", 0.05, 100.0, 100.2)
+    log = MagicMock()
+
+    profiler.log_dump(log)
+
+    dumped = json.loads(log.info.call_args.args[0].split(": ", 1)[1])
+    start = dumped["RotationISPyBCallback"]["start"]
+    assert start["handling"]["count"] == 1
+    assert start["lag"]["max_s"] == pytest.approx(0.2)
+
+
+def test_recording_overhead_is_low():
+    profiler = HandlerProfiler()
+    records = 10000
+
+    start = time.perf_counter()
+    for _ in range(records):
+        profiler.record("GridscanISPyBCallback", "event", 0.001, 1.0, 1.1)
+    per_record_s = (time.perf_counter() - start) / records
+
+    assert per_record_s < 50e-6
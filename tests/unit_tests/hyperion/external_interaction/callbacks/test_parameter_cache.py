@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from mx_bluesky.hyperion.external_interaction.callbacks.common.parameter_cache import (
+    ParsedParameterCache,
+)
+from mx_bluesky.hyperion.parameters.gridscan import GridCommon, ThreeDGridScan
+from mx_bluesky.hyperion.parameters.rotation import RotationScan
+
+from .....conftest import raw_params_from_file
+
+TEST_PARAMS = ThreeDGridScan(
+    **raw_params_from_file(
+        "tests/test_data/parameter_json_files/good_test_parameters.json"
+    )
+).json()
+
+
+def _start_doc(uid="run-1", params=TEST_PARAMS):
+    return {"uid": uid, "hyperion_parameters": params}
+
+
+def test_same_document_only_parsed_once():
+    cache = ParsedParameterCache()
+    with patch.object(
+        ThreeDGridScan, "from_json", wraps=ThreeDGridScan.from_json
+    ) as from_json:
+        first = cache.get(ThreeDGridScan, _start_doc())
+        second = cache.get(ThreeDGridScan, _start_doc())
+
+    from_json.assert_called_once()
+    assert first is second
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_different_run_type_or_content_parsed_separately():
+    cache = ParsedParameterCache()
+    params = cache.get(ThreeDGridScan, _start_doc())
+    changed_params = ThreeDGridScan.from_json(TEST_PARAMS)
+    changed_params.x_steps += 1
+
+    assert cache.get(ThreeDGridScan, _start_doc(uid="run-2")) is not params
+    changed_doc = _start_doc(params=changed_params.json())
+    assert cache.get(ThreeDGridScan, changed_doc) is not params
+    assert isinstance(
+        cache.get(GridCommon, _start_doc(), allow_extras=True), GridCommon
+    )
+    assert cache.misses == 4
+
+
+def test_oldest_entries_evicted_when_full():
+    cache = ParsedParameterCache(max_size=2)
+    first = cache.get(ThreeDGridScan, _start_doc(uid="1"))
+    cache.get(ThreeDGridScan, _start_doc(uid="2"))
+    cache.get(ThreeDGridScan, _start_doc(uid="3"))
+
+    assert cache.get(ThreeDGridScan, _start_doc(uid="1")) is not first
+
+
+def test_concurrent_callbacks_share_a_single_parse():
+    cache = ParsedParameterCache()
+    rotation_params = RotationScan(
+        **raw_params_from_file(
+            "tests/test_data/parameter_json_files/good_test_rotation_scan_parameters.json"
+        )
+    ).json()
+    with ThreadPoolExecutor(8) as executor:
+        results = list(
+            executor.map(
+                lambda _: cache.get(RotationScan, _start_doc(params=rotation_params)),
+                range(16),
+            )
+        )
+
+    assert all(result is results[0] for result in results)
+    assert cache.misses == 1
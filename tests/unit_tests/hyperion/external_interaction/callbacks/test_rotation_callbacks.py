@@ -111,7 +111,7 @@ def fake_rotation_scan(
             md={
                 "subplan_name": CONST.PLAN.ROTATION_MAIN,
                 "zocalo_environment": "dev_zocalo",
-                "scan_points": [params.scan_points],
+                "scan_descriptors": [params.scan_descriptor.to_dict()],
             }
         )
         def fake_main_plan():
@@ -172,11 +172,15 @@ def test_nexus_handler_only_writes_once(
 ):
     nexus_writer.return_value.data_filename = "test_full_filename"
     cb = RotationNexusFileCallback()
+    cb.nexus_writing = MagicMock()
     cb.active = True
     RE(fake_rotation_scan(params, [cb]))
     nexus_writer.assert_called_once()
     assert cb.writer is not None
-    cb.writer.create_nexus_file.assert_called_once()  # type: ignore
+    cb.nexus_writing.submit_skeletons.assert_called_once_with(cb.run_uid, cb.writer)
+    cb.nexus_writing.submit.assert_called_once()
+    cb.nexus_writing.wait_for_run.assert_called_with(cb.run_uid)
+    cb.nexus_writing.discard_skeletons.assert_called_once_with(cb.run_uid)
 
 
 def test_nexus_handler_triggers_write_file_when_told(
@@ -204,7 +208,7 @@ def test_nexus_handler_triggers_write_file_when_told(
     autospec=True,
 )
 @patch(
-    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
     autospec=True,
 )
 @patch(
@@ -235,7 +239,7 @@ def test_zocalo_start_and_end_not_triggered_if_ispyb_ids_not_present(
     autospec=True,
 )
 @patch(
-    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
     autospec=True,
 )
 @patch(
@@ -283,7 +287,7 @@ def test_ispyb_starts_on_opening_and_zocalo_on_main_so_ispyb_triggered_before_zo
 
 
 @patch(
-    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+    "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
     autospec=True,
 )
 def test_ispyb_handler_grabs_uid_from_main_plan_and_not_first_start_doc(
@@ -0,0 +1,207 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from bluesky.callbacks import CallbackBase
+
+from mx_bluesky.hyperion.external_interaction.callbacks.threaded_dispatcher import (
+    ThreadedCallbackDispatcher,
+)
+
+SLOW_CALLBACK_S = 0.05
+
+
+class RecordingCallback(CallbackBase):
+    """Records the documents it receives, taking `delay_s` over each one"""
+
+    def __init__(self, log: list, delay_s: float = 0.0, emit=None) -> None:
+        super().__init__(emit=emit)
+        self.emit_cb = emit
+        self.log = log
+        self.delay_s = delay_s
+
+    def __call__(self, name, doc, *args, **kwargs):
+        time.sleep(self.delay_s)
+        self.log.append((type(self).__name__, name, doc.get("uid")))
+        return getattr(self, name)(doc)
+
+
+class SlowNexusCallback(RecordingCallback):
+    def __init__(self, log: list) -> None:
+        super().__init__(log, SLOW_CALLBACK_S)
+
+
+class FastZocaloCallback(RecordingCallback):
+    def start(self, doc):
+        self.log.append(("dcids", doc.get("ispyb_dcids")))
+
+
+class TaggingIspybCallback(RecordingCallback):
+    def start(self, doc):
+        doc["ispyb_dcids"] = (12, 13)
+        self.emit("start", doc)
+
+
+def _run(uid: str, events: int = 3) -> list[tuple[str, dict]]:
+    return (
+        [("start", {"uid": uid, "time": 0})]
+        + [("event", {"uid": f"{uid}-event-{i}", "time": 0}) for i in range(events)]
+        + [("stop", {"uid": f"{uid}-stop", "run_start": uid, "time": 0})]
+    )
+
+
+@pytest.fixture
+def dispatch():
+    dispatchers = []
+
+    def _dispatch(callbacks, documents, **kwargs):
+        dispatcher = ThreadedCallbackDispatcher(callbacks, **kwargs)
+        dispatchers.append(dispatcher)
+        dispatcher.start()
+        for name, doc in documents:
+            dispatcher(name, doc)
+        return dispatcher
+
+    yield _dispatch
+    for dispatcher in dispatchers:
+        dispatcher.stop()
+
+
+def test_slow_callback_does_not_hold_up_others(dispatch):
+    log = []
+    fast_done = threading.Event()
+    fast = MagicMock(side_effect=lambda name, doc: name == "stop" and fast_done.set())
+
+    start = time.monotonic()
+    dispatcher = dispatch([SlowNexusCallback(log), fast], _run("run-1"))
+
+    assert fast_done.wait(SLOW_CALLBACK_S)
+    assert time.monotonic() - start < SLOW_CALLBACK_S
+    dispatcher.wait_until_idle()
+    assert len(log) == 5
+    stats = dispatcher.stats
+    assert stats["SlowNexusCallback"].max_lag_s >= 5 * SLOW_CALLBACK_S
+    assert stats["MagicMock"].max_lag_s < SLOW_CALLBACK_S
+    assert stats["SlowNexusCallback"].handled == 5
+
+
+def test_each_callback_gets_documents_in_order(dispatch):
+    log = []
+    documents = _run("run-1", events=8)
+
+    dispatcher = dispatch(
+        [SlowNexusCallback(log), RecordingCallback(log, delay_s=0.001)],
+        documents,
+    )
+    dispatcher.wait_until_idle()
+
+    for callback in ("SlowNexusCallback", "RecordingCallback"):
+        assert [uid for name, _, uid in log if name == callback] == [
+            doc["uid"] for _, doc in documents
+        ]
+
+
+def test_new_run_not_started_until_every_callback_finished_last_run(dispatch):
+    log = []
+
+    dispatcher = dispatch(
+        [SlowNexusCallback(log), RecordingCallback(log)],
+        _run("run-1") + _run("run-2"),
+    )
+    dispatcher.wait_until_idle()
+
+    first_start_of_run_2 = log.index(("RecordingCallback", "start", "run-2"))
+    assert ("SlowNexusCallback", "stop", "run-1-stop") in log[:first_start_of_run_2]
+
+
+def test_nested_run_is_not_a_barrier(dispatch):
+    log = []
+    documents = _run("outer")
+    documents[2:2] = _run("inner")
+
+    fast_done = threading.Event()
+    fast = MagicMock(
+        side_effect=lambda name, doc: (
+            doc.get("run_start") == "outer" and fast_done.set()
+        )
+    )
+
+    dispatcher = dispatch([SlowNexusCallback(log), fast], documents)
+
+    assert fast_done.wait(SLOW_CALLBACK_S)
+    assert ("SlowNexusCallback", "start", "inner") not in log
+    dispatcher.wait_until_idle()
+
+
+def test_stop_passed_on_only_once_callbacks_it_waits_for_have_handled_it(dispatch):
+    log = []
+    nexus = SlowNexusCallback(log)
+    ispyb = RecordingCallback(log)
+
+    dispatcher = dispatch([ispyb, nexus], _run("run-1"), stop_after={ispyb: [nexus]})
+    dispatcher.wait_until_idle()
+
+    assert log.index(("SlowNexusCallback", "stop", "run-1-stop")) < log.index(
+        ("RecordingCallback", "stop", "run-1-stop")
+    )
+    # Only the stop document waits
+    assert log.index(("RecordingCallback", "event", "run-1-event-2")) < log.index(
+        ("SlowNexusCallback", "event", "run-1-event-0")
+    )
+
+
+def test_stop_passed_on_when_callback_it_waits_for_has_failed(dispatch):
+    following = MagicMock()
+    failing = MagicMock(side_effect=ValueError)
+
+    dispatcher = dispatch(
+        [following, failing], _run("run-1"), stop_after={following: [failing]}
+    )
+    dispatcher.wait_until_idle()
+
+    assert following.call_args_list[-1].args[0] == "stop"
+
+
+def test_dcids_tagged_onto_documents_before_zocalo_without_affecting_others(
+    dispatch,
+):
+    log = []
+    untagged = []
+    zocalo = FastZocaloCallback(log)
+
+    dispatcher = dispatch(
+        [
+            TaggingIspybCallback(log, emit=zocalo),
+            MagicMock(side_effect=lambda name, doc: untagged.append(dict(doc))),
+        ],
+        _run("run-1"),
+    )
+    dispatcher.wait_until_idle()
+
+    assert ("dcids", (12, 13)) in log
+    assert all("ispyb_dcids" not in doc for doc in untagged)
+
+
+def test_callback_error_only_drops_rest_of_that_callbacks_run(dispatch):
+    failing_calls = []
+    following_calls = []
+
+    def _fail_once(name, doc):
+        failing_calls.append(doc["uid"])
+        if doc["uid"] == "r1-event-0":
+            raise ValueError("Transient error")
+
+    documents = _run("r1") + _run("r2") + _run("r3")
+    dispatcher = dispatch(
+        [_fail_once, lambda name, doc: following_calls.append(doc["uid"])],
+        documents,
+    )
+    dispatcher.wait_until_idle()
+
+    # The dispatcher would have raised if the error had been passed back to it
+    assert following_calls == [doc["uid"] for _, doc in documents]
+    assert failing_calls == ["r1", "r1-event-0"] + [
+        doc["uid"] for _, doc in documents[5:]
+    ]
+    assert dispatcher.workers[0].error is None
@@ -14,6 +14,9 @@ from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_store import (
     IspybIds,
     StoreInIspyb,
 )
+from mx_bluesky.hyperion.external_interaction.nexus.writing_service import (
+    NexusWritingService,
+)
 from mx_bluesky.hyperion.parameters.constants import CONST
 
 from .conftest import TestData
@@ -66,7 +69,7 @@ class TestZocaloHandler:
             )
 
     @patch(
-        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
         autospec=True,
     )
     def test_handler_inits_zocalo_trigger_on_right_plan(self, zocalo_trigger):
@@ -81,8 +84,39 @@ class TestZocaloHandler:
         )
         assert zocalo_handler.zocalo_interactor is not None
 
+    @pytest.mark.parametrize(
+        "failed_nexus_files, expected_run_ends",
+        [([], [call(135)]), (["test_1.nxs"], [])],
+    )
+    @patch(
+        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
+        autospec=True,
+    )
+    def test_zocalo_runs_only_ended_if_nexus_files_written(
+        self, zocalo_trigger, failed_nexus_files, expected_run_ends
+    ):
+        nexus_writing = MagicMock(spec=NexusWritingService)
+        nexus_writing.failed_files.return_value = failed_nexus_files
+        zocalo_handler = ZocaloCallback(nexus_writing)
+        zocalo_handler.start({**start_dict(), "uid": "outer"})  # type: ignore
+        zocalo_handler.start(
+            {
+                "uid": "inner",
+                "subplan_name": "test_plan_name",
+                "ispyb_dcids": (135,),
+                "scan_points": [{"test": [1, 2, 3]}],
+            }  # type: ignore
+        )
+        zocalo_interactor = zocalo_handler.zocalo_interactor
+        assert zocalo_interactor is not None
+
+        zocalo_handler.stop({"run_start": "inner"})  # type: ignore
+
+        nexus_writing.failed_files.assert_called_once_with("outer")
+        assert zocalo_interactor.run_end.call_args_list == expected_run_ends  # type: ignore
+
     @patch(
-        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.ZocaloTrigger",
+        "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
         autospec=True,
     )
     @patch(
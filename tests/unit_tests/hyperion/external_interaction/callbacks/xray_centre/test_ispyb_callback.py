@@ -85,6 +85,7 @@ class TestXrayCentreISPyBCallback:
             TestData.test_descriptor_document_pre_data_collection
         )
         callback.activity_gated_event(TestData.test_event_document_pre_data_collection)
+        callback.flush_writes()
         mx_acq.upsert_data_collection_group.assert_not_called()
         assert_upsert_call_with(
             mx_acq.upsert_data_collection.mock_calls[0],
@@ -119,6 +120,7 @@ class TestXrayCentreISPyBCallback:
             TestData.test_descriptor_document_pre_data_collection
         )
         callback.activity_gated_event(TestData.test_event_document_pre_data_collection)
+        callback.flush_writes()
         mx_acq.upsert_data_collection_group.reset_mock()
         mx_acq.upsert_data_collection.reset_mock()
 
@@ -128,6 +130,7 @@ class TestXrayCentreISPyBCallback:
         callback.activity_gated_event(
             TestData.test_event_document_during_data_collection
         )
+        callback.flush_writes()
 
         assert_upsert_call_with(
             mx_acq.upsert_data_collection.mock_calls[0],
@@ -176,6 +179,7 @@ class TestXrayCentreISPyBCallback:
         )
         callback.activity_gated_event(TestData.test_event_document_oav_snapshot_xy)
         callback.activity_gated_event(TestData.test_event_document_oav_snapshot_xz)
+        callback.flush_writes()
 
         mx_acq.upsert_data_collection_group.assert_not_called()
         assert_upsert_call_with(
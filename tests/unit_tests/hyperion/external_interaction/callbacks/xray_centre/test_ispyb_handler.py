@@ -176,6 +176,7 @@ class TestXrayCentreIspybHandler:
             td.test_descriptor_document_zocalo_reading
         )
         ispyb_handler.activity_gated_event(td.test_zocalo_reading_event)
+        ispyb_handler.flush_writes()
 
         assert (
             ispyb_handler.ispyb.append_to_comment.call_args.args[1]  # type:ignore
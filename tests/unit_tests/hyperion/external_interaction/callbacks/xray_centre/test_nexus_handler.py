@@ -1,5 +1,5 @@
 from copy import deepcopy
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import numpy as np
 import pytest
@@ -37,6 +37,7 @@ def test_writers_dont_create_on_init_but_do_on_during_collection_read_event(
 ):
     mock_nexus_writer.side_effect = [MagicMock(), MagicMock()]
     nexus_handler = GridscanNexusFileCallback()
+    nexus_handler.nexus_writing = MagicMock()
 
     assert nexus_handler.nexus_writer_1 is None
     assert nexus_handler.nexus_writer_2 is None
@@ -52,8 +53,10 @@ def test_writers_dont_create_on_init_but_do_on_during_collection_read_event(
 
     assert nexus_handler.nexus_writer_1 is not None
     assert nexus_handler.nexus_writer_2 is not None
-    nexus_handler.nexus_writer_1.create_nexus_file.assert_called_once()
-    nexus_handler.nexus_writer_2.create_nexus_file.assert_called_once()
+    assert [c.args[1] for c in nexus_handler.nexus_writing.submit.call_args_list] == [
+        nexus_handler.nexus_writer_1,
+        nexus_handler.nexus_writer_2,
+    ]
 
 
 @pytest.mark.parametrize(
@@ -74,6 +77,7 @@ def test_given_different_bit_depths_then_writers_created_wth_correct_VDS_size(
 ):
     mock_nexus_writer.side_effect = [MagicMock(), MagicMock()]
     nexus_handler = GridscanNexusFileCallback()
+    nexus_handler.nexus_writing = MagicMock()
 
     nexus_handler.activity_gated_start(TestData.test_start_document)
     nexus_handler.activity_gated_descriptor(
@@ -86,12 +90,10 @@ def test_given_different_bit_depths_then_writers_created_wth_correct_VDS_size(
 
     assert nexus_handler.nexus_writer_1 is not None
     assert nexus_handler.nexus_writer_2 is not None
-    nexus_handler.nexus_writer_1.create_nexus_file.assert_called_once_with(  # type:ignore
-        vds_type
-    )
-    nexus_handler.nexus_writer_2.create_nexus_file.assert_called_once_with(  # type:ignore
-        vds_type
-    )
+    for writer in [nexus_handler.nexus_writer_1, nexus_handler.nexus_writer_2]:
+        nexus_handler.nexus_writing.submit.assert_any_call(
+            TestData.test_start_document["uid"], writer, vds_type
+        )
 
 
 @patch(
@@ -102,6 +104,7 @@ def test_beam_and_attenuator_set_on_ispyb_transmission_event(
 ):
     mock_nexus_writer.side_effect = [MagicMock(), MagicMock()]
     nexus_handler = GridscanNexusFileCallback()
+    nexus_handler.nexus_writing = MagicMock()
 
     nexus_handler.activity_gated_start(TestData.test_start_document)
     nexus_handler.activity_gated_descriptor(
@@ -130,3 +133,45 @@ def test_sensible_error_if_writing_triggered_before_params_received(
         )
 
     assert "Nexus callback did not receive start doc" in excinfo.value.args[0]
+
+
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.xray_centre.nexus_callback.NexusWriter"
+)
+def test_files_waited_for_on_stop(mock_nexus_writer: MagicMock):
+    nexus_handler = GridscanNexusFileCallback()
+    nexus_handler.nexus_writing = MagicMock()
+    nexus_handler.activity_gated_start(TestData.test_start_document)
+    nexus_handler.nexus_writing.wait_for_run.assert_not_called()
+
+    nexus_handler.activity_gated_stop(TestData.test_do_fgs_gridscan_stop_document)
+
+    nexus_handler.nexus_writing.wait_for_run.assert_called_once_with(
+        TestData.test_start_document["uid"]
+    )
+
+
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.xray_centre.nexus_callback.NexusWriter"
+)
+def test_skeletons_written_on_start_and_discarded_on_outer_stop(
+    mock_nexus_writer: MagicMock,
+):
+    mock_nexus_writer.side_effect = [MagicMock(), MagicMock()]
+    nexus_handler = GridscanNexusFileCallback()
+    nexus_handler.nexus_writing = MagicMock()
+    run_uid = TestData.test_gridscan_outer_start_document["uid"]
+
+    nexus_handler.activity_gated_start(TestData.test_gridscan_outer_start_document)  # type: ignore
+    assert nexus_handler.nexus_writing.submit_skeletons.call_args_list == [
+        call(run_uid, nexus_handler.nexus_writer_1),
+        call(run_uid, nexus_handler.nexus_writer_2),
+    ]
+
+    inner_stop_document = deepcopy(TestData.test_do_fgs_gridscan_stop_document)
+    inner_stop_document["run_start"] = "inner run"
+    nexus_handler.activity_gated_stop(inner_stop_document)
+    nexus_handler.nexus_writing.discard_skeletons.assert_not_called()
+
+    nexus_handler.activity_gated_stop(TestData.test_run_gridscan_stop_document)
+    nexus_handler.nexus_writing.discard_skeletons.assert_called_once_with(run_uid)
@@ -195,6 +195,8 @@ def base_ispyb_conn():
 
         mock_core.retrieve_visit_id.side_effect = mock_retrieve_visit
         ispyb_connection.return_value.core = mock_core
+        # The underlying MySQL connection
+        ispyb_connection.return_value.conn = MagicMock()
         yield ispyb_connection
 
 
@@ -0,0 +1,134 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import ispyb
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    ISPYB_CONNECTION_POOLS,
+    IspybConnectionPool,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.data_model import (
+    DataCollectionGroupInfo,
+    DataCollectionInfo,
+    ScanDataInfo,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_store import (
+    IspybIds,
+    StoreInIspyb,
+)
+from mx_bluesky.hyperion.parameters.constants import CONST
+
+from ..conftest import TEST_DATA_COLLECTION_GROUP_ID, TEST_DATA_COLLECTION_IDS
+
+TEST_CONFIG = CONST.SIM.ISPYB_CONFIG
+
+
+@pytest.fixture
+def opened_connections():
+    """Patches ispyb.open to give a new mock connection each time it's called"""
+    connections = []
+
+    def _open(config_path):
+        connection = MagicMock()
+        connection.__enter__.return_value = connection
+        connections.append(connection)
+        return connection
+
+    with patch("ispyb.open", side_effect=_open):
+        yield connections
+
+
+def test_connection_reused_once_returned(opened_connections):
+    pool = IspybConnectionPool(TEST_CONFIG)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(opened_connections) == 1
+    first.__exit__.assert_not_called()
+    assert (pool.opened, pool.reused) == (1, 1)
+
+
+@pytest.mark.parametrize("error", [ConnectionError, ispyb.ConnectionError])
+def test_connection_discarded_after_connection_error(
+    opened_connections, error: type[Exception]
+):
+    pool = IspybConnectionPool(TEST_CONFIG)
+    with pytest.raises(error):
+        with pool.connection() as first:
+            raise error("Lost connection")
+    with pool.connection() as second:
+        pass
+
+    assert first is not second
+    first.__exit__.assert_called_once()
+    assert pool.discarded == 1
+
+
+def test_connection_kept_after_other_errors(opened_connections):
+    pool = IspybConnectionPool(TEST_CONFIG)
+    with pytest.raises(ValueError):
+        with pool.connection() as first:
+            raise ValueError("Bad data")
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+
+
+@patch(
+    "mx_bluesky.hyperion.external_interaction.ispyb.connection_pool.HEALTH_CHECK_AFTER_IDLE_S",
+    0,
+)
+def test_idle_connection_replaced_if_it_fails_health_check(opened_connections):
+    pool = IspybConnectionPool(TEST_CONFIG)
+    with pool.connection() as first:
+        first.conn.ping.side_effect = ConnectionError("Server has gone away")
+    with pool.connection() as second:
+        pass
+
+    assert first is not second
+    first.__exit__.assert_called_once()
+
+
+def test_users_wait_for_a_connection_when_pool_is_full(opened_connections):
+    pool = IspybConnectionPool(TEST_CONFIG, max_size=1)
+    got_connection = []
+
+    def _use_connection():
+        with pool.connection() as conn:
+            got_connection.append(conn)
+
+    with pool.connection() as first:
+        waiting_user = threading.Thread(target=_use_connection)
+        waiting_user.start()
+        waiting_user.join(0.1)
+        assert not got_connection
+    waiting_user.join(1)
+
+    assert got_connection == [first]
+    assert len(opened_connections) == 1
+
+
+def test_pool_size_can_be_configured_from_environment():
+    with patch.dict("os.environ", {"ISPYB_POOL_SIZE": "7"}):
+        assert ISPYB_CONNECTION_POOLS.get("some_other_config").max_size == 7
+
+
+def test_stores_share_connections_across_depositions(mock_ispyb_conn):
+    ispyb_ids = StoreInIspyb(TEST_CONFIG).begin_deposition(
+        DataCollectionGroupInfo(
+            visit_string="cm31105-4", experiment_type="Mesh3D", sample_id=364758
+        ),
+        [ScanDataInfo(data_collection_info=DataCollectionInfo())],
+    )
+    StoreInIspyb(TEST_CONFIG).end_deposition(ispyb_ids, "fail", "Test failure")
+
+    assert ispyb_ids == IspybIds(
+        data_collection_ids=(TEST_DATA_COLLECTION_IDS[0],),
+        data_collection_group_id=TEST_DATA_COLLECTION_GROUP_ID,
+    )
+    mock_ispyb_conn.assert_called_once_with(TEST_CONFIG)
@@ -16,7 +16,7 @@ def test_get_url_and_token_returns_expected_data():
     assert token == "notatoken"
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.post")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.post")
 def test_when_start_load_called_then_correct_expected_url_posted_to_with_expected_data(
     mock_post,
 ):
@@ -38,7 +38,7 @@ def test_when_start_load_called_then_correct_expected_url_posted_to_with_expecte
     assert mock_post.call_args.kwargs["json"] == expected_data
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.post")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.post")
 def test_when_start_called_then_returns_id(mock_post):
     mock_post.return_value.json.return_value = {"robotActionId": 190}
     expeye_interactor = ExpeyeInteraction()
@@ -46,7 +46,7 @@ def test_when_start_called_then_returns_id(mock_post):
     assert robot_id == 190
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.post")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.post")
 def test_when_start_load_called_then_use_correct_token(
     mock_post,
 ):
@@ -57,7 +57,7 @@ def test_when_start_load_called_then_use_correct_token(
     assert auth.token == "notatoken"
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.post")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.post")
 def test_given_server_does_not_respond_when_start_load_called_then_error(mock_post):
     mock_post.return_value.ok = False
 
@@ -66,7 +66,7 @@ def test_given_server_does_not_respond_when_start_load_called_then_error(mock_po
         expeye_interactor.start_load("test", 3, 700, 10, 5)
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.patch")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.patch")
 def test_when_end_load_called_with_success_then_correct_expected_url_posted_to_with_expected_data(
     mock_patch,
 ):
@@ -83,7 +83,7 @@ def test_when_end_load_called_with_success_then_correct_expected_url_posted_to_w
     assert mock_patch.call_args.kwargs["json"] == expected_data
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.patch")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.patch")
 def test_when_end_load_called_with_failure_then_correct_expected_url_posted_to_with_expected_data(
     mock_patch,
 ):
@@ -100,7 +100,7 @@ def test_when_end_load_called_with_failure_then_correct_expected_url_posted_to_w
     assert mock_patch.call_args.kwargs["json"] == expected_data
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.patch")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.patch")
 def test_when_end_load_called_then_use_correct_token(
     mock_patch,
 ):
@@ -111,7 +111,7 @@ def test_when_end_load_called_then_use_correct_token(
     assert auth.token == "notatoken"
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.patch")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.patch")
 def test_given_server_does_not_respond_when_end_load_called_then_error(mock_patch):
     mock_patch.return_value.ok = False
 
@@ -120,7 +120,7 @@ def test_given_server_does_not_respond_when_end_load_called_then_error(mock_patc
         expeye_interactor.end_load(1, "", "")
 
 
-@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.patch")
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.Session.patch")
 def test_when_update_barcode_called_with_success_then_correct_expected_url_posted_to_with_expected_data(
     mock_patch,
 ):
@@ -0,0 +1,319 @@
+import configparser
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store import (
+    ExpeyeInteraction,
+    _read_base_url_and_token,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.expeye_queue import (
+    ExpeyeRobotActionQueue,
+)
+
+
+class StandInExpeye(ThreadingHTTPServer):
+    """A local HTTP server taking the place of ExpEye, which records the requests made
+    to it and the connections they were made on"""
+
+    daemon_threads = True
+
+    def __init__(self, delay_s: float = 0.0, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _StandInHandler)
+        self.delay_s = delay_s
+        self.reject = False
+        self.requests: list[tuple[str, str, dict]] = []
+        self.connections = 0
+        self.action_ids = count(100)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Otherwise the body waits for the client to acknowledge the headers
+    disable_nagle_algorithm = True
+    server: StandInExpeye
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _respond(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delay_s)
+        self.server.requests.append((self.command, self.path, body))
+        if self.server.reject:
+            response, status = {}, 500
+        elif self.command == "POST":
+            response, status = {"robotActionId": next(self.server.action_ids)}, 201
+        else:
+            response, status = {}, 200
+        encoded = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    do_POST = _respond
+    do_PATCH = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_expeye():
+    server = StandInExpeye()
+    yield server
+    server.stop()
+
+
+def _expeye_at(url: str) -> ExpeyeInteraction:
+    expeye = ExpeyeInteraction()
+    expeye.base_url = url + "/core"
+    return expeye
+
+
+def _queue_load(queue: ExpeyeRobotActionQueue):
+    action = queue.start_load("cm31105", 4, 700, 10, 5)
+    queue.update_barcode_and_snapshots(action, "BARCODE", "before.jpg", "after.jpg")
+    queue.end_load(action, "success", "OK")
+    return action
+
+
+def test_requests_to_expeye_reuse_one_connection(stand_in_expeye: StandInExpeye):
+    for _ in range(3):
+        expeye = _expeye_at(stand_in_expeye.url)
+        action_id = expeye.start_load("cm31105", 4, 700, 10, 5)
+        expeye.end_load(action_id, "success", "OK")
+
+    assert len(stand_in_expeye.requests) == 6
+    assert stand_in_expeye.connections == 1
+
+
+def test_expeye_config_read_once_per_config_file():
+    _read_base_url_and_token.cache_clear()
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.configparser.ConfigParser",
+        wraps=configparser.ConfigParser,
+    ) as mock_parser:
+        for _ in range(5):
+            ExpeyeInteraction()
+
+    mock_parser.assert_called_once()
+
+
+def test_queued_robot_load_sent_in_order_without_waiting_for_expeye(
+    stand_in_expeye: StandInExpeye, tmp_path
+):
+    stand_in_expeye.delay_s = 0.1
+    queue = ExpeyeRobotActionQueue(
+        _expeye_at(stand_in_expeye.url), tmp_path / "spool.jsonl"
+    )
+
+    start = time.monotonic()
+    action = _queue_load(queue)
+    assert time.monotonic() - start < stand_in_expeye.delay_s
+
+    assert queue.flush(timeout=5)
+    assert [(method, path) for method, path, _ in stand_in_expeye.requests] == [
+        ("POST", "/core/proposals/cm31105/sessions/4/robot-actions"),
+        ("PATCH", "/core/robot-actions/100"),
+        ("PATCH", "/core/robot-actions/100"),
+    ]
+    assert action.action_id == 100
+    assert queue.stats.completed == 3
+    assert queue.stats.max_latency_s >= 3 * stand_in_expeye.delay_s
+
+
+def test_queued_loads_sent_with_the_times_they_were_submitted(
+    stand_in_expeye: StandInExpeye, tmp_path
+):
+    stand_in_expeye.delay_s = 0.1
+    queue = ExpeyeRobotActionQueue(
+        _expeye_at(stand_in_expeye.url), tmp_path / "spool.jsonl"
+    )
+
+    with (
+        patch(
+            "mx_bluesky.hyperion.external_interaction.ispyb.expeye_queue.get_current_time_string",
+            side_effect=["load started", "load ended"],
+        ),
+        patch(
+            "mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.get_current_time_string",
+            return_value="request sent",
+        ),
+    ):
+        _queue_load(queue)
+        assert queue.flush(timeout=5)
+
+    assert stand_in_expeye.requests[0][2]["startTimestamp"] == "load started"
+    assert stand_in_expeye.requests[2][2]["endTimestamp"] == "load ended"
+
+
+def test_requests_spooled_when_expeye_unreachable_then_sent_when_it_returns(
+    tmp_path,
+):
+    stand_in = StandInExpeye()
+    url, port = stand_in.url, stand_in.server_address[1]
+    stand_in.stop()
+    spool_path = tmp_path / "spool.jsonl"
+    queue = ExpeyeRobotActionQueue(
+        _expeye_at(url), spool_path, max_attempts=2, backoff_s=0
+    )
+
+    _queue_load(queue)
+    assert queue.flush(timeout=10)
+
+    spooled = [json.loads(line) for line in spool_path.read_text().splitlines()]
+    assert [record["call"] for record in spooled] == [
+        "start_load",
+        "update_barcode_and_snapshots",
+        "end_load",
+    ]
+    assert queue.stats.retries == 1
+    assert queue.stats.spooled == 3
+
+    stand_in = StandInExpeye(port=port)
+    try:
+        action = queue.start_load("cm31105", 5, 701, 11, 6)
+        assert queue.flush(timeout=5)
+    finally:
+        stand_in.stop()
+
+    assert [(method, path) for method, path, _ in stand_in.requests] == [
+        ("POST", "/core/proposals/cm31105/sessions/4/robot-actions"),
+        ("PATCH", "/core/robot-actions/100"),
+        ("PATCH", "/core/robot-actions/100"),
+        ("POST", "/core/proposals/cm31105/sessions/5/robot-actions"),
+    ]
+    # Spooled requests keep the times the load started and ended
+    assert stand_in.requests[0][2]["startTimestamp"] == spooled[0]["timestamp"]
+    assert stand_in.requests[2][2]["endTimestamp"] == spooled[2]["timestamp"]
+    assert action.action_id == 101
+    assert not spool_path.exists()
+    assert queue.stats.replayed == 3
+
+
+def test_rejected_requests_dropped_and_not_spooled(
+    stand_in_expeye: StandInExpeye, tmp_path
+):
+    stand_in_expeye.reject = True
+    spool_path = tmp_path / "spool.jsonl"
+    queue = ExpeyeRobotActionQueue(_expeye_at(stand_in_expeye.url), spool_path)
+
+    action = _queue_load(queue)
+    assert queue.flush(timeout=5)
+
+    # Without an action ID there is nothing to update
+    assert len(stand_in_expeye.requests) == 1
+    assert action.action_id is None
+    assert queue.stats.dropped == 3
+    assert not spool_path.exists()
+
+
+def test_requests_not_sent_when_spool_replayed_kept_with_action_ids(
+    stand_in_expeye: StandInExpeye, tmp_path
+):
+    spool_path = tmp_path / "spool.jsonl"
+    queue = ExpeyeRobotActionQueue(
+        _expeye_at(stand_in_expeye.url), spool_path, max_attempts=1
+    )
+    records = [
+        {
+            "key": "a",
+            "action_id": None,
+            "call": "start_load",
+            "args": ["cm31105", 4, 700, 10, 5],
+            "timestamp": "t0",
+        },
+        {
+            "key": "a",
+            "action_id": None,
+            "call": "end_load",
+            "args": ["success", "OK"],
+            "timestamp": "t1",
+        },
+    ]
+    spool_path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    with patch.object(queue.expeye, "end_load", side_effect=requests.ConnectionError):
+        queue._replay_spool()
+
+    remaining = [json.loads(line) for line in spool_path.read_text().splitlines()]
+    assert remaining == [{**records[1], "action_id": 100}]
+
+    queue._replay_spool()
+
+    assert stand_in_expeye.requests[-1][:2] == ("PATCH", "/core/robot-actions/100")
+    assert stand_in_expeye.requests[-1][2]["endTimestamp"] == "t1"
+    assert not spool_path.exists()
+
+
+def test_robot_action_not_created_again_when_expeye_too_slow_to_respond(
+    stand_in_expeye: StandInExpeye, tmp_path
+):
+    stand_in_expeye.delay_s = 0.5
+    spool_path = tmp_path / "spool.jsonl"
+    queue = ExpeyeRobotActionQueue(
+        _expeye_at(stand_in_expeye.url), spool_path, backoff_s=0
+    )
+
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store.EXPEYE_TIMEOUT_S",
+        0.1,
+    ):
+        action = _queue_load(queue)
+        assert queue.flush(timeout=5)
+    time.sleep(2 * stand_in_expeye.delay_s)
+
+    assert [method for method, _, _ in stand_in_expeye.requests] == ["POST"]
+    assert action.action_id is None
+    assert queue.stats.retries == 0
+    assert queue.stats.dropped == 3
+    assert not spool_path.exists()
+
+
+def test_spooled_robot_action_dropped_when_expeye_too_slow_to_respond(tmp_path):
+    spool_path = tmp_path / "spool.jsonl"
+    queue = ExpeyeRobotActionQueue(_expeye_at("http://unused"), spool_path)
+    records = [
+        {
+            "key": "a",
+            "action_id": None,
+            "call": "start_load",
+            "args": ["cm31105", 4, 700, 10, 5],
+            "timestamp": "t0",
+        },
+        {
+            "key": "a",
+            "action_id": None,
+            "call": "end_load",
+            "args": ["success", "OK"],
+            "timestamp": "t1",
+        },
+    ]
+    spool_path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    with patch.object(queue.expeye, "start_load", side_effect=requests.ReadTimeout):
+        queue._replay_spool()
+
+    assert not spool_path.exists()
+    assert queue.stats.dropped == 2
+    assert queue.stats.replayed == 0
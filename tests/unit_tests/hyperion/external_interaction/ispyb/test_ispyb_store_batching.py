@@ -0,0 +1,270 @@
+from unittest.mock import MagicMock, patch
+
+import ispyb
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.ispyb.data_model import (
+    DataCollectionGridInfo,
+    DataCollectionGroupInfo,
+    DataCollectionInfo,
+    DataCollectionPositionInfo,
+    ScanDataInfo,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_dataclass import Orientation
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_store import (
+    IspybIds,
+    StoreInIspyb,
+)
+from mx_bluesky.hyperion.parameters.constants import CONST
+
+from ..conftest import (
+    EXPECTED_END_TIME,
+    TEST_DATA_COLLECTION_GROUP_ID,
+    TEST_DATA_COLLECTION_IDS,
+    assert_upsert_call_with,
+    mx_acquisition_from_conn,
+    remap_upsert_columns,
+)
+
+GRID_INFO = DataCollectionGridInfo(
+    dx_in_mm=0.1,
+    dy_in_mm=0.1,
+    steps_x=40,
+    steps_y=20,
+    microns_per_pixel_x=1.25,
+    microns_per_pixel_y=1.25,
+    snapshot_offset_x_pixel=100,
+    snapshot_offset_y_pixel=100,
+    orientation=Orientation.HORIZONTAL,
+    snaked=True,
+)
+
+
+def _begin(store: StoreInIspyb) -> IspybIds:
+    return store.begin_deposition(
+        DataCollectionGroupInfo(
+            visit_string="cm31105-4", experiment_type="Mesh3D", sample_id=364758
+        ),
+        [
+            ScanDataInfo(data_collection_info=DataCollectionInfo()),
+            ScanDataInfo(data_collection_info=DataCollectionInfo()),
+        ],
+    )
+
+
+def _gridscan_updates(store: StoreInIspyb, ispyb_ids: IspybIds):
+    """The updates made to ISPyB during a gridscan after the deposition has begun"""
+    for dc_id in ispyb_ids.data_collection_ids:
+        store.update_deposition(
+            ispyb_ids,
+            [
+                ScanDataInfo(
+                    data_collection_info=DataCollectionInfo(
+                        n_images=800, comments="Diffraction grid scan"
+                    ),
+                    data_collection_id=dc_id,
+                    data_collection_grid_info=GRID_INFO,
+                )
+            ],
+        )
+    for info in [
+        DataCollectionInfo(synchrotron_mode="User"),
+        DataCollectionInfo(flux=10, transmission=100),
+    ]:
+        store.update_deposition(
+            ispyb_ids,
+            [
+                ScanDataInfo(
+                    data_collection_info=info,
+                    data_collection_id=dc_id,
+                    data_collection_position_info=DataCollectionPositionInfo(1, 2, 3),
+                )
+                for dc_id in ispyb_ids.data_collection_ids
+            ],
+        )
+    store.append_to_comment(ispyb_ids.data_collection_ids[0], "Aperture: Small.")
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.ispyb.ispyb_store.get_current_time_string",
+        new=MagicMock(return_value=EXPECTED_END_TIME),
+    ):
+        store.end_deposition(ispyb_ids, "fail", "Test failure")
+
+
+def _round_trips(mock_ispyb_conn) -> int:
+    mx = mx_acquisition_from_conn(mock_ispyb_conn)
+    return sum(
+        method.call_count
+        for method in [
+            mx.upsert_data_collection_group,
+            mx.upsert_data_collection,
+            mx.update_dc_position,
+            mx.upsert_dc_grid,
+            mx.update_data_collection_append_comments,
+        ]
+    )
+
+
+def test_batched_changes_are_merged_into_one_call_of_each_kind_per_data_collection(
+    mock_ispyb_conn,
+):
+    store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=True)
+    ispyb_ids = _begin(store)
+    mx = mx_acquisition_from_conn(mock_ispyb_conn)
+    mx.upsert_data_collection.reset_mock()
+
+    _gridscan_updates(store, ispyb_ids)
+    mx.upsert_data_collection.assert_not_called()
+    store.write_pending()
+
+    assert mx.upsert_data_collection.call_count == 2
+    for upsert, dc_id in zip(
+        mx.upsert_data_collection.mock_calls, TEST_DATA_COLLECTION_IDS, strict=True
+    ):
+        expected_comment = (
+            "Diffraction grid scan Aperture: Small. "
+            if dc_id == TEST_DATA_COLLECTION_IDS[0]
+            else "Diffraction grid scan "
+        ) + "DataCollection Unsuccessful reason: Test failure"
+        assert_upsert_call_with(
+            upsert,
+            mx.get_data_collection_params(),
+            {
+                "id": dc_id,
+                "parentid": TEST_DATA_COLLECTION_GROUP_ID,
+                "nimages": 800,
+                "comments": expected_comment,
+                "synchrotronmode": "User",
+                "flux": 10,
+                "transmission": 100,
+                "endtime": EXPECTED_END_TIME,
+                "runstatus": "DataCollection Unsuccessful",
+            },
+        )
+    assert mx.update_dc_position.call_count == 2
+    assert mx.upsert_dc_grid.call_count == 2
+    mx.update_data_collection_append_comments.assert_not_called()
+
+
+def test_comments_appended_in_one_call_when_comment_not_set_in_batch(
+    mock_ispyb_conn,
+):
+    store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=True)
+    dc_id = TEST_DATA_COLLECTION_IDS[0]
+    store.append_to_comment(dc_id, "Zocalo found no crystals.")
+    store.append_to_comment(dc_id, "Processing took 10s.", delimiter="; ")
+    store.write_pending()
+
+    mx = mx_acquisition_from_conn(mock_ispyb_conn)
+    mx.upsert_data_collection.assert_not_called()
+    mx.update_data_collection_append_comments.assert_called_once_with(
+        dc_id, "Zocalo found no crystals.; Processing took 10s.", " "
+    )
+
+
+def test_batch_written_in_one_transaction(mock_ispyb_conn):
+    store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=True)
+    ispyb_ids = _begin(store)
+    _gridscan_updates(store, ispyb_ids)
+    mysql_conn = mock_ispyb_conn.return_value.__enter__.return_value.conn
+    mysql_conn.reset_mock()
+
+    store.write_pending()
+
+    assert [c[0] for c in mysql_conn.method_calls] == ["start_transaction", "commit"]
+
+
+def test_failed_batch_rolled_back_and_kept_for_retry(mock_ispyb_conn):
+    store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=True)
+    ispyb_ids = _begin(store)
+    _gridscan_updates(store, ispyb_ids)
+    mx = mx_acquisition_from_conn(mock_ispyb_conn)
+    mysql_conn = mock_ispyb_conn.return_value.__enter__.return_value.conn
+    mx.upsert_dc_grid.side_effect = [ispyb.ConnectionError, 1, 2]
+
+    with pytest.raises(ispyb.ConnectionError):
+        store.write_pending()
+    mysql_conn.rollback.assert_called_once()
+    mysql_conn.commit.assert_not_called()
+
+    store.write_pending()
+    mysql_conn.commit.assert_called_once()
+    assert mx.upsert_dc_grid.call_count == 3
+
+
+def test_comments_appended_once_when_failed_batch_retried(mock_ispyb_conn):
+    store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=True)
+    ispyb_ids = _begin(store)
+    _gridscan_updates(store, ispyb_ids)
+    mx = mx_acquisition_from_conn(mock_ispyb_conn)
+    mx.upsert_data_collection.reset_mock()
+    mx.upsert_data_collection.side_effect = [ispyb.ConnectionError, 1, 1]
+
+    with pytest.raises(ispyb.ConnectionError):
+        store.write_pending()
+    store.write_pending()
+
+    params = [
+        remap_upsert_columns(list(mx.get_data_collection_params()), upsert.args[0])
+        for upsert in mx.upsert_data_collection.mock_calls
+    ]
+    # The first data collection is written by both attempts
+    assert [
+        p["comments"] for p in params if p["id"] == TEST_DATA_COLLECTION_IDS[0]
+    ] == [
+        "Diffraction grid scan Aperture: Small. "
+        "DataCollection Unsuccessful reason: Test failure"
+    ] * 2
+
+
+def test_grid_ids_of_batched_updates_not_returned(mock_ispyb_conn):
+    store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=True)
+    ispyb_ids = _begin(store)
+
+    updated_ids = store.update_deposition(
+        ispyb_ids,
+        [
+            ScanDataInfo(
+                data_collection_info=DataCollectionInfo(n_images=800),
+                data_collection_id=ispyb_ids.data_collection_ids[0],
+                data_collection_grid_info=GRID_INFO,
+            )
+        ],
+    )
+
+    assert updated_ids == ispyb_ids
+    assert updated_ids.grid_ids == ()
+
+
+def test_update_creating_data_collection_writes_pending_changes_first(
+    mock_ispyb_conn_multiscan,
+):
+    store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=True)
+    ispyb_ids = _begin(store)
+    mx = mx_acquisition_from_conn(mock_ispyb_conn_multiscan)
+    mx.reset_mock()
+
+    store.append_to_comment(ispyb_ids.data_collection_ids[0], "Pending comment")
+    store.update_deposition(
+        ispyb_ids, [ScanDataInfo(data_collection_info=DataCollectionInfo())]
+    )
+
+    assert [c[0] for c in mx.method_calls[:2]] == [
+        "update_data_collection_append_comments",
+        "get_data_collection_params",
+    ]
+    mx.upsert_data_collection.assert_called_once()
+
+
+def test_batching_reduces_round_trips_for_a_gridscan(mock_ispyb_conn_multiscan):
+    round_trips = {}
+    for batch_updates in (False, True):
+        store = StoreInIspyb(CONST.SIM.ISPYB_CONFIG, batch_updates=batch_updates)
+        ispyb_ids = _begin(store)
+        _gridscan_updates(store, ispyb_ids)
+        store.write_pending()
+        round_trips[batch_updates] = _round_trips(mock_ispyb_conn_multiscan)
+        mx_acquisition_from_conn(mock_ispyb_conn_multiscan).reset_mock()
+
+    # Beginning the deposition makes 3 calls, after that each data collection needs
+    # one data collection, position, and grid call when batched
+    assert round_trips == {False: 20, True: 3 + 2 * 3}
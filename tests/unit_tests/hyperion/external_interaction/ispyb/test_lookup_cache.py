@@ -0,0 +1,168 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from ispyb import NoResult
+
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils import (
+    get_session_id_from_visit,
+    prewarm_ispyb_lookups,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.lookup_cache import (
+    ISPYB_LOOKUP_CACHE,
+    IspybLookupCache,
+)
+from mx_bluesky.hyperion.parameters.constants import CONST
+
+from ..conftest import TEST_SESSION_ID
+
+
+@pytest.fixture
+def database():
+    """Stands in for an ISPyB connection, counting the lookups made of it"""
+    conn = MagicMock()
+    conn.core.retrieve_visit_id.return_value = TEST_SESSION_ID
+    return conn
+
+
+def test_repeated_lookups_of_a_visit_only_go_to_the_database_once(database):
+    for _ in range(10):
+        assert get_session_id_from_visit(database, "cm31105-4") == TEST_SESSION_ID
+    assert get_session_id_from_visit(database, "cm31105-5") == TEST_SESSION_ID
+
+    assert [c.args for c in database.core.retrieve_visit_id.call_args_list] == [
+        ("cm31105-4",),
+        ("cm31105-5",),
+    ]
+    assert ISPYB_LOOKUP_CACHE.hits["session_id"] == 9
+    assert ISPYB_LOOKUP_CACHE.hit_rate("session_id") == pytest.approx(9 / 11)
+
+
+def test_visit_which_isnt_found_is_not_cached(database):
+    database.core.retrieve_visit_id.side_effect = [NoResult, TEST_SESSION_ID]
+
+    with pytest.raises(NoResult, match="cm31105-4"):
+        get_session_id_from_visit(database, "cm31105-4")
+    assert get_session_id_from_visit(database, "cm31105-4") == TEST_SESSION_ID
+    assert database.core.retrieve_visit_id.call_count == 2
+
+
+@patch("mx_bluesky.hyperion.external_interaction.ispyb.lookup_cache.time.monotonic")
+def test_lookup_made_again_after_it_expires(mock_monotonic: MagicMock):
+    cache = IspybLookupCache(ttl_s=60)
+    database = MagicMock(side_effect=[1, 2])
+
+    mock_monotonic.return_value = 0
+    assert cache.get("session_id", "cm31105-4", database) == 1
+    mock_monotonic.return_value = 59
+    assert cache.get("session_id", "cm31105-4", database) == 1
+    mock_monotonic.return_value = 60
+    assert cache.get("session_id", "cm31105-4", database) == 2
+
+
+def test_invalidated_lookup_made_again():
+    cache = IspybLookupCache()
+    database = MagicMock(side_effect=[1, 2])
+
+    cache.get("session_id", "cm31105-4", database)
+    cache.invalidate("session_id", "cm31105-4")
+
+    assert cache.get("session_id", "cm31105-4", database) == 2
+
+
+def test_oldest_lookup_evicted_when_cache_full():
+    cache = IspybLookupCache(max_size=2)
+    for visit in ["cm31105-1", "cm31105-2", "cm31105-3"]:
+        cache.get("session_id", visit, lambda visit=visit: visit)
+
+    database = MagicMock(return_value="looked up again")
+    assert cache.get("session_id", "cm31105-3", database) == "cm31105-3"
+    assert cache.get("session_id", "cm31105-2", database) == "cm31105-2"
+    assert cache.get("session_id", "cm31105-1", database) == "looked up again"
+
+
+def test_prewarm_caches_session_id_using_pooled_connection(mock_ispyb_conn):
+    prewarm_ispyb_lookups(CONST.SIM.ISPYB_CONFIG, "cm31105-4").join()
+    conn = mock_ispyb_conn.return_value.__enter__.return_value
+    conn.core.retrieve_visit_id.reset_mock()
+
+    get_session_id_from_visit(conn, "cm31105-4")
+
+    conn.core.retrieve_visit_id.assert_not_called()
+    assert ISPYB_LOOKUP_CACHE.hits["session_id"] == 1
+
+
+def test_failed_prewarm_logged_and_not_raised(mock_ispyb_conn):
+    conn = mock_ispyb_conn.return_value.__enter__.return_value
+    conn.core.retrieve_visit_id.side_effect = NoResult
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.ispyb.ispyb_utils.ISPYB_LOGGER"
+    ) as mock_logger:
+        prewarm_ispyb_lookups(CONST.SIM.ISPYB_CONFIG, "cm31105-4").join()
+
+    mock_logger.warning.assert_called_once()
+
+
+def test_slow_lookup_does_not_hold_up_other_lookups():
+    cache = IspybLookupCache()
+    release = threading.Event()
+    slow = threading.Thread(
+        target=cache.get,
+        args=("session_id", "cm31105-4", lambda: release.wait(5) and 1),
+    )
+    slow.start()
+
+    assert cache.get("session_id", "cm31105-5", lambda: 2) == 2
+    assert slow.is_alive()
+    release.set()
+    slow.join()
+
+
+def test_concurrent_lookups_of_same_key_made_once():
+    cache = IspybLookupCache()
+    release = threading.Event()
+    database = MagicMock(side_effect=lambda: release.wait(5) and 1)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                cache.get("session_id", "cm31105-4", database)
+            )
+        )
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [1, 1, 1]
+    database.assert_called_once()
+
+
+def test_failed_lookup_raised_in_threads_waiting_for_it():
+    cache = IspybLookupCache()
+    release = threading.Event()
+
+    def look_up():
+        release.wait(5)
+        raise NoResult("cm31105-4")
+
+    errors = []
+
+    def get():
+        try:
+            cache.get("session_id", "cm31105-4", look_up)
+        except NoResult as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=get) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 2
+    assert cache.get("session_id", "cm31105-4", lambda: 1) == 1
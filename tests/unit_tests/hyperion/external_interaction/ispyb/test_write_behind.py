@@ -0,0 +1,190 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import ispyb
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.callbacks.xray_centre.ispyb_callback import (
+    GridscanISPyBCallback,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_store import (
+    IspybIds,
+    StoreInIspyb,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.write_behind import (
+    IspybWriteBehindQueue,
+)
+
+from ..callbacks.conftest import TestData
+
+DATABASE_DELAY_S = 0.2
+
+
+class SlowDatabase(StoreInIspyb):
+    """Takes DATABASE_DELAY_S for every write after the deposition has begun"""
+
+    def __init__(self, config, **kwargs) -> None:
+        super().__init__(config, **kwargs)
+        self.writes: list[str] = []
+
+    def begin_deposition(self, *args):
+        return IspybIds(data_collection_group_id=4, data_collection_ids=(1, 2))
+
+    def update_deposition(self, ispyb_ids, scan_data_infos):
+        time.sleep(DATABASE_DELAY_S)
+        self.writes.append("update")
+        return ispyb_ids
+
+    def append_to_comment(self, data_collection_id, comment):
+        time.sleep(DATABASE_DELAY_S)
+        self.writes.append("comment")
+
+    def end_deposition(self, ispyb_ids, success, reason):
+        time.sleep(DATABASE_DELAY_S)
+        self.writes.append("end")
+
+
+@patch(
+    "mx_bluesky.hyperion.external_interaction.callbacks.xray_centre.ispyb_callback.StoreInIspyb",
+    SlowDatabase,
+)
+def test_callback_does_not_wait_for_slow_database_until_stop():
+    callback = GridscanISPyBCallback()
+    callback.activity_gated_start(TestData.test_gridscan3d_start_document)  # type: ignore
+
+    start = time.monotonic()
+    callback.activity_gated_descriptor(
+        TestData.test_descriptor_document_pre_data_collection
+    )
+    callback.activity_gated_event(TestData.test_event_document_pre_data_collection)
+    callback.activity_gated_descriptor(
+        TestData.test_descriptor_document_during_data_collection
+    )
+    callback.activity_gated_event(TestData.test_event_document_during_data_collection)
+    events_handled_s = time.monotonic() - start
+
+    assert events_handled_s < DATABASE_DELAY_S
+    # The flux read appends to the comment of both data collections then updates them
+    assert callback.writes.depth == 4
+
+    callback.activity_gated_stop(TestData.test_run_gridscan_failed_stop_document)
+
+    assert callback.writes.depth == 0
+    assert callback.ispyb.writes == [
+        "update",
+        "comment",
+        "comment",
+        "update",
+        "end",
+    ]  # type: ignore
+    assert callback.writes.stats.max_latency_s >= 4 * DATABASE_DELAY_S
+
+
+def test_update_making_new_data_collection_waits_for_queued_writes():
+    callback = GridscanISPyBCallback()
+    callback.ispyb = MagicMock(spec=StoreInIspyb)
+    callback.ispyb_ids = IspybIds(data_collection_group_id=4, data_collection_ids=(1,))
+    made = []
+    callback.ispyb.update_deposition.side_effect = lambda *args: (
+        made.append("new data collection")
+        or IspybIds(data_collection_group_id=4, data_collection_ids=(1, 2))
+    )
+    callback.writes.submit(
+        "slow write",
+        lambda: time.sleep(DATABASE_DELAY_S) or made.append("queued write"),
+    )
+
+    callback._update_deposition([MagicMock(data_collection_id=None)])
+
+    assert made == ["queued write", "new data collection"]
+    assert callback.ispyb_ids.data_collection_ids == (1, 2)
+
+
+def test_ids_from_queued_updates_only_taken_by_callback_when_flushed():
+    callback = GridscanISPyBCallback()
+    callback.ispyb = MagicMock(spec=StoreInIspyb)
+    ids = IspybIds(data_collection_group_id=4, data_collection_ids=(1, 2))
+    callback.ispyb_ids = ids
+    release = threading.Event()
+
+    def add_grid(ispyb_ids: IspybIds, scan_data_infos):
+        release.wait(5)
+        return ispyb_ids.copy(update={"grid_ids": (*ispyb_ids.grid_ids, 10)})
+
+    callback.ispyb.update_deposition.side_effect = add_grid
+    for _ in range(2):
+        callback._update_deposition([MagicMock(data_collection_id=1)])
+    release.set()
+    while callback.writes.depth:
+        time.sleep(0.01)
+
+    assert callback.ispyb_ids is ids
+    callback.flush_writes()
+    # Each queued update adds to the IDs returned by the one before
+    assert callback.ispyb_ids == ids.copy(update={"grid_ids": (10, 10)})
+
+
+def test_writes_made_in_order_they_were_submitted():
+    queue = IspybWriteBehindQueue()
+    made = []
+    for i in range(20):
+        queue.submit(f"write {i}", lambda i=i: made.append(i))
+    queue.flush()
+
+    assert made == list(range(20))
+    assert queue.stats.completed == 20
+
+
+def test_write_retried_with_backoff_after_connection_error():
+    queue = IspybWriteBehindQueue(max_attempts=3, backoff_s=0.01)
+    write = MagicMock(side_effect=[ConnectionError, ispyb.ConnectionError, None])
+    with patch(
+        "mx_bluesky.hyperion.external_interaction.ordered_worker.time.sleep"
+    ) as mock_sleep:
+        queue.submit("write", write)
+        assert queue.flush()
+    assert queue.take_failed() == []
+
+    assert write.call_count == 3
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.01, 0.02]
+    assert queue.stats.retries == 2
+
+
+@pytest.mark.parametrize(
+    "error, expected_attempts", [(ConnectionError, 2), (ValueError, 1)]
+)
+def test_failed_write_dropped_and_reported(error, expected_attempts):
+    queue = IspybWriteBehindQueue(max_attempts=2, backoff_s=0)
+    failing = MagicMock(side_effect=error)
+    following = MagicMock()
+    queue.submit("failing write", failing)
+    queue.submit("following write", following)
+
+    assert queue.flush()
+    assert queue.take_failed() == ["failing write"]
+    assert queue.take_failed() == []
+    assert failing.call_count == expected_attempts
+    following.assert_called_once()
+    assert queue.stats.failed == 1
+
+
+def test_submit_waits_when_queue_is_full():
+    queue = IspybWriteBehindQueue(max_depth=1)
+    release = threading.Event()
+    queue.submit("blocked write", release.wait)
+    submitted = threading.Event()
+
+    def _submit():
+        queue.submit("next write", lambda: None)
+        submitted.set()
+
+    submitter = threading.Thread(target=_submit)
+    submitter.start()
+    assert not submitted.wait(0.1)
+    release.set()
+    assert submitted.wait(1)
+    submitter.join()
+    queue.flush()
+
+    assert queue.stats.max_depth == 1
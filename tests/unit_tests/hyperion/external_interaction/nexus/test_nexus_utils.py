@@ -1,10 +1,23 @@
+from unittest.mock import patch
+
 import numpy as np
 import pytest
+from dodal.devices.zebra import RotationDirection
+from nexgen.nxs_utils import Goniometer
 from numpy.typing import DTypeLike
 
 from mx_bluesky.hyperion.external_interaction.nexus.nexus_utils import (
+    CompactGoniometer,
+    create_goniometer_axes,
+    unique_in_order,
     vds_type_based_on_bit_depth,
 )
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+from mx_bluesky.hyperion.parameters.rotation import RotationScan
+from mx_bluesky.hyperion.parameters.scan_geometry import (
+    LineDescriptor,
+    ScanDescriptor,
+)
 
 
 @pytest.mark.parametrize(
@@ -15,3 +28,95 @@ def test_vds_type_is_expected_based_on_bit_depth(
     bit_depth: int, expected_type: DTypeLike
 ):
     assert vds_type_based_on_bit_depth(bit_depth) == expected_type
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [3.0, 2.0, 1.0, 0.0],
+        [0.5, 1.5, 2.5, 2.5, 1.5, 0.5],
+        [1.0, 1.0, 1.0],
+        [2.0, -0.0, 0.0, -1.0, 2.0],
+    ],
+)
+def test_unique_in_order_the_same_as_nexgen(values: list[float]):
+    goniometer = Goniometer([], None)
+    goniometer.scan = {"omega": np.array(values)}
+
+    np.testing.assert_array_equal(
+        unique_in_order(values), goniometer._get_unique_scan_point_values("omega")
+    )
+
+
+def _assert_goniometers_the_same(compact: Goniometer, nexgen: Goniometer):
+    for compact_axis, nexgen_axis in zip(
+        compact.axes_list, nexgen.axes_list, strict=True
+    ):
+        assert (
+            compact_axis.start_pos,
+            compact_axis.increment,
+            compact_axis.num_steps,
+        ) == (nexgen_axis.start_pos, nexgen_axis.increment, nexgen_axis.num_steps)
+    for compact_scan, nexgen_scan in zip(
+        compact.define_scan_from_goniometer_axes(),
+        nexgen.define_scan_from_goniometer_axes(),
+        strict=True,
+    ):
+        assert (compact_scan or {}).keys() == (nexgen_scan or {}).keys()
+        for axis in compact_scan or {}:
+            np.testing.assert_array_equal(compact_scan[axis], nexgen_scan[axis])
+
+
+def _descriptors(
+    test_fgs_params: ThreeDGridScan, test_rotation_params: RotationScan
+) -> list[ScanDescriptor]:
+    return [
+        *test_fgs_params.scan_descriptors,
+        test_rotation_params.scan_descriptor,
+        ScanDescriptor(LineDescriptor("sam_x", 1, 0, 5), snake=True),
+    ]
+
+
+@pytest.mark.parametrize("scan", range(4))
+@pytest.mark.parametrize("rotation_direction", list(RotationDirection))
+def test_goniometer_set_up_from_descriptor_the_same_as_by_nexgen(
+    test_fgs_params: ThreeDGridScan,
+    test_rotation_params: RotationScan,
+    scan: int,
+    rotation_direction: RotationDirection,
+):
+    test_fgs_params.x_steps, test_fgs_params.y_steps = 13, 7
+    descriptor = _descriptors(test_fgs_params, test_rotation_params)[scan]
+    points = descriptor.points()
+
+    compact = create_goniometer_axes(
+        0, points, rotation_direction=rotation_direction, scan_descriptor=descriptor
+    )
+    nexgen = Goniometer(
+        create_goniometer_axes(
+            0, None, rotation_direction=rotation_direction
+        ).axes_list,
+        points,
+    )
+
+    _assert_goniometers_the_same(compact, nexgen)
+
+
+def test_nexgen_finds_scan_positions_through_compact_goniometer(
+    test_fgs_params: ThreeDGridScan,
+):
+    """CompactGoniometer overrides a private method of nexgen's Goniometer, which
+    nexgen must still call for the override to have any effect"""
+    descriptor = test_fgs_params.scan_descriptors[0]
+
+    with patch.object(
+        CompactGoniometer,
+        "_get_unique_scan_point_values",
+        autospec=True,
+        side_effect=CompactGoniometer._get_unique_scan_point_values,
+    ) as get_unique_values:
+        create_goniometer_axes(0, descriptor.points(), scan_descriptor=descriptor)
+
+    assert sorted(c.args[1] for c in get_unique_values.call_args_list) == sorted(
+        descriptor.points()
+    )
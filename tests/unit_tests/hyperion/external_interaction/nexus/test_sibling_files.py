@@ -0,0 +1,101 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import h5py
+import numpy as np
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.nexus.compare_nexus import (
+    compare_nexus_files,
+)
+from mx_bluesky.hyperion.external_interaction.nexus.sibling_files import (
+    NexusSiblingMode,
+    clone_file,
+    get_nexus_sibling_mode,
+)
+from mx_bluesky.hyperion.external_interaction.nexus.write_nexus import NexusWriter
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+
+
+def _write_nexus_like_file(filename: Path, omega_end: float = 10):
+    """Writes the sorts of things nexgen does: attributes, datasets, links to the image
+    files and a VDS of them"""
+    with h5py.File(filename, "x") as f:
+        f.attrs["default"] = "entry"
+        entry = f.create_group("entry")
+        entry.attrs["NX_class"] = "NXentry"
+        entry["definition"] = np.bytes_("NXmx")
+        omega = entry.create_dataset("sample/omega", data=np.linspace(0, omega_end, 10))
+        omega.attrs["units"] = "deg"
+        entry["data/data_000001"] = h5py.ExternalLink("images_000001.h5", "data")
+        entry["sample/depends_on"] = h5py.SoftLink("/entry/sample/omega")
+        layout = h5py.VirtualLayout((10, 4, 4), np.uint16)
+        layout[:] = h5py.VirtualSource("images_000001.h5", "data", (10, 4, 4))
+        entry.create_virtual_dataset("data/data", layout)
+
+
+@pytest.fixture
+def writer(test_fgs_params: ThreeDGridScan, tmp_path: Path):
+    test_fgs_params.storage_directory = str(tmp_path)
+    with patch.object(
+        NexusWriter,
+        "_write_with_nexgen",
+        lambda self, filename, *args: _write_nexus_like_file(filename),
+    ):
+        writer = NexusWriter(test_fgs_params, (10, 4, 4), {"sam_x": np.zeros(10)})
+        writer.beam, writer.attenuator = MagicMock(), MagicMock()
+        yield writer
+
+
+@pytest.mark.parametrize("mode", list(NexusSiblingMode))
+def test_master_file_the_same_as_nexus_file_in_every_mode(
+    writer: NexusWriter, mode: NexusSiblingMode
+):
+    writer.sibling_mode = mode
+
+    writer.create_nexus_file(np.uint16)
+
+    assert compare_nexus_files(writer.nexus_file, writer.master_file) == []
+    with h5py.File(writer.master_file) as master:
+        entry_link = master.get("entry", getlink=True)
+        assert isinstance(entry_link, h5py.ExternalLink) == (
+            mode == NexusSiblingMode.LINK
+        )
+        assert master["entry/sample/omega"].attrs["units"] == "deg"
+
+
+def test_master_file_derived_in_the_same_group_as_nexus_file(writer: NexusWriter):
+    writer.sibling_mode = NexusSiblingMode.WRITE
+    assert writer.file_groups == [[writer.nexus_file], [writer.master_file]]
+
+    writer.sibling_mode = NexusSiblingMode.COPY
+    assert writer.file_groups == [[writer.nexus_file, writer.master_file]]
+
+
+def test_differences_between_files_found(tmp_path: Path):
+    _write_nexus_like_file(tmp_path / "a.nxs")
+    _write_nexus_like_file(tmp_path / "b.nxs", omega_end=20)
+    with h5py.File(tmp_path / "b.nxs", "r+") as f:
+        f["entry"].attrs["NX_class"] = "NXsubentry"
+        f["entry/extra"] = 1
+
+    assert compare_nexus_files(tmp_path / "a.nxs", tmp_path / "b.nxs") == [
+        "/entry: attribute NX_class differs",
+        "/entry/extra: only in one file",
+        "/entry/sample/omega: values differ",
+    ]
+
+
+def test_file_copied_when_it_cannot_be_reflinked(tmp_path: Path):
+    (tmp_path / "a").write_bytes(b"nexus")
+
+    with patch("fcntl.ioctl", side_effect=OSError("Operation not supported")):
+        assert not clone_file(tmp_path / "a", tmp_path / "b")
+
+    assert (tmp_path / "b").read_bytes() == b"nexus"
+
+
+def test_sibling_mode_from_environment():
+    assert get_nexus_sibling_mode() == NexusSiblingMode.WRITE
+    with patch.dict("os.environ", {"HYPERION_NEXUS_SIBLING_MODE": "link"}):
+        assert get_nexus_sibling_mode() == NexusSiblingMode.LINK
@@ -1,5 +1,6 @@
 import os
 from contextlib import contextmanager
+from pathlib import Path
 from typing import Literal
 from unittest.mock import patch
 
@@ -11,7 +12,11 @@ from dodal.devices.detector.det_dim_constants import (
     PIXELS_Y_EIGER2_X_4M,
 )
 from dodal.devices.fast_grid_scan import GridAxis, ZebraGridScanParams
+from numpy.typing import DTypeLike
 
+from mx_bluesky.hyperion.external_interaction.nexus.compare_nexus import (
+    compare_nexus_files,
+)
 from mx_bluesky.hyperion.external_interaction.nexus.nexus_utils import (
     create_beam_and_attenuator_parameters,
 )
@@ -375,3 +380,61 @@ def test_given_data_files_not_yet_written_when_nexus_files_created_then_nexus_fi
             nexus_writer_1.master_file,
         ]:
             assert os.path.exists(filename)
+
+
+@pytest.mark.parametrize("bit_depth", [np.uint16, np.uint32])
+def test_completed_skeleton_the_same_as_file_written_in_one_go(
+    test_fgs_params: ThreeDGridScan, tmp_path: Path, bit_depth: DTypeLike
+):
+    test_fgs_params.storage_directory = str(tmp_path)
+    nexus_writer = create_nexus_writer(test_fgs_params, 1)
+    collection_times = nexus_writer.predict_collection_times()
+    nexus_writer.write_file(nexus_writer.nexus_file, bit_depth, *collection_times)
+    written_in_one_go = nexus_writer.nexus_file.rename(tmp_path / "in_one_go.nxs")
+
+    nexus_writer.write_skeleton(nexus_writer.nexus_file)
+    assert not nexus_writer.nexus_file.exists()
+    nexus_writer.write_file(nexus_writer.nexus_file, bit_depth, *collection_times)
+
+    assert compare_nexus_files(written_in_one_go, nexus_writer.nexus_file) == []
+
+
+def test_skeletons_not_completed_are_discarded(
+    test_fgs_params: ThreeDGridScan, tmp_path: Path
+):
+    test_fgs_params.storage_directory = str(tmp_path)
+    nexus_writer = create_nexus_writer(test_fgs_params, 1)
+
+    for filename in nexus_writer.nexgen_files:
+        nexus_writer.write_skeleton(filename)
+    assert len(list(tmp_path.iterdir())) == len(nexus_writer.nexgen_files)
+
+    nexus_writer.discard_skeletons()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("writer_num", [1, 2])
+def test_file_written_from_scan_descriptor_the_same_as_from_scan_points(
+    test_fgs_params: ThreeDGridScan, tmp_path: Path, writer_num: int
+):
+    test_fgs_params.storage_directory = str(tmp_path)
+    nexus_writer = create_nexus_writer(test_fgs_params, writer_num)
+    collection_times = nexus_writer.predict_collection_times()
+    nexus_writer.write_file(nexus_writer.nexus_file, np.uint16, *collection_times)
+    from_points = nexus_writer.nexus_file.rename(tmp_path / "from_points.nxs")
+
+    descriptor_writer = NexusWriter(
+        test_fgs_params,
+        nexus_writer.data_shape,
+        test_fgs_params.scan_descriptors[writer_num - 1],
+        run_number=nexus_writer.run_number,
+        vds_start_index=nexus_writer.start_index,
+        omega_start_deg=nexus_writer.goniometer.axes_list[0].start_pos,
+    )
+    descriptor_writer.beam = nexus_writer.beam
+    descriptor_writer.attenuator = nexus_writer.attenuator
+    descriptor_writer.write_file(
+        descriptor_writer.nexus_file, np.uint16, *collection_times
+    )
+
+    assert compare_nexus_files(from_points, descriptor_writer.nexus_file) == []
@@ -0,0 +1,204 @@
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.nexus.write_nexus import NexusWriter
+from mx_bluesky.hyperion.external_interaction.nexus.writing_service import (
+    NexusWritingService,
+)
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+
+
+def _fake_writer(files: list[str], write_file=None) -> MagicMock:
+    writer = MagicMock()
+    writer.file_groups = [[Path(f)] for f in files]
+    writer.predict_collection_times.return_value = ("start", "end")
+    if write_file:
+        writer.write_file.side_effect = write_file
+    return writer
+
+
+def test_all_files_of_a_run_written_at_the_same_time():
+    writing = threading.Barrier(4, timeout=5)
+    service = NexusWritingService(max_workers=4)
+    writers = [
+        _fake_writer([f"{i}.nxs", f"{i}_master.h5"], lambda *_: writing.wait())
+        for i in (1, 2)
+    ]
+
+    for writer in writers:
+        service.submit("run-1", writer, np.uint16)
+    report = service.wait_for_run("run-1")
+
+    assert report is not None
+    assert report.failed == []
+    assert [f.filename for f in report.files] == [
+        "1.nxs",
+        "1_master.h5",
+        "2.nxs",
+        "2_master.h5",
+    ]
+    writers[0].write_file.assert_any_call(Path("1.nxs"), np.uint16, "start", "end")
+
+
+def test_workers_bounded():
+    running = 0
+    most_running = 0
+    lock = threading.Lock()
+
+    def write_file(*_):
+        nonlocal running, most_running
+        with lock:
+            running += 1
+            most_running = max(most_running, running)
+        threading.Event().wait(0.02)
+        with lock:
+            running -= 1
+
+    service = NexusWritingService(max_workers=2)
+    service.submit("run-1", _fake_writer(list("abcdef"), write_file), np.uint8)
+    service.wait_for_run("run-1")
+
+    assert most_running == 2
+
+
+def test_failed_and_slow_files_reported_without_stopping_the_others():
+    finish = threading.Event()
+
+    def write_file(filename, *_):
+        if filename.name == "bad.nxs":
+            raise OSError("Disk full")
+        if filename.name == "slow.nxs":
+            finish.wait(5)
+
+    service = NexusWritingService()
+    service.submit(
+        "run-1", _fake_writer(["bad.nxs", "slow.nxs", "good.nxs"], write_file), "u2"
+    )
+    report = service.wait_for_run("run-1", timeout_s=0.1)
+    finish.set()
+
+    assert report is not None
+    assert report.failed == ["bad.nxs", "slow.nxs"]
+    assert "Disk full" in report.files[0].error
+    assert report.files[2].succeeded
+    assert report.as_dict()["failed"] == report.failed
+    assert service.failed_files("run-1") == ["bad.nxs", "slow.nxs"]
+    assert service.failed_files("run-1") == []
+
+
+def test_only_runs_with_files_reported():
+    service = NexusWritingService()
+    service.submit("run-1", _fake_writer(["a.nxs"]), np.uint16)
+
+    assert service.wait_for_run("run-2") is None
+    assert service.wait_for_run("run-1") is not None
+    assert service.wait_for_run("run-1") is None
+    assert service.failed_files("run-1") == []
+
+
+@patch("mx_bluesky.hyperion.external_interaction.nexus.write_nexus.NXmxFileWriter")
+def test_file_only_appears_once_completely_written(
+    nxmx_writer: MagicMock, test_fgs_params: ThreeDGridScan, tmp_path: Path
+):
+    test_fgs_params.storage_directory = str(tmp_path)
+    writer = NexusWriter(test_fgs_params, (10, 10, 10), {"sam_x": np.zeros(10)})
+    writer.beam = MagicMock()
+    writer.attenuator = MagicMock()
+
+    written = []
+
+    def write(*args, **kwargs):
+        temporary_file = nxmx_writer.call_args.args[0]
+        temporary_file.touch()
+        assert {p.name for p in tmp_path.iterdir()} == {*written, temporary_file.name}
+
+    nxmx_writer.return_value.write.side_effect = write
+
+    writer.write_file(writer.nexus_file, np.uint16, "start", "end")
+    written.append(writer.nexus_file.name)
+
+    assert {p.name for p in tmp_path.iterdir()} == set(written)
+
+    nxmx_writer.return_value.write_vds.side_effect = OSError("Disk full")
+    with pytest.raises(OSError):
+        writer.write_file(writer.master_file, np.uint16, "start", "end")
+
+    assert {p.name for p in tmp_path.iterdir()} == set(written)
+
+
+def test_derived_files_written_after_the_file_they_are_derived_from():
+    written = []
+    writer = _fake_writer([], lambda filename, *_: written.append(filename.name))
+    writer.file_groups = [[Path("1.nxs"), Path("1_master.h5")]]
+    service = NexusWritingService()
+
+    service.submit("run-1", writer, np.uint16)
+    report = service.wait_for_run("run-1")
+
+    assert written == ["1.nxs", "1_master.h5"]
+    assert report is not None
+    assert report.files[1].queued_s >= report.files[0].write_s
+
+
+def test_files_completed_once_their_skeletons_are_written():
+    events = []
+    writer = _fake_writer(["1.nxs"], lambda filename, *_: events.append("file"))
+    writer.nexgen_files = [Path("1.nxs")]
+    skeleton_started = threading.Event()
+    finish_skeleton = threading.Event()
+
+    def write_skeleton(filename):
+        skeleton_started.set()
+        finish_skeleton.wait(5)
+        events.append("skeleton")
+
+    writer.write_skeleton.side_effect = write_skeleton
+    service = NexusWritingService()
+
+    service.submit_skeletons("run-1", writer)
+    assert skeleton_started.wait(5)
+    service.submit("run-1", writer, np.uint16)
+    finish_skeleton.set()
+    report = service.wait_for_run("run-1")
+    service.discard_skeletons("run-1")
+
+    assert events == ["skeleton", "file"]
+    assert report is not None
+    assert report.files[0].skeleton_s > 0
+    writer.discard_skeletons.assert_called_once()
+
+
+def test_file_written_in_full_if_its_skeleton_fails():
+    writer = _fake_writer(["1.nxs"])
+    writer.nexgen_files = [Path("1.nxs")]
+    writer.write_skeleton.side_effect = OSError("Disk full")
+    service = NexusWritingService()
+
+    service.submit_skeletons("run-1", writer)
+    service.submit("run-1", writer, np.uint16)
+    report = service.wait_for_run("run-1")
+
+    assert report is not None
+    assert report.failed == []
+    assert report.files[0].skeleton_s == 0
+    writer.write_file.assert_called_once()
+
+
+def test_skeletons_of_a_run_which_never_reads_the_hardware_discarded():
+    writers = [_fake_writer([f"{i}.nxs"]) for i in (1, 2)]
+    service = NexusWritingService()
+    for writer in writers:
+        writer.nexgen_files = writer.file_groups[0]
+        service.submit_skeletons("run-1", writer)
+
+    assert service.wait_for_run("run-1") is None
+    service.discard_skeletons("run-1")
+
+    for writer in writers:
+        writer.write_skeleton.assert_called_once()
+        writer.discard_skeletons.assert_called_once()
+        writer.write_file.assert_not_called()
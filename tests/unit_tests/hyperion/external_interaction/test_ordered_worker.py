@@ -0,0 +1,85 @@
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mx_bluesky.hyperion.external_interaction.ordered_worker import (
+    OrderedRetryingWorker,
+    OrderedWorkerStats,
+)
+
+
+class RecordingWorker(OrderedRetryingWorker[str]):
+    def __init__(self, attempt: MagicMock, max_attempts: int = 3) -> None:
+        super().__init__(
+            "test-worker",
+            logging.getLogger("test"),
+            OrderedWorkerStats(),
+            max_attempts,
+            0.01,
+        )
+        self.attempt = attempt
+        self.failures: list[tuple[str, int]] = []
+        self.finished: list[tuple[str, bool]] = []
+
+    def submit(self, item: str) -> None:
+        self._submit(item)
+
+    def _attempt(self, item: str) -> None:
+        self.attempt(item)
+
+    def _is_retryable(self, item: str, error: Exception) -> bool:
+        return isinstance(error, ConnectionError)
+
+    def _on_failure(self, item: str, error: Exception, attempts: int) -> None:
+        self.failures.append((item, attempts))
+        if item == "broken":
+            raise RuntimeError("Failure handling failed")
+
+    def _finished(self, item: str, succeeded: bool) -> None:
+        self.finished.append((item, succeeded))
+
+
+@patch("mx_bluesky.hyperion.external_interaction.ordered_worker.time.sleep")
+def test_items_finished_in_order_with_only_retryable_errors_retried(mock_sleep):
+    attempt = MagicMock(
+        side_effect=[ConnectionError, None, ValueError, ConnectionError, None]
+    )
+    worker = RecordingWorker(attempt)
+    for item in ["a", "b", "c"]:
+        worker.submit(item)
+
+    assert worker.flush(timeout=5)
+    assert [c.args[0] for c in attempt.call_args_list] == ["a", "a", "b", "c", "c"]
+    assert worker.finished == [("a", True), ("b", False), ("c", True)]
+    assert worker.failures == [("b", 1)]
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.01, 0.01]
+    assert (worker.stats.completed, worker.stats.failed) == (2, 1)
+    assert worker.stats.retries == 2
+
+
+@patch("mx_bluesky.hyperion.external_interaction.ordered_worker.time.sleep")
+def test_gives_up_after_max_attempts(mock_sleep):
+    worker = RecordingWorker(MagicMock(side_effect=ConnectionError), max_attempts=3)
+    worker.submit("a")
+
+    assert worker.flush(timeout=5)
+    assert worker.failures == [("a", 3)]
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.01, 0.02]
+
+
+def test_worker_carries_on_when_handling_a_failure_fails():
+    worker = RecordingWorker(MagicMock(side_effect=[ValueError, None]))
+    worker.submit("broken")
+    worker.submit("next")
+
+    assert worker.flush(timeout=5)
+    assert worker.finished == [("broken", False), ("next", True)]
+    assert worker.depth == 0
+
+
+def test_worker_must_say_how_to_attempt_items():
+    class NoAttempt(OrderedRetryingWorker[str]): ...
+
+    with pytest.raises(TypeError):
+        NoAttempt("test-worker", logging.getLogger("test"), OrderedWorkerStats(), 1, 0)  # type: ignore
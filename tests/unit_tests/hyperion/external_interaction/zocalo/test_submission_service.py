@@ -0,0 +1,281 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import workflows
+from dodal.devices.zocalo import ZocaloStartInfo, ZocaloTrigger
+from workflows.transport.common_transport import CommonTransport
+
+from mx_bluesky.hyperion.external_interaction.zocalo.submission_service import (
+    QueuedZocaloTrigger,
+    ZocaloSubmissionService,
+)
+
+
+class StandInZocaloBroker:
+    """A broker in the process taking the place of RabbitMQ, which records the messages
+    committed to it as (environment, destination, message, headers) and the
+    connections made to it. `connect` is
+    given to a ZocaloSubmissionService in place of connecting to Zocalo.
+
+    Messages are only kept once their transaction is committed. Connecting takes
+    `connect_latency_s` and each commit `commit_latency_s`, to stand in for the
+    handshake with and confirmation from a real broker. `fail_next_sends` and
+    `fail_next_commits` make that many of the next sends or commits fail as if the
+    connection had dropped."""
+
+    def __init__(self) -> None:
+        self.connect_latency_s = 0.0
+        self.commit_latency_s = 0.0
+        self.fail_next_sends = 0
+        self.fail_next_commits = 0
+        self.messages: list[tuple[str, str, dict, dict]] = []
+        self.transports: list[StandInTransport] = []
+        self._lock = threading.Lock()
+
+    def connect(self, environment: str) -> "StandInTransport":
+        transport = StandInTransport(self, environment)
+        transport.connect()
+        self.transports.append(transport)
+        return transport
+
+    def _fail(self, counter: str) -> bool:
+        with self._lock:
+            if failing := getattr(self, counter) > 0:
+                setattr(self, counter, getattr(self, counter) - 1)
+            return failing
+
+
+class StandInTransport(CommonTransport):
+    def __init__(self, broker: StandInZocaloBroker, environment: str) -> None:
+        super().__init__()
+        self.broker = broker
+        self.environment = environment
+        self._connected = False
+        self._transactions: dict[int, list[tuple]] = {}
+
+    def connect(self) -> bool:
+        time.sleep(self.broker.connect_latency_s)
+        self._connected = True
+        return True
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def disconnect(self):
+        self._connected = False
+        self._transactions.clear()
+
+    def _check_connected(self, counter: str | None = None) -> None:
+        if not self._connected:
+            raise workflows.Disconnected("Not connected to the stand-in broker")
+        if counter and self.broker._fail(counter):
+            self.disconnect()
+            raise workflows.Disconnected("Stand-in broker dropped the connection")
+
+    def _send(self, destination, message, headers=None, transaction=None, **kwargs):
+        self._check_connected("fail_next_sends")
+        sent = (self.environment, destination, message, headers or {})
+        if transaction is None:
+            with self.broker._lock:
+                self.broker.messages.append(sent)
+        else:
+            self._transactions[transaction].append(sent)
+
+    def _transaction_begin(self, transaction_id: int, **kwargs) -> None:
+        self._check_connected()
+        self._transactions[transaction_id] = []
+
+    def _transaction_abort(self, transaction_id: int, **kwargs) -> None:
+        self._transactions.pop(transaction_id, None)
+
+    def _transaction_commit(self, transaction_id: int, **kwargs) -> None:
+        time.sleep(self.broker.commit_latency_s)
+        self._check_connected("fail_next_commits")
+        with self.broker._lock:
+            self.broker.messages.extend(self._transactions.pop(transaction_id))
+
+
+@pytest.fixture
+def broker():
+    return StandInZocaloBroker()
+
+
+@pytest.fixture
+def service(broker: StandInZocaloBroker, tmp_path):
+    return ZocaloSubmissionService(
+        broker.connect, tmp_path / "dead_letters.jsonl", backoff_s=0
+    )
+
+
+def _submit_runs(service: ZocaloSubmissionService, count: int, environment="test_env"):
+    return [
+        service.submit(environment, {"event": event, "ispyb_dcid": dcid})
+        for dcid in range(count)
+        for event in ("start", "end")
+    ]
+
+
+def test_messages_sent_in_order_over_one_connection(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    _submit_runs(service, 3)
+    assert service.flush(timeout=5)
+
+    assert len(broker.transports) == 1
+    assert [message["parameters"] for _, _, message, _ in broker.messages] == [
+        {"event": event, "ispyb_dcid": dcid}
+        for dcid in range(3)
+        for event in ("start", "end")
+    ]
+    assert service.stats.connections == 1
+    assert service.stats.completed == 6
+
+
+def test_one_connection_kept_for_each_environment(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    _submit_runs(service, 2, "env_1")
+    _submit_runs(service, 2, "env_2")
+    _submit_runs(service, 2, "env_1")
+    assert service.flush(timeout=5)
+
+    assert len(broker.transports) == 2
+    assert [environment for environment, *_ in broker.messages] == 4 * ["env_1"] + 4 * [
+        "env_2"
+    ] + 4 * ["env_1"]
+
+
+def test_submit_does_not_wait_for_broker(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    broker.connect_latency_s = broker.commit_latency_s = 0.1
+
+    start = time.monotonic()
+    submissions = _submit_runs(service, 2)
+    assert time.monotonic() - start < broker.commit_latency_s
+
+    assert all(submission.wait(timeout=5) for submission in submissions)
+    assert service.stats.max_latency_s >= 0.1 + 4 * 0.1
+    assert service.stats.mean_latency_s <= service.stats.max_latency_s
+
+
+def test_message_only_delivered_once_committed(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    broker.fail_next_commits = 1
+
+    start, _ = _submit_runs(service, 1)
+    assert start.wait(timeout=5)
+    assert service.flush(timeout=5)
+
+    # Sent on the first connection but not committed, so only delivered by the retry
+    assert [message["parameters"]["event"] for _, _, message, _ in broker.messages] == [
+        "start",
+        "end",
+    ]
+    assert len(broker.transports) == 2
+    assert service.stats.retries == 1
+    assert service.stats.completed == 2
+
+
+def test_failed_send_retried_on_new_connection(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    broker.fail_next_sends = 2
+
+    submissions = _submit_runs(service, 1)
+    assert service.flush(timeout=5)
+
+    assert all(submission.delivered for submission in submissions)
+    assert len(broker.messages) == 2
+    assert len(broker.transports) == 3
+    assert service.stats.retries == 2
+    assert service.stats.connections == 3
+
+
+def test_message_dead_lettered_after_max_attempts_and_others_still_sent(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    broker.fail_next_sends = service.max_attempts
+
+    start, end = _submit_runs(service, 1)
+    assert service.flush(timeout=5)
+
+    assert not start.delivered
+    assert end.delivered
+    assert len(broker.messages) == 1
+    assert service.dead_letter_path
+    dead_letters = [
+        json.loads(line) for line in service.dead_letter_path.read_text().splitlines()
+    ]
+    assert len(dead_letters) == 1
+    assert dead_letters[0]["environment"] == "test_env"
+    assert dead_letters[0]["destination"] == "processing_recipe"
+    assert dead_letters[0]["message"] == {
+        "recipes": ["mimas"],
+        "parameters": {"event": "start", "ispyb_dcid": 0},
+    }
+    assert "Disconnected" in dead_letters[0]["error"]
+    assert service.stats.dead_lettered == 1
+
+
+def test_dead_letter_path_from_environment_when_not_given(
+    broker: StandInZocaloBroker, tmp_path
+):
+    service = ZocaloSubmissionService(broker.connect, max_attempts=1)
+    broker.fail_next_sends = 1
+    dead_letter_path = tmp_path / "zocalo" / "dead.jsonl"
+
+    with patch.dict("os.environ", {"ZOCALO_DEAD_LETTER_PATH": str(dead_letter_path)}):
+        _submit_runs(service, 1)
+        assert service.flush(timeout=5)
+
+    assert len(dead_letter_path.read_text().splitlines()) == 1
+
+
+def test_close_disconnects_once_flushed(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    broker.commit_latency_s = 0.05
+    _submit_runs(service, 2)
+    service.close(timeout=5)
+
+    assert len(broker.messages) == 4
+    assert len(broker.transports) == 1
+    assert not broker.transports[0].is_connected()
+
+
+def test_worker_only_runs_while_messages_pending(service: ZocaloSubmissionService):
+    _submit_runs(service, 1)
+    assert service.flush(timeout=5)
+
+    deadline = time.monotonic() + 5
+    while service._worker is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service._worker is None
+    assert not any(t.name == "zocalo-submission" for t in threading.enumerate())
+
+
+def test_queued_trigger_sends_same_messages_as_zocalo_trigger(
+    broker: StandInZocaloBroker, service: ZocaloSubmissionService
+):
+    start_info = ZocaloStartInfo(100, "test_path", 0, 200, 0)
+    with patch(
+        "dodal.devices.zocalo.zocalo_interaction._get_zocalo_connection",
+        broker.connect,
+    ):
+        trigger = ZocaloTrigger("test_env")
+        trigger.run_start(start_info)
+        trigger.run_end(100)
+    expected = list(broker.messages)
+    broker.messages.clear()
+
+    trigger = QueuedZocaloTrigger("test_env", service)
+    trigger.run_start(start_info)
+    trigger.run_end(100)
+    assert service.flush(timeout=5)
+
+    assert broker.messages == expected
@@ -0,0 +1,100 @@
+import os
+import shutil
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from dodal.devices.detector.det_dist_to_beam_converter import (
+    Axis,
+    DetectorDistanceToBeamXYConverter,
+)
+
+from mx_bluesky.hyperion.parameters.detector import (
+    BEAM_XY_LOOKUP_TABLES,
+    BeamXYLookupTables,
+    CachedDetectorDistanceToBeamXYConverter,
+)
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+from mx_bluesky.hyperion.parameters.rotation import RotationScan
+
+from ....conftest import raw_params_from_file
+
+TEST_LUT = "tests/test_data/test_det_dist_converter.txt"
+
+
+@pytest.fixture
+def lut_copy(tmp_path):
+    return shutil.copy(TEST_LUT, tmp_path / "lut.txt")
+
+
+def test_cached_converter_matches_dodal_converter():
+    dodal_converter = DetectorDistanceToBeamXYConverter(TEST_LUT)
+    cached_converter = CachedDetectorDistanceToBeamXYConverter(TEST_LUT)
+    distances = np.linspace(50, 500, 19)
+
+    for axis in Axis:
+        np.testing.assert_array_equal(
+            cached_converter.get_beam_xy_from_det_dists(distances, axis),
+            [dodal_converter.get_beam_xy_from_det_dist(d, axis) for d in distances],
+        )
+        assert cached_converter.get_beam_xy_from_det_dist(
+            123.4, axis
+        ) == dodal_converter.get_beam_xy_from_det_dist(123.4, axis)
+
+
+def test_lookup_table_only_loaded_once(lut_copy):
+    tables = BeamXYLookupTables()
+    assert tables.get(lut_copy) is tables.get(lut_copy)
+    assert tables.loads == 1
+
+
+def test_lookup_table_reloaded_when_file_modified(lut_copy):
+    tables = BeamXYLookupTables()
+    first = tables.get(lut_copy)
+    stat = os.stat(lut_copy)
+    os.utime(lut_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert tables.get(lut_copy) is not first
+    assert tables.loads == 2
+
+
+def test_detector_params_share_converter_across_accesses_and_experiments(tmp_path):
+    grid_params = ThreeDGridScan(
+        **raw_params_from_file(
+            "tests/test_data/parameter_json_files/good_test_parameters.json"
+        )
+    )
+    rotation_params = RotationScan(
+        **raw_params_from_file(
+            "tests/test_data/parameter_json_files/good_test_rotation_scan_parameters.json"
+        )
+    )
+    grid_params.storage_directory = rotation_params.storage_directory = str(tmp_path)
+    BEAM_XY_LOOKUP_TABLES.clear()
+    loads_before = BEAM_XY_LOOKUP_TABLES.loads
+
+    converters = {
+        id(grid_params.detector_params.beam_xy_converter),
+        id(grid_params.detector_params.beam_xy_converter),
+        id(rotation_params.detector_params.beam_xy_converter),
+    }
+
+    assert len(converters) == 1
+    assert BEAM_XY_LOOKUP_TABLES.loads == loads_before + 1
+
+
+@patch("mx_bluesky.hyperion.parameters.components.os.makedirs", wraps=os.makedirs)
+def test_storage_directory_only_created_once(mock_makedirs, tmp_path):
+    params = ThreeDGridScan(
+        **raw_params_from_file(
+            "tests/test_data/parameter_json_files/good_test_parameters.json"
+        )
+    )
+    params.storage_directory = str(tmp_path)
+    params.detector_params  # noqa: B018
+    params.detector_params  # noqa: B018
+    mock_makedirs.assert_called_once_with(str(tmp_path), exist_ok=True)
+
+    params.storage_directory = str(tmp_path / "other")
+    params.detector_params  # noqa: B018
+    assert mock_makedirs.call_count == 2
@@ -5,6 +5,7 @@ import pytest
 from pydantic import ValidationError
 
 from mx_bluesky.hyperion.parameters.gridscan import (
+    GridCommon,
     OddYStepsException,
     RobotLoadThenCentre,
     ThreeDGridScan,
@@ -110,3 +111,15 @@ def test_osc_is_used():
         params = RotationScan(**raw_params)
         assert params.rotation_increment_deg == osc
         assert params.num_images == int(params.scan_width_deg / osc)
+
+
+def test_from_json_with_extras_ignores_them_without_changing_config(
+    minimal_3d_gridscan_params,
+):
+    json_params = json.dumps(minimal_3d_gridscan_params | {"unknown_field": 1})
+
+    params = GridCommon.from_json(json_params, allow_extras=True)
+
+    assert params.sample_id == 123
+    with pytest.raises(ValidationError):
+        GridCommon.from_json(json_params)
@@ -0,0 +1,160 @@
+import json
+
+import numpy as np
+import pytest
+from scanspec.core import Path as ScanPath
+
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+from mx_bluesky.hyperion.parameters.rotation import RotationScan
+from mx_bluesky.hyperion.parameters.scan_geometry import (
+    ScanDescriptor,
+    frames_per_scan,
+)
+
+from ....conftest import raw_params_from_file
+
+
+@pytest.fixture
+def grid_params():
+    return ThreeDGridScan(
+        **raw_params_from_file(
+            "tests/test_data/parameter_json_files/good_test_parameters.json"
+        )
+    )
+
+
+def _scanspec_points(spec):
+    return ScanPath(spec.calculate()).consume().midpoints
+
+
+def _assert_points_equal(actual, expected):
+    assert list(actual.keys()) == list(expected.keys())
+    for axis in expected:
+        np.testing.assert_array_equal(actual[axis], expected[axis])
+
+
+@pytest.mark.parametrize(
+    "x_steps, y_steps, z_steps", [(1, 1, 1), (10, 10, 1), (7, 4, 9), (40, 31, 12)]
+)
+def test_geometry_points_match_scanspec(
+    grid_params: ThreeDGridScan, x_steps: int, y_steps: int, z_steps: int
+):
+    grid_params.x_steps = x_steps
+    grid_params.y_steps = y_steps
+    grid_params.z_steps = z_steps
+    grid_params.x_step_size_um = 0.3
+    grid_params.x_start_um = -2.7
+
+    _assert_points_equal(
+        grid_params.scan_points_first_grid, _scanspec_points(grid_params.grid_1_spec)
+    )
+    _assert_points_equal(
+        grid_params.scan_points_second_grid, _scanspec_points(grid_params.grid_2_spec)
+    )
+    _assert_points_equal(
+        grid_params.scan_points, _scanspec_points(grid_params.scan_spec)
+    )
+    assert grid_params.num_images == len(grid_params.scan_points["sam_x"])
+    assert grid_params.scan_indices == [
+        0,
+        len(_scanspec_points(grid_params.grid_1_spec)["sam_x"]),
+    ]
+
+
+def test_geometry_is_only_generated_once(grid_params: ThreeDGridScan):
+    assert grid_params.scan_points is grid_params.scan_points
+    assert grid_params.geometry is grid_params.geometry
+
+
+def test_geometry_regenerated_when_grid_field_changes(grid_params: ThreeDGridScan):
+    old_points = grid_params.scan_points_first_grid
+    old_num_images = grid_params.num_images
+
+    grid_params.y_steps += 1
+
+    assert grid_params.scan_points_first_grid is not old_points
+    assert grid_params.num_images == old_num_images + grid_params.x_steps
+
+
+def test_geometry_kept_when_other_fields_change(grid_params: ThreeDGridScan):
+    geometry = grid_params.geometry
+    grid_params.exposure_time_s = 0.5
+    grid_params.det_dist_to_beam_converter_path = "some/other/path"
+    assert grid_params.geometry is geometry
+
+
+def test_geometry_points_are_read_only(grid_params: ThreeDGridScan):
+    with pytest.raises(ValueError):
+        grid_params.scan_points["sam_x"][0] = 1
+
+
+@pytest.mark.parametrize(
+    "x_steps, y_steps, z_steps", [(1, 1, 1), (10, 10, 1), (7, 4, 9), (40, 31, 12)]
+)
+def test_scan_descriptors_give_the_grid_points(
+    grid_params: ThreeDGridScan, x_steps: int, y_steps: int, z_steps: int
+):
+    grid_params.x_steps = x_steps
+    grid_params.y_steps = y_steps
+    grid_params.z_steps = z_steps
+
+    first, second = grid_params.scan_descriptors
+
+    _assert_points_equal(first.points(), grid_params.scan_points_first_grid)
+    _assert_points_equal(second.points(), grid_params.scan_points_second_grid)
+    assert [first.num_frames, second.num_frames] == [
+        x_steps * y_steps,
+        x_steps * z_steps,
+    ]
+
+
+def test_rotation_scan_descriptor_gives_the_rotation_points():
+    params = RotationScan(
+        **raw_params_from_file(
+            "tests/test_data/parameter_json_files/good_test_rotation_scan_parameters.json"
+        )
+    )
+
+    points = params.scan_descriptor.points()
+
+    np.testing.assert_allclose(points["omega"], params.scan_points["omega"])
+    assert params.scan_descriptor.num_frames == params.num_images
+
+
+def test_scan_descriptors_read_back_from_dicts_and_much_smaller_than_points(
+    grid_params: ThreeDGridScan,
+):
+    for descriptor, points in zip(
+        grid_params.scan_descriptors,
+        [grid_params.scan_points_first_grid, grid_params.scan_points_second_grid],
+        strict=True,
+    ):
+        as_dict = json.loads(json.dumps(descriptor.to_dict()))
+        assert ScanDescriptor.from_dict(as_dict) == descriptor
+        assert len(json.dumps(as_dict)) * 10 < sum(
+            len(json.dumps(p.tolist())) for p in points.values()
+        )
+
+
+def test_frames_per_scan_read_from_descriptors_or_points(
+    grid_params: ThreeDGridScan,
+):
+    expected = [d.num_frames for d in grid_params.scan_descriptors]
+
+    assert (
+        frames_per_scan(
+            {"scan_descriptors": [d.to_dict() for d in grid_params.scan_descriptors]}
+        )
+        == expected
+    )
+    assert (
+        frames_per_scan(
+            {
+                "scan_points": [
+                    grid_params.scan_points_first_grid,
+                    grid_params.scan_points_second_grid,
+                ]
+            }
+        )
+        == expected
+    )
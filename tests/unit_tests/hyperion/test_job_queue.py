@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock
+
+from mx_bluesky.hyperion.job_queue import Job, JobQueue, JobState
+
+
+def _job(name: str = "plan") -> Job:
+    return Job(name, MagicMock(), MagicMock(), MagicMock())
+
+
+def test_jobs_are_popped_in_submission_order_and_marked_running():
+    queue = JobQueue()
+    first, second = queue.submit(_job("first")), queue.submit(_job("second"))
+
+    assert queue.pop_next() is first
+    assert first.state == JobState.RUNNING
+    assert queue.running is first
+    assert queue.pop_next() is second
+    assert queue.pop_next() is None
+
+
+def test_paused_queue_keeps_jobs_until_resumed():
+    queue = JobQueue()
+    job = queue.submit(_job())
+    queue.pause()
+
+    assert queue.pop_next() is None
+    assert queue.paused
+    assert queue.resume()
+    assert not queue.resume()
+    assert queue.pop_next() is job
+
+
+def test_cancelled_job_is_removed_from_queue():
+    queue = JobQueue()
+    job = queue.submit(_job())
+
+    assert queue.cancel(job.job_id)
+    assert job.state == JobState.CANCELLED
+    assert len(queue) == 0
+    assert not queue.cancel(job.job_id)
+
+
+def test_running_job_cannot_be_cancelled():
+    queue = JobQueue()
+    job = queue.submit(_job())
+    queue.pop_next()
+
+    assert not queue.cancel(job.job_id)
+
+
+def test_reorder_moves_job_to_front():
+    queue = JobQueue()
+    jobs = [queue.submit(_job(str(i))) for i in range(3)]
+
+    assert queue.reorder(jobs[2].job_id, 0)
+
+    assert [j["plan_name"] for j in queue.list_jobs()] == ["2", "0", "1"]
+    assert not queue.reorder("not_a_job", 0)
+
+
+def test_list_jobs_includes_running_job_first():
+    queue = JobQueue()
+    running = queue.submit(_job("running"))
+    queue.submit(_job("queued"))
+    queue.pop_next()
+
+    jobs = queue.list_jobs()
+
+    assert jobs[0]["job_id"] == running.job_id
+    assert jobs[0]["state"] == JobState.RUNNING.value
+    assert jobs[1]["state"] == JobState.QUEUED.value
+
+
+def test_metrics_report_depth_wait_time_and_gaps():
+    queue = JobQueue()
+    assert queue.metrics["last_wait_time_s"] is None
+    job = queue.submit(_job())
+    queue.submit(_job())
+    queue.pop_next()
+    queue.finish(job, JobState.FINISHED)
+    queue.record_gap(0.5)
+    queue.record_gap(0.1)
+
+    metrics = queue.metrics
+
+    assert metrics["queue_depth"] == 1
+    assert metrics["last_wait_time_s"] is not None
+    assert metrics["last_wait_time_s"] >= 0
+    assert metrics["last_gap_between_plans_s"] == 0.1
+    assert metrics["max_gap_between_plans_s"] == 0.5
+    assert queue.running is None
+    assert job.finished_at is not None
@@ -8,7 +8,7 @@ from collections.abc import Callable
 from dataclasses import dataclass
 from queue import Queue
 from sys import argv
-from time import sleep
+from time import perf_counter, sleep
 from typing import Any
 from unittest.mock import MagicMock, patch
 
@@ -29,6 +29,11 @@ from mx_bluesky.hyperion.__main__ import (
 )
 from mx_bluesky.hyperion.exceptions import WarningException
 from mx_bluesky.hyperion.experiment_plans.experiment_registry import PLAN_REGISTRY
+from mx_bluesky.hyperion.external_interaction.callbacks.document_bus import (
+    SERIALISERS,
+    EventBatchingPublisher,
+)
+from mx_bluesky.hyperion.job_queue import JobState
 from mx_bluesky.hyperion.log import LOGGER
 from mx_bluesky.hyperion.parameters.cli import parse_cli_args
 from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
@@ -332,6 +337,42 @@ def test_cli_args_parse(arg_list, parsed_arg_values):
     assert test_args.verbose_event_logging == parsed_arg_values[1]
     assert test_args.skip_startup_connection == parsed_arg_values[2]
     assert test_args.use_external_callbacks == parsed_arg_values[3]
+    assert test_args.zmq_serialiser == "pickle"
+    assert test_args.zmq_event_batch_size == 1
+
+
+def test_cli_args_parse_zmq_serialiser_and_event_batch_size():
+    argv[1:] = [
+        "--external-callbacks",
+        "--zmq-serialiser",
+        "msgpack-zlib",
+        "--zmq-event-batch-size",
+        "20",
+    ]
+    test_args = parse_cli_args()
+    assert test_args.zmq_serialiser == "msgpack-zlib"
+    assert test_args.zmq_event_batch_size == 20
+
+
+@patch("mx_bluesky.hyperion.__main__.Publisher")
+def test_blueskyrunner_publishes_with_chosen_serialiser_and_event_batching(
+    publisher: MagicMock,
+):
+    RE = MagicMock()
+    runner = BlueskyRunner(
+        RE,
+        MagicMock(),
+        skip_startup_connection=True,
+        use_external_callbacks=True,
+        zmq_serialiser="msgpack",
+        zmq_event_batch_size=20,
+    )
+
+    assert publisher.call_args.kwargs["serializer"] is SERIALISERS["msgpack"]
+    subscribed = [c.args[0] for c in RE.subscribe.call_args_list]
+    batching = next(s for s in subscribed if isinstance(s, EventBatchingPublisher))
+    assert batching.publish is runner.publisher
+    assert batching.max_events == 20
 
 
 @patch("mx_bluesky.hyperion.__main__.do_default_logging_setup")
@@ -518,6 +559,181 @@ def test_when_blueskyrunner_initiated_and_skip_flag_is_not_set_then_all_plans_se
         assert mock_setup.call_count == 4
 
 
+def test_when_plan_started_twice_then_devices_set_up_once_and_cache_reported_in_status(
+    test_env: ClientAndRunEngine,
+):
+    test_env.mock_run_engine.RE_takes_time = False
+    test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    wait_for_run_engine_status(test_env.client)
+    test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    response_json = wait_for_run_engine_status(test_env.client)
+
+    PLAN_REGISTRY["flyscan_xray_centre"]["setup"].assert_called_once()
+    assert response_json["composite_cache"]["plan_name"] == "flyscan_xray_centre"
+    assert response_json["composite_cache"]["hit"] is True
+
+
+SUBMIT_ENDPOINT = "/queue/flyscan_xray_centre/" + Actions.SUBMIT.value
+QUEUE_ENDPOINT = "/queue"
+RESUME_ENDPOINT = "/queue/" + Actions.RESUME.value
+
+
+def wait_for_queue(
+    client: FlaskClient,
+    queue_check: Callable[[dict], bool] = lambda queue: queue["jobs"] == [],
+    attempts=10,
+):
+    while attempts != 0:
+        queue = client.get(QUEUE_ENDPOINT).json
+        if queue_check(queue):
+            return queue
+        attempts -= 1
+        sleep(0.2)
+    raise AssertionError(f"Queue not as expected: {queue}")
+
+
+def test_job_submitted_while_busy_is_queued_and_run_after_current_plan(
+    test_env: ClientAndRunEngine,
+):
+    test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    response = test_env.client.put(SUBMIT_ENDPOINT, data=TEST_PARAMS).json
+    assert isinstance(response, dict)
+    assert response["status"] == Status.SUCCESS.value
+
+    queue = test_env.client.get(QUEUE_ENDPOINT).json
+    assert queue["metrics"]["queue_depth"] == 1
+    assert queue["jobs"][0]["job_id"] == response["job_id"]
+
+    test_env.mock_run_engine.RE_takes_time = False
+    queue = wait_for_queue(test_env.client)
+    assert queue["metrics"]["last_wait_time_s"] > 0
+    assert queue["metrics"]["last_gap_between_plans_s"] is not None
+
+
+def test_queued_job_can_be_cancelled_and_reordered(test_env: ClientAndRunEngine):
+    test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    first = test_env.client.put(SUBMIT_ENDPOINT, data=TEST_PARAMS).json["job_id"]
+    second = test_env.client.put(SUBMIT_ENDPOINT, data=TEST_PARAMS).json["job_id"]
+
+    response = test_env.client.put(
+        f"/queue/{second}/{Actions.REORDER.value}", data=json.dumps({"position": 0})
+    )
+    check_status_in_response(response, Status.SUCCESS)
+    jobs = test_env.client.get(QUEUE_ENDPOINT).json["jobs"]
+    assert [job["job_id"] for job in jobs] == [second, first]
+
+    response = test_env.client.put(f"/queue/{first}/{Actions.CANCEL.value}")
+    check_status_in_response(response, Status.SUCCESS)
+    response = test_env.client.put(f"/queue/{first}/{Actions.CANCEL.value}")
+    check_status_in_response(response, Status.FAILED)
+    jobs = test_env.client.get(QUEUE_ENDPOINT).json["jobs"]
+    assert [job["job_id"] for job in jobs] == [second]
+
+    test_env.mock_run_engine.RE_takes_time = False
+
+
+def _fail_plan_with_job_queued(test_env: ClientAndRunEngine) -> str:
+    test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    job_id = test_env.client.put(SUBMIT_ENDPOINT, data=TEST_PARAMS).json["job_id"]
+    test_env.mock_run_engine.error = Exception("D'Oh")
+    queue = wait_for_queue(test_env.client, lambda queue: queue["paused"])
+    test_env.mock_run_engine.error = None
+    test_env.mock_run_engine.RE_takes_time = False
+    assert [job["job_id"] for job in queue["jobs"]] == [job_id]
+    assert queue["jobs"][0]["state"] == JobState.QUEUED.value
+    return job_id
+
+
+def test_queue_paused_after_plan_fails_until_resumed(test_env: ClientAndRunEngine):
+    _fail_plan_with_job_queued(test_env)
+    assert test_env.client.get(STATUS_ENDPOINT).json["status"] == Status.FAILED.value
+
+    response = test_env.client.put(RESUME_ENDPOINT)
+    check_status_in_response(response, Status.SUCCESS)
+    queue = wait_for_queue(test_env.client)
+    assert queue["paused"] is False
+
+    response = test_env.client.put(RESUME_ENDPOINT)
+    check_status_in_response(response, Status.FAILED)
+
+
+def test_start_refused_while_jobs_are_queued(test_env: ClientAndRunEngine):
+    job_id = _fail_plan_with_job_queued(test_env)
+
+    response = test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    check_status_in_response(response, Status.FAILED)
+    jobs = test_env.client.get(QUEUE_ENDPOINT).json["jobs"]
+    assert [job["job_id"] for job in jobs] == [job_id]
+
+    test_env.client.put(RESUME_ENDPOINT)
+    wait_for_queue(test_env.client)
+    response = test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    check_status_in_response(response, Status.SUCCESS)
+
+
+def test_submitting_job_for_unknown_plan_fails(test_env: ClientAndRunEngine):
+    test_env.mock_run_engine.RE_takes_time = False
+    response = test_env.client.put(
+        "/queue/bad_plan/" + Actions.SUBMIT.value, data=TEST_PARAMS
+    )
+    check_status_in_response(response, Status.FAILED)
+    assert test_env.client.get(QUEUE_ENDPOINT).json["jobs"] == []
+
+
+def test_status_long_poll_returns_when_status_changes(test_env: ClientAndRunEngine):
+    version = test_env.client.get(STATUS_ENDPOINT).json["version"]
+
+    test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    response = test_env.client.get(f"{STATUS_ENDPOINT}?since={version}&timeout=5")
+
+    check_status_in_response(response, Status.BUSY)
+    assert response.json["version"] > version
+    test_env.mock_run_engine.RE_takes_time = False
+
+
+def test_status_long_poll_returns_current_status_on_timeout(
+    test_env: ClientAndRunEngine,
+):
+    test_env.mock_run_engine.RE_takes_time = False
+    version = test_env.client.get(STATUS_ENDPOINT).json["version"]
+
+    response = test_env.client.get(f"{STATUS_ENDPOINT}?since={version}&timeout=0.1")
+
+    check_status_in_response(response, Status.IDLE)
+    assert response.json["version"] == version
+
+
+def test_status_stream_sends_current_status_as_event(test_env: ClientAndRunEngine):
+    test_env.mock_run_engine.RE_takes_time = False
+    response = test_env.client.get("/status/stream", buffered=False)
+
+    assert response.mimetype == "text/event-stream"
+    first_event = next(response.response)
+    assert first_event.startswith(b"data: ")
+    assert json.loads(first_event[6:])["status"] == Status.IDLE.value
+    response.close()
+
+
+def _mean_status_latency_s(client: FlaskClient, requests: int = 200) -> float:
+    start = perf_counter()
+    for _ in range(requests):
+        client.get(STATUS_ENDPOINT)
+    return (perf_counter() - start) / requests
+
+
+def test_status_latency_does_not_grow_while_plan_running(
+    test_env: ClientAndRunEngine,
+):
+    idle_latency = _mean_status_latency_s(test_env.client)
+
+    test_env.client.put(START_ENDPOINT, data=TEST_PARAMS)
+    busy_latency = _mean_status_latency_s(test_env.client)
+    check_status_in_response(test_env.client.get(STATUS_ENDPOINT), Status.BUSY)
+    test_env.mock_run_engine.RE_takes_time = False
+
+    assert busy_latency < idle_latency * 3 + 0.001
+
+
 def test_log_on_invalid_json_params(test_env: ClientAndRunEngine):
     test_env.mock_run_engine.RE_takes_time = False
     response = test_env.client.put(TEST_BAD_PARAM_ENDPOINT, data='{"bad":1}').json
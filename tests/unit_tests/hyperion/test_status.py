@@ -0,0 +1,55 @@
+import json
+import threading
+from time import sleep
+
+from mx_bluesky.hyperion.status import StatusBroadcaster
+
+
+def test_published_status_is_serialised_with_version():
+    broadcaster = StatusBroadcaster()
+    broadcaster.publish({"status": "Idle"})
+
+    version, snapshot = broadcaster.latest
+
+    assert version == 1
+    assert json.loads(snapshot) == {"status": "Idle", "version": 1}
+
+
+def test_wait_for_change_returns_immediately_if_already_newer():
+    broadcaster = StatusBroadcaster()
+    broadcaster.publish({"status": "Idle"})
+
+    assert broadcaster.wait_for_change(0, timeout_s=10)[0] == 1
+
+
+def test_wait_for_change_wakes_on_publish():
+    broadcaster = StatusBroadcaster()
+    broadcaster.publish({"status": "Idle"})
+
+    def publish_later():
+        sleep(0.05)
+        broadcaster.publish({"status": "Busy"})
+
+    threading.Thread(target=publish_later).start()
+    version, snapshot = broadcaster.wait_for_change(1, timeout_s=5)
+
+    assert version == 2
+    assert json.loads(snapshot)["status"] == "Busy"
+
+
+def test_wait_for_change_times_out_with_current_snapshot():
+    broadcaster = StatusBroadcaster()
+    broadcaster.publish({"status": "Idle"})
+
+    assert broadcaster.wait_for_change(1, timeout_s=0.01)[0] == 1
+
+
+def test_stream_yields_current_status_then_changes_and_keepalives():
+    broadcaster = StatusBroadcaster()
+    broadcaster.publish({"status": "Idle"})
+    stream = broadcaster.stream(keepalive_s=0.01)
+
+    assert json.loads(next(stream)[6:])["status"] == "Idle"
+    assert next(stream) == b": keepalive\n\n"
+    broadcaster.publish({"status": "Busy"})
+    assert json.loads(next(stream)[6:])["status"] == "Busy"
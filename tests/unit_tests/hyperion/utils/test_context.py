@@ -5,6 +5,7 @@ import pytest
 from ophyd.device import Device
 
 from mx_bluesky.hyperion.utils.context import (
+    DeviceCompositeCache,
     device_composite_from_context,
     find_device_in_context,
 )
@@ -72,3 +73,75 @@ def test_device_composite_from_context():
 
     assert composite.device2 == device2_instance
     assert isinstance(composite.device2, _DeviceType2)
+
+
+@dataclasses.dataclass
+class _CachedComposite:
+    device1: _DeviceType1
+
+
+def _context_with_device(device):
+    context = MagicMock()
+    context.find_device = lambda name: {"device1": device}.get(name)
+    return context
+
+
+def _setup(context):
+    return device_composite_from_context(context, _CachedComposite)
+
+
+def test_composite_cache_builds_composite_once_and_reports_hits():
+    context = _context_with_device(MagicMock(spec=_DeviceType1))
+    setup = MagicMock(side_effect=_setup)
+    cache = DeviceCompositeCache()
+
+    first = cache.get(context, "plan", setup)
+    assert cache.last_lookup is not None and not cache.last_lookup.hit
+    second = cache.get(context, "plan", setup)
+
+    assert first is second
+    setup.assert_called_once()
+    assert cache.last_lookup.hit
+    assert cache.last_lookup.plan_name == "plan"
+    assert cache.last_lookup.time_s >= 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_composite_cache_rebuilds_when_context_replaced():
+    device = MagicMock(spec=_DeviceType1)
+    setup = MagicMock(side_effect=_setup)
+    cache = DeviceCompositeCache()
+
+    cache.get(_context_with_device(device), "plan", setup)
+    cache.get(_context_with_device(device), "plan", setup)
+
+    assert setup.call_count == 2
+
+
+def test_composite_cache_rebuilds_when_device_in_context_changes():
+    devices = {"device1": MagicMock(spec=_DeviceType1)}
+    context = MagicMock()
+    context.find_device = devices.get
+    setup = MagicMock(side_effect=_setup)
+    cache = DeviceCompositeCache()
+
+    cache.get(context, "plan", setup)
+    devices["device1"] = MagicMock(spec=_DeviceType1)
+    composite = cache.get(context, "plan", setup)
+
+    assert setup.call_count == 2
+    assert composite.device1 is devices["device1"]
+
+
+def test_composite_cache_invalidate_only_drops_given_plan():
+    context = _context_with_device(MagicMock(spec=_DeviceType1))
+    setup = MagicMock(side_effect=_setup)
+    cache = DeviceCompositeCache()
+    cache.get(context, "plan_1", setup)
+    cache.get(context, "plan_2", setup)
+
+    cache.invalidate("plan_1")
+    cache.get(context, "plan_1", setup)
+    cache.get(context, "plan_2", setup)
+
+    assert setup.call_count == 3
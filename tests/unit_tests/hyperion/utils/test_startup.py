@@ -0,0 +1,116 @@
+import dataclasses
+from time import perf_counter, sleep
+from unittest.mock import MagicMock
+
+from ophyd.device import Device
+
+from mx_bluesky.hyperion.utils.context import (
+    DeviceCompositeCache,
+    device_composite_from_context,
+)
+from mx_bluesky.hyperion.utils.startup import (
+    PlanSetupTiming,
+    StartupReport,
+    connect_devices_concurrently,
+    run_concurrent_startup,
+    setup_composites_concurrently,
+)
+
+CONNECT_DELAY_S = 0.2
+
+
+class _SlowDevice(Device):
+    def wait_for_connection(self, all_signals=False, timeout=2.0):
+        sleep(CONNECT_DELAY_S)
+
+
+class _TimingOutDevice(Device):
+    def wait_for_connection(self, all_signals=False, timeout=2.0):
+        raise TimeoutError("timed out")
+
+
+def _slow_device(name: str) -> _SlowDevice:
+    return _SlowDevice(name=name)
+
+
+def test_devices_are_connected_in_parallel():
+    devices = {f"device_{i}": _slow_device(f"device_{i}") for i in range(8)}
+
+    start = perf_counter()
+    timings = connect_devices_concurrently(devices, max_workers=8)
+    elapsed = perf_counter() - start
+
+    assert elapsed < CONNECT_DELAY_S * 4
+    assert [t.name for t in timings] == list(devices.keys())
+    assert all(t.connected and t.time_s >= CONNECT_DELAY_S for t in timings)
+
+
+def test_connection_parallelism_is_bounded():
+    devices = {f"device_{i}": _slow_device(f"device_{i}") for i in range(4)}
+
+    start = perf_counter()
+    connect_devices_concurrently(devices, max_workers=2)
+
+    assert perf_counter() - start >= CONNECT_DELAY_S * 2
+
+
+def test_failed_connection_is_reported_without_stopping_other_devices():
+    devices = {
+        "good": _slow_device("good"),
+        "bad": _TimingOutDevice(name="bad"),
+    }
+
+    timings = {t.name: t for t in connect_devices_concurrently(devices)}
+
+    assert timings["good"].connected
+    assert not timings["bad"].connected
+    assert "timed out" in timings["bad"].error
+
+
+@dataclasses.dataclass
+class _Composite:
+    device_0: _SlowDevice
+
+
+def test_composites_set_up_concurrently_are_cached():
+    context = MagicMock()
+    context.find_device = {"device_0": _slow_device("device_0")}.get
+    cache = DeviceCompositeCache()
+    setup = MagicMock(
+        side_effect=lambda ctx: device_composite_from_context(ctx, _Composite)
+    )
+
+    timings = setup_composites_concurrently(
+        context, cache, {"plan_1": setup, "plan_2": setup}
+    )
+    cache.get(context, "plan_1", setup)
+
+    assert [t.plan_name for t in timings] == ["plan_1", "plan_2"]
+    assert setup.call_count == 2
+    assert cache.last_lookup is not None and cache.last_lookup.hit
+
+
+def test_startup_report_contains_critical_path():
+    context = MagicMock()
+    context.devices = {"fast": Device(name="fast"), "slow": _slow_device("slow")}
+    context.devices["fast"].wait_for_connection = MagicMock()
+
+    def _slow_setup(ctx):
+        sleep(0.05)
+
+    report = run_concurrent_startup(
+        context,
+        DeviceCompositeCache(),
+        {"fast_plan": MagicMock(), "slow_plan": _slow_setup},
+    )
+
+    assert report.critical_path == ["slow", "slow_plan"]
+    assert report.critical_path_time_s >= CONNECT_DELAY_S + 0.05
+    assert report.total_time_s >= report.critical_path_time_s
+    assert report.as_dict()["failed_devices"] == []
+
+
+def test_startup_report_with_nothing_to_do_is_empty():
+    report = StartupReport(plan_setups=[PlanSetupTiming("plan", 0.1)])
+    assert report.critical_path == ["plan"]
+    assert report.critical_path_time_s == 0.1
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compares how long after a document is received each callback has handled it, when
+all the callbacks run on the dispatcher thread against each callback having its own
+worker. Documents arrive at the rate of a gridscan and the callbacks are synthetic,
+taking the times below in place of the NeXus writing, ISPyB deposition (which
+triggers Zocalo) and log tagging. With the workers, ISPyB handles each stop document
+once the NeXus callback has, as it would in the callbacks process."""
+
+import time
+from uuid import uuid4
+
+from mx_bluesky.hyperion.external_interaction.callbacks.threaded_dispatcher import (
+    CallbackLagStats,
+    ThreadedCallbackDispatcher,
+)
+
+RUNS = 3
+EVENTS_PER_RUN = 20
+EVENT_INTERVAL_S = 0.01
+RUN_INTERVAL_S = 0.3
+# The time each synthetic callback takes over each kind of document
+CALLBACK_S = {
+    "Nexus": {"start": 0.1, "event": 0.001, "stop": 0.1},
+    "IspybAndZocalo": {"start": 0.02, "event": 0.002, "stop": 0.02},
+    "LogUidTagging": {"start": 0.0, "event": 0.0, "stop": 0.0},
+}
+
+
+class SyntheticCallback:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.delays_s = CALLBACK_S[name]
+
+    def __call__(self, name, doc):
+        time.sleep(self.delays_s[name])
+
+
+def _documents():
+    """Yields each document, with when it arrived, once it is due to arrive. A document
+    handled late still arrived when it was due, so the lag is measured from then."""
+    due = time.monotonic()
+    for _ in range(RUNS):
+        uid = str(uuid4())
+        documents = (
+            [("start", {"uid": uid})]
+            + [("event", {"uid": str(uuid4())})] * EVENTS_PER_RUN
+            + [("stop", {"uid": str(uuid4()), "run_start": uid})]
+        )
+        for document in documents:
+            time.sleep(max(0, due - time.monotonic()))
+            yield document, due
+            due += EVENT_INTERVAL_S
+        due += RUN_INTERVAL_S
+
+
+def single_thread() -> dict[str, CallbackLagStats]:
+    callbacks = [SyntheticCallback(name) for name in CALLBACK_S]
+    stats = {cb.name: CallbackLagStats() for cb in callbacks}
+    for (name, doc), received in _documents():
+        for cb in callbacks:
+            cb(name, doc)
+            lag_s = time.monotonic() - received
+            stats[cb.name].handled += 1
+            stats[cb.name].total_lag_s += lag_s
+            stats[cb.name].max_lag_s = max(stats[cb.name].max_lag_s, lag_s)
+    return stats
+
+
+def threaded() -> dict[str, CallbackLagStats]:
+    callbacks = {name: SyntheticCallback(name) for name in CALLBACK_S}
+    dispatcher = ThreadedCallbackDispatcher(
+        list(callbacks.values()),
+        stop_after={callbacks["IspybAndZocalo"]: [callbacks["Nexus"]]},
+    )
+    dispatcher.start()
+    for (name, doc), _ in _documents():
+        dispatcher(name, doc)
+    dispatcher.wait_until_idle()
+    dispatcher.stop()
+    return {worker.callback.name: worker.stats for worker in dispatcher.workers}  # type: ignore
+
+
+def main():
+    print(f"{RUNS} runs of {EVENTS_PER_RUN} events, lag mean / max in ms")
+    print(f"{'callback':>15} {'single thread':>16} {'worker each':>16}")
+    single, workers = single_thread(), threaded()
+    for name in CALLBACK_S:
+        print(
+            f"{name:>15} "
+            f"{single[name].mean_lag_s * 1000:7.2f} / {single[name].max_lag_s * 1000:6.2f} "
+            f"{workers[name].mean_lag_s * 1000:7.2f} / {workers[name].max_lag_s * 1000:6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compares the time spent parsing parameters when a start document is handled by all
+of the callbacks that are subscribed to it, with each callback parsing the parameters
+itself against the callbacks sharing the parsed parameter cache."""
+
+import json
+from timeit import timeit
+from uuid import uuid4
+
+from mx_bluesky.hyperion.external_interaction.callbacks.common.parameter_cache import (
+    ParsedParameterCache,
+)
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+from mx_bluesky.hyperion.parameters.rotation import RotationScan
+
+REPEATS = 200
+
+# The parameter type each subscribed callback parses from the start document
+START_DOCUMENTS = {
+    "gridscan outer": (
+        "tests/test_data/parameter_json_files/good_test_parameters.json",
+        # GridscanNexusFileCallback
+        [ThreeDGridScan],
+    ),
+    "rotation outer": (
+        "tests/test_data/parameter_json_files/good_test_rotation_scan_parameters.json",
+        # RotationISPyBCallback and RotationNexusFileCallback
+        [RotationScan, RotationScan],
+    ),
+}
+
+
+def main():
+    print(
+        f"{'start document':>15} {'callbacks':>10} {'uncached (ms)':>14} {'cached (ms)':>12}"
+    )
+    for name, (params_file, subscribed) in START_DOCUMENTS.items():
+        with open(params_file) as f:
+            json_params = subscribed[0](**json.load(f)).json()
+
+        def handle_uncached(json_params=json_params, subscribed=subscribed):
+            for callback_params_type in subscribed:
+                callback_params_type.from_json(json_params)
+
+        cache = ParsedParameterCache()
+
+        def handle_cached(json_params=json_params, subscribed=subscribed, cache=cache):
+            doc = {"uid": str(uuid4()), "hyperion_parameters": json_params}
+            for callback_params_type in subscribed:
+                cache.get(callback_params_type, doc)  # type: ignore
+
+        uncached_ms = timeit(handle_uncached, number=REPEATS) / REPEATS * 1000
+        cached_ms = timeit(handle_cached, number=REPEATS) / REPEATS * 1000
+        print(
+            f"{name:>15} {len(subscribed):>10} {uncached_ms:>14.3f} {cached_ms:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Measures the time taken to record robot loads in ExpEye, which is replaced by a
+local HTTP server taking SERVER_DELAY_S to handle each request. Compares a new
+connection for each request against the shared keep-alive session, and how long the
+robot load callback is held up when the requests are sent by the queue instead."""
+
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from pathlib import Path
+
+import requests
+
+from mx_bluesky.hyperion.external_interaction.ispyb.exp_eye_store import (
+    ExpeyeInteraction,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.expeye_queue import (
+    ExpeyeRobotActionQueue,
+)
+
+LOADS = 20
+SERVER_DELAY_S = 0.005
+
+
+class StandInExpeye(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.connections = 0
+        self.action_ids = count(1)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Otherwise the body waits for the client to acknowledge the headers
+    disable_nagle_algorithm = True
+    server: StandInExpeye
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _respond(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(SERVER_DELAY_S)
+        encoded = json.dumps({"robotActionId": next(self.server.action_ids)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    do_POST = _respond
+    do_PATCH = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnpooledSession:
+    """Makes each request on a new connection, as bare requests.post did"""
+
+    post = staticmethod(requests.post)
+    patch = staticmethod(requests.patch)
+
+
+def _load(submit):
+    action = submit.start_load("cm31105", 4, 700, 10, 5)
+    submit.update_barcode_and_snapshots(action, "BARCODE", "before.jpg", "after.jpg")
+    submit.end_load(action, "success", "OK")
+
+
+def run(mode: str) -> None:
+    server = StandInExpeye()
+    expeye = ExpeyeInteraction()
+    expeye.base_url = f"http://127.0.0.1:{server.server_address[1]}/core"
+    if mode == "unpooled":
+        expeye.session = UnpooledSession()  # type: ignore
+    submit = expeye
+    if mode == "queued":
+        submit = ExpeyeRobotActionQueue(
+            expeye, Path(tempfile.mkdtemp()) / "expeye_spool.jsonl"
+        )
+
+    start = time.perf_counter()
+    for _ in range(LOADS):
+        _load(submit)
+    blocked_s = time.perf_counter() - start
+    if isinstance(submit, ExpeyeRobotActionQueue):
+        submit.flush()
+    total_s = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+
+    print(
+        f"{mode:>10}: {server.connections:3d} connections, "
+        f"callback blocked {blocked_s * 1000 / LOADS:6.2f}ms per load, "
+        f"all sent after {total_s * 1000:7.1f}ms"
+    )
+    if isinstance(submit, ExpeyeRobotActionQueue):
+        print(
+            f"{'':>10}  mean latency {submit.stats.mean_latency_s * 1000:.1f}ms, "
+            f"max {submit.stats.max_latency_s * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    print(
+        f"{LOADS} robot loads, 3 requests each, {SERVER_DELAY_S * 1000}ms server time"
+    )
+    for mode in ("unpooled", "pooled", "queued"):
+        run(mode)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Counts the ISPyB connections opened, the stored procedure calls (round trips) made,
+and the time taken, for the depositions made during a gridscan and a rotation
+collection. The database is replaced by a stand-in which takes HANDSHAKE_S to connect
+to and CALL_S for each stored procedure call. Compares opening a connection for each
+deposition against the shared connection pool, with and without batched updates."""
+
+import time
+from contextlib import AbstractContextManager
+from itertools import count
+from unittest.mock import patch
+
+import ispyb
+from ispyb.sp.mxacquisition import MXAcquisition
+
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    ISPYB_CONNECTION_POOLS,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.data_model import (
+    DataCollectionGridInfo,
+    DataCollectionGroupInfo,
+    DataCollectionInfo,
+    DataCollectionPositionInfo,
+    ScanDataInfo,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_dataclass import Orientation
+from mx_bluesky.hyperion.external_interaction.ispyb.ispyb_store import (
+    StoreInIspyb,
+)
+
+CONFIG = "tests/test_data/test_config.cfg"
+HANDSHAKE_S = 0.02
+CALL_S = 0.001
+
+
+class StandInMXAcquisition:
+    get_data_collection_group_params = staticmethod(
+        MXAcquisition.get_data_collection_group_params
+    )
+    get_data_collection_params = staticmethod(MXAcquisition.get_data_collection_params)
+    get_dc_position_params = staticmethod(MXAcquisition.get_dc_position_params)
+    get_dc_grid_params = staticmethod(MXAcquisition.get_dc_grid_params)
+
+    def __init__(self, database: "StandInDatabase") -> None:
+        self._database = database
+
+    def _call(self, values=None):
+        self._database.calls += 1
+        time.sleep(CALL_S)
+        return (values and values[0]) or next(self._database.ids)
+
+    upsert_data_collection_group = _call
+    upsert_data_collection = _call
+    update_dc_position = _call
+    upsert_dc_grid = _call
+
+    def update_data_collection_append_comments(self, *args):
+        return self._call()
+
+
+class StandInCore:
+    def __init__(self, database: "StandInDatabase") -> None:
+        self._database = database
+
+    def retrieve_visit_id(self, visit):
+        self._database.calls += 1
+        time.sleep(CALL_S)
+        return 1
+
+
+class StandInConnection:
+    def __init__(self, database: "StandInDatabase") -> None:
+        time.sleep(HANDSHAKE_S)
+        database.connections += 1
+        self.conn = self
+        self.mx_acquisition = StandInMXAcquisition(database)
+        self.core = StandInCore(database)
+
+    def ping(self, **kwargs):
+        pass
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class StandInDatabase:
+    def __init__(self) -> None:
+        self.connections = 0
+        self.calls = 0
+        self.ids = count(100)
+
+    def open(self, config_path):
+        return StandInConnection(self)
+
+
+class UnpooledStoreInIspyb(StoreInIspyb):
+    def _connection(self) -> AbstractContextManager:
+        return ispyb.open(self.ISPYB_CONFIG_PATH)
+
+
+def _data_collection(**kwargs) -> DataCollectionInfo:
+    return DataCollectionInfo(visit_string="cm31105-4", sample_id=1, **kwargs)
+
+
+def gridscan(store: StoreInIspyb):
+    group = DataCollectionGroupInfo("cm31105-4", "Mesh3D", 1)
+    ids = store.begin_deposition(
+        group, [ScanDataInfo(data_collection_info=_data_collection())]
+    )
+    for omega, dc_id in [(0, ids.data_collection_ids[0]), (90, None)]:
+        ids = store.update_deposition(
+            ids,
+            [
+                ScanDataInfo(
+                    data_collection_info=_data_collection(omega_start=omega),
+                    data_collection_id=dc_id,
+                    data_collection_position_info=DataCollectionPositionInfo(0, 0, 0),
+                    data_collection_grid_info=DataCollectionGridInfo(
+                        0.1,
+                        0.1,
+                        40,
+                        20,
+                        1.25,
+                        1.25,
+                        0.01,
+                        100,
+                        Orientation.HORIZONTAL,
+                        True,
+                    ),
+                )
+            ],
+        )
+    # Where the callback waits for the writes before the gridscan triggers Zocalo
+    store.write_pending()
+    for _ in range(2):
+        ids = store.update_deposition(
+            ids,
+            [
+                ScanDataInfo(
+                    data_collection_info=_data_collection(), data_collection_id=dc_id
+                )
+                for dc_id in ids.data_collection_ids
+            ],
+        )
+    for dc_id in ids.data_collection_ids:
+        store.append_to_comment(dc_id, "Zocalo found no crystals in this gridscan.")
+    store.end_deposition(ids, "success", "")
+    store.write_pending()
+
+
+def rotation(store: StoreInIspyb):
+    group = DataCollectionGroupInfo("cm31105-4", "SAD", 1)
+    ids = store.begin_deposition(
+        group, [ScanDataInfo(data_collection_info=_data_collection())]
+    )
+    # Snapshots, hardware read before collection and flux read during it
+    for _ in range(6):
+        ids = store.update_deposition(
+            ids,
+            [
+                ScanDataInfo(
+                    data_collection_info=_data_collection(),
+                    data_collection_id=ids.data_collection_ids[0],
+                )
+            ],
+        )
+    store.end_deposition(ids, "fail", "Test failure")
+    store.write_pending()
+
+
+def main():
+    print(
+        f"{'collection':>10} {'store':>16} {'connections':>12} {'calls':>6} {'time (ms)':>10}"
+    )
+    stores = [
+        ("unpooled", UnpooledStoreInIspyb, False),
+        ("pooled", StoreInIspyb, False),
+        ("pooled, batched", StoreInIspyb, True),
+    ]
+    for name, collection in [("gridscan", gridscan), ("rotation", rotation)]:
+        for label, store_type, batch_updates in stores:
+            database = StandInDatabase()
+            ISPYB_CONNECTION_POOLS.clear()
+            with patch("ispyb.open", database.open):
+                start = time.perf_counter()
+                collection(store_type(CONFIG, batch_updates=batch_updates))
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            print(
+                f"{name:>10} {label:>16} {database.connections:>12} "
+                f"{database.calls:>6} {elapsed_ms:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
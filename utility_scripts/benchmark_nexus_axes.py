@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Compares the time and peak memory to write the .nxs file of rotation scans and grid
+scans with increasing numbers of frames, when nexgen finds the positions of the scan
+axes itself, when they're found by sorting the points and when they come from the
+description of the scan. nexgen's own search is quadratic so is skipped for the
+largest scans. Each write is made in a new process so that its peak RSS is its own."""
+
+import json
+import multiprocessing
+import resource
+import tempfile
+from time import perf_counter
+
+import numpy as np
+from nexgen.nxs_utils import Goniometer
+
+from mx_bluesky.hyperion.external_interaction.nexus.nexus_utils import (
+    create_beam_and_attenuator_parameters,
+)
+from mx_bluesky.hyperion.external_interaction.nexus.write_nexus import NexusWriter
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+from mx_bluesky.hyperion.parameters.rotation import RotationScan
+
+ROTATION_PARAMETERS = (
+    "tests/test_data/parameter_json_files/good_test_rotation_scan_parameters.json"
+)
+GRIDSCAN_PARAMETERS = "tests/test_data/parameter_json_files/good_test_parameters.json"
+FRAME_COUNTS = [1000, 10000, 100000, 1000000]
+NEXGEN_MAX_FRAMES = 40000
+MODES = ["nexgen", "sorted", "descriptor"]
+
+
+def _rotation_writer(num_frames: int, directory: str, mode: str) -> NexusWriter:
+    with open(ROTATION_PARAMETERS) as f:
+        params = RotationScan(**json.load(f))
+    params.storage_directory = directory
+    params.scan_width_deg = num_frames * params.rotation_increment_deg
+    det_size = params.detector_params.detector_size_constants.det_size_pixels
+    return NexusWriter(
+        params,
+        (params.num_images, det_size.width, det_size.height),
+        params.scan_descriptor if mode == "descriptor" else params.scan_points,
+        omega_start_deg=params.omega_start_deg,
+    )
+
+
+def _grid_writer(num_frames: int, directory: str, mode: str) -> NexusWriter:
+    with open(GRIDSCAN_PARAMETERS) as f:
+        params = ThreeDGridScan(**json.load(f))
+    params.storage_directory = directory
+    params.x_steps = params.y_steps = int(np.sqrt(num_frames))
+    det_size = params.detector_params.detector_size_constants.det_size_pixels
+    return NexusWriter(
+        params,
+        (params.scan_indices[1], det_size.width, det_size.height),
+        (
+            params.scan_descriptors[0]
+            if mode == "descriptor"
+            else params.scan_points_first_grid
+        ),
+    )
+
+
+def _write(scan: str, num_frames: int, mode: str) -> tuple[float, float]:
+    """The time to set up the writer and write the .nxs file, and how much that raised
+    the peak RSS in MB"""
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as directory:
+        start = perf_counter()
+        writer = (_rotation_writer if scan == "rotation" else _grid_writer)(
+            num_frames, directory, mode
+        )
+        if mode == "nexgen":
+            writer.goniometer = Goniometer(
+                writer.goniometer.axes_list, writer.scan_points
+            )
+        writer.beam, writer.attenuator = create_beam_and_attenuator_parameters(
+            12.7, 1e12, 0.1
+        )
+        writer.write_file(
+            writer.nexus_file, np.uint16, *writer.predict_collection_times()
+        )
+        elapsed = perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, (rss_after - rss_before) / 1000
+
+
+def main():
+    print(f"{'scan':>9} {'frames':>8} {'mode':>11} {'write (s)':>10} {'peak +MB':>9}")
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for scan in ["rotation", "grid"]:
+            for num_frames in FRAME_COUNTS:
+                for mode in MODES:
+                    if mode == "nexgen" and num_frames > NEXGEN_MAX_FRAMES:
+                        print(f"{scan:>9} {num_frames:>8} {mode:>11} {'-':>10}")
+                        continue
+                    write_s, peak_mb = pool.apply(_write, (scan, num_frames, mode))
+                    print(
+                        f"{scan:>9} {num_frames:>8} {mode:>11} {write_s:>10.3f} "
+                        f"{peak_mb:>9.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
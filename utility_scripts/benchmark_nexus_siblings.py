@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Compares the time to write the .nxs and _master.h5 files of rotation scans with a
+small and a very large number of images, when nexgen writes both files and when the
+master file is copied from, or linked to, the .nxs file. The files written in each
+mode are checked to be the same as each other."""
+
+import json
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from mx_bluesky.hyperion.external_interaction.nexus.compare_nexus import (
+    compare_nexus_files,
+)
+from mx_bluesky.hyperion.external_interaction.nexus.nexus_utils import (
+    create_beam_and_attenuator_parameters,
+)
+from mx_bluesky.hyperion.external_interaction.nexus.sibling_files import (
+    NexusSiblingMode,
+)
+from mx_bluesky.hyperion.external_interaction.nexus.write_nexus import NexusWriter
+from mx_bluesky.hyperion.parameters.rotation import RotationScan
+
+PARAMETERS = (
+    "tests/test_data/parameter_json_files/good_test_rotation_scan_parameters.json"
+)
+IMAGE_COUNTS = [100, 3600, 36000]
+REPEATS = 3
+
+
+def _writer(num_images: int, directory: str, mode: NexusSiblingMode) -> NexusWriter:
+    with open(PARAMETERS) as f:
+        params = RotationScan(**json.load(f))
+    params.storage_directory = directory
+    params.scan_width_deg = num_images * params.rotation_increment_deg
+    det_size = params.detector_params.detector_size_constants.det_size_pixels
+    writer = NexusWriter(
+        params,
+        (params.num_images, det_size.width, det_size.height),
+        params.scan_points,
+        omega_start_deg=params.omega_start_deg,
+        sibling_mode=mode,
+    )
+    writer.beam, writer.attenuator = create_beam_and_attenuator_parameters(
+        12.7, 1e12, 0.1
+    )
+    return writer
+
+
+def _time_files(writer: NexusWriter) -> list[float]:
+    """The best time to write each of the files"""
+    times = []
+    start_time, est_end_time = writer.predict_collection_times()
+    for _ in range(REPEATS):
+        for filename in writer.files:
+            filename.unlink(missing_ok=True)
+        repeat = []
+        for filename in writer.files:
+            start = perf_counter()
+            writer.write_file(filename, np.uint16, start_time, est_end_time)
+            repeat.append(perf_counter() - start)
+        times = [min(t) for t in zip(times, repeat, strict=True)] if times else repeat
+    return times
+
+
+def main():
+    print(
+        f"{'images':>8} {'mode':>6} {'.nxs (s)':>9} {'master (s)':>11} "
+        f"{'total (s)':>10} {'master kB':>10} {'same':>5}"
+    )
+    for num_images in IMAGE_COUNTS:
+        for mode in NexusSiblingMode:
+            with tempfile.TemporaryDirectory() as directory:
+                writer = _writer(num_images, directory, mode)
+                nexus_s, master_s = _time_files(writer)
+                same = not compare_nexus_files(writer.nexus_file, writer.master_file)
+                master_kb = Path(writer.master_file).stat().st_size / 1000
+            print(
+                f"{num_images:>8} {mode.value:>6} {nexus_s:>9.4f} {master_s:>11.4f} "
+                f"{nexus_s + master_s:>10.4f} {master_kb:>10.1f} {str(same):>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compares generating the points of a 3D grid scan through scanspec with the cached
+NumPy geometry used by ThreeDGridScan, for a range of grid sizes."""
+
+from timeit import timeit
+
+from scanspec.core import Path as ScanPath
+
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+
+GRID_SIZES = [(10, 10, 1), (50, 50, 50), (100, 100, 100), (200, 200, 200)]
+REPEATS = 5
+
+
+def _params(x_steps: int, y_steps: int, z_steps: int) -> ThreeDGridScan:
+    return ThreeDGridScan(
+        sample_id=123,
+        x_start_um=0.123,
+        y_start_um=0.777,
+        z_start_um=0.05,
+        parameter_model_version="5.0.0",
+        visit="cm12345",
+        file_name="benchmark",
+        y2_start_um=2,
+        z2_start_um=2,
+        x_steps=x_steps,
+        y_steps=y_steps,
+        z_steps=z_steps,
+        storage_directory="/tmp/benchmark_scan_geometry/",
+    )
+
+
+def main():
+    print(
+        f"{'grid':>15} {'images':>8} {'scanspec (s)':>13} {'first (s)':>10} "
+        f"{'cached (s)':>11} {'num_images (s)':>15}"
+    )
+    for size in GRID_SIZES:
+        params = _params(*size)
+        scanspec_s = (
+            timeit(
+                lambda params=params: (
+                    ScanPath(params.scan_spec.calculate()).consume().midpoints
+                ),
+                number=REPEATS,
+            )
+            / REPEATS
+        )
+        first_s = timeit(lambda params=params: params.scan_points, number=1)
+        cached_s = timeit(lambda params=params: params.scan_points, number=REPEATS)
+        count_s = timeit(lambda params=params: params.num_images, number=REPEATS)
+        print(
+            f"{'x'.join(map(str, size)):>15} {params.num_images:>8} "
+            f"{scanspec_s:>13.6f} {first_s:>10.6f} {cached_s / REPEATS:>11.6f} "
+            f"{count_s / REPEATS:>15.6f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Compares the bytes sent over the ZMQ document bus, and the latency from a document
+being published until the callback process handles it, for the serialisers and with
+events batched. Each run publishes the documents of a gridscan and a multi-rotation
+scan, made with the test parameters and at the rate of a real collection, through a
+Proxy to a DocumentBusDispatcher over localhost, as between hyperion and
+hyperion-callbacks."""
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from uuid import uuid4
+
+import numpy as np
+from bluesky.callbacks.zmq import Proxy, Publisher
+
+from mx_bluesky.hyperion.external_interaction.callbacks.common.handler_profiler import (
+    Histogram,
+)
+from mx_bluesky.hyperion.external_interaction.callbacks.document_bus import (
+    SERIALISERS,
+    DocumentBusDispatcher,
+    create_publisher_subscription,
+)
+from mx_bluesky.hyperion.parameters.constants import CONST
+from mx_bluesky.hyperion.parameters.gridscan import ThreeDGridScan
+from mx_bluesky.hyperion.parameters.rotation import MultiRotationScan
+
+PARAMETERS = "tests/test_data/parameter_json_files/"
+PORTS = (5587, 5588)
+EVENT_INTERVAL_S = 0.005
+# Readings taken per event, as in the hardware reads of the plans
+READINGS_PER_EVENT = 12
+# Events of a gridscan or a rotation, e.g. hardware reads, flux and zocalo readings
+EVENTS_PER_COLLECTION = 20
+CONFIGURATIONS = [
+    ("pickle", 1),
+    ("msgpack", 1),
+    ("msgpack-zlib", 1),
+    ("msgpack-zlib", 10),
+]
+
+
+def _run(md: dict, events: int, nested: list | None = None) -> Iterator[tuple]:
+    uid = str(uuid4())
+    yield "start", {"uid": uid, "time": time.time(), **md}
+    for inner in nested or []:
+        yield from inner
+    descriptor = {"uid": str(uuid4()), "run_start": uid, "time": time.time()}
+    if events:
+        yield "descriptor", descriptor
+    for seq_num in range(1, events + 1):
+        readings = {
+            f"device-{i}": float(np.random.rand()) for i in range(READINGS_PER_EVENT)
+        }
+        yield (
+            "event",
+            {
+                "uid": str(uuid4()),
+                "descriptor": descriptor["uid"],
+                "seq_num": seq_num,
+                "time": time.time(),
+                "data": readings,
+                "timestamps": dict.fromkeys(readings, time.time()),
+                "filled": {},
+            },
+        )
+    yield "stop", {"uid": str(uuid4()), "run_start": uid, "time": time.time()}
+
+
+def gridscan_documents() -> Iterator[tuple]:
+    with open(PARAMETERS + "good_test_parameters.json") as f:
+        params = ThreeDGridScan(**json.load(f))
+    do_fgs = _run(
+        {
+            "subplan_name": CONST.PLAN.DO_FGS,
+            "scan_descriptors": [d.to_dict() for d in params.scan_descriptors],
+            "scan_start_indices": params.scan_indices,
+        },
+        EVENTS_PER_COLLECTION,
+    )
+    return _run(
+        {
+            "subplan_name": CONST.PLAN.GRIDSCAN_OUTER,
+            "hyperion_parameters": params.json(),
+            "activate_callbacks": ["GridscanNexusFileCallback"],
+        },
+        0,
+        [do_fgs],
+    )
+
+
+def multi_rotation_documents() -> Iterator[tuple]:
+    with open(PARAMETERS + "good_test_multi_rotation_scan_parameters.json") as f:
+        params = MultiRotationScan(**json.load(f))
+    sweeps = [
+        _run(
+            {
+                "subplan_name": CONST.PLAN.ROTATION_OUTER,
+                "hyperion_parameters": sweep.json(),
+            },
+            0,
+            [
+                _run(
+                    {
+                        "subplan_name": CONST.PLAN.ROTATION_MAIN,
+                        "scan_descriptors": [sweep.scan_descriptor.to_dict()],
+                    },
+                    EVENTS_PER_COLLECTION,
+                )
+            ],
+        )
+        for sweep in params.single_rotation_scans
+    ]
+    return _run(
+        {
+            "subplan_name": CONST.PLAN.ROTATION_MULTI,
+            "hyperion_parameters": params.json(),
+            "activate_callbacks": ["RotationISPyBCallback"],
+        },
+        0,
+        sweeps,
+    )
+
+
+class Receiver:
+    def __init__(self) -> None:
+        self.received: dict[str, float] = {}
+        self.new_document = threading.Condition()
+
+    def __call__(self, name, doc):
+        with self.new_document:
+            self.received[doc["uid"]] = time.perf_counter()
+            self.new_document.notify_all()
+
+    def wait_for(self, uid: str, timeout_s: float = 10) -> None:
+        with self.new_document:
+            assert self.new_document.wait_for(
+                lambda: uid in self.received, timeout_s
+            ), f"{uid} not received"
+
+
+def start_bus(receiver: Receiver) -> None:
+    proxy = Proxy(*PORTS)
+    threading.Thread(target=proxy.start, daemon=True).start()
+
+    def run_dispatcher():
+        dispatcher = DocumentBusDispatcher(
+            f"localhost:{PORTS[1]}", loop=asyncio.new_event_loop()
+        )
+        dispatcher.subscribe(receiver)
+        dispatcher.start()
+
+    threading.Thread(target=run_dispatcher, daemon=True).start()
+
+
+def publish(receiver, documents, serialiser: str, batch_size: int):
+    sent_bytes = []
+
+    def serialise(doc):
+        serialised = SERIALISERS[serialiser](doc)
+        sent_bytes.append(len(serialised))
+        return serialised
+
+    publisher = Publisher(f"localhost:{PORTS[0]}", serializer=serialise)
+    # Wait for the subscriptions to be passed through the proxy
+    while True:
+        uid = str(uuid4())
+        publisher("stop", {"uid": uid})
+        try:
+            receiver.wait_for(uid, 0.1)
+            break
+        except AssertionError:
+            continue
+    sent_bytes.clear()
+
+    subscription = create_publisher_subscription(publisher, batch_size)
+    published = {}
+    for name, doc in documents:
+        if name == "event":
+            time.sleep(EVENT_INTERVAL_S)
+        published[doc["uid"]] = time.perf_counter()
+        subscription(name, doc)
+    receiver.wait_for(doc["uid"])
+    publisher.close()
+
+    latency = Histogram()
+    for uid, sent in published.items():
+        latency.record(receiver.received[uid] - sent)
+    return len(sent_bytes), sum(sent_bytes), latency
+
+
+def main():
+    receiver = Receiver()
+    start_bus(receiver)
+    print(
+        f"{'run':>15} {'serialiser':>13} {'batch':>5} {'messages':>8} {'kB':>7} "
+        f"{'latency mean / p95 / max (ms)':>30}"
+    )
+    for run, documents in [
+        ("gridscan", gridscan_documents),
+        ("multi-rotation", multi_rotation_documents),
+    ]:
+        for serialiser, batch_size in CONFIGURATIONS:
+            messages, sent_bytes, latency = publish(
+                receiver, list(documents()), serialiser, batch_size
+            )
+            print(
+                f"{run:>15} {serialiser:>13} {batch_size:>5} {messages:>8} "
+                f"{sent_bytes / 1000:>7.1f} {latency.mean_s * 1000:>12.2f} / "
+                f"{latency.quantile_s(0.95) * 1000:>5.2f} / "
+                f"{latency.max_s * 1000:>6.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Measures the time taken to trigger Zocalo for gridscans, with the broker replaced by
+a transport in the process taking CONNECT_S to connect and SEND_S to confirm each
+message. Compares dodal's ZocaloTrigger, which connects for each message and waits
+for it to be sent, against the QueuedZocaloTrigger, which the callbacks hand the
+messages to without waiting and which keeps its connection open."""
+
+import time
+from unittest.mock import patch
+
+from dodal.devices.zocalo import ZocaloStartInfo, ZocaloTrigger
+from workflows.transport.common_transport import CommonTransport
+
+from mx_bluesky.hyperion.external_interaction.zocalo.submission_service import (
+    QueuedZocaloTrigger,
+    ZocaloSubmissionService,
+)
+
+RUNS = 20
+GRIDS_PER_RUN = 2
+CONNECT_S = 0.02
+SEND_S = 0.002
+
+
+class StandInTransport(CommonTransport):
+    connections = 0
+    messages = 0
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._connected = False
+
+    def connect(self) -> bool:
+        time.sleep(CONNECT_S)
+        StandInTransport.connections += 1
+        self._connected = True
+        return True
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def disconnect(self):
+        self._connected = False
+
+    def _send(self, destination, message, **kwargs):
+        if kwargs.get("transaction") is None:
+            time.sleep(SEND_S)
+            StandInTransport.messages += 1
+
+    def _transaction_begin(self, transaction_id: int, **kwargs) -> None:
+        pass
+
+    def _transaction_commit(self, transaction_id: int, **kwargs) -> None:
+        time.sleep(SEND_S)
+        StandInTransport.messages += 1
+
+
+def _connect(environment: str) -> StandInTransport:
+    transport = StandInTransport()
+    transport.connect()
+    return transport
+
+
+def _trigger_runs(trigger: ZocaloTrigger) -> float:
+    """Triggers the runs as the Zocalo callback would and returns how long the
+    callback was held up"""
+    blocked_s = 0.0
+    for run in range(RUNS):
+        dcids = [GRIDS_PER_RUN * run + grid for grid in range(GRIDS_PER_RUN)]
+        start = time.perf_counter()
+        for index, dcid in enumerate(dcids):
+            trigger.run_start(ZocaloStartInfo(dcid, "test", 100 * index, 100, index))
+        for dcid in dcids:
+            trigger.run_end(dcid)
+        blocked_s += time.perf_counter() - start
+    return blocked_s
+
+
+def main():
+    print(
+        f"{'trigger':>10} {'blocked (s)':>12} {'total (s)':>10} {'messages':>9} "
+        f"{'connections':>12}"
+    )
+    for name in ["per-message", "queued"]:
+        StandInTransport.connections = StandInTransport.messages = 0
+        start = time.perf_counter()
+        if name == "queued":
+            service = ZocaloSubmissionService(_connect)
+            blocked_s = _trigger_runs(QueuedZocaloTrigger("test", service))
+            service.close()
+        else:
+            with patch(
+                "dodal.devices.zocalo.zocalo_interaction._get_zocalo_connection",
+                _connect,
+            ):
+                blocked_s = _trigger_runs(ZocaloTrigger("test"))
+        total_s = time.perf_counter() - start
+        print(
+            f"{name:>10} {blocked_s:>12.3f} {total_s:>10.3f} "
+            f"{StandInTransport.messages:>9} {StandInTransport.connections:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Replays document journals, recorded by hyperion when HYPERION_DOCUMENT_JOURNAL_DIR is
+set, into the external callbacks and reports the throughput and the latency of each
+type of document. ISPyB and Zocalo are replaced by local stand-ins, ISPyB taking
+--ispyb-call-ms for each stored procedure call, and the NeXus files are written to a
+temporary directory, so the same journal gives comparable results on any machine.
+
+    python utility_scripts/replay_callback_journal.py journals/*.jsonl.gz --speed 1
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from itertools import count
+from unittest.mock import patch
+
+from ispyb.sp.mxacquisition import MXAcquisition
+
+from mx_bluesky.hyperion.external_interaction.callbacks.__main__ import (
+    setup_callbacks,
+)
+from mx_bluesky.hyperion.external_interaction.callbacks.document_journal import (
+    replay_journal,
+)
+from mx_bluesky.hyperion.external_interaction.ispyb.connection_pool import (
+    ISPYB_CONNECTION_POOLS,
+)
+
+CONFIG = "tests/test_data/test_config.cfg"
+
+
+class StandInMXAcquisition:
+    get_data_collection_group_params = staticmethod(
+        MXAcquisition.get_data_collection_group_params
+    )
+    get_data_collection_params = staticmethod(MXAcquisition.get_data_collection_params)
+    get_dc_position_params = staticmethod(MXAcquisition.get_dc_position_params)
+    get_dc_grid_params = staticmethod(MXAcquisition.get_dc_grid_params)
+
+    def __init__(self, database: "StandInDatabase") -> None:
+        self._database = database
+
+    def _call(self, values=None, *args):
+        return self._database.call((values and values[0]) or None)
+
+    upsert_data_collection_group = _call
+    upsert_data_collection = _call
+    update_dc_position = _call
+    upsert_dc_grid = _call
+    update_data_collection_append_comments = _call
+
+
+class StandInCore:
+    def __init__(self, database: "StandInDatabase") -> None:
+        self._database = database
+
+    def retrieve_visit_id(self, visit):
+        return self._database.call(1)
+
+
+class StandInConnection:
+    def __init__(self, database: "StandInDatabase") -> None:
+        self.conn = self
+        self.mx_acquisition = StandInMXAcquisition(database)
+        self.core = StandInCore(database)
+
+    def ping(self, **kwargs):
+        pass
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class StandInDatabase:
+    def __init__(self, call_s: float) -> None:
+        self.call_s = call_s
+        self.calls = 0
+        self.ids = count(100)
+
+    def call(self, result=None):
+        self.calls += 1
+        time.sleep(self.call_s)
+        return result if result is not None else next(self.ids)
+
+    def open(self, config_path):
+        return StandInConnection(self)
+
+
+class StandInZocaloTrigger:
+    runs_started = 0
+    runs_ended = 0
+
+    def __init__(self, environment: str) -> None:
+        self.environment = environment
+
+    def run_start(self, start_info):
+        StandInZocaloTrigger.runs_started += 1
+
+    def run_end(self, data_collection_id):
+        StandInZocaloTrigger.runs_ended += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("journals", nargs="+")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=None,
+        help="1 to replay as quickly as recorded, 2 twice as quickly; as quickly as "
+        "the callbacks allow if not given",
+    )
+    parser.add_argument("--ispyb-call-ms", type=float, default=1.0)
+    parser.add_argument("--json", help="File to write the reports to as JSON")
+    args = parser.parse_args()
+
+    reports = {}
+    for journal in args.journals:
+        database = StandInDatabase(args.ispyb_call_ms / 1000)
+        ISPYB_CONNECTION_POOLS.clear()
+        with (
+            tempfile.TemporaryDirectory() as storage_directory,
+            patch("ispyb.open", database.open),
+            patch.dict("os.environ", {"ISPYB_CONFIG_PATH": CONFIG}),
+            patch(
+                "mx_bluesky.hyperion.external_interaction.callbacks.zocalo_callback.QueuedZocaloTrigger",
+                StandInZocaloTrigger,
+            ),
+        ):
+            report = replay_journal(
+                journal, setup_callbacks(), args.speed, storage_directory
+            )
+        reports[journal] = report.to_dict() | {"ispyb_calls": database.calls}
+        print(f"{journal}: {database.calls} ISPyB calls")
+        print(report)
+    print(
+        f"Zocalo runs started {StandInZocaloTrigger.runs_started}, "
+        f"ended {StandInZocaloTrigger.runs_ended}"
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Checks that the _master.h5 file beside each given .nxs file holds the same NeXus
+structure, however it was written, and prints any differences.
+
+    python utility_scripts/verify_nexus_siblings.py /dls/i03/data/2024/cm12345-1/*.nxs
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from mx_bluesky.hyperion.external_interaction.nexus.compare_nexus import (
+    compare_nexus_files,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("nexus_files", nargs="+", type=Path)
+    args = parser.parse_args()
+
+    all_same = True
+    for nexus_file in args.nexus_files:
+        master_file = nexus_file.with_name(f"{nexus_file.stem}_master.h5")
+        if not master_file.exists():
+            print(f"{nexus_file}: no master file {master_file.name}")
+            all_same = False
+            continue
+        differences = compare_nexus_files(nexus_file, master_file)
+        print(f"{nexus_file}: {'differs' if differences else 'same'}")
+        for difference in differences:
+            print(f"    {difference}")
+        all_same = all_same and not differences
+    sys.exit(0 if all_same else 1)
+
+
+if __name__ == "__main__":
+    main()